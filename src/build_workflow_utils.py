@@ -0,0 +1,28 @@
+"""Generate fabric_devops_utils modules of project workflow templates from the fabric_devops package"""
+import os
+import sys
+
+WORKFLOW_FILTER = os.getenv("WORKFLOW_FILTER")
+# 'true' reports workflows with stale utils modules and fails instead of writing them
+CHECK_ONLY = os.getenv("CHECK_ONLY") == 'true'
+
+from fabric_devops import AppLogger
+from fabric_devops.workflow_utils_bundler import WorkflowUtilsBundler
+
+workflow_names = [ workflow_name for workflow_name in WorkflowUtilsBundler.get_workflow_names()
+                   if WORKFLOW_FILTER is None or WORKFLOW_FILTER in workflow_name ]
+
+AppLogger.log_step('Build fabric_devops_utils modules for project workflow templates')
+stale_workflows = []
+for workflow_name in workflow_names:
+    if CHECK_ONLY:
+        if not WorkflowUtilsBundler.is_current(workflow_name):
+            stale_workflows.append(workflow_name)
+            AppLogger.log_error(f'[{WorkflowUtilsBundler.get_utils_path(workflow_name)}] is out of date')
+    elif WorkflowUtilsBundler.write(workflow_name):
+        AppLogger.log_substep(f'Updated [{WorkflowUtilsBundler.get_utils_path(workflow_name)}]')
+    else:
+        AppLogger.log_substep(f'[{WorkflowUtilsBundler.get_utils_path(workflow_name)}] is up to date')
+
+if len(stale_workflows) > 0:
+    sys.exit(1)
@@ -0,0 +1,58 @@
+"""Check that importing fabric_devops stays within its time budget and leaves heavy modules to first use"""
+import json
+import os
+import subprocess
+import sys
+
+# seconds a fresh interpreter may spend on 'import fabric_devops'
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "0.1"))
+# seconds a fresh interpreter may spend importing every public name of fabric_devops
+IMPORT_ALL_BUDGET_SECONDS = float(os.getenv("IMPORT_ALL_BUDGET_SECONDS", "1.5"))
+# each import is timed this many times and the fastest run is compared to the budget
+IMPORT_BUDGET_RUNS = int(os.getenv("IMPORT_BUDGET_RUNS", "3"))
+
+# third-party modules which fabric_devops must only import on first use
+LAZY_MODULES = [ 'msal', 'nacl', 'yaml', 'fabric_cicd', 'microsoft_fabric_api' ]
+
+# runs in a fresh interpreter so modules imported by this script are not counted
+MEASURE_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{ 'seconds': seconds, 'modules': sorted(sys.modules) }}))
+"""
+
+def measure_import(statement):
+    """Get (seconds, modules) of fastest run of import statement in a fresh interpreter"""
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [ os.path.dirname(os.path.abspath(__file__)), environment.get('PYTHONPATH') ]))
+    runs = []
+    for _ in range(max(1, IMPORT_BUDGET_RUNS)):
+        output = subprocess.run([ sys.executable, '-c', MEASURE_IMPORT.format(statement=statement) ],
+                                env=environment, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    fastest = min(runs, key=lambda run: run['seconds'])
+    return fastest['seconds'], fastest['modules']
+
+from fabric_devops import AppLogger
+
+AppLogger.log_step('Check import time budget of fabric_devops')
+failures = []
+for statement, budget_seconds in [ ('import fabric_devops', IMPORT_BUDGET_SECONDS),
+                                   ('from fabric_devops import *', IMPORT_ALL_BUDGET_SECONDS) ]:
+    seconds, modules = measure_import(statement)
+    AppLogger.log_substep(f'[{statement}] took {seconds * 1000:.0f}ms (budget {budget_seconds * 1000:.0f}ms)')
+    if seconds > budget_seconds:
+        failures.append(f'[{statement}] took {seconds * 1000:.0f}ms which is over budget of ' + \
+                        f'{budget_seconds * 1000:.0f}ms')
+    loaded_modules = sorted({ module.split('.')[0] for module in modules } & set(LAZY_MODULES))
+    if len(loaded_modules) > 0:
+        failures.append(f'[{statement}] loaded {", ".join(loaded_modules)} which must only load on first use')
+
+for failure in failures:
+    AppLogger.log_error(failure)
+
+if len(failures) > 0:
+    sys.exit(1)
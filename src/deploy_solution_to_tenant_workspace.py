@@ -1,10 +1,12 @@
 """Deploy solution to tenant customer workspace"""
 import os
+import sys
 
 from fabric_devops import DeploymentManager, SampleCustomerData, AppLogger
 
 CUSTOMER_NAME = os.getenv("CUSTOMER_NAME")
 SOLUTION_NAME = os.getenv("SOLUTION_NAME")
+FLEET_MAX_PARALLELISM = int(os.getenv("FLEET_MAX_PARALLELISM", "4"))
 
 DEPLOYMENT_JOBS = []
 match CUSTOMER_NAME:
@@ -23,13 +25,24 @@ match CUSTOMER_NAME:
     case 'Deploy To All Customers':
         DEPLOYMENT_JOBS = SampleCustomerData.get_all_customers()
 
-for DEPLOYMENT_JOB in DEPLOYMENT_JOBS:
+if len(DEPLOYMENT_JOBS) > 1:
+    # deploy to many tenants concurrently with per-capacity limits
+    results = DeploymentManager.deploy_solution_to_tenants(
+        SOLUTION_NAME,
+        DEPLOYMENT_JOBS,
+        max_parallelism=FLEET_MAX_PARALLELISM)
 
-    TARGET_WORKSPACE = f'Tenant - {DEPLOYMENT_JOB.name}'
+    if any(result['status'] != 'Succeeded' for result in results):
+        sys.exit(1)
 
-    workspace = DeploymentManager.deploy_solution_by_name(
-        SOLUTION_NAME,
-        TARGET_WORKSPACE,
-        DEPLOYMENT_JOB)
+else:
+    for DEPLOYMENT_JOB in DEPLOYMENT_JOBS:
+
+        TARGET_WORKSPACE = f'Tenant - {DEPLOYMENT_JOB.name}'
+
+        workspace = DeploymentManager.deploy_solution_by_name(
+            SOLUTION_NAME,
+            TARGET_WORKSPACE,
+            DEPLOYMENT_JOB)
 
-    AppLogger.log_job_complete(workspace.id)
+        AppLogger.log_job_complete(workspace.id)
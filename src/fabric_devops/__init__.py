@@ -1,12 +1,24 @@
 """Fabric DevOps Library"""
 
+import importlib
+from typing import TYPE_CHECKING
+
 # Define the __all__ variable
 __all__ = [
     "EnvironmentSettings", 
     "AppLogger",
     "FabricRestApi",
     "PowerBiRestApi",
+    "AsyncFabricRestApi",
     "ItemDefinitionFactory",
+    "ItemDefinition",
+    "DefinitionPartSet",
+    "DefinitionPart",
+    "DefinitionPartCache",
+    "PayloadRewriter",
+    "BulkExportWriter",
+    "BulkImportBatcher",
+    "TemplateCatalog",
     "VariableLibrary",
     "Variable",
     "VariableOverride",
@@ -18,19 +30,91 @@ __all__ = [
     "SampleCustomerData",
     "AdoProjectManager",
     "GitHubRestApi",
-    "FabricCicdManager"
+    "FabricCicdManager",
+    "JobOrchestrator",
+    "DeploymentGraph",
+    "DeploymentStep",
+    "HttpSessionPool",
+    "HttpMetrics",
+    "RateLimiter",
+    "TokenProvider",
+    "CachedTokenCredential"
 ]
 
-# Import the submodules
-from .environment_settings import EnvironmentSettings
-from .app_logger import AppLogger
-from .fabric_rest_api import FabricRestApi, PowerBiRestApi
-from .item_definition_factory import ItemDefinitionFactory
-from .variable_library import VariableLibrary, Variable, VariableOverride, Valueset
-from .deployment_job import DeploymentJob, DeploymentJobType
-from .deployment_manager import DeploymentManager
-from .staging_environments import StagingEnvironments
-from .sample_customer_data import SampleCustomerData
-from .ado_project_manager import AdoProjectManager
-from .github_rest_api import GitHubRestApi
-from .fabric_cicd_manager import FabricCicdManager
+# submodule of each public name, imported on first access so that importing
+# the package does not load the Fabric SDK, azure.identity or fabric-cicd
+_SUBMODULES = {
+    'EnvironmentSettings':   'environment_settings',
+    'AppLogger':             'app_logger',
+    'FabricRestApi':         'fabric_rest_api',
+    'PowerBiRestApi':        'fabric_rest_api',
+    'AsyncFabricRestApi':    'async_fabric_rest_api',
+    'ItemDefinitionFactory': 'item_definition_factory',
+    'ItemDefinition':        'item_definition',
+    'DefinitionPartSet':     'item_definition',
+    'DefinitionPart':        'item_definition',
+    'DefinitionPartCache':   'definition_part_cache',
+    'PayloadRewriter':       'payload_rewriter',
+    'BulkExportWriter':      'bulk_export_writer',
+    'BulkImportBatcher':     'bulk_import_batcher',
+    'TemplateCatalog':       'template_catalog',
+    'VariableLibrary':       'variable_library',
+    'Variable':              'variable_library',
+    'VariableOverride':      'variable_library',
+    'Valueset':              'variable_library',
+    'DeploymentJob':         'deployment_job',
+    'DeploymentJobType':     'deployment_job',
+    'DeploymentManager':     'deployment_manager',
+    'StagingEnvironments':   'staging_environments',
+    'SampleCustomerData':    'sample_customer_data',
+    'AdoProjectManager':     'ado_project_manager',
+    'GitHubRestApi':         'github_rest_api',
+    'FabricCicdManager':     'fabric_cicd_manager',
+    'JobOrchestrator':       'job_orchestrator',
+    'DeploymentGraph':       'deployment_graph',
+    'DeploymentStep':        'deployment_graph',
+    'HttpSessionPool':       'http_session_pool',
+    'HttpMetrics':           'http_metrics',
+    'RateLimiter':           'rate_limiter',
+    'TokenProvider':         'token_provider',
+    'CachedTokenCredential': 'token_provider'
+}
+
+def __getattr__(name):
+    """Import submodule which defines name on first access"""
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_SUBMODULES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    """List public names including those not imported yet"""
+    return sorted(set(globals()) | set(__all__))
+
+if TYPE_CHECKING:
+    from .environment_settings import EnvironmentSettings
+    from .app_logger import AppLogger
+    from .fabric_rest_api import FabricRestApi, PowerBiRestApi
+    from .async_fabric_rest_api import AsyncFabricRestApi
+    from .item_definition_factory import ItemDefinitionFactory
+    from .item_definition import ItemDefinition, DefinitionPartSet, DefinitionPart
+    from .definition_part_cache import DefinitionPartCache
+    from .payload_rewriter import PayloadRewriter
+    from .bulk_export_writer import BulkExportWriter
+    from .bulk_import_batcher import BulkImportBatcher
+    from .template_catalog import TemplateCatalog
+    from .variable_library import VariableLibrary, Variable, VariableOverride, Valueset
+    from .deployment_job import DeploymentJob, DeploymentJobType
+    from .deployment_manager import DeploymentManager
+    from .staging_environments import StagingEnvironments
+    from .sample_customer_data import SampleCustomerData
+    from .ado_project_manager import AdoProjectManager
+    from .github_rest_api import GitHubRestApi
+    from .fabric_cicd_manager import FabricCicdManager
+    from .job_orchestrator import JobOrchestrator
+    from .deployment_graph import DeploymentGraph, DeploymentStep
+    from .http_session_pool import HttpSessionPool
+    from .http_metrics import HttpMetrics
+    from .rate_limiter import RateLimiter
+    from .token_provider import TokenProvider, CachedTokenCredential
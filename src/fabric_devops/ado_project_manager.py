@@ -1,18 +1,15 @@
 """Module to manage calls to Fabric REST APIs"""
 import base64
 import json
-import datetime
 import os
 import time
 from json.decoder import JSONDecodeError
 
-import requests
-
-import msal
-
 from .app_logger import AppLogger
 from .environment_settings import EnvironmentSettings
+from .http_session_pool import HttpSessionPool
 from .item_definition_factory import ItemDefinitionFactory
+from .token_provider import TokenProvider
 
 class AdoProjectManager:
     """Wrapper class for calling Azure REST APIs for Azure Dev Ops"""
@@ -22,40 +19,21 @@ class AdoProjectManager:
     AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET')
 
     ADO_ORGANIZATION = os.getenv('ADO_ORGANIZATION')
-    BASE_URL = f'https://dev.azure.com/{ADO_ORGANIZATION}/_apis/'
+
+    # Azure DevOps service roots, which can be pointed at a local mock server
+    ADO_API_BASE_URL = os.getenv('ADO_API_BASE_URL', 'https://dev.azure.com').rstrip('/') + '/'
+    ADO_VSSPS_API_BASE_URL = os.getenv('ADO_VSSPS_API_BASE_URL', 'https://vssps.dev.azure.com').rstrip('/') + '/'
+    BASE_URL = f'{ADO_API_BASE_URL}{ADO_ORGANIZATION}/_apis/'
 
     ADO_PROJECT_TEMPLATE_ID = "b8a3a935-7e91-48b8-a94c-606d37c3e9f2"
     ADO_API_VERSION = "api-version=7.1-preview"
 
     #region Low-level details about authentication and HTTP requests and responses
 
-    # in-memory token cache
-    _token_cache = dict()
-
     @classmethod
     def _get_ado_access_token(cls):
-        """"Get Access Token for Azure Dev """
-        ado_resource_id = '499b84ac-1321-427f-aa17-267ca6975798'
-        scope = ado_resource_id + "/.default"
-        
-        if (scope in cls._token_cache) and \
-           (datetime.datetime.now() < cls._token_cache[scope]['access_token_expiration']):
-            return cls._token_cache[scope]['access_token']
-      
-        app = msal.ConfidentialClientApplication(
-            cls.AZURE_CLIENT_ID,
-            authority=f'https://login.microsoftonline.com/{cls.AZURE_TENANT_ID}',
-            client_credential=cls.AZURE_CLIENT_SECRET)
-
-        authentication_result = app.acquire_token_for_client([scope])
-
-        cls._token_cache[scope] = {
-            'access_token': authentication_result['access_token'],
-            'access_token_expiration': datetime.datetime.now() + \
-                                       datetime.timedelta(0,  int(authentication_result['expires_in']))
-        }
-
-        return authentication_result['access_token']
+        """"Get Access Token for Azure Dev Ops from shared token cache"""
+        return TokenProvider.get_access_token(TokenProvider.ADO_API_SCOPE)
 
     @classmethod
     def _execute_get_request(cls, endpoint):
@@ -65,7 +43,7 @@ class AdoProjectManager:
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
         else:
@@ -76,12 +54,12 @@ class AdoProjectManager:
     @classmethod
     def _execute_get_request_on_vssps(cls, endpoint):
         """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://vssps.dev.azure.com/{cls.ADO_ORGANIZATION}/_apis/' + endpoint
+        rest_url = f'{cls.ADO_VSSPS_API_BASE_URL}{cls.ADO_ORGANIZATION}/_apis/' + endpoint
         access_token = cls._get_ado_access_token()
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
         else:
@@ -92,12 +70,12 @@ class AdoProjectManager:
     @classmethod
     def _execute_get_request_on_project(cls, project_name, endpoint):
         """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
+        rest_url = f'{cls.ADO_API_BASE_URL}{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
         access_token = cls._get_ado_access_token()
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
         else:
@@ -114,7 +92,7 @@ class AdoProjectManager:
                            'Content-Type': f'application/json; charset=utf-8; {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
 
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
         if response.status_code in { 200, 201 }:
             try:
@@ -148,13 +126,13 @@ class AdoProjectManager:
     @classmethod
     def _execute_post_request_on_project(cls, project_name, endpoint, post_body=''):
         """Execute POST request with support for Long-running Operations (LRO)"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
+        rest_url = f'{cls.ADO_API_BASE_URL}{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
         access_token = cls._get_ado_access_token()
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json; charset=utf-8; {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
 
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
         if response.status_code in { 200, 201 }:
             try:
@@ -193,29 +171,24 @@ class AdoProjectManager:
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json; {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
 
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_patch_request(endpoint, post_body)
-        else:
-            AppLogger.log_error(
-                f'Error executing PATCH request: {response.status_code} - {response.text}')
-            return None
+        AppLogger.log_error(
+            f'Error executing PATCH request: {response.status_code} - {response.text}')
+        return None
 
     @classmethod
     def _execute_patch_request_on_project(cls, project_name, endpoint, post_body):
         """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
+        rest_url = f'{cls.ADO_API_BASE_URL}{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
         access_token = cls._get_ado_access_token()
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json; {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
         
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
 
@@ -227,13 +200,13 @@ class AdoProjectManager:
     @classmethod
     def _execute_put_request_on_project(cls, project_name, endpoint, post_body):
         """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
+        rest_url = f'{cls.ADO_API_BASE_URL}{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
         access_token = cls._get_ado_access_token()
         request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
                            'Content-Type': f'application/json; {cls.ADO_API_VERSION}',
                            'Authorization': f'Bearer {access_token}'}
         
-        response = requests.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
 
@@ -250,7 +223,7 @@ class AdoProjectManager:
         request_headers= {'Accept':  f'application/json; {cls.ADO_API_VERSION}',
                           'Content-Type':  f'application/json; {cls.ADO_API_VERSION}',
                           'Authorization': f'Bearer {access_token}'}
-        response = requests.delete(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.delete(url=rest_url, headers=request_headers, timeout=60)
         
         if response.status_code in { 200, 204}:
             return None
@@ -268,21 +241,14 @@ class AdoProjectManager:
                 time.sleep(2)
                 response = cls._execute_get_request(operation_url)
 
-            if response['status'] == 'succeeded':
-                return None
-            else:
+            if response['status'] != 'succeeded':
                 AppLogger.log_error(response)
-
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            cls._execute_delete_request(endpoint)
-            return None
-        else:
-            AppLogger.log_error(
-                f'Error executing DELETE request: {response.status_code} - {response.text}')
             return None
 
+        AppLogger.log_error(
+            f'Error executing DELETE request: {response.status_code} - {response.text}')
+        return None
+
 #endregion
 
     @classmethod
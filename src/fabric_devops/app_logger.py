@@ -1,10 +1,231 @@
 """AppLogger Module"""
 
+import contextvars
+import json
 import os
+import threading
+import time
+from contextlib import contextmanager
+
+class TraceSpan:
+    """Timed section of work recorded by AppLogger"""
+
+    # nesting level of spans opened automatically by log calls
+    LEVELS = { 'job': 0, 'step': 1, 'substep': 2 }
+
+    def __init__(self, name, kind, parent = None, attributes = None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.thread_id = threading.get_native_id()
+        self.thread_name = threading.current_thread().name
+        self.started_at = time.monotonic()
+        self.ended_at = None
+
+    @property
+    def level(self):
+        """Nesting level for automatic spans or None for spans opened with AppLogger.span"""
+        return self.LEVELS.get(self.kind)
+
+    @property
+    def duration(self):
+        """Seconds between start and end, or until now for an open span"""
+        end_time = self.ended_at if self.ended_at is not None else time.monotonic()
+        return end_time - self.started_at
+
+    @property
+    def job(self):
+        """Outermost span this span is nested in"""
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+    def is_nested_in(self, span):
+        """Check whether this span is span or nested in it at any depth"""
+        current = self
+        while current is not None:
+            if current is span:
+                return True
+            current = current.parent
+        return False
+
+    def end(self):
+        """Close span if it is still open"""
+        if self.ended_at is None:
+            self.ended_at = time.monotonic()
 
 class AppLogger:
     """Logic to write log output to console and/or logs"""
 
+    #region tracing spans
+
+    # Chrome trace / Perfetto JSON file written each time a job completes
+    TRACE_FILE = os.getenv('APP_TRACE_FILE')
+
+    # rows in slowest steps table logged when a job completes
+    SLOWEST_STEPS_COUNT = int(os.getenv('APP_TRACE_SLOWEST_STEPS', '10'))
+
+    # oldest spans are discarded once this many have been recorded
+    MAX_SPANS = int(os.getenv('APP_TRACE_MAX_SPANS', '100000'))
+
+    # open spans for the current thread or task, outermost first
+    _span_stack = contextvars.ContextVar('app_logger_span_stack', default=())
+    _spans = []
+    _spans_lock = threading.Lock()
+
+    # converts monotonic span times to wall-clock trace timestamps
+    _clock_offset = time.time() - time.monotonic()
+
+    @classmethod
+    def _record_span(cls, span):
+        """Add span to recorded spans"""
+        with cls._spans_lock:
+            cls._spans.append(span)
+            if len(cls._spans) > cls.MAX_SPANS:
+                del cls._spans[:len(cls._spans) - cls.MAX_SPANS]
+
+    @classmethod
+    def _open_span(cls, name, kind, attributes = None):
+        """Close automatic spans at the same or deeper level and open new span nested in what remains"""
+        stack = list(cls._span_stack.get())
+        level = TraceSpan.LEVELS.get(kind)
+        if level is not None:
+            while len(stack) > 0 and stack[-1].level is not None and stack[-1].level >= level:
+                stack.pop().end()
+
+        span = TraceSpan(name, kind, stack[-1] if len(stack) > 0 else None, attributes)
+        cls._record_span(span)
+        stack.append(span)
+        cls._span_stack.set(tuple(stack))
+        return span
+
+    @classmethod
+    def _close_spans(cls, span = None):
+        """Close span along with all spans nested in it, or every open span when span is None"""
+        stack = list(cls._span_stack.get())
+        if span is not None and span not in stack:
+            span.end()
+            return
+        while len(stack) > 0:
+            closed_span = stack.pop()
+            closed_span.end()
+            if closed_span is span:
+                break
+        cls._span_stack.set(tuple(stack))
+
+    @classmethod
+    @contextmanager
+    def span(cls, name, kind = 'span', **attributes):
+        """Context manager which records a timed span nested in the current job or step"""
+        span = cls._open_span(name, kind, attributes)
+        try:
+            yield span
+        finally:
+            cls._close_spans(span)
+
+    @classmethod
+    def get_current_span(cls):
+        """Get innermost open span for the current thread or task"""
+        stack = cls._span_stack.get()
+        return stack[-1] if len(stack) > 0 else None
+
+    @classmethod
+    def set_span_attributes(cls, **attributes):
+        """Add attributes to innermost open span"""
+        span = cls.get_current_span()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    @classmethod
+    def add_completed_span(cls, name, started_at, ended_at, kind = 'span', **attributes):
+        """Record span for work timed elsewhere using time.monotonic timestamps"""
+        span = TraceSpan(name, kind, cls.get_current_span(), attributes)
+        span.started_at = started_at
+        span.ended_at = ended_at
+        cls._record_span(span)
+        return span
+
+    @classmethod
+    def get_spans(cls, job = None):
+        """Get recorded spans, optionally only those nested in job span"""
+        with cls._spans_lock:
+            spans = list(cls._spans)
+        if job is not None:
+            spans = [ span for span in spans if span.is_nested_in(job) ]
+        return spans
+
+    @classmethod
+    def get_chrome_trace(cls, spans = None):
+        """Get spans as Chrome trace event format which can be loaded in Perfetto or chrome://tracing"""
+        if spans is None:
+            spans = cls.get_spans()
+
+        process_id = os.getpid()
+        trace_events = []
+        thread_names = {}
+        for span in spans:
+            thread_names[span.thread_id] = span.thread_name
+            trace_events.append({
+                'name': span.name,
+                'cat': span.kind,
+                'ph': 'X',
+                'ts': round((span.started_at + cls._clock_offset) * 1_000_000),
+                'dur': round(span.duration * 1_000_000),
+                'pid': process_id,
+                'tid': span.thread_id,
+                'args': { name: str(value) for name, value in span.attributes.items() }
+            })
+        for thread_id, thread_name in thread_names.items():
+            trace_events.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': process_id,
+                'tid': thread_id,
+                'args': { 'name': thread_name }
+            })
+
+        return { 'traceEvents': trace_events, 'displayTimeUnit': 'ms' }
+
+    @classmethod
+    def write_chrome_trace(cls, file_path = None):
+        """Write all recorded spans to Chrome trace JSON file"""
+        if file_path is None:
+            file_path = cls.TRACE_FILE
+        folder_path = os.path.dirname(file_path)
+        if folder_path != '':
+            os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(cls.get_chrome_trace()))
+
+    @classmethod
+    def log_slowest_steps(cls, job = None, count = None):
+        """Log table of the slowest spans nested in job"""
+        if count is None:
+            count = cls.SLOWEST_STEPS_COUNT
+        spans = [ span for span in cls.get_spans(job) if span.kind != 'job' ]
+        if len(spans) == 0:
+            return
+        spans.sort(key=lambda span: span.duration, reverse=True)
+        cls.log_table_header('Slowest steps')
+        for span in spans[:count]:
+            cls.log_table_row(f'{span.duration:.1f}s', f'[{span.kind}] {span.name}')
+
+    @classmethod
+    def _end_job(cls):
+        """Close innermost job with its nested spans, log its slowest steps and write trace file when configured"""
+        # a job run by a worker thread is nested in the job which started the worker and only it ends here
+        jobs = [ span for span in cls._span_stack.get() if span.kind == 'job' ]
+        job = jobs[-1] if len(jobs) > 0 else None
+        cls._close_spans(job)
+        if job is not None:
+            cls.log_slowest_steps(job)
+        if cls.TRACE_FILE:
+            cls.write_chrome_trace()
+
+    #endregion
+
     @classmethod
     def clear_console(cls):
         """Clear Console Window when running locally"""
@@ -14,6 +235,7 @@ class AppLogger:
     @classmethod
     def log_job(cls, message):
         """start job"""
+        cls._open_span(message, 'job')
         print(' ', flush=True)
         print(('-' * (len(message) + 5)) , flush=True)
         print(f'|> {message} |', flush=True)
@@ -25,6 +247,7 @@ class AppLogger:
         print(' ', flush=True)
         print(f'> {message}', flush=True)
         print(' ', flush=True)
+        cls._end_job()
 
     @classmethod
     def log_job_complete(cls, workspace_id = None):
@@ -34,21 +257,28 @@ class AppLogger:
              workspace_laucnh_url = f'https://app.powerbi.com/groups/{workspace_id}/list?experience=power-bi'
              cls.log_substep(f'Workspace launch URL: {workspace_laucnh_url}')
         print(' ', flush=True)
+        cls._end_job()
 
     @classmethod
     def log_step(cls, message):
         """log a step"""
+        cls._open_span(message, 'step')
         print(' ', flush=True)
         print('> ' + message, flush=True)
 
     @classmethod
     def log_substep(cls, message):
         """log a sub step"""    
+        cls._open_span(message, 'substep')
         print('  - ' + message, flush=True)
 
     @classmethod
     def log_step_complete(cls):
         """add linebreak to log"""
+        stack = cls._span_stack.get()
+        steps = [ span for span in stack if span.kind == 'step' ]
+        if len(steps) > 0:
+            cls._close_spans(steps[-1])
         print(' ', flush=True)
 
     TABLE_WIDTH = 120
@@ -85,3 +315,11 @@ class AppLogger:
         print('-' * len(error_message), flush=True)
         print(error_message, flush=True)
         print('-' * len(error_message), flush=True)
+
+    @classmethod
+    def log_warning(cls, message):
+        """log warning"""
+        warning_message = "WARNING: " + message
+        print('-' * len(warning_message), flush=True)
+        print(warning_message, flush=True)
+        print('-' * len(warning_message), flush=True)
@@ -0,0 +1,591 @@
+"""Asyncio-native Fabric REST API Wrapper Class"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from json.decoder import JSONDecodeError
+from urllib.parse import urlparse
+
+from .app_logger import AppLogger
+from .fabric_rest_api import FabricRestApi
+from .http_metrics import HttpMetrics
+from .lro_poller import LroPoller
+from .rate_limiter import RateLimiter
+from .token_provider import TokenProvider
+
+class AsyncResponse:
+    """Fully-read HTTP response returned by AsyncFabricRestApi"""
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """Body parsed as JSON"""
+        if self.body is None:
+            raise JSONDecodeError('Response has no body', '', 0)
+        return self.body
+
+class AsyncFabricRestApi:
+    """Asyncio counterpart of FabricRestApi used to run many independent operations concurrently"""
+
+    BASE_URL = FabricRestApi.FABRIC_API_V1_URL
+
+    # upper bound for HTTP requests in flight at the same time within one event loop
+    MAX_CONCURRENT_REQUESTS = int(os.getenv('ASYNC_MAX_CONCURRENT_REQUESTS', '32'))
+
+    ADMIN_USER_ID = os.getenv('ADMIN_USER_ID')
+    FABRIC_CAPACITY_ID = os.getenv('FABRIC_CAPACITY_ID')
+
+    # aiohttp sessions and semaphores are bound to the event loop which created them and
+    # hold a reference to it, so entries of closed loops are dropped when another session is opened
+    _sessions = {}
+    _semaphores = {}
+
+    #region Low-level details about HTTP requests and LRO support
+
+    @classmethod
+    def _get_session(cls):
+        """Get pooled aiohttp session for the running event loop"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            for closed_loop in [ other_loop for other_loop in cls._sessions if other_loop.is_closed() ]:
+                cls._sessions.pop(closed_loop, None)
+                cls._semaphores.pop(closed_loop, None)
+            connector = aiohttp.TCPConnector(limit=cls.MAX_CONCURRENT_REQUESTS, keepalive_timeout=60)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+            cls._sessions[loop] = session
+        return session
+
+    @classmethod
+    def _get_semaphore(cls):
+        """Get semaphore bounding requests in flight for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = cls._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(cls.MAX_CONCURRENT_REQUESTS)
+            cls._semaphores[loop] = semaphore
+        return semaphore
+
+    @classmethod
+    async def close(cls):
+        """Close aiohttp session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        cls._semaphores.pop(loop, None)
+        session = cls._sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    @classmethod
+    @asynccontextmanager
+    async def session(cls):
+        """Async context manager which closes the aiohttp session of the running event loop on exit"""
+        cls._get_session()
+        try:
+            yield cls
+        finally:
+            await cls.close()
+
+    @classmethod
+    async def _get_request_headers(cls):
+        """Get request headers with bearer token from shared token cache"""
+        # acquiring a token can block on sign-in so it runs on a worker thread instead of the event loop
+        access_token = await asyncio.to_thread(TokenProvider.get_access_token, TokenProvider.FABRIC_API_SCOPE)
+        return {'Content-Type': 'application/json',
+                'Authorization': f'Bearer {access_token}'}
+
+    @classmethod
+    async def _send_request(cls, method, url, post_body = None):
+        """Send HTTP request and read response, retrying after 429 TOO MANY REQUESTS"""
+        if not url.startswith('http'):
+            url = cls.BASE_URL + url
+
+        host = urlparse(url).netloc.lower()
+        session = cls._get_session()
+        for attempt in range(RateLimiter.MAX_RETRIES + 1):
+            # shares per-host token bucket with synchronous callers in the same process
+            await asyncio.sleep(RateLimiter.reserve(host))
+            headers = await cls._get_request_headers()
+            async with cls._get_semaphore():
+                start_time = time.monotonic()
+                async with session.request(method, url,
+                                           json=post_body,
+                                           headers=headers) as response:
+                    try:
+                        body = await response.json(content_type=None)
+                    except (ValueError, JSONDecodeError):
+                        body = None
+                    result = AsyncResponse(response.status, response.headers, body)
+                HttpMetrics.record_request(method, url, result.status_code,
+                                           time.monotonic() - start_time, attempt)
+
+            if result.status_code != 429:
+                RateLimiter.on_success(host)
+                return result
+
+            RateLimiter.on_throttled(host, RateLimiter.get_retry_after(result))
+
+        # retries exhausted so caller handles the 429 response
+        return result
+
+    @classmethod
+    async def _poll_operation(cls, operation_url, is_complete = None,
+                              initial_response = None, timeout = None,
+                              wait_category = 'long_running_operation'):
+        """Poll long-running operation using the same semantics as LroPoller"""
+        if is_complete is None:
+            is_complete = LroPoller.is_operation_complete
+        if timeout is None:
+            timeout = LroPoller.DEFAULT_TIMEOUT_SECONDS
+
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        retry_after = LroPoller.get_retry_after(initial_response)
+        attempt = 0
+
+        while True:
+            delay = LroPoller.get_poll_delay(attempt, retry_after)
+            await asyncio.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+
+            response = await cls._send_request('GET', operation_url)
+            if response.status_code not in { 200, 201, 202, 429 } and response.status_code < 500:
+                raise RuntimeError(
+                    f'Error polling operation status: {response.status_code} - {response.body}')
+
+            operation_state = response.body if response.status_code < 300 else None
+            if operation_state is not None and is_complete(operation_state):
+                LroPoller._record_wait(time.monotonic() - start_time, wait_category)
+                return response, operation_state
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f'Long-running operation [{operation_url}] did not complete ' + \
+                    f'within {timeout} seconds')
+
+            retry_after = LroPoller.get_retry_after(response)
+            attempt += 1
+
+    @classmethod
+    async def _execute_request(cls, method, endpoint, post_body = None, lro_timeout = None):
+        """Execute request with support for Long-running Operations (LRO)"""
+        response = await cls._send_request(method, endpoint, post_body)
+
+        if response.status_code in { 200, 201, 204 }:
+            return response.body
+
+        if response.status_code == 202 and 'Location' in response.headers:
+            response, operation_state = await cls._poll_operation(
+                response.headers['Location'],
+                initial_response=response,
+                timeout=lro_timeout)
+
+            if operation_state['status'] != 'Succeeded':
+                AppLogger.log_error(f"Error - {operation_state}")
+                raise RuntimeError(f'Long-running operation failed: {operation_state}')
+
+            if 'Location' in response.headers:
+                result = await cls._send_request('GET', response.headers['Location'])
+                if result.status_code == 200:
+                    return result.body
+                AppLogger.log_error(f"Error - {result.status_code}")
+            return None
+
+        if response.status_code == 202:
+            return response.body
+
+        AppLogger.log_error(
+            f'Error executing {method} request: {response.status_code} - {response.body}')
+        raise RuntimeError(
+            f'Error executing {method} request: {response.status_code} - {response.body}')
+
+    @classmethod
+    async def _get_all_pages(cls, endpoint):
+        """Execute GET request and follow continuation links to collect every page"""
+        values = []
+        response = await cls._execute_request('GET', endpoint)
+        while response is not None:
+            values.extend(response.get('value', []))
+            continuation_uri = response.get('continuationUri')
+            if not continuation_uri:
+                break
+            response = await cls._execute_request('GET', continuation_uri)
+        return values
+
+    @classmethod
+    async def gather_bounded(cls, coroutines, max_concurrency = None, return_exceptions = True):
+        """Run coroutines concurrently with at most max_concurrency running at the same time"""
+        if max_concurrency is None:
+            max_concurrency = cls.MAX_CONCURRENT_REQUESTS
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(
+            *(run_bounded(coroutine) for coroutine in coroutines),
+            return_exceptions=return_exceptions)
+
+    #endregion
+
+    #region workspace functions
+
+    @classmethod
+    async def list_workspaces(cls):
+        """list workspaces accessible to caller"""
+        return await cls._get_all_pages('workspaces')
+
+    @classmethod
+    async def get_workspace_info(cls, workspace_id):
+        """Get Workspace information by ID"""
+        return await cls._execute_request('GET', f'workspaces/{workspace_id}')
+
+    @classmethod
+    async def get_workspace_by_name(cls, display_name):
+        """Get Workspace by display name"""
+        for workspace in await cls.list_workspaces():
+            if workspace['displayName'] == display_name:
+                return workspace
+        return None
+
+    @classmethod
+    async def create_workspace(cls, display_name, capacity_id = None, reuse_existing_workspace = False):
+        """Create a new Fabric workspace"""
+        AppLogger.log_step(f'Creating workspace [{display_name}]')
+
+        if capacity_id is None:
+            capacity_id = cls.FABRIC_CAPACITY_ID
+
+        existing_workspace = await cls.get_workspace_by_name(display_name)
+        if existing_workspace is not None:
+            if reuse_existing_workspace:
+                AppLogger.log_substep("Found existing workspace with the same name")
+                return existing_workspace
+            AppLogger.log_substep("Deleting existing workspace with the same name")
+            await cls.delete_workspace(existing_workspace['id'])
+
+        create_request = {
+            'displayName': display_name,
+            'capacityId': capacity_id
+        }
+        workspace = await cls._execute_request('POST', 'workspaces', create_request)
+        AppLogger.log_substep(f"Workspace created with Id of [{workspace['id']}]")
+
+        if cls.ADMIN_USER_ID is not None:
+            await cls.add_workspace_role_assignment(workspace['id'], cls.ADMIN_USER_ID, 'User', 'Admin')
+
+        return workspace
+
+    @classmethod
+    async def update_workspace_description(cls, workspace_id, description = None):
+        """Update Workspace properties"""
+        return await cls._execute_request('PATCH', f'workspaces/{workspace_id}',
+                                          { 'description': description })
+
+    @classmethod
+    async def add_workspace_role_assignment(cls, workspace_id, principal_id, principal_type, role_name):
+        """Add workspace role assignment for user, group or service principal"""
+        add_role_request = {
+            'role': role_name,
+            'principal': {
+                'id': principal_id,
+                'type': principal_type
+            }
+        }
+        return await cls._execute_request('POST', f'workspaces/{workspace_id}/roleAssignments',
+                                          add_role_request)
+
+    @classmethod
+    async def delete_workspace(cls, workspace_id):
+        """Delete Workspace"""
+        return await cls._execute_request('DELETE', f'workspaces/{workspace_id}')
+
+    #endregion
+
+    #region item functions
+
+    @classmethod
+    async def list_workspace_items(cls, workspace_id, item_type = None):
+        """Get items in workspace"""
+        endpoint = f'workspaces/{workspace_id}/items'
+        if item_type is not None:
+            endpoint += f'?type={item_type}'
+        return await cls._get_all_pages(endpoint)
+
+    @classmethod
+    async def get_item_by_name(cls, workspace_id, display_name, item_type):
+        """Get Item by Name"""
+        for item in await cls.list_workspace_items(workspace_id, item_type):
+            if item['displayName'] == display_name:
+                return item
+        return None
+
+    @classmethod
+    async def create_item(cls, workspace_id, create_item_request, folder_id = None):
+        """Create Item"""
+        AppLogger.log_step(
+            f"Creating [{create_item_request['displayName']}.{create_item_request['type']}]...")
+
+        if folder_id is not None:
+            create_item_request['folderId'] = folder_id
+
+        item = await cls._execute_request('POST', f'workspaces/{workspace_id}/items', create_item_request)
+        AppLogger.log_substep(f"{item['type']} created with id [{item['id']}]")
+        return item
+
+    @classmethod
+    async def get_item_definition(cls, workspace_id, item_id, export_format = None):
+        """Get Item Definition"""
+        endpoint = f'workspaces/{workspace_id}/items/{item_id}/getDefinition'
+        if export_format is not None:
+            endpoint += f'?format={export_format}'
+        return await cls._execute_request('POST', endpoint)
+
+    @classmethod
+    async def update_item_definition(cls, workspace_id, item_id, update_item_definition_request):
+        """Update Item Definition"""
+        endpoint = f'workspaces/{workspace_id}/items/{item_id}/updateDefinition'
+        return await cls._execute_request('POST', endpoint, update_item_definition_request)
+
+    @classmethod
+    async def delete_item(cls, workspace_id, item_id):
+        """Delete Item"""
+        return await cls._execute_request('DELETE', f'workspaces/{workspace_id}/items/{item_id}')
+
+    #endregion
+
+    #region lakehouse and shortcut functions
+
+    @classmethod
+    async def create_lakehouse(cls, workspace_id, display_name, folder_id = None, enable_schemas = False):
+        """Create Lakehouse"""
+        create_item_request = {
+            'displayName': display_name,
+            'type': 'Lakehouse'
+        }
+        if enable_schemas:
+            create_item_request['creationPayload'] = { 'enableSchemas': True }
+        return await cls.create_item(workspace_id, create_item_request, folder_id)
+
+    @classmethod
+    async def get_lakehouse(cls, workspace_id, lakehouse_id):
+        """Get lakehouse properties"""
+        return await cls._execute_request('GET', f'workspaces/{workspace_id}/lakehouses/{lakehouse_id}')
+
+    @classmethod
+    async def get_sql_endpoint_for_lakehouse(cls, workspace_id, lakehouse_id, timeout = None):
+        """Get SQL endpoint properties for lakehouse once it has been provisioned"""
+        if timeout is None:
+            timeout = LroPoller.DEFAULT_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout
+        attempt = 0
+
+        lakehouse = await cls.get_lakehouse(workspace_id, lakehouse_id)
+        while lakehouse['properties']['sqlEndpointProperties']['provisioningStatus'] != 'Success':
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f'SQL endpoint for lakehouse [{lakehouse_id}] was not provisioned')
+            await asyncio.sleep(LroPoller.get_backoff_delay(attempt))
+            attempt += 1
+            lakehouse = await cls.get_lakehouse(workspace_id, lakehouse_id)
+
+        sql_endpoint_properties = lakehouse['properties']['sqlEndpointProperties']
+        return {
+            'server': sql_endpoint_properties['connectionString'],
+            'database': sql_endpoint_properties['id']
+        }
+
+    @classmethod
+    async def refresh_sql_endpoint_metadata(cls, workspace_id, sql_endpoint_id):
+        """Refresh SQL Endpoint metadata"""
+        endpoint = f'workspaces/{workspace_id}/sqlEndpoints/{sql_endpoint_id}/refreshMetadata'
+        return await cls._execute_request('POST', endpoint, {})
+
+    @classmethod
+    async def list_shortcuts(cls, workspace_id, lakehouse_id):
+        """List Shortcuts"""
+        return await cls._get_all_pages(f'workspaces/{workspace_id}/items/{lakehouse_id}/shortcuts')
+
+    @classmethod
+    async def create_onelake_shortcut(cls, workspace_id, target_lakehouse_id,
+                                      source_lakehouse_id, name, path):
+        """Create OneLake Shortcut"""
+        create_request = {
+            'name': name,
+            'path': f'/{path}',
+            'target': {
+                'onelake': {
+                    'itemId': source_lakehouse_id,
+                    'path': f'{path}/{name}',
+                    'workspaceId': workspace_id
+                }
+            }
+        }
+        endpoint = f'workspaces/{workspace_id}/items/{target_lakehouse_id}/shortcuts'
+        return await cls._execute_request('POST', endpoint, create_request)
+
+    @classmethod
+    async def create_adls_gen2_shortcut(cls, workspace_id, lakehouse_id, name, path,
+                                        location, subpath, connection_id):
+        """Create ADLS Gen2 Shortcut"""
+        AppLogger.log_substep(f'Creating ADLS Gen2 shortcut [{path}/{name}] using ADLS connection...')
+        create_request = {
+            'name': name,
+            'path': path,
+            'target': {
+                'adlsGen2': {
+                    'location': location,
+                    'subpath': subpath,
+                    'connectionId': connection_id
+                }
+            }
+        }
+        endpoint = f'workspaces/{workspace_id}/items/{lakehouse_id}/shortcuts' + \
+                   '?shortcutConflictPolicy=CreateOrOverwrite'
+        return await cls._execute_request('POST', endpoint, create_request)
+
+    #endregion
+
+    #region job functions
+
+    @classmethod
+    async def run_item_job(cls, workspace_id, item_id, job_type, job_timeout = None):
+        """Run on-demand item job and wait for job completion"""
+        if job_timeout is None:
+            job_timeout = FabricRestApi.JOB_TIMEOUT_SECONDS
+
+        endpoint = f'workspaces/{workspace_id}/items/{item_id}/jobs/instances?jobType={job_type}'
+        response = await cls._send_request('POST', endpoint)
+        if response.status_code != 202:
+            AppLogger.log_error(
+                f'Error executing POST request: {response.status_code} - {response.body}')
+            raise RuntimeError(f'On-demand job could not be started: {response.status_code}')
+
+        _, job_instance = await cls._poll_operation(
+            response.headers['Location'],
+            FabricRestApi._is_job_instance_complete,
+            initial_response=response,
+            timeout=job_timeout,
+            wait_category='job')
+
+        if job_instance['status'] == 'Failed':
+            AppLogger.log_error('On-demand job Failed')
+            raise RuntimeError('On-demand job started but Failed')
+
+        return job_instance
+
+    @classmethod
+    async def run_notebook(cls, workspace_id, notebook):
+        """Run notebook and wait for job completion"""
+        AppLogger.log_substep(f"Running notebook [{notebook['displayName']}]...")
+        job_instance = await cls.run_item_job(workspace_id, notebook['id'], 'RunNotebook')
+        AppLogger.log_substep("Notebook run job completed successfully")
+        return job_instance
+
+    @classmethod
+    async def run_data_pipeline(cls, workspace_id, pipeline):
+        """Run data pipeline and wait for job completion"""
+        AppLogger.log_substep(f"Running data pipeline [{pipeline['displayName']}]...")
+        job_instance = await cls.run_item_job(workspace_id, pipeline['id'], 'Pipeline')
+        AppLogger.log_substep("Data pipeline run job completed successfully")
+        return job_instance
+
+    #endregion
+
+    #region generic Git integration functions
+
+    @classmethod
+    async def connect_workspace_to_git(cls, workspace_id, connect_request):
+        """Connect Workspace to GIT Repository"""
+        return await cls._execute_request('POST', f'workspaces/{workspace_id}/git/connect', connect_request)
+
+    @classmethod
+    async def initialize_git_connection(cls, workspace_id, initialize_connection_request):
+        """Initialize GIT Connection"""
+        return await cls._execute_request('POST', f'workspaces/{workspace_id}/git/initializeConnection',
+                                          initialize_connection_request)
+
+    @classmethod
+    async def get_git_status(cls, workspace_id):
+        """Get GIT Connection Status"""
+        return await cls._execute_request('GET', f'workspaces/{workspace_id}/git/status')
+
+    @classmethod
+    async def commit_workspace_to_git(cls, workspace_id, commit_to_git_request):
+        """Commit Workspace to GIT Repository"""
+        return await cls._execute_request('POST', f'workspaces/{workspace_id}/git/commitToGit',
+                                          commit_to_git_request)
+
+    @classmethod
+    async def update_workspace_from_git(cls, workspace_id, update_from_git_request):
+        """Update Workspace from GIT Repository"""
+        return await cls._execute_request('POST', f'workspaces/{workspace_id}/git/updateFromGit',
+                                          update_from_git_request)
+
+    @classmethod
+    async def disconnect_workspace_from_git(cls, workspace_id):
+        """Disconnect Workspace from GIT Repository"""
+        return await cls._execute_request('POST', f'workspaces/{workspace_id}/git/disconnect')
+
+    #endregion
+
+    #region deployment pipelines
+
+    @classmethod
+    async def list_deployment_pipelines(cls):
+        """Get all deployment pipelines accessible to caller"""
+        return await cls._get_all_pages('deploymentPipelines')
+
+    @classmethod
+    async def list_deployment_pipeline_stages(cls, pipeline_id):
+        """List all deployment pipeline stages"""
+        return await cls._get_all_pages(f'deploymentPipelines/{pipeline_id}/stages')
+
+    @classmethod
+    async def create_deployment_pipeline(cls, display_name, stages):
+        """Create Deployment Pipeline"""
+        create_request = {
+            'displayName': display_name,
+            'stages': [
+                { 'displayName': stage, 'description': f'stage for {stage}', 'isPublic': False }
+                for stage in stages
+            ]
+        }
+        return await cls._execute_request('POST', 'deploymentPipelines', create_request)
+
+    @classmethod
+    async def assign_workpace_to_pipeline_stage(cls, workspace_id, pipeline_id, stage_id):
+        """Assign workspace to pipeline stage"""
+        endpoint = f'deploymentPipelines/{pipeline_id}/stages/{stage_id}/assignWorkspace'
+        return await cls._execute_request('POST', endpoint, { 'workspaceId': workspace_id })
+
+    @classmethod
+    async def unassign_workpace_from_pipeline_stage(cls, pipeline_id, stage_id):
+        """Unassign workspace from pipeline stage"""
+        endpoint = f'deploymentPipelines/{pipeline_id}/stages/{stage_id}/unassignWorkspace'
+        return await cls._execute_request('POST', endpoint)
+
+    @classmethod
+    async def deploy_to_pipeline_stage(cls, pipeline_id, source_stage_id, target_stage_id, note = None):
+        """Deploy to pipeline stage"""
+        deploy_request = {
+            'sourceStageId': source_stage_id,
+            'targetStageId': target_stage_id,
+            'note': note if note is not None else 'Demo of automating deployment using APIs'
+        }
+        return await cls._execute_request('POST', f'deploymentPipelines/{pipeline_id}/deploy',
+                                          deploy_request)
+
+    @classmethod
+    async def delete_deployment_pipeline(cls, pipeline_id):
+        """Delete Deployment Pipeline"""
+        return await cls._execute_request('DELETE', f'deploymentPipelines/{pipeline_id}')
+
+    #endregion
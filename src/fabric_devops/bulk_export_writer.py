@@ -0,0 +1,209 @@
+"""Streaming writer for bulk item definition exports"""
+
+import base64
+import codecs
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class JsonStreamReader:
+    """Incremental reader which decodes the members of a top-level JSON object from chunks of bytes"""
+
+    _WHITESPACE = ' \t\r\n'
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._exhausted = False
+
+    def _read_more(self):
+        """Append next chunk to buffer and return False once the stream has ended"""
+        if self._exhausted:
+            return False
+        # drop consumed text so the buffer only holds the value being decoded
+        if self._position > 0:
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+        target_length = max(len(self._buffer) * 2, 1)
+        while len(self._buffer) < target_length:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._buffer += self._decoder.decode(b'', final=True)
+                self._exhausted = True
+                break
+            self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self):
+        """Get next non-whitespace character without consuming it, or None at end of stream"""
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in self._WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                return None
+
+    def _expect(self, characters):
+        """Consume next non-whitespace character, which must be one of characters"""
+        character = self._peek()
+        if character is None or character not in characters:
+            raise ValueError(f'Expected one of [{characters}] in JSON stream but found [{character}]')
+        self._position += 1
+        return character
+
+    def _decode_value(self):
+        """Decode next complete JSON value, reading more chunks until the value is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                # value is incomplete unless the whole stream has been read
+                if not self._read_more():
+                    raise
+                continue
+            # numbers can continue in the next chunk so they are complete only once a delimiter follows
+            if not self._exhausted and not isinstance(value, (dict, list, str)):
+                next_position = end
+                while next_position < len(self._buffer) and self._buffer[next_position] in self._WHITESPACE:
+                    next_position += 1
+                if next_position == len(self._buffer) or self._buffer[next_position] not in ',]}':
+                    self._read_more()
+                    continue
+            self._position = end
+            return value
+
+    def read_object(self, streamed_keys):
+        """Yield (key, value) for members of top-level object, yielding (key, element) for each array element of streamed_keys"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._position += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key in streamed_keys and self._peek() == '[':
+                self._position += 1
+                if self._peek() == ']':
+                    self._position += 1
+                else:
+                    while True:
+                        yield key, self._decode_value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                yield key, self._decode_value()
+            if self._expect(',}') == '}':
+                return
+
+class BulkExportWriter:
+    """Writes definition parts of a bulk export to files on a thread pool while the response is still being read"""
+
+    # threads writing part files
+    MAX_WORKERS = int(os.getenv('BULK_EXPORT_WRITER_THREADS', '8'))
+
+    # upper bound for decoded part content waiting to be written
+    MAX_PENDING_BYTES = int(float(os.getenv('BULK_EXPORT_WRITER_MAX_PENDING_MB', '64')) * 1024 * 1024)
+
+    # size of chunks read from the response
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, folder_path, max_workers = None, max_pending_bytes = None):
+        self.folder_path = os.path.abspath(folder_path)
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.max_pending_bytes = max_pending_bytes or self.MAX_PENDING_BYTES
+        self.part_count = 0
+        self.bytes_written = 0
+        self._pending_bytes = 0
+        self._condition = threading.Condition()
+        self._error = None
+
+    def get_file_path(self, part_path):
+        """Get path of file for definition part, refusing paths which leave the export folder"""
+        file_path = os.path.abspath(os.path.join(self.folder_path, part_path.lstrip('/')))
+        if os.path.commonpath([ self.folder_path, file_path ]) != self.folder_path:
+            raise ValueError(f'Definition part path [{part_path}] is outside of export folder')
+        return file_path
+
+    def _reserve(self, size):
+        """Wait until content of size fits under pending bytes limit"""
+        with self._condition:
+            # a part larger than the limit is admitted on its own
+            while self._pending_bytes > 0 and self._pending_bytes + size > self.max_pending_bytes:
+                self._condition.wait()
+            self._pending_bytes += size
+
+    def _write_file(self, file_path, content):
+        """Write part content to file and release its pending bytes"""
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'wb') as file:
+                file.write(content)
+        except Exception as ex:
+            self._error = self._error or ex
+        finally:
+            with self._condition:
+                self._pending_bytes -= len(content)
+                self.bytes_written += len(content)
+                self._condition.notify_all()
+
+    def write_part(self, executor, part):
+        """Queue definition part to be written as raw bytes so binary resources stay intact"""
+        if self._error is not None:
+            raise self._error
+        file_path = self.get_file_path(part['path'])
+        content = base64.b64decode(part['payload']) if part.get('payloadType', 'InlineBase64') == 'InlineBase64' \
+                  else part['payload'].encode('utf-8')
+        self._reserve(len(content))
+        executor.submit(self._write_file, file_path, content)
+        self.part_count += 1
+
+    def write_parts(self, parts):
+        """Write list of definition parts which is already in memory"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for part in parts:
+                self.write_part(executor, part)
+        if self._error is not None:
+            raise self._error
+
+    def write_stream(self, chunks, raw_response_file = None):
+        """Write parts from bulk export response chunks and return members other than definitionParts"""
+        members = {}
+        raw_file = None
+        if raw_response_file is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(raw_response_file)), exist_ok=True)
+            raw_file = open(raw_response_file, 'wb')
+
+        def tee(chunks):
+            for chunk in chunks:
+                if raw_file is not None:
+                    raw_file.write(chunk)
+                yield chunk
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                reader = JsonStreamReader(tee(chunks))
+                for key, value in reader.read_object({ 'definitionParts' }):
+                    if key == 'definitionParts':
+                        self.write_part(executor, value)
+                    else:
+                        members[key] = value
+        finally:
+            if raw_file is not None:
+                raw_file.close()
+
+        if self._error is not None:
+            raise self._error
+        return members
+
+    def write_response(self, response, raw_response_file = None):
+        """Write parts from streamed requests response"""
+        try:
+            return self.write_stream(response.iter_content(chunk_size=self.CHUNK_SIZE), raw_response_file)
+        finally:
+            response.close()
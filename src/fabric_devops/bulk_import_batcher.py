@@ -0,0 +1,157 @@
+"""Splits bulk import requests into size-bounded batches by dependency tier which keep referencing items together"""
+
+import base64
+import os
+import posixpath
+import re
+
+class BulkImportBatcher:
+    """Groups definition parts by item and packs items which reference each other into the same batch"""
+
+    # upper bound for serialized size of definition parts in one import request
+    MAX_BATCH_BYTES = int(float(os.getenv('BULK_IMPORT_MAX_BATCH_MB', '16')) * 1024 * 1024)
+
+    # batches of the same tier which are submitted at the same time
+    MAX_PARALLEL_BATCHES = int(os.getenv('BULK_IMPORT_MAX_PARALLEL_BATCHES', '4'))
+
+    # items of a tier are only created once all items of lower tiers exist when deploying tier by tier
+    ITEM_TYPE_TIERS = {
+        'Lakehouse': 0,
+        'VariableLibrary': 0,
+        'Environment': 0,
+        'Warehouse': 0,
+        'Eventhouse': 0,
+        'KQLDatabase': 1,
+        'Notebook': 1,
+        'SemanticModel': 1,
+        'SparkJobDefinition': 1,
+        'DataPipeline': 2,
+        'Report': 2,
+        'Dashboard': 3
+    }
+
+    # tier for item types without known dependencies
+    DEFAULT_TIER = 1
+
+    # item folders are named like 'display name.ItemType'
+    _ITEM_FOLDER = re.compile(r'^.+\.(?P<item_type>[A-Za-z]+)$')
+
+    # JSON punctuation and field names around path and payload of each part
+    _PART_OVERHEAD_BYTES = 64
+
+    # items reference each other by the logical id in their .platform file
+    _LOGICAL_ID = re.compile(r'"logicalId"\s*:\s*"(?P<logical_id>[^"]+)"')
+    _GUID = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+    # reports reference their semantic model by relative item folder path in definition.pbir
+    _BY_PATH = re.compile(r'"byPath"\s*:\s*\{\s*"path"\s*:\s*"(?P<path>[^"]+)"')
+
+    @classmethod
+    def get_item_folder(cls, part_path):
+        """Get (item folder path, item type) for part path or (None, None) when part is outside an item folder"""
+        segments = part_path.strip('/').split('/')
+        for index, segment in enumerate(segments[:-1]):
+            match = cls._ITEM_FOLDER.match(segment)
+            if match is not None:
+                return '/'.join(segments[:index + 1]), match.group('item_type')
+        return None, None
+
+    @classmethod
+    def get_part_size(cls, part):
+        """Get approximate serialized size of definition part"""
+        return len(part['path']) + len(part.get('payload') or '') + cls._PART_OVERHEAD_BYTES
+
+    @classmethod
+    def get_batch_tiers(cls, import_request, max_batch_bytes = None):
+        """Get lists of import requests by dependency tier, with each item and every item it references in one request"""
+        if max_batch_bytes is None:
+            max_batch_bytes = cls.MAX_BATCH_BYTES
+
+        items = {}
+        for part in import_request.get('definitionParts', []):
+            item_folder, item_type = cls.get_item_folder(part['path'])
+            item = items.setdefault(item_folder, { 'type': item_type, 'parts': [], 'size': 0 })
+            item['parts'].append(part)
+            item['size'] += cls.get_part_size(part)
+
+        # the service resolves references between items of one request so small imports are never split
+        if sum(item['size'] for item in items.values()) <= max_batch_bytes:
+            return [ [ import_request ] ]
+
+        # a group is imported with the highest tier of its items so items it does not reference exist first
+        groups_by_tier = {}
+        for group in cls.get_reference_groups(items):
+            tier = max(cls.ITEM_TYPE_TIERS.get(items[item_folder]['type'], cls.DEFAULT_TIER) for item_folder in group)
+            groups_by_tier.setdefault(tier, []).append(group)
+
+        # other request properties such as allowPairingByName apply to every batch
+        request_properties = { key: value for key, value in import_request.items() if key != 'definitionParts' }
+
+        tiers = []
+        for tier in sorted(groups_by_tier):
+            batches = []
+            for group in groups_by_tier[tier]:
+                size = sum(items[item_folder]['size'] for item_folder in group)
+                # first fit keeps batches in item order; a group larger than the limit gets a batch of its own
+                batch = next((batch for batch in batches if batch['size'] + size <= max_batch_bytes), None)
+                if batch is None:
+                    batch = { 'size': 0, 'parts': [] }
+                    batches.append(batch)
+                for item_folder in group:
+                    batch['parts'].extend(items[item_folder]['parts'])
+                batch['size'] += size
+            tiers.append([ { **request_properties, 'definitionParts': batch['parts'] } for batch in batches ])
+        return tiers
+
+    @classmethod
+    def get_reference_groups(cls, items):
+        """Get lists of item folders connected by logical id or byPath references, in item order"""
+        contents = { item_folder: [ (part['path'], cls._decode(part)) for part in item['parts'] ]
+                     for item_folder, item in items.items() }
+
+        item_folders_by_logical_id = {}
+        for item_folder, parts in contents.items():
+            for path, content in parts:
+                match = cls._LOGICAL_ID.search(content) if path.endswith('/.platform') else None
+                if match is not None:
+                    item_folders_by_logical_id[match.group('logical_id').lower()] = item_folder
+
+        # union-find over item folders
+        parents = { item_folder: item_folder for item_folder in items }
+        def find(item_folder):
+            while parents[item_folder] != item_folder:
+                parents[item_folder] = parents[parents[item_folder]]
+                item_folder = parents[item_folder]
+            return item_folder
+
+        for item_folder, parts in contents.items():
+            for path, content in parts:
+                if path.endswith('/.platform'):
+                    continue
+                # guids which are not logical ids of items in the request reference nothing here
+                references = { item_folders_by_logical_id[guid.lower()] for guid in cls._GUID.findall(content)
+                               if guid.lower() in item_folders_by_logical_id }
+                if item_folder is not None:
+                    references.update(posixpath.normpath(posixpath.join(item_folder, match.group('path')))
+                                      for match in cls._BY_PATH.finditer(content))
+                for reference in references:
+                    if reference in parents:
+                        parents[find(reference)] = find(item_folder)
+
+        groups = {}
+        for item_folder in items:
+            groups.setdefault(find(item_folder), []).append(item_folder)
+        return list(groups.values())
+
+    @classmethod
+    def _decode(cls, part):
+        """Get payload text of part, ignoring bytes of binary parts such as images"""
+        return base64.b64decode(part.get('payload') or '').decode('utf-8', errors='ignore')
+
+    @classmethod
+    def merge_results(cls, results):
+        """Merge results of batch imports into one result"""
+        merged = { 'itemDefinitionsIndex': [] }
+        for result in results:
+            merged['itemDefinitionsIndex'].extend((result or {}).get('itemDefinitionsIndex', []))
+        return merged
@@ -0,0 +1,140 @@
+"""Cache of base64-encoded item definition parts read from template folders"""
+
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+class DefinitionPartCache:
+    """Process-wide LRU cache of encoded template files keyed by path, modification time and size"""
+
+    # upper bound for encoded payloads held in memory
+    MAX_MEMORY_BYTES = int(float(os.getenv('DEFINITION_PART_CACHE_MAX_MB', '64')) * 1024 * 1024)
+
+    # folder for encoded payloads which outlive the process, disabled when not set
+    DISK_FOLDER = os.getenv('DEFINITION_PART_CACHE_FOLDER')
+
+    _entries = OrderedDict()
+    _keys_by_path = {}
+    _memory_bytes = 0
+    _lock = threading.Lock()
+    _metrics = { 'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0 }
+
+    @classmethod
+    def _get_key(cls, file_path, stat_result):
+        """Get cache key which changes whenever the file is modified"""
+        return (os.path.abspath(file_path), stat_result.st_mtime_ns, stat_result.st_size)
+
+    @classmethod
+    def _get_disk_path(cls, key):
+        """Get path of on-disk copy of payload for cache key"""
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(cls.DISK_FOLDER, digest[:2], f'{digest}.b64')
+
+    @classmethod
+    def _read_from_disk(cls, key):
+        """Get payload from disk tier or None"""
+        if not cls.DISK_FOLDER:
+            return None
+        try:
+            with open(cls._get_disk_path(key), 'r', encoding='ascii') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    @classmethod
+    def _write_to_disk(cls, key, payload):
+        """Store payload in disk tier, replacing the file atomically so readers never see partial content"""
+        if not cls.DISK_FOLDER:
+            return
+        disk_path = cls._get_disk_path(key)
+        temp_path = f'{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            with open(temp_path, 'w', encoding='ascii') as file:
+                file.write(payload)
+            os.replace(temp_path, disk_path)
+        except OSError:
+            # the disk tier is best effort
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @classmethod
+    def _encode_file(cls, file_path):
+        """Read file as UTF-8 text and encode it as base64"""
+        # text mode keeps the newline translation template files have always been read with
+        with open(file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+        return base64.b64encode(content.encode('utf-8')).decode('utf-8')
+
+    @classmethod
+    def _store(cls, key, payload):
+        """Add payload to memory tier and evict least recently used entries (caller holds lock)"""
+        previous_key = cls._keys_by_path.get(key[0])
+        if previous_key is not None and previous_key != key:
+            # file changed since it was cached so the old payload can never be hit again
+            cls._memory_bytes -= len(cls._entries.pop(previous_key, ''))
+        # another thread may have stored the same file while this one was reading it
+        cls._memory_bytes -= len(cls._entries.pop(key, ''))
+        cls._keys_by_path[key[0]] = key
+        cls._entries[key] = payload
+        cls._memory_bytes += len(payload)
+
+        while cls._memory_bytes > cls.MAX_MEMORY_BYTES and len(cls._entries) > 1:
+            evicted_key, evicted_payload = cls._entries.popitem(last=False)
+            cls._memory_bytes -= len(evicted_payload)
+            if cls._keys_by_path.get(evicted_key[0]) == evicted_key:
+                del cls._keys_by_path[evicted_key[0]]
+            cls._metrics['evictions'] += 1
+
+    @classmethod
+    def get_payload(cls, file_path, stat_result = None):
+        """Get base64-encoded content of file, reading it only when it changed since it was cached"""
+        if stat_result is None:
+            stat_result = os.stat(file_path)
+        key = cls._get_key(file_path, stat_result)
+
+        with cls._lock:
+            payload = cls._entries.get(key)
+            if payload is not None:
+                cls._entries.move_to_end(key)
+                cls._metrics['hits'] += 1
+                return payload
+
+        payload = cls._read_from_disk(key)
+        if payload is not None:
+            metric = 'disk_hits'
+        else:
+            metric = 'misses'
+            payload = cls._encode_file(file_path)
+            cls._write_to_disk(key, payload)
+
+        with cls._lock:
+            cls._metrics[metric] += 1
+            cls._store(key, payload)
+        return payload
+
+    @classmethod
+    def get_folder_payloads(cls, folder_path):
+        """Get (file path, encoded payload) for every file below folder in os.walk order"""
+        payloads = []
+        for root, _, files in os.walk(folder_path):
+            for file_name in files:
+                file_path = os.path.join(root, file_name)
+                payloads.append((file_path, cls.get_payload(file_path)))
+        return payloads
+
+    @classmethod
+    def get_metrics(cls):
+        """Get hit, miss and eviction counts with current memory use"""
+        with cls._lock:
+            return { **cls._metrics, 'entries': len(cls._entries), 'memory_bytes': cls._memory_bytes }
+
+    @classmethod
+    def clear(cls):
+        """Remove all payloads from memory tier"""
+        with cls._lock:
+            cls._entries.clear()
+            cls._keys_by_path.clear()
+            cls._memory_bytes = 0
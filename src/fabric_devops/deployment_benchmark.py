@@ -0,0 +1,307 @@
+"""Benchmarks of deployment flows against the local mock Fabric REST API"""
+
+import gc
+import inspect
+import json
+import os
+import time
+import tracemalloc
+import traceback
+from datetime import datetime, timezone
+
+from .app_logger import AppLogger
+from .deployment_manager import DeploymentManager
+from .fabric_rest_api import FabricRestApi
+from .http_metrics import HttpMetrics
+from .mock_fabric_server import MockFabricServer, MockFabricSettings
+from .rate_limiter import RateLimiter
+from .token_provider import TokenProvider
+
+class BenchmarkCase:
+    """Deployment flow measured by DeploymentBenchmark"""
+
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+
+class DeploymentBenchmark:
+    """Runs deployment flows under fixed latency profiles and compares wall time, HTTP calls and peak memory to a baseline"""
+
+    SOLUTION_NAMES = [
+        'Power BI Solution',
+        'Notebook Solution',
+        'Shortcut Solution',
+        'Pipeline Solution',
+        'Medallion Solution'
+    ]
+
+    # MockFabricSettings arguments for each latency profile
+    LATENCY_PROFILES = {
+        'local': {
+            'latency': 0.005
+        },
+        'regional': {
+            'latency': 0.05,
+            'latency_jitter': 0.03,
+            'lro_duration': 1.5,
+            'job_duration': 3.0,
+            'sql_endpoint_provisioning_duration': 2.0,
+            'refresh_duration': 2.0
+        },
+        'throttled': {
+            'latency': 0.05,
+            'latency_jitter': 0.03,
+            'throttle_rate': 0.05,
+            'lro_duration': 1.5,
+            'job_duration': 3.0,
+            'sql_endpoint_provisioning_duration': 2.0,
+            'refresh_duration': 2.0
+        }
+    }
+
+    # profile of the discarded run which loads modules, SDK clients and tokens before a case is measured
+    WARMUP_PROFILE = 'local'
+
+    # seed which makes throttling and job failures repeat between runs
+    RANDOM_SEED = 20250101
+
+    BASELINE_FILE = os.getenv('BENCHMARK_BASELINE_FILE', './benchmarks/deployment_benchmark_baseline.json')
+
+    # allowed increase over baseline before a metric counts as a regression, as a fraction of the baseline value
+    DEFAULT_THRESHOLDS = {
+        'wall_time_seconds': float(os.getenv('BENCHMARK_WALL_TIME_THRESHOLD', '0.25')),
+        'http_calls': float(os.getenv('BENCHMARK_HTTP_CALLS_THRESHOLD', '0.1')),
+        'peak_memory_bytes': float(os.getenv('BENCHMARK_PEAK_MEMORY_THRESHOLD', '0.5'))
+    }
+
+    # increases smaller than these absolute amounts are treated as noise
+    NOISE_FLOORS = {
+        'wall_time_seconds': 1.0,
+        'http_calls': 2,
+        'peak_memory_bytes': 1024 * 1024
+    }
+
+    @classmethod
+    def get_cases(cls):
+        """Get deploy_solution_by_name variants and setup flows of DeploymentManager"""
+        cases = []
+        for solution_name in cls.SOLUTION_NAMES:
+            for deploy_using_fabric_cicd in [ False, True ]:
+                mode = 'fabric-cicd' if deploy_using_fabric_cicd else 'api'
+                cases.append(BenchmarkCase(
+                    f'deploy {solution_name} ({mode})',
+                    cls._get_deploy_function(solution_name, deploy_using_fabric_cicd)))
+            cases.append(BenchmarkCase(
+                f'deploy {solution_name} (bulk-import)',
+                cls._get_deploy_function(solution_name, False, deploy_using_bulk_import=True)))
+
+        for name, function in inspect.getmembers(DeploymentManager, inspect.ismethod):
+            if not name.startswith('setup_'):
+                continue
+            cases.append(BenchmarkCase(name, cls._get_setup_function(function)))
+
+        return cases
+
+    @classmethod
+    def _get_deploy_function(cls, solution_name, deploy_using_fabric_cicd, deploy_using_bulk_import = False):
+        """Get function which deploys solution to a new workspace"""
+        def deploy():
+            return DeploymentManager.deploy_solution_by_name(
+                solution_name,
+                f'Benchmark {solution_name}',
+                deploy_using_fabric_cicd=deploy_using_fabric_cicd,
+                deploy_using_bulk_import=deploy_using_bulk_import)
+        return deploy
+
+    @classmethod
+    def _get_setup_function(cls, setup_function):
+        """Get function which runs setup flow for benchmark project"""
+        def setup():
+            if 'solution_name' in inspect.signature(setup_function).parameters:
+                return setup_function('Benchmark Project', 'Medallion Solution')
+            return setup_function('Benchmark Project')
+        return setup
+
+    @classmethod
+    def _check_server(cls, server: MockFabricServer):
+        """Make sure REST API classes were configured to call the mock server"""
+        if FabricRestApi.FABRIC_API_BASE_URL.rstrip('/') != server.base_url:
+            raise RuntimeError(
+                f'FABRIC_API_BASE_URL is [{FabricRestApi.FABRIC_API_BASE_URL}] but mock server runs at ' + \
+                f'[{server.base_url}] - set environment variables before importing fabric_devops')
+
+    @classmethod
+    def _reset(cls, server: MockFabricServer, profile_name):
+        """Reset mock server, lookup caches, metrics and rate limits before running a case"""
+        server.reset(MockFabricSettings(**cls.LATENCY_PROFILES[profile_name], seed=cls.RANDOM_SEED))
+        FabricRestApi.clear_lookup_caches()
+        HttpMetrics.reset()
+        RateLimiter.reset()
+        gc.collect()
+
+    @classmethod
+    def warm_up(cls, server: MockFabricServer, case: BenchmarkCase):
+        """Run case once without measuring it so one-time imports and client setup are not counted"""
+        cls._reset(server, cls.WARMUP_PROFILE)
+        try:
+            case.function()
+        except Exception:
+            # the measured run reports the failure
+            pass
+
+    @classmethod
+    def _warm_up_clients(cls):
+        """Create SDK client and acquire access token, which importing fabric_devops leaves to first use"""
+        FabricRestApi.get_fabric_client()
+        TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
+
+    @classmethod
+    def run_case(cls, server: MockFabricServer, profile_name, case: BenchmarkCase):
+        """Run benchmark case against freshly reset mock server and return its measurements"""
+        cls._warm_up_clients()
+        cls._reset(server, profile_name)
+
+        result = { 'status': 'passed' }
+        tracemalloc.start()
+        start_time = time.monotonic()
+        try:
+            case.function()
+        except Exception as ex:
+            result = { 'status': 'failed', 'error': f'{type(ex).__name__}: {ex}' }
+            AppLogger.log_error(traceback.format_exc())
+        finally:
+            elapsed_time = time.monotonic() - start_time
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        # counted by the server so calls fabric-cicd makes with its own HTTP client are included
+        http_calls_by_endpoint = dict(sorted(server.request_counts.items()))
+        result.update({
+            'wall_time_seconds': round(elapsed_time, 3),
+            'http_calls': sum(http_calls_by_endpoint.values()),
+            'http_calls_by_endpoint': http_calls_by_endpoint,
+            'peak_memory_bytes': peak_memory,
+            'throttled_responses': server.throttled_count,
+            'waits': HttpMetrics.get_metrics()['waits']
+        })
+        if len(server.unknown_routes) > 0:
+            result['unmocked_endpoints'] = dict(server.unknown_routes)
+        return result
+
+    @classmethod
+    def run(cls, server: MockFabricServer, profile_names = None, case_filter = None):
+        """Run all benchmark cases under each latency profile and return results keyed by profile and case"""
+        cls._check_server(server)
+        if profile_names is None:
+            profile_names = list(cls.LATENCY_PROFILES)
+
+        cases = [ case for case in cls.get_cases()
+                  if case_filter is None or case_filter.lower() in case.name.lower() ]
+
+        for case in cases:
+            AppLogger.log_step(f'Warming up [{case.name}]')
+            cls.warm_up(server, case)
+
+        results = {}
+        for profile_name in profile_names:
+            for case in cases:
+                key = f'{profile_name}/{case.name}'
+                AppLogger.log_step(f'Benchmarking [{key}]')
+                result = cls.run_case(server, profile_name, case)
+                results[key] = result
+                AppLogger.log_substep(f"{result['status'].capitalize()} in {result['wall_time_seconds']:.1f}s " + \
+                                      f"with {result['http_calls']} HTTP calls")
+        return results
+
+    @classmethod
+    def load_baseline(cls, file_path = None):
+        """Load baseline results and thresholds, returning None if no baseline exists"""
+        file_path = file_path or cls.BASELINE_FILE
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    @classmethod
+    def write_baseline(cls, results, file_path = None):
+        """Write passed results as new baseline, keeping thresholds and results of cases which were not run"""
+        file_path = file_path or cls.BASELINE_FILE
+        existing_baseline = cls.load_baseline(file_path) or {}
+        baseline_results = {
+            key: result for key, result in existing_baseline.get('results', {}).items() if key not in results
+        }
+        baseline_results.update({
+            key: { metric: result[metric] for metric in
+                   [ 'wall_time_seconds', 'http_calls', 'http_calls_by_endpoint', 'peak_memory_bytes' ] }
+            for key, result in results.items() if result['status'] == 'passed'
+        })
+        baseline = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'thresholds': existing_baseline.get('thresholds', cls.DEFAULT_THRESHOLDS),
+            'results': dict(sorted(baseline_results.items()))
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(baseline, indent=4) + '\n')
+
+    @classmethod
+    def _exceeds(cls, metric, current, baseline, threshold):
+        """Check whether current value regressed past threshold and noise floor"""
+        return current > baseline * (1 + threshold) and current - baseline > cls.NOISE_FLOORS[metric]
+
+    @classmethod
+    def compare(cls, results, baseline):
+        """Get list of regressions of results against baseline"""
+        thresholds = { **cls.DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}) }
+        # environment settings take precedence over thresholds checked in with the baseline
+        for metric, variable in [ ('wall_time_seconds', 'BENCHMARK_WALL_TIME_THRESHOLD'),
+                                  ('http_calls', 'BENCHMARK_HTTP_CALLS_THRESHOLD'),
+                                  ('peak_memory_bytes', 'BENCHMARK_PEAK_MEMORY_THRESHOLD') ]:
+            if os.getenv(variable) is not None:
+                thresholds[metric] = cls.DEFAULT_THRESHOLDS[metric]
+
+        regressions = []
+        for key, expected in baseline.get('results', {}).items():
+            result = results.get(key)
+            if result is None:
+                continue
+            if result['status'] == 'failed':
+                regressions.append(f"[{key}] failed - {result['error']}")
+                continue
+
+            for metric, threshold in thresholds.items():
+                if cls._exceeds(metric, result[metric], expected[metric], threshold):
+                    regressions.append(
+                        f'[{key}] {metric} rose from {expected[metric]} to {result[metric]} ' + \
+                        f'(threshold {threshold:.0%})')
+
+            for endpoint, count in result['http_calls_by_endpoint'].items():
+                expected_count = expected['http_calls_by_endpoint'].get(endpoint, 0)
+                if cls._exceeds('http_calls', count, expected_count, thresholds['http_calls']):
+                    regressions.append(f'[{key}] {endpoint} called {count} times instead of {expected_count}')
+
+        return regressions
+
+    @classmethod
+    def log_results(cls, results, baseline = None):
+        """Log results next to baseline values"""
+        expected_results = (baseline or {}).get('results', {})
+        AppLogger.log_table_header('Deployment benchmark results')
+        for key, result in results.items():
+            expected = expected_results.get(key)
+            summary = f"{result['http_calls']} calls, {result['peak_memory_bytes'] / (1024 * 1024):.1f} MB peak"
+            if expected is not None:
+                summary += f" (baseline {expected['wall_time_seconds']:.1f}s, {expected['http_calls']} calls, " + \
+                           f"{expected['peak_memory_bytes'] / (1024 * 1024):.1f} MB)"
+            AppLogger.log_table_row(f"{result['wall_time_seconds']:.1f}s", f'{key} - {summary}')
+
+    @classmethod
+    def write_results(cls, results, regressions, file_path):
+        """Write results and regressions to JSON report"""
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({
+                'generated_at': datetime.now(timezone.utc).isoformat(),
+                'regressions': regressions,
+                'results': results
+            }, indent=4) + '\n')
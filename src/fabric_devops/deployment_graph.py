@@ -0,0 +1,155 @@
+"""Dependency-graph executor for deployment steps"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .app_logger import AppLogger
+
+class DeploymentStep:
+    """Deployment step whose function receives the outputs of its input steps as keyword arguments"""
+
+    def __init__(self, name, function, inputs = None, after = None):
+        self.name = name
+        self.function = function
+        self.inputs = list(inputs or [])
+        self.after = list(after or [])
+        self.output = None
+        self.started_at = None
+        self.ended_at = None
+
+    @property
+    def dependencies(self):
+        """Names of all steps which must complete before this step starts"""
+        return self.inputs + [ name for name in self.after if name not in self.inputs ]
+
+    @property
+    def duration(self):
+        """Seconds spent running step"""
+        if self.started_at is None or self.ended_at is None:
+            return None
+        return self.ended_at - self.started_at
+
+class DeploymentGraph:
+    """Runs deployment steps concurrently as soon as the steps they depend on have completed"""
+
+    # upper bound for steps running at the same time
+    MAX_WORKERS = int(os.getenv('DEPLOYMENT_GRAPH_MAX_WORKERS', '8'))
+
+    def __init__(self, name):
+        self.name = name
+        self.steps = {}
+        self.critical_path = []
+        self.elapsed_time = None
+
+    def add_step(self, name, function, inputs = None, after = None):
+        """Add step which runs function with outputs of input steps once all dependencies complete"""
+        if name in self.steps:
+            raise ValueError(f'Deployment step [{name}] already exists')
+        step = DeploymentStep(name, function, inputs, after)
+        self.steps[name] = step
+        return step
+
+    def validate(self):
+        """Check that all dependencies exist and that the graph has no cycles"""
+        for step in self.steps.values():
+            unknown = [ name for name in step.dependencies if name not in self.steps ]
+            if len(unknown) > 0:
+                raise ValueError(f'Deployment step [{step.name}] depends on unknown steps {unknown}')
+
+        visited = set()
+        in_progress = set()
+
+        def visit(name, path):
+            if name in in_progress:
+                raise ValueError(f'Deployment graph has a cycle: {" -> ".join(path + [name])}')
+            if name in visited:
+                return
+            in_progress.add(name)
+            for dependency in self.steps[name].dependencies:
+                visit(dependency, path + [name])
+            in_progress.discard(name)
+            visited.add(name)
+
+        for name in self.steps:
+            visit(name, [])
+
+    def _run_step(self, step):
+        """Run step function with outputs of its input steps"""
+        step.started_at = time.monotonic()
+        try:
+            with AppLogger.span(step.name, 'graph_step', graph=self.name):
+                kwargs = { name: self.steps[name].output for name in step.inputs }
+                step.output = step.function(**kwargs)
+                return step.output
+        finally:
+            step.ended_at = time.monotonic()
+
+    def run(self, max_workers = None):
+        """Run all steps and return outputs by step name"""
+        self.validate()
+        if max_workers is None:
+            max_workers = self.MAX_WORKERS
+
+        start_time = time.monotonic()
+        completed = set()
+        running = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while len(completed) < len(self.steps):
+                if failure is None:
+                    for step in self.steps.values():
+                        if step.name in completed or step.name in running.values():
+                            continue
+                        if all(name in completed for name in step.dependencies):
+                            # worker threads see the same context variables as the caller
+                            context = contextvars.copy_context()
+                            future = executor.submit(context.run, self._run_step, step)
+                            running[future] = step.name
+
+                if len(running) == 0:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        if failure is None:
+                            failure = future.exception()
+                            AppLogger.log_error(f'Deployment step [{name}] failed - {failure}')
+                    else:
+                        completed.add(name)
+
+        self.elapsed_time = time.monotonic() - start_time
+        if failure is not None:
+            raise failure
+
+        self.critical_path = self.get_critical_path()
+        self.log_critical_path()
+        return { name: step.output for name, step in self.steps.items() }
+
+    def get_critical_path(self):
+        """Get chain of steps which determined total run time, ending with the last step to finish"""
+        finished_steps = [ step for step in self.steps.values() if step.ended_at is not None ]
+        if len(finished_steps) == 0:
+            return []
+
+        path = []
+        step = max(finished_steps, key=lambda step: step.ended_at)
+        while step is not None:
+            path.append(step)
+            dependencies = [ self.steps[name] for name in step.dependencies ]
+            step = max(dependencies, key=lambda dependency: dependency.ended_at, default=None)
+        path.reverse()
+        return path
+
+    def log_critical_path(self):
+        """Log steps on critical path with their durations"""
+        total_step_time = sum(step.duration for step in self.steps.values() if step.duration is not None)
+        AppLogger.log_table_header(
+            f'Critical path for [{self.name}]: {self.elapsed_time:.1f}s elapsed, ' + \
+            f'{total_step_time:.1f}s of step time across {len(self.steps)} steps')
+        for step in self.critical_path:
+            AppLogger.log_table_row(f'{step.duration:.1f}s', step.name)
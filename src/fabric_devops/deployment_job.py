@@ -26,6 +26,8 @@ class DeploymentJob:
         self.id = deployment_id
         self.name = deployment_name
         self.description = None
+        # capacity for workspaces created by this job, None uses FABRIC_CAPACITY_ID
+        self.capacity_id = None
         self._parameters = dict()
 
         # setup Web datasource path
@@ -1,18 +1,26 @@
 """Deployment Manager"""
 
+import contextvars
 import time
 import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import yaml
-
 from .app_logger import AppLogger
 from .environment_settings import EnvironmentSettings
+from .bulk_import_batcher import BulkImportBatcher
+from .template_catalog import TemplateCatalog
 from .fabric_rest_api import FabricRestApi, PowerBiRestApi
 from .fabric_cicd_manager import FabricCicdManager
 from .item_definition_factory import ItemDefinitionFactory
+from .item_definition import DefinitionPartSet, DefinitionPart
+from .job_orchestrator import JobOrchestrator
 from .staging_environments import StagingEnvironments
+from .deployment_graph import DeploymentGraph
 from .deployment_job import DeploymentJob, DeploymentJobType
 from .variable_library import VariableLibrary, Valueset
 from .ado_project_manager import AdoProjectManager
@@ -21,6 +29,37 @@ from .github_rest_api import GitHubRestApi
 class DeploymentManager:
     """Deployment Manager"""
 
+    # upper bounds for concurrent tenant deployments in total and on each capacity
+    FLEET_MAX_PARALLELISM = int(os.getenv('FLEET_MAX_PARALLELISM', '4'))
+    FLEET_MAX_PER_CAPACITY = int(os.getenv('FLEET_MAX_PER_CAPACITY', '2'))
+
+    # per-service upper bounds for concurrent deletes during cleanup
+    CLEANUP_MAX_WORKERS = {
+        'fabric': int(os.getenv('CLEANUP_MAX_WORKERS_FABRIC', '8')),
+        'github': int(os.getenv('CLEANUP_MAX_WORKERS_GITHUB', '4')),
+        'ado': int(os.getenv('CLEANUP_MAX_WORKERS_ADO', '4'))
+    }
+
+    # variable library each solution deployed with bulk import creates before importing its items
+    BULK_IMPORT_VARIABLE_LIBRARIES = {
+        'Power BI Solution': None,
+        'Notebook Solution': 'web_datasource',
+        'Shortcut Solution': 'adls_connection',
+        'Pipeline Solution': 'adls_connection',
+        'Medallion Solution': 'adls_connection'
+    }
+
+    # solution templates reference their own workspace by this id
+    BULK_IMPORT_WORKSPACE_PLACEHOLDER = '00000000-0000-0000-0000-000000000000'
+
+    # notebook metadata which binds a notebook to its default lakehouse
+    NOTEBOOK_LAKEHOUSE_PATTERNS = [
+        r'("default_lakehouse"\s*:\s*)".*"',
+        r'("default_lakehouse_name"\s*:\s*)".*"',
+        r'("default_lakehouse_workspace_id"\s*:\s*)".*"',
+        r'("known_lakehouses"\s*:\s*)\[[\s\S]*?\]'
+    ]
+
     #region Deploy solution by name
 
     @classmethod
@@ -28,12 +67,16 @@ class DeploymentManager:
                                 solution_name, 
                                 target_workspace = None,
                                 deploy_job = StagingEnvironments.get_dev_environment(),
-                                deploy_using_fabric_cicd = True):
+                                deploy_using_fabric_cicd = True,
+                                deploy_using_bulk_import = False):
         """Deploy Solution by Name"""
 
         if target_workspace is None:
             target_workspace = solution_name
-            
+
+        if deploy_using_bulk_import:
+            return cls.deploy_solution_using_bulk_import(solution_name, target_workspace, deploy_job)
+
         if deploy_using_fabric_cicd:                
             match solution_name:
                 case 'Power BI Solution':
@@ -85,6 +128,99 @@ class DeploymentManager:
 
     #endregion
 
+    #region Fleet deployment to customer tenants
+
+    @classmethod
+    def deploy_solution_to_tenants(cls,
+                                   solution_name,
+                                   deploy_jobs,
+                                   max_parallelism = None,
+                                   max_per_capacity = None,
+                                   deploy_using_fabric_cicd = True,
+                                   deploy_using_bulk_import = False):
+        """Deploy solution to tenant workspaces concurrently and return one result per tenant"""
+        if max_parallelism is None:
+            max_parallelism = cls.FLEET_MAX_PARALLELISM
+        if max_per_capacity is None:
+            max_per_capacity = cls.FLEET_MAX_PER_CAPACITY
+
+        deploy_jobs = list(deploy_jobs)
+        AppLogger.log_job(f"Deploying [{solution_name}] to {len(deploy_jobs)} tenants " + \
+                          f"with up to {max_parallelism} at a time")
+
+        # interleave tenants by capacity so workers are not all parked on one busy capacity
+        jobs_by_capacity = {}
+        for deploy_job in deploy_jobs:
+            capacity_id = deploy_job.capacity_id or FabricRestApi.FABRIC_CAPACITY_ID
+            jobs_by_capacity.setdefault(capacity_id, []).append(deploy_job)
+        capacity_queues = list(jobs_by_capacity.values())
+        ordered_jobs = [ queue[index]
+                         for index in range(max(map(len, capacity_queues), default=0))
+                         for queue in capacity_queues if index < len(queue) ]
+
+        capacity_slots = { capacity_id: threading.BoundedSemaphore(max_per_capacity)
+                           for capacity_id in jobs_by_capacity }
+
+        def deploy_tenant(deploy_job):
+            capacity_id = deploy_job.capacity_id or FabricRestApi.FABRIC_CAPACITY_ID
+            result = {
+                'tenant': deploy_job.name,
+                'capacity_id': capacity_id,
+                'workspace_id': None,
+                'status': 'Failed',
+                'duration': 0.0,
+                'error': None
+            }
+            # the tenant span keeps the tenant job nested in the fleet job and closes it when the tenant fails
+            with capacity_slots[capacity_id], \
+                 AppLogger.span(f'Tenant [{deploy_job.name}]', 'tenant', capacity_id=capacity_id):
+                start_time = time.monotonic()
+                FabricRestApi.set_default_capacity_id_for_thread(capacity_id)
+                try:
+                    workspace = cls.deploy_solution_by_name(
+                        solution_name,
+                        f'Tenant - {deploy_job.name}',
+                        deploy_job,
+                        deploy_using_fabric_cicd,
+                        deploy_using_bulk_import)
+                    result['workspace_id'] = workspace.id if workspace is not None else None
+                    result['status'] = 'Succeeded'
+                    # tenant job spans live in this worker thread so its slowest steps are logged here
+                    AppLogger.log_job_complete(result['workspace_id'])
+                except Exception as e:
+                    AppLogger.log_error(f"Deployment to tenant [{deploy_job.name}] failed - {e}")
+                    result['error'] = str(e)
+                finally:
+                    FabricRestApi.set_default_capacity_id_for_thread(None)
+                    result['duration'] = time.monotonic() - start_time
+            return result
+
+        start_time = time.monotonic()
+        # worker threads see the same context variables as the caller so tenant spans nest in the fleet job
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, max_parallelism)) as executor:
+            results = list(executor.map(lambda deploy_job: context.copy().run(deploy_tenant, deploy_job),
+                                        ordered_jobs))
+
+        cls.log_fleet_deployment_report(results, time.monotonic() - start_time)
+        AppLogger.log_job_ended(f"Deployment of [{solution_name}] to {len(results)} tenants complete")
+        return results
+
+    @classmethod
+    def log_fleet_deployment_report(cls, results, elapsed_time):
+        """Log outcome and duration of each tenant deployment"""
+        succeeded = sum(1 for result in results if result['status'] == 'Succeeded')
+        AppLogger.log_table_header(
+            f'Fleet deployment: {succeeded} succeeded, {len(results) - succeeded} failed ' + \
+            f'in {elapsed_time:.0f} seconds')
+        for result in sorted(results, key=lambda result: result['duration'], reverse=True):
+            outcome = f"{result['tenant']} ({result['duration']:.1f}s)"
+            if result['error'] is not None:
+                outcome += f" - {result['error']}"
+            AppLogger.log_table_row(result['status'], outcome)
+
+    #endregion
+
     #region Variable library support
 
     @classmethod
@@ -441,6 +577,16 @@ class DeploymentManager:
 
     #region Notebook support
     
+    @classmethod
+    def _get_notebook_lakehouse_redirects(cls, workspace_id, lakehouse_id, lakehouse_name):
+        """Get regex search and replace terms which bind notebook to default lakehouse"""
+        return dict(zip(cls.NOTEBOOK_LAKEHOUSE_PATTERNS, [
+            rf'\1"{lakehouse_id}"',
+            rf'\1"{lakehouse_name}"',
+            rf'\1"{workspace_id}"',
+            rf'\1[{{"id": "{lakehouse_id}"}}]'
+        ]))
+
     @classmethod
     def update_source_lakehouse_in_notebook(cls,
                 workspace_name,
@@ -451,15 +597,7 @@ class DeploymentManager:
         notebook = FabricRestApi.get_item_by_name(workspace.id, notebook_name, 'Notebook')
         lakehouse = FabricRestApi.get_item_by_name(workspace.id, lakehouse_name, "Lakehouse")
 
-        workspace_id = workspace.id
-        lakehouse_id = lakehouse.id
-
-        search_replace_terms = {
-            r'("default_lakehouse"\s*:\s*)".*"': rf'\1"{lakehouse_id}"',
-            r'("default_lakehouse_name"\s*:\s*)".*"': rf'\1"{lakehouse_name}"',
-            r'("default_lakehouse_workspace_id"\s*:\s*)".*"': rf'\1"{workspace_id}"',
-            r'("known_lakehouses"\s*:\s*)\[[\s\S]*?\]': rf'\1[{{"id": "{lakehouse_id}"}}]',
-        }
+        search_replace_terms = cls._get_notebook_lakehouse_redirects(workspace.id, lakehouse.id, lakehouse_name)
 
         notebook_definition = FabricRestApi.get_item_definition(workspace.id, notebook).as_dict()
 
@@ -607,10 +745,10 @@ class DeploymentManager:
              
         AppLogger.log_step("Applying post-deploy updates to shortcut solution")
  
-        notebook1 = FabricRestApi.get_item_by_name(workspace.id, 'Create 11 Silver Layer', 'Notebook')
+        notebook1 = FabricRestApi.get_item_by_name(workspace.id, 'Create 01 Silver Layer', 'Notebook')
         FabricRestApi.run_notebook(workspace.id, notebook1)
                 
-        notebook2 = FabricRestApi.get_item_by_name(workspace.id, 'Create 12 Gold Layer', 'Notebook')
+        notebook2 = FabricRestApi.get_item_by_name(workspace.id, 'Create 02 Gold Layer', 'Notebook')
         FabricRestApi.run_notebook(workspace.id, notebook2)
         
         lakehouse = FabricRestApi.get_item_by_name(workspace.id, 'sales', 'Lakehouse')
@@ -838,168 +976,45 @@ class DeploymentManager:
         return workspace
 
     @classmethod
-    def deploy_shortcut_solution_using_apis(cls, target_workspace,
-                                            deploy_job = StagingEnvironments.get_dev_environment()):
-        """Deploy Shortcut Solution using APIs"""
-        
-        AppLogger.log_job(f"Deploying Shortcut Solution to [{target_workspace}] using Fabric REST APIs")
-        workspace = FabricRestApi.create_workspace(target_workspace)
-        FabricRestApi.update_workspace_description(workspace.id, 'Shortcut Solution')
-        
-        staging_folder = FabricRestApi.create_folder(workspace.id ,'staging')
-        staging_folder_id = staging_folder.id
-        
-        cls.create_variable_library_with_adls_connection(workspace, staging_folder_id, deploy_job)
-
-        lakehouse_name = "sales"
-        lakehouse = FabricRestApi.create_lakehouse(workspace.id, lakehouse_name)
-
-        shortcut_name = "sales-data"
-        shortcut_path = "Files"
-     
-        adls_shortcut_location_variable = "$(/**/environment_settings/adls_server)"
-        adls_shortcut_subpath_variable = "$(/**/environment_settings/adls_shortcut_subpath)"
-        adls_connection_id_variable = "$(/**/environment_settings/adls_connection_id)"
-
-        FabricRestApi.create_adls_gen2_shortcut(workspace.id,
-                                                lakehouse.id,
-                                                shortcut_name,
-                                                shortcut_path,
-                                                adls_shortcut_location_variable,
-                                                adls_shortcut_subpath_variable,
-                                                adls_connection_id_variable)
-
-
-        notebook_folders = [
-            'staging/Create 11 Silver Layer.Notebook',
-            'staging/Create 12 Gold Layer.Notebook'
-        ]
-        for notebook_folder in notebook_folders:
-            create_notebook_request = ItemDefinitionFactory.get_create_notebook_request_from_folder(
-                'Shortcut Solution',
-                notebook_folder,
-                workspace.id,
-                lakehouse
-            )
-
-            notebook = FabricRestApi.create_item(
-                workspace.id, 
-                create_notebook_request,
-                staging_folder_id
-            )
-            
-            FabricRestApi.run_notebook(workspace.id, notebook)
-
-        sql_endpoint = FabricRestApi.get_sql_endpoint_for_lakehouse(workspace.id, lakehouse)
-
-        FabricRestApi.refresh_sql_endpoint_metadata(workspace.id, sql_endpoint['database'])
-        semantic_model_folder = 'Product Sales DirectLake Model.SemanticModel'
-
-        create_model_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Shortcut Solution',
-            semantic_model_folder
-        )
-
-        model_redirects = {
-            'abc-xyz.datawarehouse.fabric.microsoft.com': sql_endpoint['server']
-        }
-
-        create_model_request = ItemDefinitionFactory.update_part_in_create_request(
-            create_model_request,
-            'definition/expressions.tmdl',
-            model_redirects
+    def _create_sales_data_shortcut(cls, workspace, lakehouse):
+        """Create ADLS Gen2 shortcut to sales data using variable library settings"""
+        FabricRestApi.create_adls_gen2_shortcut(
+            workspace.id,
+            lakehouse.id,
+            "sales-data",
+            "Files",
+            "$(/**/environment_settings/adls_server)",
+            "$(/**/environment_settings/adls_shortcut_subpath)",
+            "$(/**/environment_settings/adls_connection_id)"
         )
 
-        model = FabricRestApi.create_item(workspace.id, create_model_request)
-
-        FabricRestApi.create_and_bind_semantic_model_connecton(workspace, model.id, lakehouse)
-        
-        report_folders = [
-            'Product Sales Summary.Report',
-            'Product Sales Time Intelligence.Report'
-        ]
-
-        for report_folder in report_folders:
-            create_report_request = ItemDefinitionFactory.get_create_report_request_from_folder(
-                'Shortcut Solution',
-                report_folder,
-                model.id
-            )
-
-            FabricRestApi.create_item(workspace.id, create_report_request)
-
-        return workspace
-
     @classmethod
-    def deploy_pipeline_solution_using_apis(cls, target_workspace,
-                                            deploy_job = StagingEnvironments.get_dev_environment()):
-        """Deploy Data Pipeline Solution using APIs"""
-        AppLogger.log_job(f"Deploying Pipeline Solution to [{target_workspace}] using Fabric REST APIs")
-        workspace = FabricRestApi.create_workspace(target_workspace)
-        FabricRestApi.update_workspace_description(workspace.id, 'Pipeline Solution')
-        
-        staging_folder = FabricRestApi.create_folder(workspace.id ,'staging')
-        staging_folder_id = staging_folder.id
-        
-        cls.create_variable_library_with_adls_connection(workspace, staging_folder_id, deploy_job)
-
-        lakehouse_name = "sales"
-        lakehouse = FabricRestApi.create_lakehouse(workspace.id, lakehouse_name)
-
-        notebook_folders = [
-            'staging/Build 1 Silver Layer.Notebook',
-            'staging/Build 2 Gold Layer.Notebook'
-        ]
-
-        notebook_ids = []
-        for notebook_folder in notebook_folders:
-            create_notebook_request = \
-                ItemDefinitionFactory.get_create_notebook_request_from_folder(
-                    'Pipeline Solution',
-                    notebook_folder,
-                    workspace.id,
-                    lakehouse
-                )
-
-            notebook = FabricRestApi.create_item(
-                workspace.id, 
-                create_notebook_request, 
-                staging_folder_id)
-            
-            notebook_ids.append(notebook.id)
-
-        create_pipeline_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Pipeline Solution',
-            'staging/Create Lakehouse Tables.DataPipeline'
+    def _create_notebook_with_redirects(cls, solution_folder, notebook_folder,
+                                        workspace, target_workspace, lakehouse, folder_id = None):
+        """Create notebook from template with workspace and lakehouse placeholders redirected"""
+        create_notebook_request = ItemDefinitionFactory.get_create_item_request_from_folder(
+            solution_folder,
+            notebook_folder
         )
 
-        pipeline_redirects = {
-            '11111111-1111-1111-1111-111111111111': workspace.id,
+        notebook_redirects = {
+            '11111111-1111-1111-1111-111111111111': target_workspace.id,
             '22222222-2222-2222-2222-222222222222': lakehouse.id,
-            '33333333-3333-3333-3333-333333333333': notebook_ids[1],
-            '44444444-4444-4444-4444-444444444444': notebook_ids[1]
         }
-        
-        create_pipeline_request = ItemDefinitionFactory.update_part_in_create_request(
-            create_pipeline_request,
-            'pipeline-content.json',
-            pipeline_redirects
-        )
-        
-        pipeline = FabricRestApi.create_item(
-            workspace.id, 
-            create_pipeline_request,
-            staging_folder_id
-        )
-        
-        FabricRestApi.run_data_pipeline(workspace.id, pipeline)
 
-        sql_endpoint = FabricRestApi.get_sql_endpoint_for_lakehouse(workspace.id, lakehouse)
+        create_notebook_request = ItemDefinitionFactory.update_part_in_create_request(
+            create_notebook_request,
+            'notebook-content.py',
+            notebook_redirects
+        )
 
-        FabricRestApi.refresh_sql_endpoint_metadata(workspace.id, sql_endpoint['database'])
+        return FabricRestApi.create_item(workspace.id, create_notebook_request, folder_id)
 
+    @classmethod
+    def _create_directlake_model(cls, solution_folder, workspace, sql_endpoint):
+        """Create DirectLake semantic model redirected to lakehouse SQL endpoint"""
         create_model_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Pipeline Solution',
+            solution_folder,
             'Product Sales DirectLake Model.SemanticModel'
         )
 
@@ -1013,164 +1028,252 @@ class DeploymentManager:
             model_redirects
         )
 
-        model = FabricRestApi.create_item(workspace.id, create_model_request)
-
-        FabricRestApi.create_and_bind_semantic_model_connecton(workspace, model.id, lakehouse)
+        return FabricRestApi.create_item(workspace.id, create_model_request)
 
-        report_folders = [
-            'Product Sales Summary.Report',
-            'Product Sales Time Intelligence.Report'
-        ]
-        for report_folder in report_folders:
-            create_report_request = ItemDefinitionFactory.get_create_report_request_from_folder(
-                'Pipeline Solution',
-                report_folder,
-                model.id
-            )
+    @classmethod
+    def _create_report(cls, solution_folder, report_folder, workspace, model):
+        """Create report bound to semantic model"""
+        create_report_request = ItemDefinitionFactory.get_create_report_request_from_folder(
+            solution_folder,
+            report_folder,
+            model.id
+        )
+        return FabricRestApi.create_item(workspace.id, create_report_request)
 
-            FabricRestApi.create_item(workspace.id, create_report_request)
+    @classmethod
+    def _add_workspace_steps(cls, graph, step_name, display_name, description):
+        """Add steps which create workspace and set its description"""
+        graph.add_step(step_name, lambda: FabricRestApi.create_workspace(display_name))
+        graph.add_step(f'{step_name}_description',
+                       lambda **outputs: FabricRestApi.update_workspace_description(
+                           outputs[step_name].id, description),
+                       inputs=[step_name])
 
-        return workspace
+    @classmethod
+    def _add_sql_endpoint_steps(cls, graph, step_name, workspace_step, lakehouse_step, after):
+        """Add steps which wait for lakehouse SQL endpoint and refresh its metadata after tables are written"""
+        graph.add_step(step_name,
+                       lambda **outputs: FabricRestApi.get_sql_endpoint_for_lakehouse(
+                           outputs[workspace_step].id, outputs[lakehouse_step]),
+                       inputs=[workspace_step, lakehouse_step])
+        graph.add_step(f'refresh_{step_name}',
+                       lambda **outputs: FabricRestApi.refresh_sql_endpoint_metadata(
+                           outputs[workspace_step].id, outputs[step_name]['database']),
+                       inputs=[workspace_step, step_name],
+                       after=after)
 
     @classmethod
-    def deploy_medallion_solution_using_apis(cls, target_workspace,
-                                             deploy_job = StagingEnvironments.get_dev_environment()):
-        """Deploy Medallion Lakehouse Solution using APIs"""
-        
-        AppLogger.log_job(f"Deploying Medallion Solution to [{target_workspace}] using Fabric REST APIs")
-        workspace = FabricRestApi.create_workspace(target_workspace)
-        FabricRestApi.update_workspace_description(workspace.id, 'Medallion Solution')
+    def _add_model_and_report_steps(cls, graph, solution_folder, workspace_step,
+                                    lakehouse_step, sql_endpoint_step, report_folders):
+        """Add steps which create DirectLake model once SQL endpoint is refreshed, then bind it and add reports"""
+        graph.add_step('semantic_model',
+                       lambda **outputs: cls._create_directlake_model(
+                           solution_folder, outputs[workspace_step], outputs[sql_endpoint_step]),
+                       inputs=[workspace_step, sql_endpoint_step],
+                       after=[f'refresh_{sql_endpoint_step}'])
+        graph.add_step('bind_semantic_model',
+                       lambda **outputs: FabricRestApi.create_and_bind_semantic_model_connecton(
+                           outputs[workspace_step], outputs['semantic_model'].id, outputs[lakehouse_step]),
+                       inputs=[workspace_step, 'semantic_model', lakehouse_step])
+        for report_folder in report_folders:
+            graph.add_step(f'report [{report_folder}]',
+                           lambda report_folder=report_folder, **outputs: cls._create_report(
+                               solution_folder, report_folder, outputs[workspace_step],
+                               outputs['semantic_model']),
+                           inputs=[workspace_step, 'semantic_model'])
 
-        staging_folder = FabricRestApi.create_folder(workspace.id, 'staging')
-        staging_folder_id = staging_folder.id
+    @classmethod
+    def deploy_shortcut_solution_using_apis(cls, target_workspace,
+                                            deploy_job = StagingEnvironments.get_dev_environment()):
+        """Deploy Shortcut Solution using APIs"""
         
-        cls.create_variable_library_with_adls_connection(workspace, staging_folder_id, deploy_job)
-
-        bronze_lakehouse_name = "sales_bronze"
-        silver_lakehouse_name = "sales_silver"
-        gold_lakehouse_name = "sales"
-     
-        bronze_lakehouse = FabricRestApi.create_lakehouse(
-            workspace.id,
-            bronze_lakehouse_name,
-            staging_folder_id
-        )
-
-        shortcut_name = "sales-data"
-        shortcut_path = "Files"
-        adls_shortcut_location_variable = "$(/**/environment_settings/adls_server)"
-        adls_shortcut_subpath_variable = "$(/**/environment_settings/adls_shortcut_subpath)"
-        adls_connection_id_variable = "$(/**/environment_settings/adls_connection_id)"
-
-        FabricRestApi.create_adls_gen2_shortcut(
-            workspace.id,
-            bronze_lakehouse.id,
-            shortcut_name,
-            shortcut_path,
-            adls_shortcut_location_variable,
-            adls_shortcut_subpath_variable,
-            adls_connection_id_variable
-        )
+        AppLogger.log_job(f"Deploying Shortcut Solution to [{target_workspace}] using Fabric REST APIs")
+        solution_folder = 'Shortcut Solution'
+        graph = DeploymentGraph(solution_folder)
+
+        cls._add_workspace_steps(graph, 'workspace', target_workspace, 'Shortcut Solution')
+        graph.add_step('staging_folder',
+                       lambda workspace: FabricRestApi.create_folder(workspace.id, 'staging'),
+                       inputs=['workspace'])
+        graph.add_step('variable_library',
+                       lambda workspace, staging_folder: cls.create_variable_library_with_adls_connection(
+                           workspace, staging_folder.id, deploy_job),
+                       inputs=['workspace', 'staging_folder'])
+        graph.add_step('lakehouse',
+                       lambda workspace: FabricRestApi.create_lakehouse(workspace.id, "sales"),
+                       inputs=['workspace'])
+        graph.add_step('shortcut',
+                       lambda workspace, lakehouse: cls._create_sales_data_shortcut(workspace, lakehouse),
+                       inputs=['workspace', 'lakehouse'],
+                       after=['variable_library'])
+
+        previous_run_step = 'shortcut'
+        for notebook_folder in [ 'staging/Create 01 Silver Layer.Notebook',
+                                 'staging/Create 02 Gold Layer.Notebook' ]:
+            notebook_step = f'notebook [{notebook_folder}]'
+            graph.add_step(notebook_step,
+                           lambda workspace, lakehouse, staging_folder, notebook_folder=notebook_folder: \
+                               FabricRestApi.create_item(
+                                   workspace.id,
+                                   ItemDefinitionFactory.get_create_notebook_request_from_folder(
+                                       solution_folder, notebook_folder, workspace.id, lakehouse),
+                                   staging_folder.id),
+                           inputs=['workspace', 'lakehouse', 'staging_folder'])
+            # gold layer notebook reads tables written by silver layer notebook
+            run_step = f'run {notebook_step}'
+            graph.add_step(run_step,
+                           lambda notebook_step=notebook_step, **outputs: FabricRestApi.run_notebook(
+                               outputs['workspace'].id, outputs[notebook_step]),
+                           inputs=['workspace', notebook_step],
+                           after=[previous_run_step])
+            previous_run_step = run_step
+
+        cls._add_sql_endpoint_steps(graph, 'sql_endpoint', 'workspace', 'lakehouse', [previous_run_step])
+        cls._add_model_and_report_steps(graph, solution_folder, 'workspace', 'lakehouse', 'sql_endpoint',
+                                        [ 'Product Sales Summary.Report',
+                                          'Product Sales Time Intelligence.Report' ])
+
+        return graph.run()['workspace']
 
-        silver_lakehouse = FabricRestApi.create_lakehouse(
-            workspace.id,
-            silver_lakehouse_name,
-            staging_folder_id)
-        
-        create_notebook_request = \
-            ItemDefinitionFactory.get_create_item_request_from_folder(
-                'Medallion Solution', 
-                'staging/Build 11 Silver Tables.Notebook'
+    @classmethod
+    def deploy_pipeline_solution_using_apis(cls, target_workspace,
+                                            deploy_job = StagingEnvironments.get_dev_environment()):
+        """Deploy Data Pipeline Solution using APIs"""
+        AppLogger.log_job(f"Deploying Pipeline Solution to [{target_workspace}] using Fabric REST APIs")
+        solution_folder = 'Pipeline Solution'
+        graph = DeploymentGraph(solution_folder)
+
+        cls._add_workspace_steps(graph, 'workspace', target_workspace, 'Pipeline Solution')
+        graph.add_step('staging_folder',
+                       lambda workspace: FabricRestApi.create_folder(workspace.id, 'staging'),
+                       inputs=['workspace'])
+        graph.add_step('variable_library',
+                       lambda workspace, staging_folder: cls.create_variable_library_with_adls_connection(
+                           workspace, staging_folder.id, deploy_job),
+                       inputs=['workspace', 'staging_folder'])
+        graph.add_step('lakehouse',
+                       lambda workspace: FabricRestApi.create_lakehouse(workspace.id, "sales"),
+                       inputs=['workspace'])
+
+        notebook_steps = []
+        for notebook_folder in [ 'staging/Build 01 Silver Layer.Notebook',
+                                 'staging/Build 02 Gold Layer.Notebook' ]:
+            notebook_step = f'notebook [{notebook_folder}]'
+            graph.add_step(notebook_step,
+                           lambda workspace, lakehouse, staging_folder, notebook_folder=notebook_folder: \
+                               FabricRestApi.create_item(
+                                   workspace.id,
+                                   ItemDefinitionFactory.get_create_notebook_request_from_folder(
+                                       solution_folder, notebook_folder, workspace.id, lakehouse),
+                                   staging_folder.id),
+                           inputs=['workspace', 'lakehouse', 'staging_folder'])
+            notebook_steps.append(notebook_step)
+
+        def create_pipeline(workspace, lakehouse, staging_folder, **notebooks):
+            notebook_ids = [ notebooks[notebook_step].id for notebook_step in notebook_steps ]
+            create_pipeline_request = ItemDefinitionFactory.get_create_item_request_from_folder(
+                solution_folder,
+                'staging/Create Lakehouse Tables.DataPipeline'
             )
-        
-        notebook_redirects = {
-            '11111111-1111-1111-1111-111111111111': workspace.id,
-            '22222222-2222-2222-2222-222222222222': silver_lakehouse.id,
-        }
-
-        create_notebook_request = \
-            ItemDefinitionFactory.update_part_in_create_request(
-                create_notebook_request,
-                'notebook-content.py', 
-                notebook_redirects)
-
-        notebook_build_silver = FabricRestApi.create_item(
-            workspace.id, 
-            create_notebook_request,
-            staging_folder_id)
 
-        FabricRestApi.run_notebook(workspace.id, notebook_build_silver)
+            pipeline_redirects = {
+                '11111111-1111-1111-1111-111111111111': workspace.id,
+                '22222222-2222-2222-2222-222222222222': lakehouse.id,
+                '33333333-3333-3333-3333-333333333333': notebook_ids[1],
+                '44444444-4444-4444-4444-444444444444': notebook_ids[1]
+            }
 
-        silver_sql_endpoint = FabricRestApi.get_sql_endpoint_for_lakehouse(workspace.id, silver_lakehouse)
+            create_pipeline_request = ItemDefinitionFactory.update_part_in_create_request(
+                create_pipeline_request,
+                'pipeline-content.json',
+                pipeline_redirects
+            )
 
-        FabricRestApi.refresh_sql_endpoint_metadata(workspace.id, silver_sql_endpoint['database'])
+            return FabricRestApi.create_item(workspace.id, create_pipeline_request, staging_folder.id)
 
-        gold_lakehouse = FabricRestApi.create_lakehouse(
-            workspace.id,
-            gold_lakehouse_name)
-        
-        create_notebook_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Medallion Solution',
-            'staging/Build 12 Gold Tables.Notebook'            
-        )
-        
-        notebook_redirects = {
-            '11111111-1111-1111-1111-111111111111': workspace.id,
-            '22222222-2222-2222-2222-222222222222': gold_lakehouse.id,
-        }
+        graph.add_step('pipeline', create_pipeline,
+                       inputs=['workspace', 'lakehouse', 'staging_folder'] + notebook_steps)
+        graph.add_step('run_pipeline',
+                       lambda workspace, pipeline: FabricRestApi.run_data_pipeline(workspace.id, pipeline),
+                       inputs=['workspace', 'pipeline'],
+                       after=['variable_library'])
 
-        create_notebook_request = ItemDefinitionFactory.update_part_in_create_request(
-            create_notebook_request,
-            'notebook-content.py', 
-            notebook_redirects
-        )
+        cls._add_sql_endpoint_steps(graph, 'sql_endpoint', 'workspace', 'lakehouse', ['run_pipeline'])
+        cls._add_model_and_report_steps(graph, solution_folder, 'workspace', 'lakehouse', 'sql_endpoint',
+                                        [ 'Product Sales Summary.Report',
+                                          'Product Sales Time Intelligence.Report' ])
 
-        notebook_build_gold = FabricRestApi.create_item(
-            workspace.id, 
-            create_notebook_request,
-            staging_folder_id)
+        return graph.run()['workspace']
 
-        FabricRestApi.run_notebook(workspace.id, notebook_build_gold)
+    @classmethod
+    def deploy_medallion_solution_using_apis(cls, target_workspace,
+                                             deploy_job = StagingEnvironments.get_dev_environment()):
+        """Deploy Medallion Lakehouse Solution using APIs"""
         
-        gold_sql_endpoint = FabricRestApi.get_sql_endpoint_for_lakehouse(workspace.id, gold_lakehouse)
-
-        FabricRestApi.refresh_sql_endpoint_metadata(workspace.id, gold_sql_endpoint['database'])
-
-        create_model_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Medallion Solution',
-            'Product Sales DirectLake Model.SemanticModel'
-        )
-            
-        model_redirects = {
-            'abc-xyz.datawarehouse.fabric.microsoft.com': gold_sql_endpoint['server']
-        }
-
-        create_model_request = \
-            ItemDefinitionFactory.update_part_in_create_request(
-                create_model_request,
-                'definition/expressions.tmdl',
-                model_redirects)
-
-        model = FabricRestApi.create_item(workspace.id, create_model_request)
-
-        FabricRestApi.create_and_bind_semantic_model_connecton(workspace, model.id, gold_lakehouse)
-
-        report_folders = [
-            'Product Sales Summary.Report',
-            'Product Sales Time Intelligence.Report',
-            'Product Sales Top 11 Cities.Report'
-        ]
-        for report_folder in report_folders:
-            
-            create_report_request = ItemDefinitionFactory.get_create_report_request_from_folder(
-                'Medallion Solution',
-                report_folder,
-                model.id
-            )
-
-            FabricRestApi.create_item(workspace.id, create_report_request)
- 
-        return workspace
+        AppLogger.log_job(f"Deploying Medallion Solution to [{target_workspace}] using Fabric REST APIs")
+        solution_folder = 'Medallion Solution'
+        graph = DeploymentGraph(solution_folder)
+
+        cls._add_workspace_steps(graph, 'workspace', target_workspace, 'Medallion Solution')
+        graph.add_step('staging_folder',
+                       lambda workspace: FabricRestApi.create_folder(workspace.id, 'staging'),
+                       inputs=['workspace'])
+        graph.add_step('variable_library',
+                       lambda workspace, staging_folder: cls.create_variable_library_with_adls_connection(
+                           workspace, staging_folder.id, deploy_job),
+                       inputs=['workspace', 'staging_folder'])
+
+        graph.add_step('bronze_lakehouse',
+                       lambda workspace, staging_folder: FabricRestApi.create_lakehouse(
+                           workspace.id, "sales_bronze", staging_folder.id),
+                       inputs=['workspace', 'staging_folder'])
+        graph.add_step('shortcut',
+                       lambda workspace, bronze_lakehouse: cls._create_sales_data_shortcut(
+                           workspace, bronze_lakehouse),
+                       inputs=['workspace', 'bronze_lakehouse'],
+                       after=['variable_library'])
+        graph.add_step('silver_lakehouse',
+                       lambda workspace, staging_folder: FabricRestApi.create_lakehouse(
+                           workspace.id, "sales_silver", staging_folder.id),
+                       inputs=['workspace', 'staging_folder'])
+        graph.add_step('gold_lakehouse',
+                       lambda workspace: FabricRestApi.create_lakehouse(workspace.id, "sales"),
+                       inputs=['workspace'])
+
+        graph.add_step('silver_notebook',
+                       lambda workspace, silver_lakehouse, staging_folder: cls._create_notebook_with_redirects(
+                           solution_folder, 'staging/Build 01 Silver Tables.Notebook',
+                           workspace, workspace, silver_lakehouse, staging_folder.id),
+                       inputs=['workspace', 'silver_lakehouse', 'staging_folder'])
+        graph.add_step('run_silver_notebook',
+                       lambda workspace, silver_notebook: FabricRestApi.run_notebook(
+                           workspace.id, silver_notebook),
+                       inputs=['workspace', 'silver_notebook'],
+                       after=['shortcut'])
+        cls._add_sql_endpoint_steps(graph, 'silver_sql_endpoint', 'workspace', 'silver_lakehouse',
+                                    ['run_silver_notebook'])
+
+        graph.add_step('gold_notebook',
+                       lambda workspace, gold_lakehouse, staging_folder: cls._create_notebook_with_redirects(
+                           solution_folder, 'staging/Build 02 Gold Tables.Notebook',
+                           workspace, workspace, gold_lakehouse, staging_folder.id),
+                       inputs=['workspace', 'gold_lakehouse', 'staging_folder'])
+        # gold tables are built from silver tables
+        graph.add_step('run_gold_notebook',
+                       lambda workspace, gold_notebook: FabricRestApi.run_notebook(
+                           workspace.id, gold_notebook),
+                       inputs=['workspace', 'gold_notebook'],
+                       after=['run_silver_notebook'])
+        cls._add_sql_endpoint_steps(graph, 'gold_sql_endpoint', 'workspace', 'gold_lakehouse',
+                                    ['run_gold_notebook'])
+
+        cls._add_model_and_report_steps(graph, solution_folder, 'workspace', 'gold_lakehouse',
+                                        'gold_sql_endpoint',
+                                        [ 'Product Sales Summary.Report',
+                                          'Product Sales Time Intelligence.Report',
+                                          'Product Sales Top 10 Cities.Report' ])
+
+        return graph.run()['workspace']
 
     @classmethod
     def deploy_two_workspace_solution_using_apis(
@@ -1179,163 +1282,110 @@ class DeploymentManager:
         """Deploy Two Workspace Medallion Solution using APIs"""
         
         AppLogger.log_job(f"Deploying 2 workspace solution for project [{project_name}] using Fabric REST APIs")
-        
-        staging_workspace_name = f'{project_name}-staging'        
-        staging_workspace = FabricRestApi.create_workspace(staging_workspace_name)
-        FabricRestApi.update_workspace_description(staging_workspace.id, 'Medallion Solution - Staging Workspace')
-        
-        presentation_workspace_name = f'{project_name}-presentation'
-        presentation_workspace = FabricRestApi.create_workspace(presentation_workspace_name)
-        FabricRestApi.update_workspace_description(presentation_workspace.id, 'Medallion Solution - Presentation Workspace')
-
-        cls.create_variable_library_with_adls_connection(staging_workspace, deploy_job= deploy_job)
-
-        bronze_lakehouse_name = "sales_bronze"
-        silver_lakehouse_name = "sales_silver"
-        gold_lakehouse_name = "sales"
-     
-        bronze_lakehouse = FabricRestApi.create_lakehouse(
-            staging_workspace.id,
-            bronze_lakehouse_name
-        )
-
-        shortcut_name = "sales-data"
-        shortcut_path = "Files"
-        adls_shortcut_location_variable = "$(/**/environment_settings/adls_server)"
-        adls_shortcut_subpath_variable = "$(/**/environment_settings/adls_shortcut_subpath)"
-        adls_connection_id_variable = "$(/**/environment_settings/adls_connection_id)"
-
-        FabricRestApi.create_adls_gen2_shortcut(
-            staging_workspace.id,
-            bronze_lakehouse.id,
-            shortcut_name,
-            shortcut_path,
-            adls_shortcut_location_variable,
-            adls_shortcut_subpath_variable,
-            adls_connection_id_variable
-        )
-
-        silver_lakehouse = FabricRestApi.create_lakehouse(
-            staging_workspace.id,
-            silver_lakehouse_name)
-        
-        create_notebook_request = \
-            ItemDefinitionFactory.get_create_item_request_from_folder(
-                'Medallion Solution', 
-                'staging/Build 01 Silver Tables.Notebook'
-            )
-        
-        notebook_redirects = {
-            '11111111-1111-1111-1111-111111111111': staging_workspace.id,
-            '22222222-2222-2222-2222-222222222222': silver_lakehouse.id,
-        }
-
-        create_notebook_request = \
-            ItemDefinitionFactory.update_part_in_create_request(
-                create_notebook_request,
-                'notebook-content.py', 
-                notebook_redirects)
-
-        notebook_build_silver = FabricRestApi.create_item(
-            staging_workspace.id, 
-            create_notebook_request)
-
-        FabricRestApi.run_notebook(staging_workspace.id, notebook_build_silver)
-
-        silver_sql_endpoint = FabricRestApi.get_sql_endpoint_for_lakehouse(staging_workspace.id, silver_lakehouse)
-
-        FabricRestApi.refresh_sql_endpoint_metadata(staging_workspace.id, silver_sql_endpoint['database'])
-
-        gold_lakehouse = FabricRestApi.create_lakehouse(
-            presentation_workspace.id,
-            gold_lakehouse_name)
-        
-        create_notebook_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Medallion Solution',
-            'staging/Build 02 Gold Tables.Notebook'            
-        )
-        
-        notebook_redirects = {
-            '11111111-1111-1111-1111-111111111111': presentation_workspace.id,
-            '22222222-2222-2222-2222-222222222222': gold_lakehouse.id,
-        }
-
-        create_notebook_request = ItemDefinitionFactory.update_part_in_create_request(
-            create_notebook_request,
-            'notebook-content.py', 
-            notebook_redirects
-        )
-
-        notebook_build_gold = FabricRestApi.create_item(
-            staging_workspace.id, 
-            create_notebook_request)
-
-        FabricRestApi.run_notebook(staging_workspace.id, notebook_build_gold)
-        
-        gold_sql_endpoint = FabricRestApi.get_sql_endpoint_for_lakehouse(presentation_workspace.id, gold_lakehouse)
-
-        FabricRestApi.refresh_sql_endpoint_metadata(presentation_workspace.id, gold_sql_endpoint['database'])
-
-        create_model_request = ItemDefinitionFactory.get_create_item_request_from_folder(
-            'Medallion Solution',
-            'Product Sales DirectLake Model.SemanticModel'
-        )
-            
-        model_redirects = {
-            'abc-xyz.datawarehouse.fabric.microsoft.com': gold_sql_endpoint['server']
-        }
-
-        create_model_request = \
-            ItemDefinitionFactory.update_part_in_create_request(
-                create_model_request,
-                'definition/expressions.tmdl',
-                model_redirects)
-
-        model = FabricRestApi.create_item(presentation_workspace.id, create_model_request)
-
-        FabricRestApi.create_and_bind_semantic_model_connecton(presentation_workspace, model.id, gold_lakehouse)
+        solution_folder = 'Medallion Solution'
+        graph = DeploymentGraph(f'{project_name} two workspace solution')
+
+        cls._add_workspace_steps(graph, 'staging_workspace', f'{project_name}-staging',
+                                 'Medallion Solution - Staging Workspace')
+        cls._add_workspace_steps(graph, 'presentation_workspace', f'{project_name}-presentation',
+                                 'Medallion Solution - Presentation Workspace')
+
+        graph.add_step('variable_library',
+                       lambda staging_workspace: cls.create_variable_library_with_adls_connection(
+                           staging_workspace, deploy_job= deploy_job),
+                       inputs=['staging_workspace'])
+        graph.add_step('bronze_lakehouse',
+                       lambda staging_workspace: FabricRestApi.create_lakehouse(
+                           staging_workspace.id, "sales_bronze"),
+                       inputs=['staging_workspace'])
+        graph.add_step('shortcut',
+                       lambda staging_workspace, bronze_lakehouse: cls._create_sales_data_shortcut(
+                           staging_workspace, bronze_lakehouse),
+                       inputs=['staging_workspace', 'bronze_lakehouse'],
+                       after=['variable_library'])
+        graph.add_step('silver_lakehouse',
+                       lambda staging_workspace: FabricRestApi.create_lakehouse(
+                           staging_workspace.id, "sales_silver"),
+                       inputs=['staging_workspace'])
+        graph.add_step('gold_lakehouse',
+                       lambda presentation_workspace: FabricRestApi.create_lakehouse(
+                           presentation_workspace.id, "sales"),
+                       inputs=['presentation_workspace'])
+
+        graph.add_step('silver_notebook',
+                       lambda staging_workspace, silver_lakehouse: cls._create_notebook_with_redirects(
+                           solution_folder, 'staging/Build 01 Silver Tables.Notebook',
+                           staging_workspace, staging_workspace, silver_lakehouse),
+                       inputs=['staging_workspace', 'silver_lakehouse'])
+        graph.add_step('run_silver_notebook',
+                       lambda staging_workspace, silver_notebook: FabricRestApi.run_notebook(
+                           staging_workspace.id, silver_notebook),
+                       inputs=['staging_workspace', 'silver_notebook'],
+                       after=['shortcut'])
+        cls._add_sql_endpoint_steps(graph, 'silver_sql_endpoint', 'staging_workspace', 'silver_lakehouse',
+                                    ['run_silver_notebook'])
+
+        # gold notebook lives in staging workspace and writes to lakehouse in presentation workspace
+        graph.add_step('gold_notebook',
+                       lambda staging_workspace, presentation_workspace, gold_lakehouse: \
+                           cls._create_notebook_with_redirects(
+                               solution_folder, 'staging/Build 02 Gold Tables.Notebook',
+                               staging_workspace, presentation_workspace, gold_lakehouse),
+                       inputs=['staging_workspace', 'presentation_workspace', 'gold_lakehouse'])
+        graph.add_step('run_gold_notebook',
+                       lambda staging_workspace, gold_notebook: FabricRestApi.run_notebook(
+                           staging_workspace.id, gold_notebook),
+                       inputs=['staging_workspace', 'gold_notebook'],
+                       after=['run_silver_notebook'])
+        cls._add_sql_endpoint_steps(graph, 'gold_sql_endpoint', 'presentation_workspace', 'gold_lakehouse',
+                                    ['run_gold_notebook'])
 
         report_folders = [
             'Product Sales Summary.Report',
             'Product Sales Time Intelligence.Report',
             'Product Sales Top 10 Cities.Report'
         ]
-        for report_folder in report_folders:
-            
-            create_report_request = ItemDefinitionFactory.get_create_report_request_from_folder(
-                'Medallion Solution',
-                report_folder,
-                model.id
-            )
-
-            FabricRestApi.create_item(presentation_workspace.id, create_report_request)
-            
-        AdoProjectManager.create_project(project_name, presentation_workspace)
-        
-        AdoProjectManager.write_file_to_repo(
-            project_name, 
-            'main', 
-            'workspace/staging/ReadMe.md', 
-            "hello",
-            comment='Adding ReadMe.md to [workspace] folder')
-    
-        
-        FabricRestApi.connect_workspace_to_ado_repo(staging_workspace,project_name, 'main', git_folder='/workspace/staging')
+        cls._add_model_and_report_steps(graph, solution_folder, 'presentation_workspace', 'gold_lakehouse',
+                                        'gold_sql_endpoint', report_folders)
+
+        # workspaces are connected to the repo only after all of their content exists
+        content_steps = list(graph.steps)
+        graph.add_step('ado_project',
+                       lambda presentation_workspace: AdoProjectManager.create_project(
+                           project_name, presentation_workspace),
+                       inputs=['presentation_workspace'])
+        graph.add_step('staging_readme',
+                       lambda: AdoProjectManager.write_file_to_repo(
+                           project_name,
+                           'main',
+                           'workspace/staging/ReadMe.md',
+                           "hello",
+                           comment='Adding ReadMe.md to [workspace] folder'),
+                       after=['ado_project'])
+        graph.add_step('connect_staging_workspace',
+                       lambda staging_workspace: FabricRestApi.connect_workspace_to_ado_repo(
+                           staging_workspace, project_name, 'main', git_folder='/workspace/staging'),
+                       inputs=['staging_workspace'],
+                       after=['staging_readme'] + content_steps)
+        graph.add_step('presentation_readme',
+                       lambda: AdoProjectManager.write_file_to_repo(
+                           project_name,
+                           'main',
+                           'workspace/presentation/ReadMe.md',
+                           "hello",
+                           comment='Adding ReadMe.md to [workspace] folder'),
+                       after=['connect_staging_workspace'])
+        graph.add_step('connect_presentation_workspace',
+                       lambda presentation_workspace: FabricRestApi.connect_workspace_to_ado_repo(
+                           presentation_workspace, project_name, 'main', git_folder='/workspace/presentation'),
+                       inputs=['presentation_workspace'],
+                       after=['presentation_readme'])
+
+        outputs = graph.run()
 
-        AdoProjectManager.write_file_to_repo(
-            project_name, 
-            'main', 
-            'workspace/presentation/ReadMe.md', 
-            "hello",
-            comment='Adding ReadMe.md to [workspace] folder')
-
-
-        FabricRestApi.connect_workspace_to_ado_repo(presentation_workspace,project_name, 'main', git_folder='/workspace/presentation')
-  
- 
         return {
-            'presentation': presentation_workspace,
-            'staging:': staging_workspace
+            'presentation': outputs['presentation_workspace'],
+            'staging:': outputs['staging_workspace']
         }
 
 
@@ -1369,29 +1419,155 @@ class DeploymentManager:
         
         import_request = ItemDefinitionFactory.get_bulk_item_import_request_from_folder(solution_folder, True)
 
-        import_request['definitionParts'] = ItemDefinitionFactory.update_import_definition_part(
-            import_request['definitionParts'],
+        definition_parts = DefinitionPartSet.from_parts(import_request['definitionParts'])
+
+        definition_parts.rewrite(
             '/staging/environment_settings.VariableLibrary/variables.json',
             { '11111111-1111-1111-1111-111111111111': connection_ids['dev'] }
         )
 
-        import_request['definitionParts'] = ItemDefinitionFactory.update_import_definition_part(
-            import_request['definitionParts'],
+        definition_parts.rewrite(
             '/staging/environment_settings.VariableLibrary/valueSets/test.json',
             { '22222222-2222-2222-2222-222222222222': connection_ids['test'] }
         )
 
-        import_request['definitionParts'] = ItemDefinitionFactory.update_import_definition_part(
-            import_request['definitionParts'],
+        definition_parts.rewrite(
             '/staging/environment_settings.VariableLibrary/valueSets/prod.json',
             { '33333333-3333-3333-3333-333333333333': connection_ids['prod'] }
         )
+
+        import_request['definitionParts'] = definition_parts.to_parts()
         # cls._write_json_to_exports_folder(f'{solution_folder}_import_request.json', import_request)
         AppLogger.log_step(f"Calling Bulk Import Item API")
 
         FabricRestApi.import_item_definitions(workspace.id, import_request)
         AppLogger.log_substep(f"Import operation complete")
-          
+
+    @classmethod
+    def deploy_solution_using_bulk_import(cls, solution_name, target_workspace,
+                                          deploy_job = StagingEnvironments.get_dev_environment()):
+        """Deploy solution with one bulk import per dependency tier and apply post-deploy fixes"""
+        if solution_name not in cls.BULK_IMPORT_VARIABLE_LIBRARIES:
+            raise LookupError(f'Unknown solution name [{solution_name}]')
+
+        AppLogger.log_job(f"Deploying {solution_name} to [{target_workspace}] using bulk import")
+
+        # fail before anything is created when imported items hold placeholders no redirect replaces
+        import_item_folders = [ item_folder for item_folder, item in TemplateCatalog.get_items(solution_name).items()
+                                if item['type'] != 'VariableLibrary' ]
+        TemplateCatalog.validate_placeholders(solution_name, [ cls.BULK_IMPORT_WORKSPACE_PLACEHOLDER ],
+                                              import_item_folders, cls.NOTEBOOK_LAKEHOUSE_PATTERNS)
+
+        workspace = FabricRestApi.create_workspace(target_workspace)
+        FabricRestApi.update_workspace_description(workspace.id, solution_name)
+
+        # variable libraries hold tenant-specific values so they are created instead of imported
+        match cls.BULK_IMPORT_VARIABLE_LIBRARIES[solution_name]:
+            case 'web_datasource':
+                cls.create_web_datasource_url_variable_library(workspace, deploy_job)
+            case 'adls_connection':
+                staging_folder = FabricRestApi.create_folder(workspace.id, 'staging')
+                cls.create_variable_library_with_adls_connection(workspace, staging_folder.id, deploy_job)
+
+        import_request = ItemDefinitionFactory.get_bulk_item_import_request_from_folder(solution_name, True)
+
+        parts_by_tier = {}
+        for part in import_request['definitionParts']:
+            _, item_type = BulkImportBatcher.get_item_folder(part['path'])
+            if item_type == 'VariableLibrary':
+                continue
+            tier = BulkImportBatcher.ITEM_TYPE_TIERS.get(item_type, BulkImportBatcher.DEFAULT_TIER)
+            parts_by_tier.setdefault(tier, DefinitionPartSet()).put(DefinitionPart.from_dict(part))
+
+        # logical ids from .platform files are replaced with ids of items once they exist
+        id_redirects = { cls.BULK_IMPORT_WORKSPACE_PLACEHOLDER: workspace.id }
+        logical_ids = cls._get_logical_ids(import_request['definitionParts'])
+
+        for tier in sorted(parts_by_tier):
+            definition_parts = parts_by_tier[tier]
+            cls._apply_bulk_import_redirects(workspace, definition_parts, id_redirects, deploy_job)
+
+            AppLogger.log_step(f"Importing {len(definition_parts)} item definition parts (tier {tier})")
+            FabricRestApi.import_item_definitions(workspace.id, {
+                'definitionParts': definition_parts.to_parts(),
+                'allowPairingByName': import_request['allowPairingByName']
+            })
+
+            items = { (item.display_name, item.type): item.id
+                      for item in FabricRestApi.list_workspace_items(workspace.id) }
+            for item_key, logical_id in logical_ids.items():
+                if item_key in items:
+                    id_redirects[logical_id] = items[item_key]
+
+        cls.apply_post_deploy_fixes(workspace.id)
+
+        return workspace
+
+    @classmethod
+    def _get_logical_ids(cls, definition_parts):
+        """Get logical id from .platform file of each item by (display name, type)"""
+        logical_ids = {}
+        for part in definition_parts:
+            if not part['path'].endswith('/.platform'):
+                continue
+            platform = json.loads(DefinitionPart.from_dict(part).content)
+            logical_id = platform.get('config', {}).get('logicalId')
+            if logical_id is not None:
+                metadata = platform['metadata']
+                logical_ids[(metadata['displayName'], metadata['type'])] = logical_id
+        return logical_ids
+
+    @classmethod
+    def _apply_bulk_import_redirects(cls, workspace, definition_parts: DefinitionPartSet, id_redirects, deploy_job):
+        """Redirect parts to items of target workspace and to data sources of deployment job"""
+        sql_endpoints = {}
+        for part in definition_parts:
+            # an item's own logical id must stay in its .platform file
+            if part.path.endswith('/.platform'):
+                continue
+
+            if part.path.endswith('.Notebook/notebook-content.py'):
+                match = re.search(r'"default_lakehouse_name"\s*:\s*"([^"]+)"', part.content)
+                if match is not None:
+                    lakehouse_name = match.group(1)
+                    lakehouse = FabricRestApi.get_item_by_name(workspace.id, lakehouse_name, 'Lakehouse')
+                    part.rewrite(patterns=cls._get_notebook_lakehouse_redirects(
+                        workspace.id, lakehouse.id, lakehouse_name))
+
+            # reports exported with their model reference it by relative path, which only resolves
+            # when both are imported in the same request, so reports are bound to the created model
+            if part.path.endswith('.Report/definition.pbir'):
+                match = re.search(r'"byPath"\s*:\s*\{\s*"path"\s*:\s*"[^"]*?([^"/]+)\.SemanticModel"', part.content)
+                if match is not None:
+                    model = FabricRestApi.get_item_by_name(workspace.id, match.group(1), 'SemanticModel')
+                    part.content = ItemDefinitionFactory.get_report_definition_pbir(model.id)
+
+            if part.path.endswith('.SemanticModel/definition/expressions.tmdl'):
+                # the model names the lakehouse behind its SQL endpoint as the database of Sql.Database
+                match = re.search(r'Sql\.Database\(\s*"[^"]*"\s*,\s*"([^"]+)"', part.content)
+                if match is not None:
+                    lakehouse_name = match.group(1)
+                    if lakehouse_name not in sql_endpoints:
+                        lakehouse = FabricRestApi.get_item_by_name(workspace.id, lakehouse_name, 'Lakehouse')
+                        if lakehouse is None:
+                            raise LookupError(f'Lakehouse [{lakehouse_name}] used by [{part.path}] ' + \
+                                              f'does not exist in workspace [{workspace.display_name}]')
+                        sql_endpoints[lakehouse_name] = \
+                            FabricRestApi.get_sql_endpoint_for_lakehouse(workspace.id, lakehouse)
+                    part.rewrite(patterns={
+                        r'(Sql\.Database\(\s*")[^"]*datawarehouse\.fabric\.microsoft\.com[^"]*(")':
+                            rf'\g<1>{sql_endpoints[lakehouse_name]["server"]}\g<2>'
+                    })
+                adls_server = deploy_job.parameters[DeploymentJob.adls_server_parameter]
+                adls_container_name = deploy_job.parameters[DeploymentJob.adls_container_name_parameter]
+                adls_container_path = deploy_job.parameters[DeploymentJob.adls_container_path_parameter]
+                part.rewrite(patterns={
+                    r'(expression AZURE_STORAGE_ROOT = ")[^"]*(")':
+                        rf'\g<1>{adls_server}{adls_container_name}{adls_container_path}\g<2>'
+                })
+
+            part.rewrite(literals=id_redirects)
+
     #endregion
 
     #region Deployment pipeline support
@@ -1399,11 +1575,7 @@ class DeploymentManager:
     @classmethod
     def get_deployment_pipeline_by_name(cls, display_name):
         """Get Deployment Pipeline by Name"""
-        for pipeline in FabricRestApi.list_deployment_pipelines():
-            if pipeline.display_name == display_name:
-                return pipeline
-    
-        return None
+        return FabricRestApi.get_deployment_pipeline_by_name(display_name)
 
     @classmethod
     def delete_deployment_pipeline_by_name(cls, display_name):
@@ -1420,17 +1592,25 @@ class DeploymentManager:
             AppLogger.log_substep('Deployment pipeline deleted')
 
     @classmethod
-    def delete_all_deployment_pipelines(cls):
+    def delete_all_deployment_pipelines(cls, max_workers = 1):
         """Delete All Deployment Pipelines"""
         AppLogger.log_step("Deleting Pipelines")
-        for pipeline in FabricRestApi.list_deployment_pipelines():
+
+        def delete_pipeline(pipeline):
             AppLogger.log_substep(f"Deleting {pipeline.display_name}")
+            # stages must be unassigned before the pipeline or its workspaces can be deleted
             stages = FabricRestApi.list_deployment_pipeline_stages(pipeline.id)
             for stage in stages:
-                FabricRestApi.unassign_workpace_from_pipeline_stage(pipeline.id, stage.id)
+                if stage.workspace_id is not None:
+                    FabricRestApi.unassign_workpace_from_pipeline_stage(pipeline.id, stage.id)
 
             FabricRestApi.delete_deployment_pipeline(pipeline.id)
 
+        return cls._delete_resources(FabricRestApi.list_deployment_pipelines(),
+                                     delete_pipeline,
+                                     lambda pipeline: pipeline.id,
+                                     max_workers)
+
     @classmethod
     def deploy_from_dev_to_test(cls, pipeline_name):
         """Deploy Stage from Dev to Test"""
@@ -1461,6 +1641,13 @@ class DeploymentManager:
         FabricRestApi.deploy_to_pipeline_stage(pipeline.id, source_stage_id, target_stage_id)
         AppLogger.log_substep("Deploy operation complete")
 
+    @classmethod
+    def run_etl_jobs(cls, workspace_id, workspace_items, dependencies = None):
+        """Run 'Create' notebooks and data pipelines concurrently in dependency order"""
+        etl_items = [ item for item in workspace_items
+                      if item.type in JobOrchestrator.JOB_TYPES and 'Create' in item.display_name ]
+        return JobOrchestrator.run_jobs(workspace_id, etl_items, dependencies)
+
     @classmethod
     def apply_post_pipeline_deploy_fixes(cls,
                                          workspace_name,
@@ -1487,16 +1674,8 @@ class DeploymentManager:
                 if (shortcut.target.type == 'AdlsGen2') and (shortcut.name == 'sales-data'):
                     FabricRestApi.reset_adls_gen2_shortcut(workspace.id, lakehouse.id, shortcut)
 
-        notebooks_list = list(filter(lambda item: item.type=='Notebook', workspace_items))
-        sorted_notebooks_list = sorted(notebooks_list, key=lambda notebook: notebook.display_name)
-        for notebook in sorted_notebooks_list:
-            if run_etl_jobs and 'Create' in notebook.display_name:                
-                FabricRestApi.run_notebook(workspace.id, notebook)
-
-        pipelines  = list(filter(lambda item: item.type=='DataPipeline', workspace_items))
-        for pipeline in pipelines:
-            if run_etl_jobs and 'Create' in pipeline.display_name:
-                FabricRestApi.run_data_pipeline(workspace.id, pipeline)
+        if run_etl_jobs:
+            cls.run_etl_jobs(workspace.id, workspace_items)
 
         sql_endpoints =    list(filter(lambda item: item.type=='SQLEndpoint', workspace_items))
         for sql_endpoint in sql_endpoints:
@@ -1613,15 +1792,79 @@ class DeploymentManager:
        
         AppLogger.log_step(f"Applying post deploy fixes to [{workspace_name}]")
         
-        notebooks = list(filter(lambda item: item.type == 'Notebook', workspace_items))        
+        cls.run_etl_jobs(workspace.id, workspace_items)
+
+        sql_endpoints = list(filter(lambda item: item.type == 'SQLEndpoint', workspace_items))
+        for sql_endpoint in sql_endpoints:
+            FabricRestApi.refresh_sql_endpoint_metadata(
+                workspace.id,
+                sql_endpoint.id)
+
+        models = list(filter(lambda item: item.type == 'SemanticModel', workspace_items))
+        for model in models:
+            FabricRestApi.create_and_bind_semantic_model_connecton(
+                workspace,
+                model.id,
+                FabricRestApi.get_item_by_name(workspace.id, 'sales', 'Lakehouse'))
+
+    @classmethod
+    def apply_post_sync_fixes_to_staging_workspace(cls, workspace_id, deploy_job: DeploymentJob):
+        """Apply Post Sync Fixes to staging workspace of two workspace solution"""
+        workspace = FabricRestApi.get_workspace_info(workspace_id)
+        AppLogger.log_step(f"Applying post sync fixes to staging workspace [{workspace.display_name}]")
+
+        workspace_items = list(FabricRestApi.list_workspace_items(workspace.id))
+
+        # staging notebooks write to lakehouse of the staging workspace
+        notebooks = list(filter(lambda item: item.type=='Notebook', workspace_items))
         for notebook in notebooks:
-            if 'Create' in notebook.display_name:
-                FabricRestApi.run_notebook(workspace.id, notebook)
-    
-        pipelines  = list(filter(lambda item: item.type == 'DataPipeline', workspace_items))
-        for pipeline in pipelines:
-            if 'Create' in pipeline.display_name:
-                FabricRestApi.run_data_pipeline(workspace.id, pipeline)
+            AppLogger.log_substep(f"Updating notebook [{notebook.display_name}]")
+            cls.update_source_lakehouse_in_notebook(
+                workspace.display_name,
+                notebook.display_name,
+                "sales_silver")
+
+    @classmethod
+    def apply_post_sync_fixes_to_presentation_workspace(cls, workspace_id, deploy_job: DeploymentJob):
+        """Apply Post Sync Fixes to presentation workspace of two workspace solution"""
+        workspace = FabricRestApi.get_workspace_info(workspace_id)
+        AppLogger.log_step(f"Applying post sync fixes to presentation workspace [{workspace.display_name}]")
+
+        workspace_items = list(FabricRestApi.list_workspace_items(workspace.id))
+
+        models = list(filter(lambda item: item.type=='SemanticModel', workspace_items))
+        for model in models:
+            if model.display_name == 'Product Sales DirectLake Model':
+                AppLogger.log_substep(f"Updating semantic model [{model.display_name}]")
+                # fix connection to lakehouse SQL endpoint
+                cls.update_directlake_semantic_model_source(
+                    workspace.display_name,
+                    model.display_name,
+                    'sales')
+
+    @classmethod
+    def apply_post_deploy_fixes_to_staging_workspace(cls, workspace_id):
+        """Apply Post Deploy Fixes to staging workspace of two workspace solution"""
+        workspace = FabricRestApi.get_workspace_info(workspace_id)
+        workspace_items = list(FabricRestApi.list_workspace_items(workspace.id))
+
+        AppLogger.log_step(f"Applying post deploy fixes to staging workspace [{workspace.display_name}]")
+
+        cls.run_etl_jobs(workspace.id, workspace_items)
+
+        sql_endpoints = list(filter(lambda item: item.type == 'SQLEndpoint', workspace_items))
+        for sql_endpoint in sql_endpoints:
+            FabricRestApi.refresh_sql_endpoint_metadata(
+                workspace.id,
+                sql_endpoint.id)
+
+    @classmethod
+    def apply_post_deploy_fixes_to_presentation_workspace(cls, workspace_id):
+        """Apply Post Deploy Fixes to presentation workspace of two workspace solution"""
+        workspace = FabricRestApi.get_workspace_info(workspace_id)
+        workspace_items = list(FabricRestApi.list_workspace_items(workspace.id))
+
+        AppLogger.log_step(f"Applying post deploy fixes to presentation workspace [{workspace.display_name}]")
 
         sql_endpoints = list(filter(lambda item: item.type == 'SQLEndpoint', workspace_items))
         for sql_endpoint in sql_endpoints:
@@ -1651,6 +1894,7 @@ class DeploymentManager:
         parameter_file = 'parameter.yml'
     ):
         """generate_yaml_deploy_file"""
+        import yaml
                 
         if item_types_in_scope is None:
             item_types_in_scope = [ 'Lakehouse', 'Notebook', 'DataPipeline', 'SemanticModel', 'Report']
@@ -1698,6 +1942,7 @@ class DeploymentManager:
         test_workspace,
         prod_workspace):
         """Generate parameter.yml file"""
+        import yaml
 
         dev_workspace_items = FabricRestApi.list_workspace_items(dev_workspace.id)
         test_workspace_items = FabricRestApi.list_workspace_items(test_workspace.id)
@@ -1822,6 +2067,7 @@ class DeploymentManager:
         test_workspace_id,
         prod_workspace_id):
         """Update deploy config with workspace ids"""
+        import yaml
         
         yaml_deploy_config['core']['workspace_id']['dev'] = dev_workspace_id
         yaml_deploy_config['core']['workspace_id']['test'] = test_workspace_id    
@@ -1872,6 +2118,8 @@ class DeploymentManager:
             "Member"
         )
 
+        return feature_workspace
+
     @classmethod
     def setup_ado_repo_with_deployment_pipeline(cls, project_name, solution_name, create_feature_workspace = False):
         """Setup Deployment Pipeline"""
@@ -2036,6 +2284,7 @@ class DeploymentManager:
     @classmethod
     def setup_ado_repo_with_fabric_cicd_and_gitflow(cls, project_name, solution_name, create_feature_workspace = False):
         """Setup ADO repo for three branch GitFlow and release process using fabric-cicd"""
+        import yaml
              
         dev_workspace_name = f"{project_name}-dev"
         test_workspace_name = f"{project_name}-test"
@@ -2141,6 +2390,7 @@ class DeploymentManager:
     @classmethod
     def setup_ado_repo_with_fabric_cicd_and_github_flow(cls, project_name, solution_name, create_feature_workspace = False):
         """Set up project with fabric-cicd and GitHub Flow"""
+        import yaml
 
         dev_workspace_name = f"{project_name}-dev"
         test_workspace_name = f"{project_name}-test"
@@ -2236,6 +2486,7 @@ class DeploymentManager:
     @classmethod
     def setup_ado_repo_with_fabric_cicd_and_release_flow(cls, project_name, solution_name, create_feature_workspace = False):
         """Set up project with fabric-cicd and Release Flow"""
+        import yaml
              
         dev_workspace_name = f"{project_name}-dev"
         test_workspace_name = f"{project_name}-test"
@@ -2336,6 +2587,7 @@ class DeploymentManager:
     @classmethod
     def setup_ado_repo_with_two_workspace_solution(cls, project_name):
         """Setup ADO repo with Two Workspace Solution using fabric-cicd"""
+        import yaml
 
         AppLogger.log_job(f"Deploying Two Workspace Solution for project [{project_name}]")
                   
@@ -2555,6 +2807,8 @@ class DeploymentManager:
             commit_message="Committing feature workspace changes after post-sync fixes."
         )
 
+        return feature_workspace
+
     @classmethod
     def setup_github_repo_with_deployment_pipeline(cls, project_name, solution_name, create_feature_workspace = False):
         """Setup Deployment Pipeline"""
@@ -2575,10 +2829,7 @@ class DeploymentManager:
         
         repo_name = project_name.replace(' ', '-')
         GitHubRestApi.create_repository(repo_name, dev_workspace)
-        
-        # add readme.md file in workspace folder
-        GitHubRestApi.create_workspace_readme(repo_name, 'main')
-  
+
         FabricRestApi.connect_workspace_to_github_repo(dev_workspace, repo_name, 'main')
 
         test_workspace = FabricRestApi.create_workspace(test_workspace_name)
@@ -2663,9 +2914,6 @@ class DeploymentManager:
         GitHubRestApi.create_branch(repo_name, 'test', 'main')
         GitHubRestApi.create_branch(repo_name, 'dev', 'test')
         GitHubRestApi.set_default_branch(repo_name, 'dev')
-        
-        # add readme.md file in workspace folder
-        GitHubRestApi.create_workspace_readme(repo_name, 'dev')
           
         FabricRestApi.connect_workspace_to_github_repo(dev_workspace, repo_name, 'dev')
 
@@ -2748,6 +2996,7 @@ class DeploymentManager:
     @classmethod
     def setup_github_repo_with_fabric_cicd_and_gitflow(cls, project_name, solution_name, create_feature_workspace = False):
         """Setup GitHub repo for three branch GitFlow and release process using fabric-cicd"""
+        import yaml
              
         dev_workspace_name = f"{project_name}-dev"
         test_workspace_name = f"{project_name}-test"
@@ -2766,9 +3015,6 @@ class DeploymentManager:
         GitHubRestApi.create_branch(repo_name, 'dev', 'test')
         GitHubRestApi.set_default_branch(repo_name, 'dev')
         
-        # add readme.md file in workspace folder
-        GitHubRestApi.create_workspace_readme(repo_name, 'dev')
-        
         FabricRestApi.connect_workspace_to_github_repo(dev_workspace, repo_name, 'dev')
 
         if create_feature_workspace:
@@ -2867,6 +3113,7 @@ class DeploymentManager:
     @classmethod
     def setup_github_repo_with_fabric_cicd_and_github_flow(cls, project_name, solution_name, create_feature_workspace = False):
         """Set up GitHub repo with fabric-cicd and GitHub Flow"""
+        import yaml
              
         dev_workspace_name = f"{project_name}-dev"
         test_workspace_name = f"{project_name}-test"
@@ -2966,6 +3213,7 @@ class DeploymentManager:
     @classmethod
     def setup_github_repo_with_fabric_cicd_and_release_flow(cls, project_name, solution_name, create_feature_workspace = False):
         """Set up GitHub repo with fabric-cicd and Release Flow"""
+        import yaml
              
         dev_workspace_name = f"{project_name}-dev"
         test_workspace_name = f"{project_name}-test"
@@ -2980,8 +3228,6 @@ class DeploymentManager:
         
         repo_name = project_name.replace(' ','-')
         GitHubRestApi.create_repository(repo_name, dev_workspace)
-        
-        GitHubRestApi.create_workspace_readme(repo_name, 'main')
              
         FabricRestApi.connect_workspace_to_github_repo(
             dev_workspace,
@@ -3100,51 +3346,141 @@ class DeploymentManager:
     #region ADO project for terraform
     
     @classmethod
-    def delete_all_workspaces(cls):
+    def _delete_resources(cls, resources, delete_function, get_resource_id, max_workers = 1):
+        """Delete resources with a bounded worker pool and return deleted and failed resource ids"""
+        summary = { 'deleted': [], 'failed': {} }
+
+        def delete_resource(resource):
+            resource_id = get_resource_id(resource)
+            with AppLogger.span(f'Delete [{resource_id}]', 'delete'):
+                try:
+                    delete_function(resource)
+                    summary['deleted'].append(resource_id)
+                except Exception as e:
+                    AppLogger.log_error(f"Could not delete [{resource_id}] - {e}")
+                    summary['failed'][resource_id] = str(e)
+
+        # worker threads see the same context variables as the caller
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            list(executor.map(lambda resource: context.copy().run(delete_resource, resource), resources))
+
+        return summary
+
+    @classmethod
+    def delete_all_workspaces(cls, max_workers = None):
         """Delete All Workspaces"""
         AppLogger.log_step("Deleting workspaces and their associated connections")
-        for workspace in FabricRestApi.list_workspaces():
-            AppLogger.log_substep(f"Deleting workspace {workspace.display_name} [{workspace.id}]")
-            FabricRestApi.delete_workspace(workspace.id)
+        workspace_ids = [ workspace.id for workspace in FabricRestApi.list_workspaces() ]
+        summary = FabricRestApi.delete_workspaces(workspace_ids, max_workers)
+        for resource_type, results in summary.items():
+            AppLogger.log_substep(
+                f"Deleted {len(results['deleted'])} {resource_type}, {len(results['failed'])} failed")
+            for resource_id, error in results['failed'].items():
+                AppLogger.log_error(f"Could not delete {resource_type[:-1]} [{resource_id}] - {error}")
+        return summary
 
     @classmethod
-    def delete_all_connections(cls):
+    def delete_all_connections(cls, max_workers = 1):
         """Delete All Connections"""
         AppLogger.log_step("Deleting connections")
-        for connection in FabricRestApi.list_connections():
+
+        def delete_connection(connection):
             display_name = connection.display_name if connection.display_name else connection.id
             AppLogger.log_substep(f"Deleting {display_name}")
             FabricRestApi.delete_connection(connection.id)
 
+        return cls._delete_resources(FabricRestApi.list_connections(),
+                                     delete_connection,
+                                     lambda connection: connection.id,
+                                     max_workers)
+
     @classmethod
-    def delete_all_github_repos(cls):
+    def delete_all_github_repos(cls, max_workers = 1):
         """"Delete All GitHub Repos"""
         AppLogger.log_step("Deleting Demo GitHub Repos")
- 
-        repos = GitHubRestApi.get_github_repositories()
-        for repo in repos:
+
+        def delete_repo(repo):
             AppLogger.log_substep(f"Deleting {repo['name']}")
             GitHubRestApi.delete_github_repository(repo['name'])
 
+        return cls._delete_resources(GitHubRestApi.get_github_repositories(),
+                                     delete_repo,
+                                     lambda repo: repo['name'],
+                                     max_workers)
+
     @classmethod 
-    def delete_all_ado_projects(cls):
+    def delete_all_ado_projects(cls, max_workers = 1):
         """Delete All Azure DevOps Projects"""
         AppLogger.log_step("Deleting Demo Azure DevOps projects")
- 
-        projects = AdoProjectManager.get_projects()
-        for project in projects:
+
+        def delete_project(project):
+            AppLogger.log_substep(f"Deleting {project['name']}")
             AdoProjectManager.delete_project(project['id'])
 
+        return cls._delete_resources(AdoProjectManager.get_projects(),
+                                     delete_project,
+                                     lambda project: project['id'],
+                                     max_workers)
+
     @classmethod
-    def cleanup_dev_environment(cls):
+    def cleanup_dev_environment(cls, run_concurrently = False):
         """Clean Up Dev Environment"""
         AppLogger.log_job("Cleanup dev environment")
-        cls.delete_all_deployment_pipelines()
-        cls.delete_all_workspaces()
-        cls.delete_all_connections()
-        cls.delete_all_github_repos()
-        cls.delete_all_ado_projects()
+
+        if not run_concurrently:
+            # one delete at a time, as before concurrent mode existed
+            summary = {
+                'deployment_pipelines': cls.delete_all_deployment_pipelines(),
+                'workspaces': cls.delete_all_workspaces(max_workers=1),
+                'connections': cls.delete_all_connections(),
+                'github_repos': cls.delete_all_github_repos(),
+                'ado_projects': cls.delete_all_ado_projects()
+            }
+            AppLogger.log_job_ended("Cleanup of dev environment complete")
+            return summary
+
+        fabric_workers = cls.CLEANUP_MAX_WORKERS['fabric']
+
+        def cleanup_fabric():
+            # pipeline stages are unassigned before workspaces are deleted and
+            # connections left behind by workspace cascade deletes are removed last
+            return {
+                'deployment_pipelines': cls.delete_all_deployment_pipelines(fabric_workers),
+                'workspaces': cls.delete_all_workspaces(fabric_workers),
+                'connections': cls.delete_all_connections(fabric_workers)
+            }
+
+        def run_cleanup(phase, cleanup, *args):
+            # steps of each phase are nested in a span of the cleanup job which closes with the phase
+            with AppLogger.span(f'Cleanup {phase}', 'cleanup'):
+                return cleanup(*args)
+
+        # Fabric, GitHub and Azure DevOps cleanup do not depend on each other
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            fabric_cleanup = executor.submit(context.copy().run, run_cleanup, 'fabric', cleanup_fabric)
+            github_cleanup = executor.submit(context.copy().run, run_cleanup, 'github_repos',
+                                             cls.delete_all_github_repos, cls.CLEANUP_MAX_WORKERS['github'])
+            ado_cleanup = executor.submit(context.copy().run, run_cleanup, 'ado_projects',
+                                          cls.delete_all_ado_projects, cls.CLEANUP_MAX_WORKERS['ado'])
+
+            summary = {}
+            for phase, cleanup in (('fabric', fabric_cleanup),
+                                   ('github_repos', github_cleanup),
+                                   ('ado_projects', ado_cleanup)):
+                try:
+                    result = cleanup.result()
+                except Exception as e:
+                    AppLogger.log_error(f"Cleanup of {phase} failed - {e}")
+                    result = { 'deleted': [], 'failed': { phase: str(e) } }
+                if phase == 'fabric':
+                    summary.update(result)
+                else:
+                    summary[phase] = result
+
         AppLogger.log_job_ended("Cleanup of dev environment complete")
+        return summary
 
     #endregion
     
\ No newline at end of file
@@ -36,3 +36,18 @@ class EnvironmentSettings:
     PERSONAL_ACCESS_TOKEN_GITHUB = os.getenv('PERSONAL_ACCESS_TOKEN_GITHUB')
 
     FABRIC_NONTRIAL_CAPACITY_ID = os.getenv('FABRIC_NONTRIAL_CAPACITY_ID')
+
+    # set by pipelines and workflows of projects created from ProjectWorkflowFiles templates
+    ADO_PROJECT_NAME = os.getenv('ADO_PROJECT_NAME')
+    GITHUB_REPOSITORY_NAME = os.getenv('GITHUB_REPOSITORY_NAME')
+
+    WORKSPACE_ID_DEV = os.getenv("WORKSPACE_ID_DEV")
+    WORKSPACE_ID_TEST = os.getenv("WORKSPACE_ID_TEST")
+    WORKSPACE_ID_PROD = os.getenv("WORKSPACE_ID_PROD")
+
+    WORKSPACE_ID_DEV_STAGING = os.getenv("WORKSPACE_ID_DEV_STAGING")
+    WORKSPACE_ID_TEST_STAGING = os.getenv("WORKSPACE_ID_TEST_STAGING")
+    WORKSPACE_ID_PROD_STAGING = os.getenv("WORKSPACE_ID_PROD_STAGING")
+    WORKSPACE_ID_DEV_PRESENTATION = os.getenv("WORKSPACE_ID_DEV_PRESENTATION")
+    WORKSPACE_ID_TEST_PRESENTATION = os.getenv("WORKSPACE_ID_TEST_PRESENTATION")
+    WORKSPACE_ID_PROD_PRESENTATION = os.getenv("WORKSPACE_ID_PROD_PRESENTATION")
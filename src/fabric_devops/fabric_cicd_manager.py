@@ -1,28 +1,46 @@
-
 import os
+import threading
 import time
 from pathlib import Path
-from azure.identity import ClientSecretCredential
 from .app_logger import AppLogger
-from fabric_cicd import FabricWorkspace, deploy_with_config, append_feature_flag, change_log_level
-from .fabric_rest_api import FabricRestApi
-
-# change_log_level()
-
-append_feature_flag("enable_experimental_features")
-append_feature_flag("enable_config_deploy")
-append_feature_flag("enable_shortcut_publish")
-append_feature_flag("enable_lakehouse_unpublish")
+from .fabric_rest_api import FabricRestApi, PowerBiRestApi
+from .token_provider import CachedTokenCredential
 
 class FabricCicdManager:
     """fabric-cicd Library Wrapper Class"""
 
-    # Create a credential
-    credential = ClientSecretCredential(
-        tenant_id=os.getenv('AZURE_TENANT_ID'),
-        client_id=os.getenv('AZURE_CLIENT_ID'),
-        client_secret=os.getenv('AZURE_CLIENT_SECRET')
-    )
+    # share cached tokens with the other REST API wrapper classes
+    credential = CachedTokenCredential()
+
+    # fabric-cicd feature flags which are turned on before the first deployment
+    FEATURE_FLAGS = [
+        "enable_experimental_features",
+        "enable_config_deploy",
+        "enable_shortcut_publish",
+        "enable_lakehouse_unpublish"
+    ]
+
+    _fabric_cicd = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_fabric_cicd(cls):
+        """Import fabric-cicd and turn on feature flags on first use"""
+        if cls._fabric_cicd is None:
+            with cls._lock:
+                if cls._fabric_cicd is None:
+                    import fabric_cicd
+                    # fabric_cicd.change_log_level()
+                    for feature_flag in cls.FEATURE_FLAGS:
+                        fabric_cicd.append_feature_flag(feature_flag)
+                    # fabric-cicd rejects non-Microsoft hosts in its own environment variables, so API roots
+                    # overridden for this package (e.g. a local mock server) are assigned to its constants
+                    if os.getenv('FABRIC_API_BASE_URL'):
+                        fabric_cicd.constants.FABRIC_API_ROOT_URL = FabricRestApi.FABRIC_API_BASE_URL.rstrip('/')
+                    if os.getenv('POWERBI_API_BASE_URL'):
+                        fabric_cicd.constants.DEFAULT_API_ROOT_URL = PowerBiRestApi.POWERBI_API_BASE_URL.rstrip('/')
+                    cls._fabric_cicd = fabric_cicd
+        return cls._fabric_cicd
 
     @classmethod
     def deploy(cls, solution_folder: str, deploy_target: str = "dev", workspace_id: str = None):
@@ -47,7 +65,7 @@ class FabricCicdManager:
             }
         }
 
-        deploy_with_config(
+        cls._get_fabric_cicd().deploy_with_config(
             config_file_path=config_file_path,
             environment=environment,
             config_override=config_override,
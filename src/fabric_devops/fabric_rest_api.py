@@ -1,29 +1,41 @@
 """Fabric REST API Wrapper Class"""
 
 import base64
+import contextvars
 import json
 from json.decoder import JSONDecodeError
 import os
+import re
+import threading
 import time
-import requests
-from azure.identity import DefaultAzureCredential
-from microsoft_fabric_api import FabricClient
+from concurrent.futures import ThreadPoolExecutor
 
 from .app_logger import AppLogger
+from .bulk_export_writer import BulkExportWriter
+from .bulk_import_batcher import BulkImportBatcher
 from .environment_settings import EnvironmentSettings
+from .http_metrics import HttpMetrics, HttpMetricsPolicy
+from .http_session_pool import HttpSessionPool
+from .lookup_cache import IndexedCache
+from .lro_poller import LroPoller
+from .token_provider import TokenProvider, CachedTokenCredential
 
 class FabricRestApi:
     """Fabric REST API Wrapper Class"""
     
     #region class-level fields
 
-    # used for creating DefaultAzureCredential connections with SPN creds
+    # used for creating connections with SPN creds
     AZURE_TENANT_ID = os.getenv('AZURE_TENANT_ID')
     AZURE_CLIENT_ID = os.getenv('AZURE_CLIENT_ID')
     AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET')
     
-    credential = DefaultAzureCredential()
-    fabric_client = FabricClient(credential)
+    # root URL of Fabric REST API which can point to a local mock server for offline benchmarks
+    FABRIC_API_BASE_URL = os.getenv('FABRIC_API_BASE_URL', 'https://api.fabric.microsoft.com').rstrip('/') + '/'
+    FABRIC_API_V1_URL = FABRIC_API_BASE_URL + 'v1/'
+
+    # tokens are served from the process-wide TokenProvider cache
+    credential = CachedTokenCredential()
 
     ADMIN_USER_ID = os.getenv('ADMIN_USER_ID') 
     DEVELOPERS_GROUP_ID = os.getenv('DEVELOPERS_GROUP_ID')
@@ -34,6 +46,79 @@ class FabricRestApi:
     
     ADO_ORGANIZATION = os.getenv('ADO_ORGANIZATION')
 
+    # deadline for on-demand notebook and pipeline jobs
+    JOB_TIMEOUT_SECONDS = float(os.getenv('JOB_TIMEOUT_SECONDS', '7200'))
+
+    # capacity override for workspaces created in the current thread or task context
+    _default_capacity_id = contextvars.ContextVar('default_capacity_id', default=None)
+
+    # upper bound for concurrent deletes in delete_workspaces
+    DELETE_MAX_WORKERS = int(os.getenv('FABRIC_DELETE_MAX_WORKERS', '8'))
+
+    # name-indexed caches used by get_*_by_name lookups
+    _workspace_cache = IndexedCache(lambda: FabricRestApi.list_workspaces(),
+                                    lambda workspace: workspace.display_name)
+    _connection_cache = IndexedCache(lambda: FabricRestApi.list_connections(),
+                                     lambda connection: connection.display_name)
+    _deployment_pipeline_cache = IndexedCache(lambda: FabricRestApi.list_deployment_pipelines(),
+                                              lambda pipeline: pipeline.display_name)
+    _item_caches = {}
+    _item_caches_lock = threading.Lock()
+
+    # SDK client is created on first use so importing this module stays cheap
+    _fabric_client = None
+    _fabric_client_lock = threading.Lock()
+
+    #endregion
+
+    #region fabric client functions
+
+    @classmethod
+    def get_fabric_client(cls):
+        """Get Fabric SDK client shared by all calls, creating it on first use"""
+        if cls._fabric_client is None:
+            with cls._fabric_client_lock:
+                if cls._fabric_client is None:
+                    from microsoft_fabric_api import FabricClient
+                    # every attempt made by the SDK is recorded in HttpMetrics
+                    cls._fabric_client = FabricClient(cls.credential,
+                                                      base_url=cls.FABRIC_API_BASE_URL,
+                                                      per_retry_policies=[HttpMetricsPolicy()] + \
+                                                          TokenProvider.get_pipeline_policies(cls.FABRIC_API_BASE_URL))
+        return cls._fabric_client
+
+    #endregion
+
+    #region lookup cache functions
+
+    @classmethod
+    def _get_item_cache(cls, workspace_id):
+        """Get name-indexed cache of all items in workspace"""
+        with cls._item_caches_lock:
+            item_cache = cls._item_caches.get(workspace_id)
+            if item_cache is None:
+                item_cache = IndexedCache(lambda: cls.list_workspace_items(workspace_id),
+                                          lambda item: (item.display_name, item.type))
+                cls._item_caches[workspace_id] = item_cache
+            return item_cache
+
+    @classmethod
+    def _invalidate_item_cache(cls, workspace_id = None):
+        """Discard cached items for workspace or for all workspaces when workspace_id is None"""
+        with cls._item_caches_lock:
+            if workspace_id is None:
+                cls._item_caches.clear()
+            else:
+                cls._item_caches.pop(workspace_id, None)
+
+    @classmethod
+    def clear_lookup_caches(cls):
+        """Discard all cached workspaces, items, connections and deployment pipelines"""
+        cls._workspace_cache.invalidate()
+        cls._connection_cache.invalidate()
+        cls._deployment_pipeline_cache.invalidate()
+        cls._invalidate_item_cache()
+
     #endregion
     
     #region capacity functions
@@ -41,7 +126,7 @@ class FabricRestApi:
     @classmethod
     def list_capacities(cls):
         """list capacities accessible to caller"""
-        return cls.fabric_client.core.capacities.list_capacities()
+        return cls.get_fabric_client().core.capacities.list_capacities()
 
     @classmethod
     def display_capacities(cls):
@@ -55,10 +140,21 @@ class FabricRestApi:
 
     #region workspace functions
 
+    @classmethod
+    def get_default_capacity_id(cls):
+        """Get capacity used for new workspaces when no capacity id is passed"""
+        capacity_id = cls._default_capacity_id.get()
+        return capacity_id if capacity_id is not None else cls.FABRIC_CAPACITY_ID
+
+    @classmethod
+    def set_default_capacity_id_for_thread(cls, capacity_id):
+        """Set capacity for workspaces created on the current thread, None restores FABRIC_CAPACITY_ID"""
+        cls._default_capacity_id.set(capacity_id)
+
     @classmethod
     def list_workspaces(cls):
         """list workspaces accessible to caller"""
-        return cls.fabric_client.core.workspaces.list_workspaces()
+        return cls.get_fabric_client().core.workspaces.list_workspaces()
 
     @classmethod
     def display_workspaces(cls):
@@ -71,22 +167,18 @@ class FabricRestApi:
     @classmethod
     def get_workspace_info(cls, workspace_id):
         """Get Workspace information by ID"""
-        return cls.fabric_client.core.workspaces.get_workspace(workspace_id)
+        return cls.get_fabric_client().core.workspaces.get_workspace(workspace_id)
 
     @classmethod
-    def get_workspace_by_name(cls, display_name):
+    def get_workspace_by_name(cls, display_name, force_refresh = False):
         """Get Workspace item by display name"""
-        workspaces = cls.list_workspaces()
-        for workspace in workspaces:
-            if workspace.display_name == display_name:
-                return workspace
-        return None
+        return cls._workspace_cache.get(display_name, force_refresh)
     
     @classmethod
     def get_workspace_info_by_name(cls, display_name):
         """Get Workspace information by ID"""
         workspace = cls.get_workspace_by_name(display_name)        
-        return cls.fabric_client.core.workspaces.get_workspace(workspace.id)
+        return cls.get_fabric_client().core.workspaces.get_workspace(workspace.id)
 
     @classmethod
     def create_workspace(cls, display_name, capacity_id = None, reuse_existing_workspace = False):
@@ -94,7 +186,7 @@ class FabricRestApi:
         AppLogger.log_step(f'Creating workspace [{display_name}]')
 
         if capacity_id is None:
-            capacity_id = cls.FABRIC_CAPACITY_ID
+            capacity_id = cls.get_default_capacity_id()
 
         existing_workspace = cls.get_workspace_by_name(display_name)
         if existing_workspace is not None:
@@ -110,12 +202,13 @@ class FabricRestApi:
             "capacity_id": capacity_id
         }
 
-        workspace = cls.fabric_client.core.workspaces.create_workspace(
+        workspace = cls.get_fabric_client().core.workspaces.create_workspace(
             create_workspace_request=create_request
         )
         
         workspace_id = workspace.id
         AppLogger.log_substep(f'Workspace created with Id of [{workspace_id}]')
+        cls._workspace_cache.put(workspace)
         
         # add workspace role assignment for admin user
         AppLogger.log_substep('Adding workspace role assignment for admin user')
@@ -146,7 +239,7 @@ class FabricRestApi:
             'description': description
         }
                     
-        cls.fabric_client.core.workspaces.update_workspace(
+        cls.get_fabric_client().core.workspaces.update_workspace(
             workspace_id=workspace_id, 
             update_workspace_request=update_request
         )
@@ -163,7 +256,7 @@ class FabricRestApi:
             }            
         }
 
-        cls.fabric_client.core.workspaces.add_workspace_role_assignment(        
+        cls.get_fabric_client().core.workspaces.add_workspace_role_assignment(        
             workspace_id=workspace_id,
             workspace_role_assignment_request=add_role_request
         )
@@ -180,7 +273,7 @@ class FabricRestApi:
             }            
         }
 
-        cls.fabric_client.core.workspaces.add_workspace_role_assignment(        
+        cls.get_fabric_client().core.workspaces.add_workspace_role_assignment(        
             workspace_id=workspace_id,
             workspace_role_assignment_request=add_role_request
         )
@@ -197,7 +290,7 @@ class FabricRestApi:
             }            
         }
 
-        cls.fabric_client.core.workspaces.add_workspace_role_assignment(        
+        cls.get_fabric_client().core.workspaces.add_workspace_role_assignment(        
             workspace_id=workspace_id,
             workspace_role_assignment_request=add_role_request
         )
@@ -205,7 +298,7 @@ class FabricRestApi:
     @classmethod
     def provision_workspace_identity(cls, workspace_id, workspace_role = 'Admin'):
         """Provision Workspace Identity"""        
-        workspace_identity = cls.fabric_client.core.workspaces.provision_identity(workspace_id=workspace_id)        
+        workspace_identity = cls.get_fabric_client().core.workspaces.provision_identity(workspace_id=workspace_id)        
         service_principal_id = workspace_identity.service_principal_id
         cls.add_workspace_role_assignment_for_spn(workspace_id, service_principal_id, workspace_role)
 
@@ -218,20 +311,87 @@ class FabricRestApi:
     @classmethod
     def deprovision_workspace_identity(cls, workspace_id):
         """Deprovision Workspace Identity"""        
-        cls.fabric_client.core.workspaces.deprovision_identity(workspace_id=workspace_id)        
+        cls.get_fabric_client().core.workspaces.deprovision_identity(workspace_id=workspace_id)        
+
+    @classmethod
+    def _get_workspace_connection_map(cls, workspace_ids, connections):
+        """Map each workspace id to the connections with that id in their display name"""
+        workspace_ids = { workspace_id.lower(): workspace_id for workspace_id in workspace_ids }
+        connection_map = { workspace_id: [] for workspace_id in workspace_ids.values() }
+        guid_pattern = re.compile(r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}')
+        for connection in connections:
+            if connection.display_name is None:
+                continue
+            for guid in set(guid_pattern.findall(connection.display_name)):
+                workspace_id = workspace_ids.get(guid.lower())
+                if workspace_id is not None:
+                    connection_map[workspace_id].append(connection)
+        return connection_map
 
     @classmethod
     def delete_workspace(cls, workspace_id):
         """Delete Workspace"""
 
-        # cascade delete workspace-specific connections        
-        connections = cls.list_connections()
-        for connection in connections:
-            if (connection.display_name is not None) and (workspace_id in connection.display_name):
-                cls.delete_connection(connection.id)
+        # cascade delete workspace-specific connections, including ones created since the cache was filled
+        connections = cls._connection_cache.values(force_refresh=True)
+        connection_map = cls._get_workspace_connection_map([workspace_id], connections)
+        for connection in connection_map[workspace_id]:
+            cls.delete_connection(connection.id)
         
         # delete workspace
-        cls.fabric_client.core.workspaces.delete_workspace(workspace_id)
+        cls.get_fabric_client().core.workspaces.delete_workspace(workspace_id)
+        cls._workspace_cache.remove(workspace_id)
+        cls._invalidate_item_cache(workspace_id)
+
+    @classmethod
+    def delete_workspaces(cls, workspace_ids, max_workers = None):
+        """Delete workspaces and their connections concurrently and return per-resource results"""
+        if max_workers is None:
+            max_workers = cls.DELETE_MAX_WORKERS
+
+        workspace_ids = list(workspace_ids)
+        summary = {
+            'workspaces': { 'deleted': [], 'failed': {} },
+            'connections': { 'deleted': [], 'failed': {} }
+        }
+        if len(workspace_ids) == 0:
+            return summary
+
+        # list connections once for the whole batch
+        connections = cls._connection_cache.values(force_refresh=True)
+        connection_map = cls._get_workspace_connection_map(workspace_ids, connections)
+        summary_lock = threading.Lock()
+
+        def record(resource_type, resource_id, error = None):
+            with summary_lock:
+                if error is None:
+                    summary[resource_type]['deleted'].append(resource_id)
+                else:
+                    summary[resource_type]['failed'][resource_id] = str(error)
+
+        def delete_workspace_with_connections(workspace_id):
+            with AppLogger.span(f'Delete workspace [{workspace_id}]', 'delete'):
+                for connection in connection_map[workspace_id]:
+                    try:
+                        cls.delete_connection(connection.id)
+                        record('connections', connection.id)
+                    except Exception as ex:
+                        record('connections', connection.id, ex)
+                try:
+                    cls.get_fabric_client().core.workspaces.delete_workspace(workspace_id)
+                    cls._workspace_cache.remove(workspace_id)
+                    cls._invalidate_item_cache(workspace_id)
+                    record('workspaces', workspace_id)
+                except Exception as ex:
+                    record('workspaces', workspace_id, ex)
+
+        # worker threads see the same context variables as the caller
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda workspace_id: context.copy().run(delete_workspace_with_connections, workspace_id),
+                              workspace_ids))
+
+        return summary
 
     #endregion
     
@@ -240,21 +400,17 @@ class FabricRestApi:
     @classmethod
     def get_gatewys(cls):
         """Get Gateways"""
-        return cls.fabric_client.core.gateways.list_gateways()
+        return cls.get_fabric_client().core.gateways.list_gateways()
 
     @classmethod
     def list_connections(cls):
         """List all connections accessible to caller"""
-        return cls.fabric_client.core.connections.list_connections()
+        return cls.get_fabric_client().core.connections.list_connections()
 
     @classmethod
-    def get_connection_by_name(cls, display_name):
+    def get_connection_by_name(cls, display_name, force_refresh = False):
         """Get Connection By Name"""
-        connections = cls.list_connections()
-        for connection in connections:
-            if connection.display_name == display_name:
-                return connection
-        return None
+        return cls._connection_cache.get(display_name, force_refresh)
 
     @classmethod
     def display_connections(cls):
@@ -267,12 +423,12 @@ class FabricRestApi:
     @classmethod
     def list_supported_connection_types(cls):
         """list all connection types supported by Fabric"""
-        return cls.fabric_client.core.connections.list_supported_connection_types()
+        return cls.get_fabric_client().core.connections.list_supported_connection_types()
 
     @classmethod
     def get_connection_type_metadata(cls, type_name):
         """list all connection types supported by Fabric"""
-        supported_types = cls.fabric_client.core.connections.list_supported_connection_types()
+        supported_types = cls.get_fabric_client().core.connections.list_supported_connection_types()
         for conn_type in supported_types:
             if conn_type.type == type_name:
                 return conn_type
@@ -298,17 +454,17 @@ class FabricRestApi:
         """ Create new connection"""
         AppLogger.log_substep(f"Creating connection {create_connection_request['displayName']} ...")
 
-        existing_connections = cls.list_connections()
-        for connection in existing_connections:
-            if connection.display_name is not None and connection.display_name  == create_connection_request['displayName']:
-                AppLogger.log_substep(f"Using existing Connection with id [{connection.id}]")
-                return connection
+        connection = cls.get_connection_by_name(create_connection_request['displayName'])
+        if connection is not None:
+            AppLogger.log_substep(f"Using existing Connection with id [{connection.id}]")
+            return connection
 
-        connection = cls.fabric_client.core.connections.create_connection(
+        connection = cls.get_fabric_client().core.connections.create_connection(
             create_connection_request=create_connection_request
         )
 
         AppLogger.log_substep(f"Connection created with id [{connection.id}]")
+        cls._connection_cache.put(connection)
 
         # add admin user as co-owner of connection
         cls.add_connection_role_assignment_for_user(
@@ -322,7 +478,8 @@ class FabricRestApi:
     @classmethod
     def delete_connection(cls, connection_id):
         """delete connections"""
-        cls.fabric_client.core.connections.delete_connection(connection_id)
+        cls.get_fabric_client().core.connections.delete_connection(connection_id)
+        cls._connection_cache.remove(connection_id)
 
     @classmethod
     def add_connection_role_assignment_for_user(cls, connection_id, admin_user_id, connection_role):
@@ -336,7 +493,7 @@ class FabricRestApi:
             'role': connection_role
         }
         
-        return cls.fabric_client.core.connections.add_connection_role_assignment(
+        return cls.get_fabric_client().core.connections.add_connection_role_assignment(
             connection_id=connection_id,
             add_connection_role_assignment_request=assignment_request
         )
@@ -503,7 +660,7 @@ class FabricRestApi:
     @classmethod
     def list_folders(cls, workspace_id):
         """List Folder"""
-        return cls.fabric_client.core.folders.list_folders(workspace_id=workspace_id)
+        return cls.get_fabric_client().core.folders.list_folders(workspace_id=workspace_id)
 
     @classmethod
     def create_folder(cls, workspace_id, folder_name, paremt_folder_id = None):
@@ -516,7 +673,7 @@ class FabricRestApi:
             'parentFolderId': paremt_folder_id
          }
 
-        folder = cls.fabric_client.core.folders.create_folder(workspace_id, create_request)
+        folder = cls.get_fabric_client().core.folders.create_folder(workspace_id, create_request)
         AppLogger.log_substep(f"folder created with Id [{folder.id}]")
         
         return folder
@@ -528,16 +685,15 @@ class FabricRestApi:
     @classmethod
     def list_workspace_items(cls, workspace_id, item_type = None):
         """Get items in workspace"""
-        return cls.fabric_client.core.items.list_items(workspace_id, type=item_type)
+        return cls.get_fabric_client().core.items.list_items(workspace_id, type=item_type)
 
     @classmethod
-    def get_item_by_name(cls, workspace_id, display_name, item_type):
+    def get_item_by_name(cls, workspace_id, display_name, item_type, force_refresh = False):
         """Get Item by Name"""
-        items = cls.list_workspace_items(workspace_id, item_type)
-        for item in items:
-            if item.display_name == display_name:
-                return item
-        return None
+        item_cache = cls._get_item_cache(workspace_id)
+        if item_type is None:
+            return item_cache.find(lambda item: item.display_name == display_name, force_refresh)
+        return item_cache.get((display_name, item_type), force_refresh)
 
     @classmethod
     def create_item_no_sdk(cls, workspace_id, create_item_request, folder_id = None):
@@ -550,6 +706,7 @@ class FabricRestApi:
         endpoint = f'workspaces/{workspace_id}/items'
         item = cls._execute_post_request(endpoint, create_item_request)
         AppLogger.log_substep(f"{item['type']} created with id [{item['id']}]")
+        cls._invalidate_item_cache(workspace_id)
         return item
 
     @classmethod
@@ -562,8 +719,9 @@ class FabricRestApi:
         if folder_id is not None:
             create_item_request['folderId'] = folder_id
         
-        item = cls.fabric_client.core.items.create_item(workspace_id, create_item_request)
+        item = cls.get_fabric_client().core.items.create_item(workspace_id, create_item_request)
         AppLogger.log_substep(f"{item.type} created with id [{item.id}]")
+        cls._get_item_cache(workspace_id).put(item)
 
         return item
 
@@ -571,12 +729,12 @@ class FabricRestApi:
     def get_item_definition(cls, workspace_id, item, export_format = None):
         """Get Item Definition"""
         # no ability to pass format parameter
-        return cls.fabric_client.core.items.get_item_definition(workspace_id, item.id)
+        return cls.get_fabric_client().core.items.get_item_definition(workspace_id, item.id)
 
     @classmethod
     def update_item_definition(cls, workspace_id, item, update_item_definition_request):
         """Update Item Definition using update-item--definition-request"""
-        return cls.fabric_client.core.items.update_item_definition(
+        return cls.get_fabric_client().core.items.update_item_definition(
             workspace_id,
             item.id,
             update_item_definition_request
@@ -606,7 +764,7 @@ class FabricRestApi:
             }
         }
         
-        cls.fabric_client.variablelibrary.items.update_variable_library(
+        cls.get_fabric_client().variablelibrary.items.update_variable_library(
             workspace_id=workspace_id,
             variable_library_id=library.id,
             update_variable_library_request=update_request
@@ -652,7 +810,7 @@ class FabricRestApi:
     def get_lakehouse(cls, workspace_id, lakehouse_id):
         """Get lakehouse properties"""
         rest_url = f'workspaces/{workspace_id}/lakehouses/{lakehouse_id}'
-        return cls.fabric_client.lakehouse.items.get_lakehouse(
+        return cls.get_fabric_client().lakehouse.items.get_lakehouse(
             workspace_id=workspace_id,
             lakehouse_id=lakehouse_id
         )
@@ -661,11 +819,13 @@ class FabricRestApi:
     def get_sql_endpoint_for_lakehouse(cls, workspace_id, lakehouse):
         """Get SQL endpoint properties for lakehouse"""
 
+        start_time = time.monotonic()
         lakehouse = cls.get_lakehouse(workspace_id, lakehouse.id)
         while lakehouse.properties.sql_endpoint_properties.provisioning_status != 'Success':
             wait_time = 10
             time.sleep(wait_time)
             lakehouse = cls.get_lakehouse(workspace_id, lakehouse.id)
+        HttpMetrics.record_wait('sql_endpoint_provisioning', time.monotonic() - start_time)
 
         server = lakehouse.properties.sql_endpoint_properties.connection_string
         database = lakehouse.properties.sql_endpoint_properties.id
@@ -679,7 +839,7 @@ class FabricRestApi:
     def refresh_sql_endpoint_metadata(cls, workspace_id, sql_endpoint_id):
         """Refresh SL Endpoint"""
         AppLogger.log_substep("Updating SQL Endpoint metadata...")
-        cls.fabric_client.sqlendpoint.items.refresh_sql_endpoint_metadata(
+        cls.get_fabric_client().sqlendpoint.items.refresh_sql_endpoint_metadata(
                         workspace_id=workspace_id,
                         sql_endpoint_id=sql_endpoint_id,
                         sql_endpoint_refresh_metadata_request={}
@@ -690,7 +850,7 @@ class FabricRestApi:
     @classmethod
     def list_shortcuts(cls, workspace_id, lakehouse_id):
         """List Shortcuts"""
-        return cls.fabric_client.core.one_lake_shortcuts.list_shortcuts(workspace_id, lakehouse_id)
+        return cls.get_fabric_client().core.one_lake_shortcuts.list_shortcuts(workspace_id, lakehouse_id)
 
     @classmethod
     def create_onelake_shortcut(cls, 
@@ -714,7 +874,7 @@ class FabricRestApi:
             }
         }
         
-        cls.fabric_client.core.one_lake_shortcuts.create_shortcut(
+        cls.get_fabric_client().core.one_lake_shortcuts.create_shortcut(
             workspace_id, 
             target_lakehouse_id,
             create_request
@@ -726,7 +886,7 @@ class FabricRestApi:
     def reset_shortcut_cache(cls, workspace_id):
         """Reset Shortcut Cache"""
         AppLogger.log_substep("Resetting shortcut cache...")
-        reset_operartion = cls.fabric_client.core.one_lake_shortcuts.begin_reset_shortcut_cache(workspace_id)
+        reset_operartion = cls.get_fabric_client().core.one_lake_shortcuts.begin_reset_shortcut_cache(workspace_id)
         reset_operartion.wait()
         AppLogger.log_substep("Shortcut cache reset successfully")
        
@@ -746,7 +906,7 @@ class FabricRestApi:
                 }
             }
         }
-        cls.fabric_client.core.one_lake_shortcuts.create_shortcut(
+        cls.get_fabric_client().core.one_lake_shortcuts.create_shortcut(
             workspace_id, 
             lakehouse_id,
             create_request,
@@ -775,7 +935,7 @@ class FabricRestApi:
         """Run notebook and wait for job completion"""
         AppLogger.log_substep(f"Running notebook [{notebook.display_name}]...")
 
-        response = cls.fabric_client.core.job_scheduler.run_on_demand_item_job(
+        response = cls.get_fabric_client().core.job_scheduler.run_on_demand_item_job(
             workspace_id=workspace_id,
             item_id=notebook.id,
             job_type='RunNotebook'            
@@ -790,7 +950,7 @@ class FabricRestApi:
         """Run pipeline and wait for job completion"""
         AppLogger.log_substep(f"Running data pipeline [{pipeline.display_name}]...")
         
-        response = cls.fabric_client.core.job_scheduler.run_on_demand_item_job(
+        response = cls.get_fabric_client().core.job_scheduler.run_on_demand_item_job(
             workspace_id=workspace_id,
             item_id=pipeline.id,
             job_type='Pipeline'
@@ -876,73 +1036,75 @@ class FabricRestApi:
     @classmethod
     def export_item_definitions(cls, workspace_name, save_to_file = True):
         """Export Item Definitions"""
-        workspace_id = cls.get_workspace_by_name(workspace_name).id
-        endpoint = f"workspaces/{workspace_id}/items/bulkExportDefinitions?beta=true"
+        workspace = cls.get_workspace_by_name(workspace_name)
+        endpoint = f"workspaces/{workspace.id}/items/bulkExportDefinitions?beta=true"
         post_body    = {
             'mode': 'All'
         }
-        export = cls._execute_post_request(endpoint, post_body)
-        
+
         if save_to_file:
-            cls._save_export_as_file(export, workspace_id)
-                    
-        return export
-    
+            # parts are written as they arrive so the response is never held in memory
+            return cls._save_export_stream_as_files(endpoint, post_body, workspace.display_name)
+
+        return cls._execute_post_request(endpoint, post_body)
+
     @classmethod
-    def _save_export_as_file(cls, export, workspace_id):
-        """Save export as file"""
-        
-        workspace = cls.get_workspace_info(workspace_id)
- 
-        #file_path = file_path.replace('/', '\\')
-        folder_path = f".//exports//BulkExportApi//{workspace.display_name}"
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-
-        path_export_file = f'{folder_path}/export.json'
-        os.makedirs(os.path.dirname(path_export_file), exist_ok=True)
-        with open(path_export_file, 'w', encoding='utf-8') as file:
-            file.write(json.dumps(export, indent=4))
-
-        item_definition_folder_path = f'{folder_path}/item_definitions/'
-        path_index_file = f'{item_definition_folder_path}/item_index.json'
-        os.makedirs(os.path.dirname(path_index_file), exist_ok=True)
+    def _save_export_stream_as_files(cls, endpoint, post_body, workspace_name):
+        """Stream export to export.json and item definition files and return export without definition parts"""
+
+        folder_path = f".//exports//BulkExportApi//{workspace_name}"
+        item_definition_folder_path = f'{folder_path}//item_definitions'
+
+        AppLogger.log_step("Saving item definition files from export")
+        response = cls._execute_post_request_streamed(endpoint, post_body)
+        writer = BulkExportWriter(item_definition_folder_path)
+        export = writer.write_response(response, raw_response_file=f'{folder_path}//export.json')
+
+        path_index_file = f'{item_definition_folder_path}//item_index.json'
         with open(path_index_file, 'w', encoding='utf-8') as file:
             index_file_content = {
-                "itemDefinitionsIndex": export['itemDefinitionsIndex']
+                "itemDefinitionsIndex": export.get('itemDefinitionsIndex', [])
             }
             file.write(json.dumps(index_file_content, indent=4))
-        
-        AppLogger.log_step("Saving item definition files from export")
-        definition_part_list = export['definitionParts']
-        for definition_part in definition_part_list:
-            part_file_path = f'{item_definition_folder_path}{definition_part["path"]}'
-            part_file_content = definition_part['payload']
-            cls._write_file_to_exports_folder(
-                part_file_path,
-                part_file_content,
-                convert_from_base64 = True
-            )
-        
+
+        AppLogger.log_substep(f"Saved {writer.part_count} parts ({writer.bytes_written:,} bytes)")
+        return export
+
     @classmethod
     def _write_file_to_exports_folder(cls, file_path , file_content, convert_from_base64 = True):
-        """Write file to exports folder"""    
+        """Write file to exports folder"""
         if convert_from_base64:
-            file_content_bytes = base64.b64decode(file_content)
-            file_content = file_content_bytes.decode('utf-8')
-        
-        if not os.path.exists(file_path):
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # decoded payloads are written as bytes so binary parts such as images stay intact
+            file_content = base64.b64decode(file_content)
+        else:
+            file_content = file_content.encode('utf-8')
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        with open(file_path, 'wb') as file:
+            file.write(file_content)
 
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write(file_content)    
-    
     @classmethod
-    def import_item_definitions(cls, workspace_name, import_request):
-        """Import Item Definitions"""
-        workspace_id = cls.get_workspace_by_name(workspace_name).id
+    def import_item_definitions(cls, workspace_id, import_request, max_batch_bytes = None, max_parallel_batches = None):
+        """Import Item Definitions in one request, or in size-bounded batches by dependency tier"""
         endpoint = f"workspaces/{workspace_id}/items/bulkImportDefinitions?beta=true"
-        return cls._execute_post_request(endpoint, import_request)
+        if max_parallel_batches is None:
+            max_parallel_batches = BulkImportBatcher.MAX_PARALLEL_BATCHES
+
+        tiers = BulkImportBatcher.get_batch_tiers(import_request, max_batch_bytes)
+        batch_count = sum(len(batches) for batches in tiers)
+        AppLogger.log_substep(f"Importing item definitions in {batch_count} batches across {len(tiers)} tiers")
+
+        cls._invalidate_item_cache(workspace_id)
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel_batches)) as executor:
+            for batches in tiers:
+                # items of the next tier may depend on any item of this tier so each tier must finish first
+                futures = [ executor.submit(cls._execute_post_request, endpoint, batch) for batch in batches ]
+                results.extend(future.result() for future in futures)
+        cls._invalidate_item_cache(workspace_id)
+
+        return BulkImportBatcher.merge_results(results)
     
     #endregion
     
@@ -951,26 +1113,23 @@ class FabricRestApi:
     @classmethod
     def list_deployment_pipelines(cls):
         """Get all deployment pipelines accessible to caller"""
-        return cls.fabric_client.core.deployment_pipelines.list_deployment_pipelines()
+        return cls.get_fabric_client().core.deployment_pipelines.list_deployment_pipelines()
 
     @classmethod
-    def get_deployment_pipeline_by_name(cls, display_name):
+    def get_deployment_pipeline_by_name(cls, display_name, force_refresh = False):
         """Get Deployment Pipeline item by display name"""
-        pipelines = cls.list_deployment_pipelines()
-        for pipeline in pipelines:
-            if pipeline.display_name == display_name:
-                return pipeline
-        return None
+        return cls._deployment_pipeline_cache.get(display_name, force_refresh)
 
     @classmethod
     def list_deployment_pipeline_stages(cls, pipeline_id):
         """List all deployment pipeline stages"""
-        return cls.fabric_client.core.deployment_pipelines.list_deployment_pipeline_stages(pipeline_id)
+        return cls.get_fabric_client().core.deployment_pipelines.list_deployment_pipeline_stages(pipeline_id)
 
     @classmethod
     def delete_deployment_pipeline(cls, pipeline_id):
         """Delete Deployment Pipeline"""
-        cls.fabric_client.core.deployment_pipelines.delete_deployment_pipeline(pipeline_id)
+        cls.get_fabric_client().core.deployment_pipelines.delete_deployment_pipeline(pipeline_id)
+        cls._deployment_pipeline_cache.remove(pipeline_id)
 
     @classmethod
     def display_deployment_pipelines(cls):
@@ -997,9 +1156,10 @@ class FabricRestApi:
             'stages': pipeline_stages
         }
         
-        pipeline = cls.fabric_client.core.deployment_pipelines.create_deployment_pipeline(create_request)
+        pipeline = cls.get_fabric_client().core.deployment_pipelines.create_deployment_pipeline(create_request)
         
         AppLogger.log_substep(f"Pipeline create with id [{pipeline.id}]")
+        cls._deployment_pipeline_cache.put(pipeline)
 
         AppLogger.log_substep('Adding deployment pipeline role of [Admin] for admin user')
         cls.add_deployment_pipeline_role_assignment(pipeline.id,
@@ -1019,7 +1179,7 @@ class FabricRestApi:
             },
             'role': role
         }
-        return cls.fabric_client.core.deployment_pipelines.add_deployment_pipeline_role_assignment(
+        return cls.get_fabric_client().core.deployment_pipelines.add_deployment_pipeline_role_assignment(
             pipeline_id, 
             add_request
         )
@@ -1028,7 +1188,7 @@ class FabricRestApi:
     def assign_workpace_to_pipeline_stage(cls, workspace_id, pipeline_id, stage_id):
         """Assign workspace to pipeline stage """
         assign_request = { 'workspaceId': workspace_id }
-        cls.fabric_client.core.deployment_pipelines.assign_workspace_to_stage(
+        cls.get_fabric_client().core.deployment_pipelines.assign_workspace_to_stage(
             pipeline_id,
             stage_id,
             assign_request
@@ -1037,7 +1197,7 @@ class FabricRestApi:
     @classmethod
     def unassign_workpace_from_pipeline_stage(cls, pipeline_id, stage_id):
         """Assign workspace to pipeline stage"""
-        cls.fabric_client.core.deployment_pipelines.unassign_workspace_from_stage(
+        cls.get_fabric_client().core.deployment_pipelines.unassign_workspace_from_stage(
             pipeline_id,
             stage_id
         )
@@ -1055,10 +1215,11 @@ class FabricRestApi:
             deploy_request['note'] = 'Demo of automating deployment using APIs'
 
         AppLogger.log_substep('Calling deploy_stage_content')
-        cls.fabric_client.core.deployment_pipelines.deploy_stage_content(
+        cls.get_fabric_client().core.deployment_pipelines.deploy_stage_content(
             pipeline_id,
             deploy_request
         )
+        cls._invalidate_item_cache()
         
 
     @classmethod
@@ -1075,12 +1236,14 @@ class FabricRestApi:
             deploy_request['note'] = 'Demo of automating deployment using APIs'
 
         AppLogger.log_substep('Calling deploy_stage_content')
-        # cls.fabric_client.core.deployment_pipelines.deploy_stage_content(
+        # cls.get_fabric_client().core.deployment_pipelines.deploy_stage_content(
         #     pipeline_id,
         #     deploy_request
         # )
         
         cls._execute_post_request(endpoint, deploy_request)
+        # target stage workspace is not known here
+        cls._invalidate_item_cache()
     
     #endregion
     
@@ -1089,7 +1252,7 @@ class FabricRestApi:
     @classmethod
     def initialize_git_connection(cls, workspace_id, initialize_connection_request):
         """Initialize GIT Connection"""
-        return cls.fabric_client.core.git.initialize_connection(
+        return cls.get_fabric_client().core.git.initialize_connection(
             workspace_id=workspace_id,
             git_initialize_connection_request=initialize_connection_request            
         )
@@ -1097,17 +1260,17 @@ class FabricRestApi:
     @classmethod
     def get_git_status(cls, workspace_id):
         """Get GIT Connection Status"""
-        return cls.fabric_client.core.git.get_status(workspace_id=workspace_id)
+        return cls.get_fabric_client().core.git.get_status(workspace_id=workspace_id)
 
     @classmethod
     def get_git_connection(cls, workspace_id):
         """Get GIT Connection"""
-        return cls.fabric_client.core.git.get_connection(workspace_id=workspace_id)
+        return cls.get_fabric_client().core.git.get_connection(workspace_id=workspace_id)
 
     @classmethod
     def disconnect_workspace_from_git(cls, workspace_id):
         """Disconnect Workspace from GIT Repository"""
-        return cls.fabric_client.core.git.disconnect(workspace_id)
+        return cls.get_fabric_client().core.git.disconnect(workspace_id)
 
     @classmethod
     def commit_workspace_to_git(cls, workspace_id, commit_to_git_request = None, commit_message = "commit workspace changes back to repo"):
@@ -1128,28 +1291,43 @@ class FabricRestApi:
                     'comment': commit_message
             }
             
-        cls.fabric_client.core.git.commit_to_git(
+        cls.get_fabric_client().core.git.commit_to_git(
             workspace_id, 
             commit_to_git_request)
         
         AppLogger.log_substep('GIT sync process completed successfully')
 
     @classmethod
-    def update_workspace_from_git(cls, workspace_id, update_from_git_request):
+    def update_workspace_from_git(cls, workspace_id, update_from_git_request = None):
         """Update Workspace from GIT Repository"""
         AppLogger.log_substep("Committing GIT repsitory content to workspace items")
-        return cls.fabric_client.core.git.update_from_git(workspace_id, update_from_git_request)
+
+        # by default remote changes win over changes made in the workspace
+        if update_from_git_request is None:
+            git_status = cls.get_git_status(workspace_id)
+            update_from_git_request = {
+                "workspaceHead": git_status.workspace_head,
+                "remoteCommitHash": git_status.remote_commit_hash,
+                "conflictResolution": {
+                    "conflictResolutionType": "Workspace",
+                    "conflictResolutionPolicy": "PreferRemote"
+                },
+                "options": { "allowOverrideItems": True }
+            }
+
+        cls._invalidate_item_cache(workspace_id)
+        return cls.get_fabric_client().core.git.update_from_git(workspace_id, update_from_git_request)
 
     @classmethod
     def get_my_git_credentials(cls, workspace_id):
         """Get My GIT Credential"""
-        return cls.fabric_client.core.git.get_my_git_credentials(workspace_id)
+        return cls.get_fabric_client().core.git.get_my_git_credentials(workspace_id)
 
     @classmethod
     def update_my_git_credentials(cls, workspace_id, update_git_credentials_request):
         """Update My GIT Credentials"""
         endpoint = f"workspaces/{workspace_id}/git/myGitCredentials"
-        return cls.fabric_client.core.git.update_my_git_credentials(
+        return cls.get_fabric_client().core.git.update_my_git_credentials(
             workspace_id,
             update_git_credentials_request
         )    
@@ -1225,7 +1403,7 @@ class FabricRestApi:
             }
         }
 
-        return cls.fabric_client.core.git.connect(workspace_id, connect_request)
+        return cls.get_fabric_client().core.git.connect(workspace_id, connect_request)
 
     @classmethod
     def connect_workspace_to_ado_repo(cls, workspace, project_name, branch = 'main', git_folder = '/workspace'):
@@ -1346,7 +1524,7 @@ class FabricRestApi:
             }
         }
         
-        return cls.fabric_client.core.git.connect(workspace_id, connect_request)
+        return cls.get_fabric_client().core.git.connect(workspace_id, connect_request)
 
     @classmethod
     def connect_workspace_to_github_repo(cls, workspace, repo_name, branch = 'main'):
@@ -1422,6 +1600,35 @@ class FabricRestApi:
         AppLogger.log_substep("Data pipeline run job completed successfully")
         return response
 
+    @classmethod
+    def start_item_job(cls, workspace_id, item_id, job_type, post_body = ''):
+        """Submit on-demand item job without waiting and return job instance URL and Retry-After hint"""
+        rest_url = cls.FABRIC_API_V1_URL + \
+                   f'workspaces/{workspace_id}/items/{item_id}/jobs/instances?jobType={job_type}'
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
+        request_headers = {'Content-Type':'application/json',
+                           'Authorization': f'Bearer {access_token}'}
+        response = HttpSessionPool.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
+        if response.status_code != 202:
+            AppLogger.log_error(
+                f'Error executing POST request: {response.status_code} - {response.text}')
+            raise RuntimeError(f'On-demand job could not be started: {response.status_code}')
+        return response.headers.get('Location'), LroPoller.get_retry_after(response)
+
+    @classmethod
+    def get_item_job_instance(cls, job_instance_url):
+        """Get job instance state and Retry-After hint, returning None state on transient errors"""
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
+        request_headers = {'Content-Type':'application/json',
+                           'Authorization': f'Bearer {access_token}'}
+        response = HttpSessionPool.get(url=job_instance_url, headers=request_headers, timeout=60)
+        if response.status_code == 429 or response.status_code >= 500:
+            return None, LroPoller.get_retry_after(response)
+        if response.status_code not in { 200, 201, 202 }:
+            raise RuntimeError(
+                f'Error polling job instance: {response.status_code} - {response.text}')
+        return response.json(), LroPoller.get_retry_after(response)
+
     @classmethod
     def refresh_sql_endpoint_metadata_no_sdk(cls, workspace_id, sql_endpoint_id):
         """Refresh SL Endpoint"""
@@ -1431,15 +1638,14 @@ class FabricRestApi:
         cls._execute_post_request(endpoint, {})        
 
     @classmethod
-    def _execute_post_request(cls, endpoint, post_body=''):
+    def _execute_post_request(cls, endpoint, post_body='', lro_timeout = None):
         """Execute POST request with support for Long-running Operations (LRO)"""
-        rest_url = 'https://api.fabric.microsoft.com/v1/' + endpoint        
-        fabric_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-        access_token = cls.credential.get_token(fabric_rest_api_scope).token
+        rest_url = cls.FABRIC_API_V1_URL + endpoint        
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
         request_headers = {'Content-Type':'application/json',
                              'Authorization': f'Bearer {access_token}'}
 
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
         if response.status_code in { 200, 201, 204 }:
             try:
@@ -1448,23 +1654,18 @@ class FabricRestApi:
                 return None
 
         if response.status_code == 202:
-            operation_state_url = response.headers.get('Location')
-            wait_time = 10 # int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            response = requests.get(url=operation_state_url, headers=request_headers, timeout=60)
-            operation_state = response.json()
-            while operation_state['status'] != 'Succeeded' and \
-                    operation_state['status'] != 'Failed':
-                time.sleep(wait_time)
-                response = requests.get(url=operation_state_url,
-                                        headers=request_headers,
-                                        timeout=60)
-                operation_state = response.json()
+            operation = LroPoller.poll(
+                response.headers.get('Location'),
+                request_headers,
+                initial_response=response,
+                timeout=lro_timeout)
+            response = operation.response
+            operation_state = operation.operation_state
 
             if operation_state['status'] == 'Succeeded':
                 if 'Location' in response.headers:
                     operation_result_url = response.headers.get('Location')
-                    response = requests.get(url=operation_result_url,
+                    response = HttpSessionPool.get(url=operation_result_url,
                                             headers=request_headers,
                                             timeout=60)
                     if response.status_code == 200:
@@ -1477,16 +1678,11 @@ class FabricRestApi:
             else:
                 AppLogger.log_error(f"Error - {operation_state}")
 
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_post_request(endpoint, post_body)
-     
         elif response.status_code == 404: # handle NOT FOUND error
             AppLogger.log_substep("Handling 404 by waiting and trying again")
             print( response.content )
             time.sleep(10)
-            response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+            response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
             
             if response.status_code in { 200, 201, 204 }:
                 AppLogger.log_substep("POST call succeeded on second attempt")
@@ -1505,52 +1701,89 @@ class FabricRestApi:
                 f'Error executing POST request: {response.status_code} - {response.text}')
             raise RuntimeError(f'Error executing POST request: {response.status_code} - {response.text}')
 
+    @classmethod
+    def _execute_post_request_streamed(cls, endpoint, post_body='', lro_timeout = None):
+        """Execute POST request with LRO support and return result response with body not yet read"""
+        rest_url = cls.FABRIC_API_V1_URL + endpoint
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
+        request_headers = {'Content-Type':'application/json',
+                             'Authorization': f'Bearer {access_token}'}
+
+        response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers,
+                                        timeout=60, stream=True)
+
+        if response.status_code == 202:
+            response.close()
+            operation = LroPoller.poll(
+                response.headers.get('Location'),
+                request_headers,
+                initial_response=response,
+                timeout=lro_timeout)
+            operation_state = operation.operation_state
+            if operation_state['status'] != 'Succeeded' or 'Location' not in operation.response.headers:
+                AppLogger.log_error(f"Error - {operation_state}")
+                raise RuntimeError(f"Error - {operation_state}")
+            response = HttpSessionPool.get(url=operation.response.headers.get('Location'),
+                                           headers=request_headers,
+                                           timeout=60,
+                                           stream=True)
+
+        if response.status_code != 200:
+            message = f'Error executing POST request: {response.status_code} - {response.text}'
+            response.close()
+            AppLogger.log_error(message)
+            raise RuntimeError(message)
+
+        return response
+
     @classmethod
     def _execute_patch_request(cls, endpoint, post_body):
         """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = 'https://api.fabric.microsoft.com/v1/' + endpoint        
-        fabric_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-        access_token = cls.credential.get_token(fabric_rest_api_scope).token
+        rest_url = cls.FABRIC_API_V1_URL + endpoint        
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
         request_headers = {'Content-Type':'application/json',
                            'Authorization': f'Bearer {access_token}'}
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
         if response.status_code in {200, 204}:
             return response.json()
 
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_patch_request(endpoint, post_body)
-        else:
-            AppLogger.log_error(
-                f'Error executing PATCH request: {response.status_code} - {response.text}')
-            return None
+        AppLogger.log_error(
+            f'Error executing PATCH request: {response.status_code} - {response.text}')
+        return None
+
+    @classmethod
+    def _is_job_instance_complete(cls, job_instance):
+        """Check whether on-demand job instance has stopped running"""
+        status = job_instance['status']
+        if status in { 'NotStarted', 'InProgress' }:
+            return False
+        # job scheduler reports this transient failure while it retries the job
+        failure_reason = job_instance.get('failureReason') or {}
+        if status == 'Failed' and failure_reason.get('errorCode') == 'RequestExecutionFailed':
+            return False
+        return True
 
     @classmethod
-    def _execute_post_request_for_job_scheduler(cls, endpoint, post_body=''):
+    def _execute_post_request_for_job_scheduler(cls, endpoint, post_body='', job_timeout = None):
         """Execute POST request with support for Om-demand Job with Job Scheduler"""
-        rest_url = 'https://api.fabric.microsoft.com/v1/' + endpoint        
-        fabric_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-        access_token = cls.credential.get_token(fabric_rest_api_scope).token
+        rest_url = cls.FABRIC_API_V1_URL + endpoint        
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
         request_headers = {'Content-Type':'application/json',
                              'Authorization': f'Bearer {access_token}'}
-        response = requests.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
 
         if response.status_code == 202:
-            operation_state_url = response.headers.get('Location')
-            wait_time = 10 # int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            response = requests.get(url=operation_state_url, headers=request_headers, timeout=60)
-            operation_state = response.json()
-            while operation_state['status'] == 'NotStarted' or \
-                    operation_state['status'] == 'InProgress' or \
-                    (operation_state['status'] == 'Failed' and \
-                     operation_state['failureReason']['errorCode'] == 'RequestExecutionFailed'    ):
-                time.sleep(wait_time)
-                response = requests.get(url=operation_state_url,
-                                        headers=request_headers,
-                                        timeout=60)
-                operation_state = response.json()
+            if job_timeout is None:
+                job_timeout = cls.JOB_TIMEOUT_SECONDS
+            operation = LroPoller.poll(
+                response.headers.get('Location'),
+                request_headers,
+                cls._is_job_instance_complete,
+                initial_response=response,
+                timeout=job_timeout,
+                wait_category='job')
+            response = operation.response
+            operation_state = operation.operation_state
 
             if operation_state['status'] == 'Completed':
                 return
@@ -1570,10 +1803,6 @@ class FabricRestApi:
             if operation_state['status'] == 'Deduped':
                 AppLogger.log_error('On-demand job was depuped')
 
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            cls._execute_post_request_for_job_scheduler(endpoint, post_body)
         else:
             AppLogger.log_error(
                 f'Error executing POST request: {response.status_code} - {response.text}')
@@ -1583,33 +1812,30 @@ class FabricRestApi:
 class PowerBiRestApi:
     """Power BI REST API Wrapper Class used for operations not yet supported by Fabric REST API"""
 
-    # used for creating DefaultAzureCredential connections with SPN creds
+    # used for creating connections with SPN creds
     AZURE_TENANT_ID = os.getenv('AZURE_TENANT_ID')
     AZURE_CLIENT_ID = os.getenv('AZURE_CLIENT_ID')
     AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET')
     
-    credential = DefaultAzureCredential()
-    fabric_client = FabricClient(credential)
+    # root URL of Power BI REST API which can point to a local mock server for offline benchmarks
+    POWERBI_API_BASE_URL = os.getenv('POWERBI_API_BASE_URL', 'https://api.powerbi.com').rstrip('/') + '/'
+
+    # tokens are served from the process-wide TokenProvider cache
+    credential = CachedTokenCredential()
     
     powerbi_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-    powerbi_rest_api_base_url = 'https://api.powerbi.com/v1.0/myorg/'
+    powerbi_rest_api_base_url = POWERBI_API_BASE_URL + 'v1.0/myorg/'
     
     @classmethod
     def _execute_get_request_to_powerbi(cls, endpoint):
         """Execute GET Request on Power BI REST API Endpoint"""
         rest_url = cls.powerbi_rest_api_base_url + endpoint
-        scope = cls.powerbi_rest_api_scope
-        access_token = cls.credential.get_token(scope).token
+        access_token = TokenProvider.get_access_token(cls.powerbi_rest_api_scope)
         request_headers = {'Content-Type':'application/json',
                              'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code in { 200, 202 }:
             return response.json()
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            AppLogger.log_substep(f'Waiting {wait_time} seconds due to 429 TOO MANY REQUESTS error')
-            time.sleep(wait_time)
-            return cls._execute_get_request_to_powerbi(endpoint)
         else:
             AppLogger.log_error(
                 f'Error executing GET request: {response.status_code} - {response.text}')
@@ -1618,11 +1844,10 @@ class PowerBiRestApi:
     @classmethod
     def _execute_post_request_to_powerbi(cls, endpoint, post_body=''):
         rest_url = cls.powerbi_rest_api_base_url + endpoint
-        scope = cls.powerbi_rest_api_scope
-        access_token = cls.credential.get_token(scope).token
+        access_token = TokenProvider.get_access_token(cls.powerbi_rest_api_scope)
         request_headers = {'Content-Type':'application/json',
                              'Authorization': f'Bearer {access_token}'}
-        response = requests.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
         return response
 
     @classmethod
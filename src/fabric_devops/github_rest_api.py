@@ -6,12 +6,11 @@ import os
 import json
 from json.decoder import JSONDecodeError
 
-from nacl import encoding, public
-import requests
-
 from .app_logger import AppLogger
 from .environment_settings import EnvironmentSettings
+from .http_session_pool import HttpSessionPool
 from .item_definition_factory import ItemDefinitionFactory
+from .lro_poller import LroPoller
 
 class GitHubRestApi:
     """Wrapper class for calling GitHub REST APIs"""
@@ -19,7 +18,8 @@ class GitHubRestApi:
     ACCESS_TOKEN = EnvironmentSettings.PERSONAL_ACCESS_TOKEN_GITHUB
 
     ORGANIZATION_GITHUB = EnvironmentSettings.ORGANIZATION_GITHUB
-    BASE_URL = 'https://api.github.com/'
+    # GitHub REST API root, which can be pointed at a local mock server
+    BASE_URL = os.getenv('GITHUB_API_BASE_URL', 'https://api.github.com').rstrip('/') + '/'
 
 #region Low-level details about authentication and HTTP requests and responses
 
@@ -29,7 +29,7 @@ class GitHubRestApi:
         rest_url = cls.BASE_URL + endpoint
         request_headers = {'Content-Type':'application/json',
                            'Authorization': f'token {cls.ACCESS_TOKEN}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 404: # NOT FOUND error
@@ -46,7 +46,7 @@ class GitHubRestApi:
         rest_url = cls.BASE_URL + endpoint
         request_headers = {'Content-Type': content_type,
                            'Authorization': f'token {cls.ACCESS_TOKEN}'}           
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
         if response.status_code in { 200, 201 }:
             try:
@@ -60,23 +60,17 @@ class GitHubRestApi:
 
         if response.status_code == 202:
             AppLogger.log_step("Got back 202 ACCEPTED from POST Request")
-            operation_state_url = response.headers.get('Location')
-            wait_time = 10 # int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            response = requests.get(url=operation_state_url, headers=request_headers, timeout=60)
-            operation_state = response.json()
-            while operation_state['status'] != 'Succeeded' and \
-                  operation_state['status'] != 'Failed':
-                time.sleep(wait_time)
-                response = requests.get(url=operation_state_url,
-                                        headers=request_headers,
-                                        timeout=60)
-                operation_state = response.json()
+            operation = LroPoller.poll(
+                response.headers.get('Location'),
+                request_headers,
+                initial_response=response)
+            response = operation.response
+            operation_state = operation.operation_state
 
             if operation_state['status'] == 'Succeeded':
                 if 'Location' in response.headers:
                     operation_result_url = response.headers.get('Location')
-                    response = requests.get(url=operation_result_url,
+                    response = HttpSessionPool.get(url=operation_result_url,
                                             headers=request_headers,
                                             timeout=60)
                     if response.status_code == 200:
@@ -89,10 +83,6 @@ class GitHubRestApi:
             else:
                 AppLogger.log_error(f"Error - {operation_state}")
 
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_post_request(endpoint, post_body)
         else:
             AppLogger.log_error(
                 f'Error executing POST request: {response.status_code} - {response.text}')
@@ -106,7 +96,7 @@ class GitHubRestApi:
             'Content-Type': content_type,
             'Authorization': f'token {cls.ACCESS_TOKEN}'
         }           
-        response = requests.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
         if response.status_code in { 200, 201 }:
             try:
@@ -126,7 +116,7 @@ class GitHubRestApi:
         rest_url = cls.BASE_URL + endpoint
         request_headers = {'Content-Type':'application/vnd.github+json',
                            'Authorization': f'token {cls.ACCESS_TOKEN}'}           
-        response = requests.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
         if response.status_code in { 200, 201 }:
             try:
@@ -143,18 +133,13 @@ class GitHubRestApi:
         rest_url = cls.BASE_URL + endpoint
         request_headers = {'Content-Type':'application/json',
                            'Authorization': f'token {cls.ACCESS_TOKEN}'}
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+        response = HttpSessionPool.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
         if response.status_code == 200:
             return response.json()
 
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_patch_request(endpoint, post_body)
-        else:
-            AppLogger.log_error(
-                f'Error executing PATCH request: {response.status_code} - {response.text}')
-            return None
+        AppLogger.log_error(
+            f'Error executing PATCH request: {response.status_code} - {response.text}')
+        return None
 
     @classmethod
     def _execute_delete_request(cls, endpoint):
@@ -163,18 +148,12 @@ class GitHubRestApi:
         request_headers = {'Content-Type':'application/json',
                            'Authorization': f'token {cls.ACCESS_TOKEN}'}
 
-        response = requests.delete(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.delete(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code in { 200, 204 }:
             return None
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            cls._execute_delete_request(endpoint)
-            return None
-        else:
-            AppLogger.log_error(
-                f'Error executing DELETE request: {response.status_code} - {response.text}')
-            return None
+        AppLogger.log_error(
+            f'Error executing DELETE request: {response.status_code} - {response.text}')
+        return None
 
 #endregion
 
@@ -505,6 +484,16 @@ class GitHubRestApi:
         endpoint = f"/orgs/{cls.ORGANIZATION_GITHUB}/actions/secrets/public-key"
         return cls._execute_get_request(endpoint)
 
+    @classmethod
+    def _encrypt_secret(cls, public_key_value, secret_value):
+        """Encrypt secret value with sealed box for public key of GitHub organization or repository"""
+        # PyNaCl is only needed when secrets are written
+        from nacl import encoding, public
+        public_key = public.PublicKey(public_key_value.encode("utf-8"), encoding.Base64Encoder())
+        sealed_box = public.SealedBox(public_key)
+        encrypted = sealed_box.encrypt(secret_value.encode("utf-8"))
+        return base64.b64encode(encrypted).decode("utf-8")
+
     @classmethod
     def create_organization_secret(cls, repo_name, secret_name, secret_value):
         """Create repository secret"""
@@ -512,10 +501,7 @@ class GitHubRestApi:
         public_key_result = cls._get_org_public_key()
         public_key_id = public_key_result['key_id']
         public_key_value = public_key_result['key']        
-        public_key = public.PublicKey(public_key_value.encode("utf-8"), encoding.Base64Encoder())
-        sealed_box = public.SealedBox(public_key)
-        encrypted = sealed_box.encrypt(secret_value.encode("utf-8"))
-        base64_encrypted = base64.b64encode(encrypted).decode("utf-8")
+        base64_encrypted = cls._encrypt_secret(public_key_value, secret_value)
 
         endpoint = f"/orgs/{cls.ORGANIZATION_GITHUB}/actions/secrets/{secret_name}"
         body = {
@@ -542,10 +528,7 @@ class GitHubRestApi:
         public_key_result = cls._get_repo_public_key(repo_name)
         public_key_id = public_key_result['key_id']
         public_key_value = public_key_result['key']        
-        public_key = public.PublicKey(public_key_value.encode("utf-8"), encoding.Base64Encoder())
-        sealed_box = public.SealedBox(public_key)
-        encrypted = sealed_box.encrypt(secret_value.encode("utf-8"))
-        base64_encrypted = base64.b64encode(encrypted).decode("utf-8")
+        base64_encrypted = cls._encrypt_secret(public_key_value, secret_value)
 
         endpoint = f"/repos/{cls.ORGANIZATION_GITHUB}/{repo_name}/actions/secrets/{secret_name}"
         body = {
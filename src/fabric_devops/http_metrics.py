@@ -0,0 +1,251 @@
+"""Process-wide HTTP request metrics with Prometheus and JSON export"""
+
+import atexit
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from azure.core.pipeline.policies import HTTPPolicy
+
+from .app_logger import AppLogger
+from .rate_limiter import RateLimiter
+
+class _EndpointStats:
+    """Counters and latency histogram for one templated endpoint"""
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.status_codes = {}
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        # one counter per latency bucket plus overflow, made cumulative on export
+        self.bucket_counts = [0] * (bucket_count + 1)
+
+class HttpMetrics:
+    """Records request counts, latency histograms, status codes, throttling and wait time per templated endpoint"""
+
+    # upper bounds in seconds of latency histogram buckets
+    LATENCY_BUCKETS = [ 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0 ]
+
+    # folder which receives http_metrics.prom and http_metrics.json when the process exits
+    EXPORT_FOLDER = os.getenv('HTTP_METRICS_FOLDER')
+
+    METRIC_PREFIX = 'fabric_devops'
+
+    _ID_SEGMENT = re.compile(
+        r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$')
+
+    _endpoints = {}
+    _waits = {}
+    _started_at = time.time()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_endpoint_template(cls, url):
+        """Get host and path of url with ids replaced by {id} so calls to the same endpoint share metrics"""
+        parsed_url = urlparse(url)
+        # Power BI URLs are built with doubled slashes which the service ignores
+        path = re.sub(r'/+', '/', parsed_url.path)
+        segments = [ '{id}' if cls._ID_SEGMENT.match(segment) else segment
+                     for segment in path.split('/') ]
+        return parsed_url.netloc.lower(), '/'.join(segments)
+
+    @classmethod
+    def _get_endpoint_stats(cls, method, url):
+        """Get stats for method and templated url, creating them on first use (caller holds lock)"""
+        host, path = cls.get_endpoint_template(url)
+        key = (method.upper(), host, path)
+        stats = cls._endpoints.get(key)
+        if stats is None:
+            stats = _EndpointStats(len(cls.LATENCY_BUCKETS))
+            cls._endpoints[key] = stats
+        return stats
+
+    @classmethod
+    def record_request(cls, method, url, status_code, elapsed, attempt = 0):
+        """Record one HTTP attempt with its status code and latency in seconds"""
+        with cls._lock:
+            stats = cls._get_endpoint_stats(method, url)
+            stats.count += 1
+            status = str(status_code) if status_code is not None else 'error'
+            stats.status_codes[status] = stats.status_codes.get(status, 0) + 1
+            if status_code is None:
+                stats.errors += 1
+            elif status_code == 429:
+                stats.throttled += 1
+            if attempt > 0:
+                stats.retries += 1
+            stats.latency_sum += elapsed
+            stats.latency_max = max(stats.latency_max, elapsed)
+            stats.bucket_counts[bisect.bisect_left(cls.LATENCY_BUCKETS, elapsed)] += 1
+
+    @classmethod
+    def record_wait(cls, category, wait_time):
+        """Record time spent waiting on long-running operations, jobs or provisioning"""
+        with cls._lock:
+            wait = cls._waits.setdefault(category, { 'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0 })
+            wait['count'] += 1
+            wait['total_seconds'] += wait_time
+            wait['max_seconds'] = max(wait['max_seconds'], wait_time)
+
+    @classmethod
+    def get_metrics(cls):
+        """Get snapshot of all recorded metrics as a JSON-serializable dictionary"""
+        with cls._lock:
+            endpoints = []
+            for (method, host, path), stats in sorted(cls._endpoints.items()):
+                cumulative_count = 0
+                buckets = {}
+                for upper_bound, bucket_count in zip(cls.LATENCY_BUCKETS + [ '+Inf' ], stats.bucket_counts):
+                    cumulative_count += bucket_count
+                    buckets[str(upper_bound)] = cumulative_count
+                endpoints.append({
+                    'method': method,
+                    'host': host,
+                    'endpoint': path,
+                    'requests': stats.count,
+                    'status_codes': dict(stats.status_codes),
+                    'retries': stats.retries,
+                    'throttled': stats.throttled,
+                    'errors': stats.errors,
+                    'latency_seconds': {
+                        'sum': round(stats.latency_sum, 6),
+                        'max': round(stats.latency_max, 6),
+                        'mean': round(stats.latency_sum / stats.count, 6) if stats.count > 0 else 0.0,
+                        'buckets': buckets
+                    }
+                })
+            waits = { category: { 'count': wait['count'],
+                                  'total_seconds': round(wait['total_seconds'], 3),
+                                  'max_seconds': round(wait['max_seconds'], 3) }
+                      for category, wait in sorted(cls._waits.items()) }
+
+        return {
+            'started_at': datetime.fromtimestamp(cls._started_at, timezone.utc).isoformat(),
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'endpoints': endpoints,
+            'waits': waits,
+            'rate_limiter': RateLimiter.get_metrics()
+        }
+
+    @classmethod
+    def _format_labels(cls, labels):
+        """Format Prometheus label set with escaped values"""
+        formatted = []
+        for name, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            formatted.append(f'{name}="{value}"')
+        return '{' + ','.join(formatted) + '}'
+
+    @classmethod
+    def to_prometheus(cls, metrics = None):
+        """Render metrics in Prometheus text exposition format"""
+        if metrics is None:
+            metrics = cls.get_metrics()
+        prefix = cls.METRIC_PREFIX
+        lines = []
+
+        def add_metric(name, metric_type, description, samples):
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for suffix, labels, value in samples:
+                lines.append(f'{prefix}_{name}{suffix}{cls._format_labels(labels)} {value}')
+
+        endpoints = metrics['endpoints']
+        add_metric('http_requests_total', 'counter', 'HTTP requests by endpoint and status code', [
+            ('', { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'], 'status': status }, count)
+            for e in endpoints for status, count in sorted(e['status_codes'].items()) ])
+
+        latency_samples = []
+        for e in endpoints:
+            labels = { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'] }
+            for upper_bound, count in e['latency_seconds']['buckets'].items():
+                latency_samples.append(('_bucket', { **labels, 'le': upper_bound }, count))
+            latency_samples.append(('_sum', labels, e['latency_seconds']['sum']))
+            latency_samples.append(('_count', labels, e['requests']))
+        add_metric('http_request_duration_seconds', 'histogram', 'HTTP request latency', latency_samples)
+
+        add_metric('http_retries_total', 'counter', 'HTTP requests sent again after a failed attempt', [
+            ('', { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'] }, e['retries'])
+            for e in endpoints ])
+        add_metric('http_throttled_total', 'counter', 'HTTP 429 responses', [
+            ('', { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'] }, e['throttled'])
+            for e in endpoints ])
+
+        waits = metrics['waits']
+        add_metric('wait_seconds_total', 'counter', 'Time spent waiting on operations and jobs', [
+            ('', { 'category': category }, wait['total_seconds']) for category, wait in waits.items() ])
+        add_metric('waits_total', 'counter', 'Number of waits on operations and jobs', [
+            ('', { 'category': category }, wait['count']) for category, wait in waits.items() ])
+
+        rate_limiter = metrics['rate_limiter']
+        add_metric('rate_limiter_throttled_seconds_total', 'counter',
+                   'Time requests spent queued by the client-side rate limiter', [
+            ('', { 'host': host }, host_metrics['throttled_seconds'])
+            for host, host_metrics in sorted(rate_limiter.items()) ])
+
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def write_files(cls, folder = None):
+        """Write metrics to http_metrics.prom and http_metrics.json in folder"""
+        if folder is None:
+            folder = cls.EXPORT_FOLDER or '.'
+        os.makedirs(folder, exist_ok=True)
+
+        metrics = cls.get_metrics()
+        with open(os.path.join(folder, 'http_metrics.prom'), 'w', encoding='utf-8') as file:
+            file.write(cls.to_prometheus(metrics))
+        with open(os.path.join(folder, 'http_metrics.json'), 'w', encoding='utf-8') as file:
+            file.write(json.dumps(metrics, indent=4))
+
+    @classmethod
+    def log_summary(cls, top = 10):
+        """Log endpoints with the most total latency and all recorded wait time"""
+        metrics = cls.get_metrics()
+        endpoints = sorted(metrics['endpoints'],
+                           key=lambda e: e['latency_seconds']['sum'], reverse=True)[:top]
+        AppLogger.log_table_header('HTTP endpoints by total latency')
+        for e in endpoints:
+            AppLogger.log_table_row(
+                f"{e['latency_seconds']['sum']:.1f}s",
+                f"{e['method']} {e['endpoint']} ({e['requests']} calls, {e['throttled']} throttled)")
+        for category, wait in metrics['waits'].items():
+            AppLogger.log_table_row(f"{wait['total_seconds']:.1f}s", f"waiting on {category} ({wait['count']})")
+
+    @classmethod
+    def reset(cls):
+        """Discard all recorded metrics"""
+        with cls._lock:
+            cls._endpoints.clear()
+            cls._waits.clear()
+            cls._started_at = time.time()
+
+class HttpMetricsPolicy(HTTPPolicy):
+    """Azure Core pipeline policy which records every attempt made by Fabric SDK clients in HttpMetrics"""
+
+    def send(self, request):
+        """Send request and record its status code and latency"""
+        # pipeline context is shared by every retry of the same call
+        attempt = request.context.get('fabric_devops_attempt', 0)
+        request.context['fabric_devops_attempt'] = attempt + 1
+        start_time = time.monotonic()
+        status_code = None
+        try:
+            response = self.next.send(request)
+            status_code = response.http_response.status_code
+            return response
+        finally:
+            HttpMetrics.record_request(request.http_request.method, request.http_request.url,
+                                       status_code, time.monotonic() - start_time, attempt)
+
+if HttpMetrics.EXPORT_FOLDER:
+    atexit.register(HttpMetrics.write_files)
@@ -0,0 +1,124 @@
+"""Shared pool of keep-alive HTTP sessions"""
+
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .http_metrics import HttpMetrics
+from .rate_limiter import RateLimiter
+
+class HttpSessionPool:
+    """Thread-safe, connection-pooled HTTP transport shared by REST API wrapper classes"""
+
+    # default number of pooled connections kept open for each host
+    DEFAULT_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+
+    # per-host overrides for the number of pooled connections
+    POOL_SIZES = {
+        'api.fabric.microsoft.com': int(os.getenv('HTTP_POOL_SIZE_FABRIC', '32')),
+        'api.powerbi.com': int(os.getenv('HTTP_POOL_SIZE_POWERBI', '16'))
+    }
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_host(cls, url):
+        """Get host name used to key sessions"""
+        return urlparse(url).netloc.lower()
+
+    @classmethod
+    def _create_session(cls, host):
+        """Create session with connection pool sized for host"""
+        pool_size = cls.POOL_SIZES.get(host, cls.DEFAULT_POOL_SIZE)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @classmethod
+    def get_session(cls, url):
+        """Get shared session for the host of url, creating it on first use"""
+        host = cls._get_host(url)
+        session = cls._sessions.get(host)
+        if session is not None:
+            return session
+
+        with cls._lock:
+            session = cls._sessions.get(host)
+            if session is None:
+                session = cls._create_session(host)
+                cls._sessions[host] = session
+            return session
+
+    @classmethod
+    def set_pool_size(cls, host, pool_size):
+        """Set connection pool size for host and recycle any existing session"""
+        host = host.lower()
+        with cls._lock:
+            cls.POOL_SIZES[host] = pool_size
+            session = cls._sessions.pop(host, None)
+        if session is not None:
+            session.close()
+
+    @classmethod
+    def close_all(cls):
+        """Close all pooled sessions"""
+        with cls._lock:
+            sessions = list(cls._sessions.values())
+            cls._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    @classmethod
+    def request(cls, method, url, **kwargs):
+        """Execute HTTP request using pooled session for host, retrying after 429 TOO MANY REQUESTS"""
+        host = cls._get_host(url)
+        session = cls.get_session(url)
+        for attempt in range(RateLimiter.MAX_RETRIES + 1):
+            RateLimiter.acquire(host)
+            start_time = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.RequestException:
+                HttpMetrics.record_request(method, url, None, time.monotonic() - start_time, attempt)
+                raise
+            HttpMetrics.record_request(method, url, response.status_code, time.monotonic() - start_time, attempt)
+            if response.status_code != 429:
+                RateLimiter.on_success(host)
+                return response
+            RateLimiter.on_throttled(host, RateLimiter.get_retry_after(response))
+            if attempt < RateLimiter.MAX_RETRIES:
+                response.close()
+        # retries exhausted so caller handles the 429 response
+        return response
+
+    @classmethod
+    def get(cls, url, **kwargs):
+        """Execute GET request using pooled session"""
+        return cls.request('GET', url, **kwargs)
+
+    @classmethod
+    def post(cls, url, **kwargs):
+        """Execute POST request using pooled session"""
+        return cls.request('POST', url, **kwargs)
+
+    @classmethod
+    def patch(cls, url, **kwargs):
+        """Execute PATCH request using pooled session"""
+        return cls.request('PATCH', url, **kwargs)
+
+    @classmethod
+    def put(cls, url, **kwargs):
+        """Execute PUT request using pooled session"""
+        return cls.request('PUT', url, **kwargs)
+
+    @classmethod
+    def delete(cls, url, **kwargs):
+        """Execute DELETE request using pooled session"""
+        return cls.request('DELETE', url, **kwargs)
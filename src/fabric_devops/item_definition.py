@@ -0,0 +1,164 @@
+"""Indexed item definition model with lazily decoded part payloads"""
+
+import base64
+
+from .payload_rewriter import PayloadRewriter
+
+class DefinitionPart:
+    """Item definition part which decodes its payload on first read and encodes it again only when changed"""
+
+    def __init__(self, path, payload = None, payload_type = 'InlineBase64', content = None):
+        self.path = path
+        self.payload_type = payload_type
+        self._payload = payload
+        self._content = content
+        # content has changed since payload was last encoded
+        self._dirty = content is not None
+
+    @classmethod
+    def from_dict(cls, part):
+        """Create part from REST API part dictionary"""
+        return cls(part['path'], part.get('payload'), part.get('payloadType', 'InlineBase64'))
+
+    @property
+    def content(self):
+        """Decoded UTF-8 text of payload"""
+        if self._content is None and self._payload is not None:
+            self._content = base64.b64decode(self._payload).decode('utf-8')
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._dirty = True
+
+    @property
+    def payload(self):
+        """Base64-encoded payload"""
+        if self._dirty:
+            self._payload = base64.b64encode(self._content.encode('utf-8')).decode('utf-8')
+            self._dirty = False
+        return self._payload
+
+    def rewrite(self, literals = None, patterns = None):
+        """Apply search and replace rules to content and return hit counts"""
+        content, hits = PayloadRewriter.get(literals, patterns).rewrite(self.content)
+        if any(count > 0 for count in hits.values()):
+            self.content = content
+        return hits
+
+    def to_dict(self):
+        """Get part as REST API part dictionary"""
+        return {
+            'path': self.path,
+            'payload': self.payload,
+            'payloadType': self.payload_type
+        }
+
+class DefinitionPartSet:
+    """Definition parts indexed by path which keep their original order when updated"""
+
+    # parts which must come after all others, such as notebook-settings.json which Fabric expects last
+    LAST_PART_NAMES = [ 'notebook-settings.json' ]
+
+    def __init__(self, parts = None):
+        self._parts = {}
+        for part in parts or []:
+            self.put(part)
+
+    @classmethod
+    def from_parts(cls, parts):
+        """Create part set from list of REST API part dictionaries"""
+        return cls(DefinitionPart.from_dict(part) for part in parts)
+
+    def __len__(self):
+        return len(self._parts)
+
+    def __contains__(self, path):
+        return path in self._parts
+
+    def __iter__(self):
+        return iter(self.ordered())
+
+    def get(self, path):
+        """Get part by path or None"""
+        return self._parts.get(path)
+
+    def put(self, part: DefinitionPart):
+        """Add part, replacing any part with the same path in place"""
+        self._parts[part.path] = part
+        return part
+
+    def set_content(self, path, content, payload_type = 'InlineBase64'):
+        """Replace content of part, adding part if it does not exist"""
+        part = self._parts.get(path)
+        if part is None:
+            return self.put(DefinitionPart(path, payload_type=payload_type, content=content))
+        part.content = content
+        return part
+
+    def remove(self, path):
+        """Remove part by path and return it or None"""
+        return self._parts.pop(path, None)
+
+    def rewrite(self, path, literals = None, patterns = None):
+        """Apply search and replace rules to part and return hit counts, or None if part does not exist"""
+        part = self._parts.get(path)
+        if part is None:
+            return None
+        return part.rewrite(literals, patterns)
+
+    def ordered(self):
+        """Get parts in original order with parts named in LAST_PART_NAMES moved to the end"""
+        parts = []
+        last_parts = []
+        for part in self._parts.values():
+            name = part.path.rsplit('/', 1)[-1]
+            (last_parts if name in self.LAST_PART_NAMES else parts).append(part)
+        return parts + last_parts
+
+    def to_parts(self):
+        """Get parts as list of REST API part dictionaries"""
+        return [ part.to_dict() for part in self.ordered() ]
+
+class ItemDefinition:
+    """Item display name, type and definition parts which serialize to create and update requests"""
+
+    def __init__(self, display_name = None, item_type = None, parts = None, definition_format = None):
+        self.display_name = display_name
+        self.item_type = item_type
+        self.parts = parts if parts is not None else DefinitionPartSet()
+        self.definition_format = definition_format
+
+    @classmethod
+    def from_definition(cls, definition, display_name = None, item_type = None):
+        """Create item definition from REST API definition dictionary with parts"""
+        return cls(display_name, item_type,
+                   DefinitionPartSet.from_parts(definition.get('parts', [])),
+                   definition.get('format'))
+
+    @classmethod
+    def from_create_request(cls, create_request):
+        """Create item definition from create item request"""
+        return cls.from_definition(create_request.get('definition', {}),
+                                   create_request.get('displayName'),
+                                   create_request.get('type'))
+
+    def to_definition(self):
+        """Get REST API definition dictionary"""
+        definition = { 'parts': self.parts.to_parts() }
+        if self.definition_format is not None:
+            definition['format'] = self.definition_format
+        return definition
+
+    def to_create_request(self):
+        """Get create item request"""
+        return {
+            'displayName': self.display_name,
+            'type': self.item_type,
+            'definition': self.to_definition()
+        }
+
+    def to_update_request(self):
+        """Get update item definition request"""
+        return { 'definition': self.to_definition() }
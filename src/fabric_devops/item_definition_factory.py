@@ -1,17 +1,27 @@
 """A module to create/update/export/import item definitions"""
 
 import base64
+import contextvars
+import hashlib
 import json
 import os
 import shutil
-import re
+from concurrent.futures import ThreadPoolExecutor
 from .app_logger import AppLogger
 from .fabric_rest_api import FabricRestApi
+from .item_definition import ItemDefinition, DefinitionPartSet
+from .template_catalog import TemplateCatalog
 from .variable_library import VariableLibrary
 
 class ItemDefinitionFactory:
     """Logic to to create and update item definitions"""
 
+    # items whose definitions are fetched at the same time during workspace export
+    EXPORT_MAX_WORKERS = int(os.getenv('EXPORT_MAX_WORKERS', '8'))
+
+    # content hashes of exported files used to write only what changed since the last export
+    EXPORT_MANIFEST_FILE_NAME = '.export_manifest.json'
+
     @classmethod
     def _create_inline_base64_part(cls, path, payload):
         """create item definition part with base64 encoding"""
@@ -21,152 +31,59 @@ class ItemDefinitionFactory:
             'payloadType': 'InlineBase64'
         }
 
-    @classmethod
-    def _get_part_path(cls, item_folder_path, file_path):
-        """get path for item definition part"""
-        offset = file_path.find(item_folder_path) + len(item_folder_path) + 1
-        return file_path[offset:].replace('\\', '/')
-
-    @classmethod
-    def _get_part_path_for_import(cls, solution_folder_path, file_path):
-        """get path for item definition part"""
-        offset = file_path.find(solution_folder_path) + len(solution_folder_path) + 1
-        part_path = file_path[offset:].replace('\\', '/')
-        return f'/{part_path}'
-
-    @classmethod
-    def _search_and_replace_in_payload(cls, payload, search_replace_text):
-        payload_bytes = base64.b64decode(payload)
-        payload_content = payload_bytes.decode('utf-8')
-        for entry in search_replace_text.keys():
-            payload_content = payload_content.replace(entry, search_replace_text[entry])
-        return base64.b64encode(payload_content.encode('utf-8')).decode('utf-8')
-
-    @classmethod
-    def _search_and_replace_in_payload_with_regex(cls, payload, search_replace_terms):
-        payload_bytes = base64.b64decode(payload)
-        payload_content = payload_bytes.decode('utf-8')
-
-        for search, replace in search_replace_terms.items():
-            payload_content, count = re.subn(search, replace, payload_content)
-
-        return base64.b64encode(payload_content.encode('utf-8')).decode('utf-8')
-
     @classmethod
     def get_template_file(cls, path):
         """get contents of a file from templates folder"""
         file_path = f".//templates//TemplateFiles//{path}"
-        file = open(file_path,'r', encoding="utf-8")
-        file_content = file.read()
-        file.close()
-        return file_content
+        with open(file_path,'r', encoding="utf-8") as file:
+            return file.read()
 
     @classmethod
     def get_create_item_request_from_folder(cls, solution_folder, item_folder):
-        """generate create item request from folder"""        
-                
-        folder_path = f".//templates//FabricSolutions//{solution_folder}//{item_folder}"
-        
-        platform_file_path = f'{folder_path}//.platform'
-        file = open(platform_file_path,'r', encoding="utf-8")
-        file_content = json.loads(file.read())
-        file.close()
-        item_type = file_content['metadata']['type']
-        item_display_name = file_content['metadata']['displayName']
-
-        item_definition_parts = []
-
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                part_path = cls._get_part_path(item_folder, file_path)
-                file = open(file_path,'r', encoding="utf-8")
-                part_content = file.read()
-                item_definition_parts.append(cls._create_inline_base64_part(part_path, part_content))
-
-        return {
-            'displayName': item_display_name,
-            'type': item_type,
-            'definition': {
-                'parts': item_definition_parts
-            }
+        """generate create item request from folder"""
+        return cls.get_item_definition_from_folder(solution_folder, item_folder).to_create_request()
 
-        }
+    @classmethod
+    def get_item_definition_from_folder(cls, solution_folder, item_folder) -> ItemDefinition:
+        """generate item definition from folder"""
+        return TemplateCatalog.get_item_definition(solution_folder, item_folder)
 
     @classmethod
     def get_bulk_item_import_request_from_folder(cls, solution_folder, allow_pairing = False):
-        """generate bulk item import request from folder"""        
-                
-        solution_folder_path = f".//templates//FabricSolutions//{solution_folder}"
-
-        definition_parts = []
-
-        for root, dirs, files in os.walk(solution_folder_path):
-            for file in files:                
-                file_path = os.path.join(root, file)
-                part_path = cls._get_part_path_for_import(solution_folder_path, file_path)
-                if '/' in part_path[1:]:
-                    file = open(file_path,'r', encoding="utf-8")
-                    part_content = file.read()
-                    definition_parts.append(cls._create_inline_base64_part(part_path, part_content))
+        """generate bulk item import request from folder"""
         return {
-            'definitionParts': definition_parts,
+            'definitionParts': TemplateCatalog.get_import_parts(solution_folder),
             'allowPairingByName': allow_pairing
         }
 
     @classmethod
     def update_part_in_create_request(cls, create_item_request, part_path, search_replace_text):
         """Update Item Definition Part"""
-        item_definition = create_item_request['definition']
-        item_part = next((part for part in item_definition['parts'] if part['path'] == part_path), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            item_part['payload'] = cls._search_and_replace_in_payload(item_part['payload'], search_replace_text)
-            item_definition['parts'].append(item_part)
-
-        # bug fix for notebook-settings.json file
-        notebook_settings_part = next((part for part in item_definition['parts'] if part['path'] == 'notebook-settings.json'), None)
-        if notebook_settings_part is not None:
-            item_definition['parts'].remove(notebook_settings_part)
-            item_definition['parts'].append(notebook_settings_part)
-                
-        return {
-            'displayName': create_item_request['displayName'],
-            'type': create_item_request['type'],
-            'definition': item_definition
-        }
+        item_definition = ItemDefinition.from_create_request(create_item_request)
+        item_definition.parts.rewrite(part_path, literals=search_replace_text)
+        # notebook-settings.json is kept last by DefinitionPartSet
+        return item_definition.to_create_request()
 
     @classmethod
     def update_item_definition_part(cls, item_definition, part_path, search_replace_text):
         """Update Item Definition Part"""
-        item_part = next((part for part in item_definition['parts'] if part['path'] == part_path), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            item_part['payload'] = cls._search_and_replace_in_payload(item_part['payload'], search_replace_text)
-            item_definition['parts'].append(item_part)
-        return item_definition
+        definition = ItemDefinition.from_definition(item_definition)
+        definition.parts.rewrite(part_path, literals=search_replace_text)
+        return definition.to_definition()
 
     @classmethod
     def update_item_definition_part_with_regex(cls, item_definition, part_path, search_replace_terms):
         """Update Item Definition Part"""
-        item_part = next((part for part in item_definition['parts'] if part['path'] == part_path), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            item_part['payload'] = cls._search_and_replace_in_payload_with_regex(item_part['payload'], search_replace_terms)
-            item_definition['parts'].append(item_part)
-        return item_definition
+        definition = ItemDefinition.from_definition(item_definition)
+        definition.parts.rewrite(part_path, patterns=search_replace_terms)
+        return definition.to_definition()
 
     @classmethod
     def update_import_definition_part(cls, definition_parts, part_path, search_replace_text):
         """Update Item Definition Part"""
-        definition_part = next((part for part in definition_parts if part['path'] == part_path), None)
-        if definition_part is not None:
-            definition_parts.remove(definition_part)
-            definition_part['payload'] = cls._search_and_replace_in_payload(definition_part['payload'], search_replace_text)
-            definition_parts.append(definition_part)
-            
-        return definition_parts
-
+        part_set = DefinitionPartSet.from_parts(definition_parts)
+        part_set.rewrite(part_path, literals=search_replace_text)
+        return part_set.to_parts()
 
     @classmethod
     def get_create_notebook_request_from_folder(cls, solution_folder, item_folder, workspace_id, lakehouse):
@@ -195,20 +112,17 @@ class ItemDefinitionFactory:
     @classmethod
     def update_create_report_request_with_semantic_model(cls, create_report_request, target_model_id):
         """Update Item Definition Part"""
-        item_definition = create_report_request['definition']
-        item_part = next((part for part in item_definition['parts'] if part['path'] == 'definition.pbir'), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            file_template = cls.get_template_file(r"Reports//definition.pbir")
-            file_content = file_template.replace('{SEMANTIC_MODEL_ID}', target_model_id)
-            item_part = cls._create_inline_base64_part('definition.pbir', file_content)
-            item_definition['parts'].append(item_part)
+        item_definition = ItemDefinition.from_create_request(create_report_request)
+        if 'definition.pbir' in item_definition.parts:
+            item_definition.parts.set_content('definition.pbir', cls.get_report_definition_pbir(target_model_id))
+        item_definition.item_type = 'Report'
+        return item_definition.to_create_request()
 
-        return {
-            'displayName': create_report_request['displayName'],
-            'type': "Report",
-            'definition': item_definition
-        }
+    @classmethod
+    def get_report_definition_pbir(cls, target_model_id):
+        """Get definition.pbir content which binds report to semantic model by connection"""
+        file_template = cls.get_template_file(r"Reports//definition.pbir")
+        return file_template.replace('{SEMANTIC_MODEL_ID}', target_model_id)
 
     @classmethod
     def get_variable_library_create_request(cls, display_name, variable_library: VariableLibrary):
@@ -277,7 +191,8 @@ class ItemDefinitionFactory:
         cls._write_exported_workspace_to_exports_folder(workspace_name, 'exports.json', export)            
 
     @classmethod
-    def export_item_definitions_from_workspace_one_by_one(cls, workspace_name, item_type = None):
+    def export_item_definitions_from_workspace_one_by_one(cls, workspace_name, item_type = None,
+                                                          incremental = True, max_workers = None):
         """Export Item Definiitons from Workspace"""
 
         workspace = FabricRestApi.get_workspace_by_name(workspace_name)
@@ -285,33 +200,145 @@ class ItemDefinitionFactory:
         items = FabricRestApi.list_workspace_items(workspace.id)
 
         AppLogger.log_step(f"Exporting Workspace Item Definitions from {workspace_name}")
-        
-        cls._delete_exports_folder_contents(workspace_name)
-        
-        for item in items:
-            
-            items_to_ignore = [ 'SQLEndpoint' ]
-            if item.type in items_to_ignore:
-                continue
 
-            if item_type is not None and item.type != item_type:
-                continue
+        if not incremental:
+            cls._delete_exports_folder_contents(workspace_name)
+
+        manifest = cls._read_export_manifest(workspace_name)
+
+        items_to_ignore = [ 'SQLEndpoint' ]
+        items = [ item for item in items
+                  if item.type not in items_to_ignore and (item_type is None or item.type == item_type) ]
 
+        def export_item(item):
+            item_folder = f"{item.display_name}.{item.type}"
             try:
-                AppLogger.log_substep(f"Exporting [{item.display_name}.{item.type}]")
+                AppLogger.log_substep(f"Exporting [{item_folder}]")
                 item_definition = FabricRestApi.get_item_definition(workspace.id, item).as_dict()
-                item_folder = f"{item.display_name}.{item.type}"
-                for part in item_definition['definition']['parts']:
-                    part_path = part['path']
-                    part_content = part['payload']
-                    cls._write_file_to_exports_folder(workspace_name, item_folder, part_path, part_content)
+                return item_folder, cls._sync_item_files_to_exports_folder(
+                    workspace_name, item_folder, item_definition['definition']['parts'], manifest), None
             except Exception as e:
-                AppLogger.log_substep(f" - Could not export {item.display_name}.{item.type}: {e}")
+                AppLogger.log_substep(f" - Could not export {item_folder}: {e}")
+                return item_folder, None, str(e)
+
+        if max_workers is None:
+            max_workers = cls.EXPORT_MAX_WORKERS
+
+        # worker threads see the same context variables as the caller
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(lambda item: context.copy().run(export_item, item), items))
+
+        summary = { 'added': [], 'updated': [], 'deleted': [], 'unchanged': 0, 'failed': {} }
+        new_manifest = {}
+        exported_folders = set()
+        for item_folder, item_result, error in results:
+            if error is not None:
+                summary['failed'][item_folder] = error
+                continue
+            exported_folders.add(item_folder)
+            new_manifest.update(item_result['manifest'])
+            summary['added'].extend(item_result['added'])
+            summary['updated'].extend(item_result['updated'])
+            summary['unchanged'] += item_result['unchanged']
+
+        for relative_path, digest in manifest.items():
+            if relative_path in new_manifest:
+                continue
+            item_folder = relative_path.split('/', 1)[0]
+            # files of items out of scope or which could not be exported this time are kept
+            in_scope = item_type is None or item_folder.endswith(f'.{item_type}')
+            if not in_scope or item_folder in summary['failed']:
+                new_manifest[relative_path] = digest
+                continue
+            try:
+                cls._delete_file_from_exports_folder(workspace_name, relative_path)
+            except ValueError as e:
+                # a manifest entry outside the exports folder was not written by an export so it is dropped
+                AppLogger.log_error(str(e))
+                continue
+            summary['deleted'].append(relative_path)
+
+        cls._write_export_manifest(workspace_name, new_manifest)
+
+        AppLogger.log_substep(
+            f"Export complete: {len(summary['added'])} added, {len(summary['updated'])} updated, " + \
+            f"{len(summary['deleted'])} deleted, {summary['unchanged']} unchanged, " + \
+            f"{len(summary['failed'])} items failed")
+
+        return summary
+
+    @classmethod
+    def _get_exports_folder_path(cls, workspace_name):
+        """Get exports folder for workspace"""
+        return f".//exports//WorkspaceItemDefinitions//{workspace_name}"
+
+    @classmethod
+    def _get_exports_file_path(cls, workspace_name, relative_path):
+        """Get path of exported file, refusing paths which leave the exports folder"""
+        folder_path = os.path.abspath(cls._get_exports_folder_path(workspace_name))
+        file_path = os.path.abspath(os.path.join(folder_path, relative_path.lstrip('/')))
+        if os.path.commonpath([ folder_path, file_path ]) != folder_path or file_path == folder_path:
+            raise ValueError(f'Export path [{relative_path}] is outside of exports folder')
+        return file_path
+
+    @classmethod
+    def _read_export_manifest(cls, workspace_name):
+        """Get content hashes by relative file path from last export, or empty manifest"""
+        manifest_path = os.path.join(cls._get_exports_folder_path(workspace_name), cls.EXPORT_MANIFEST_FILE_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                return json.loads(file.read())['files']
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    @classmethod
+    def _write_export_manifest(cls, workspace_name, manifest):
+        """Save content hashes, replacing manifest atomically so an interrupted export forces a full compare"""
+        folder_path = cls._get_exports_folder_path(workspace_name)
+        os.makedirs(folder_path, exist_ok=True)
+        manifest_path = os.path.join(folder_path, cls.EXPORT_MANIFEST_FILE_NAME)
+        temp_path = f'{manifest_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({ 'files': dict(sorted(manifest.items())) }, indent=4))
+        os.replace(temp_path, manifest_path)
+
+    @classmethod
+    def _sync_item_files_to_exports_folder(cls, workspace_name, item_folder, parts, manifest):
+        """Write parts whose content hash differs from manifest and return hashes with changed paths"""
+        result = { 'manifest': {}, 'added': [], 'updated': [], 'unchanged': 0 }
+        for part in parts:
+            relative_path = f"{item_folder}/{part['path']}"
+            # part paths come from the service so they are checked before anything is written
+            file_path = cls._get_exports_file_path(workspace_name, relative_path)
+            content = base64.b64decode(part['payload'])
+            digest = hashlib.sha256(content).hexdigest()
+            result['manifest'][relative_path] = digest
+            previous_digest = manifest.get(relative_path)
+            if previous_digest == digest and os.path.exists(file_path):
+                result['unchanged'] += 1
+                continue
+            cls._write_file_to_exports_folder(workspace_name, item_folder, part['path'], content,
+                                              convert_from_base64 = False)
+            result['added' if previous_digest is None else 'updated'].append(relative_path)
+        return result
+
+    @classmethod
+    def _delete_file_from_exports_folder(cls, workspace_name, relative_path):
+        """Delete exported file and any folders left empty"""
+        folder_path = os.path.abspath(cls._get_exports_folder_path(workspace_name))
+        file_path = cls._get_exports_file_path(workspace_name, relative_path)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        parent_path = os.path.dirname(file_path)
+        while parent_path != folder_path and os.path.isdir(parent_path) and len(os.listdir(parent_path)) == 0:
+            os.rmdir(parent_path)
+            parent_path = os.path.dirname(parent_path)
 
     @classmethod
     def _delete_exports_folder_contents(cls, workspace_name):
         """Delete Exports Folder"""
-        folder_path = f".//exports//WorkspaceItemDefinitions//{workspace_name}"
+        folder_path = cls._get_exports_folder_path(workspace_name)
         
         if os.path.exists(folder_path):
             shutil.rmtree(folder_path)
@@ -320,17 +347,19 @@ class ItemDefinitionFactory:
     def _write_file_to_exports_folder(cls, workspace_name, item_name, file_path , file_content, convert_from_base64 = True):
         """Write file to exports folder"""
         if convert_from_base64:
-            file_content_bytes = base64.b64decode(file_content)
-            file_content = file_content_bytes.decode('utf-8')
+            file_content = base64.b64decode(file_content)
+        elif isinstance(file_content, str):
+            file_content = file_content.encode('utf-8')
  
         #file_path = file_path.replace('/', '\\')
-        folder_path = f".//exports//WorkspaceItemDefinitions//{workspace_name}/{item_name}/"
+        folder_path = f"{cls._get_exports_folder_path(workspace_name)}/{item_name}/"
         if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
+            os.makedirs(folder_path, exist_ok=True)
 
         full_path = folder_path + file_path
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        with open(full_path, 'w', encoding='utf-8') as file:
+        # content is written as bytes so binary parts such as report images stay intact
+        with open(full_path, 'wb') as file:
             file.write(file_content)
 
     @classmethod
@@ -0,0 +1,213 @@
+"""Concurrent runner for on-demand notebook and pipeline jobs"""
+
+import os
+import re
+import time
+
+from .app_logger import AppLogger
+from .fabric_rest_api import FabricRestApi
+from .http_metrics import HttpMetrics
+from .lro_poller import LroPoller
+
+class JobRun:
+    """State and timing of one on-demand job tracked by JobOrchestrator"""
+
+    def __init__(self, name, item_id, job_type, depends_on = None):
+        self.name = name
+        self.item_id = item_id
+        self.job_type = job_type
+        self.depends_on = list(depends_on or [])
+        self.status = 'Pending'
+        self.job_instance_url = None
+        self.job_instance = None
+        self.error = None
+        self.started_at = None
+        self.ended_at = None
+        self.poll_count = 0
+        self.next_poll_at = None
+
+    @property
+    def duration(self):
+        """Seconds between submission and completion"""
+        if self.started_at is None:
+            return None
+        end_time = self.ended_at if self.ended_at is not None else time.monotonic()
+        return end_time - self.started_at
+
+    @property
+    def is_finished(self):
+        """Check whether job has reached a terminal status"""
+        return self.status not in { 'Pending', 'Running' }
+
+class JobOrchestrator:
+    """Submits on-demand jobs through the job scheduler and tracks them all from a single polling loop"""
+
+    # job type used by the job scheduler for each item type
+    JOB_TYPES = {
+        'Notebook': 'RunNotebook',
+        'DataPipeline': 'Pipeline'
+    }
+
+    # upper bound for jobs running at the same time in one workspace
+    MAX_CONCURRENT_JOBS = int(os.getenv('JOB_MAX_CONCURRENCY', '4'))
+
+    @classmethod
+    def create_job(cls, item, depends_on = None):
+        """Create job run for notebook or data pipeline item"""
+        job_type = cls.JOB_TYPES.get(item.type)
+        if job_type is None:
+            raise ValueError(f'Item type [{item.type}] does not support on-demand jobs')
+        return JobRun(item.display_name, item.id, job_type, depends_on)
+
+    @classmethod
+    def infer_dependencies(cls, items):
+        """Chain numbered items like 'Create 01 Silver' -> 'Create 02 Gold' and run pipelines after notebooks"""
+        dependencies = { item.display_name: [] for item in items }
+
+        numbered_chains = {}
+        for item in items:
+            match = re.match(r'^(.*?)\s*(\d+)\s', item.display_name)
+            if match is not None:
+                chain_key = (item.type, match.group(1))
+                numbered_chains.setdefault(chain_key, []).append((int(match.group(2)), item.display_name))
+
+        for chain in numbered_chains.values():
+            chain.sort()
+            for (_, previous_name), (_, name) in zip(chain, chain[1:]):
+                dependencies[name].append(previous_name)
+
+        # pipelines have always been run once every notebook has completed
+        notebook_names = [ item.display_name for item in items if item.type == 'Notebook' ]
+        for item in items:
+            if item.type == 'DataPipeline':
+                dependencies[item.display_name].extend(notebook_names)
+
+        return dependencies
+
+    @classmethod
+    def run_jobs(cls, workspace_id, items, dependencies = None, max_concurrency = None,
+                 timeout = None, raise_on_failure = True):
+        """Run jobs for items concurrently in dependency order and return job runs by name"""
+        if dependencies is None:
+            dependencies = cls.infer_dependencies(items)
+        if max_concurrency is None:
+            max_concurrency = cls.MAX_CONCURRENT_JOBS
+        if timeout is None:
+            timeout = FabricRestApi.JOB_TIMEOUT_SECONDS
+
+        jobs = { item.display_name: cls.create_job(item, dependencies.get(item.display_name))
+                 for item in items }
+        for job in jobs.values():
+            unknown = [ name for name in job.depends_on if name not in jobs ]
+            if len(unknown) > 0:
+                raise ValueError(f'Job [{job.name}] depends on unknown jobs {unknown}')
+
+        if len(jobs) > 0:
+            AppLogger.log_substep(f"Running {len(jobs)} on-demand jobs " + \
+                                  f"with up to {max_concurrency} at a time...")
+
+        start_time = time.monotonic()
+        while not all(job.is_finished for job in jobs.values()):
+            cls._start_ready_jobs(workspace_id, jobs, max_concurrency)
+
+            running_jobs = [ job for job in jobs.values() if job.status == 'Running' ]
+            if len(running_jobs) == 0:
+                # jobs still pending with nothing running can only be waiting on a dependency cycle
+                for job in jobs.values():
+                    if job.status == 'Pending':
+                        job.status = 'Skipped'
+                        job.error = 'Circular dependency'
+                continue
+
+            if time.monotonic() - start_time > timeout:
+                for job in running_jobs:
+                    job.status = 'TimedOut'
+                    job.ended_at = time.monotonic()
+                    job.error = f'Job did not complete within {timeout} seconds'
+                continue
+
+            # wait until the next job is due for a status check
+            next_poll_at = min(job.next_poll_at for job in running_jobs)
+            time.sleep(max(0.0, next_poll_at - time.monotonic()))
+
+            for job in running_jobs:
+                if job.next_poll_at <= time.monotonic():
+                    cls._poll_job(job)
+
+        cls.log_job_summary(jobs)
+
+        failed_jobs = [ job.name for job in jobs.values() if job.status != 'Completed' ]
+        if raise_on_failure and len(failed_jobs) > 0:
+            raise RuntimeError(f'On-demand jobs did not complete: {failed_jobs}')
+
+        return jobs
+
+    @classmethod
+    def _start_ready_jobs(cls, workspace_id, jobs, max_concurrency):
+        """Submit pending jobs whose dependencies have completed and skip those with failed dependencies"""
+        running_count = sum(1 for job in jobs.values() if job.status == 'Running')
+        for job in jobs.values():
+            if job.status != 'Pending':
+                continue
+
+            dependency_states = [ jobs[name].status for name in job.depends_on ]
+            if any(state not in { 'Pending', 'Running', 'Completed' } for state in dependency_states):
+                job.status = 'Skipped'
+                job.error = 'Dependency did not complete'
+                continue
+            if any(state != 'Completed' for state in dependency_states):
+                continue
+            if running_count >= max_concurrency:
+                continue
+
+            AppLogger.log_substep(f"Starting {job.job_type} job for [{job.name}]")
+            job.started_at = time.monotonic()
+            try:
+                job.job_instance_url, retry_after = \
+                    FabricRestApi.start_item_job(workspace_id, job.item_id, job.job_type)
+            except RuntimeError as ex:
+                job.status = 'Failed'
+                job.error = str(ex)
+                job.ended_at = time.monotonic()
+                continue
+
+            job.status = 'Running'
+            job.next_poll_at = time.monotonic() + LroPoller.get_poll_delay(0, retry_after)
+            running_count += 1
+
+    @classmethod
+    def _poll_job(cls, job):
+        """Check status of running job once and schedule its next check"""
+        job.poll_count += 1
+        try:
+            job_instance, retry_after = FabricRestApi.get_item_job_instance(job.job_instance_url)
+        except RuntimeError as ex:
+            job.status = 'Failed'
+            job.error = str(ex)
+            job.ended_at = time.monotonic()
+            return
+
+        if job_instance is not None and FabricRestApi._is_job_instance_complete(job_instance):
+            job.job_instance = job_instance
+            job.status = job_instance['status']
+            job.ended_at = time.monotonic()
+            if job.status != 'Completed':
+                job.error = job_instance.get('failureReason')
+            HttpMetrics.record_wait('job', job.duration)
+            AppLogger.log_substep(f"Job for [{job.name}] {job.status.lower()} in {job.duration:.0f} seconds")
+            return
+
+        job.next_poll_at = time.monotonic() + LroPoller.get_poll_delay(job.poll_count, retry_after)
+
+    @classmethod
+    def log_job_summary(cls, jobs):
+        """Log status and duration of each job"""
+        if len(jobs) == 0:
+            return
+        AppLogger.log_table_header('On-demand job results')
+        for job in jobs.values():
+            if job.started_at is not None and job.ended_at is not None:
+                AppLogger.add_completed_span(job.name, job.started_at, job.ended_at, 'job_run',
+                                             job_type=job.job_type, status=job.status)
+            duration = f'{job.duration:.1f}s' if job.duration is not None else '-'
+            AppLogger.log_table_row(job.status, f'{job.name} ({duration})')
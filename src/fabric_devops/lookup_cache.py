@@ -0,0 +1,95 @@
+"""In-memory indexed cache for name-based lookups"""
+
+import os
+import threading
+import time
+
+class IndexedCache:
+    """Snapshot of a collection indexed by key which is reloaded once its TTL expires"""
+
+    # lifetime of a loaded snapshot before the next lookup reloads it
+    DEFAULT_TTL_SECONDS = float(os.getenv('LOOKUP_CACHE_TTL_SECONDS', '300'))
+
+    def __init__(self, loader, key_function, id_function = None, ttl = None):
+        self.loader = loader
+        self.key_function = key_function
+        self.id_function = id_function if id_function is not None else (lambda value: value.id)
+        self.ttl = ttl if ttl is not None else self.DEFAULT_TTL_SECONDS
+        self._values = {}
+        self._index = {}
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def _is_expired(self):
+        """Check whether snapshot is missing or older than TTL (caller holds lock)"""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _load(self):
+        """Reload snapshot from loader and rebuild index (caller holds lock)"""
+        self._values = {}
+        self._index = {}
+        for value in self.loader():
+            self._values[self.id_function(value)] = value
+            # first match wins, the same as a linear scan of the listing
+            self._index.setdefault(self.key_function(value), value)
+        self._loaded_at = time.monotonic()
+
+    def values(self, force_refresh = False):
+        """Get all cached values"""
+        with self._lock:
+            if force_refresh or self._is_expired():
+                self._load()
+            return list(self._values.values())
+
+    def get(self, key, force_refresh = False):
+        """Get value by key, reloading once on a miss in case the collection changed elsewhere"""
+        with self._lock:
+            reloaded = force_refresh or self._is_expired()
+            if reloaded:
+                self._load()
+            value = self._index.get(key)
+            if value is None and not reloaded:
+                self._load()
+                value = self._index.get(key)
+            return value
+
+    def find(self, predicate, force_refresh = False):
+        """Get first cached value matching predicate"""
+        for value in self.values(force_refresh):
+            if predicate(value):
+                return value
+        return None
+
+    def put(self, value):
+        """Add or replace value after it has been created through this process"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            value_id = self.id_function(value)
+            previous = self._values.get(value_id)
+            if previous is not None and self._index.get(self.key_function(previous)) is previous:
+                del self._index[self.key_function(previous)]
+            self._values[value_id] = value
+            self._index.setdefault(self.key_function(value), value)
+
+    def remove(self, value_id):
+        """Remove value after it has been deleted through this process"""
+        with self._lock:
+            value = self._values.pop(value_id, None)
+            if value is None:
+                return
+            key = self.key_function(value)
+            if self._index.get(key) is value:
+                del self._index[key]
+                # another value may share the same key
+                for other in self._values.values():
+                    if self.key_function(other) == key:
+                        self._index[key] = other
+                        break
+
+    def invalidate(self):
+        """Discard snapshot so the next lookup reloads it"""
+        with self._lock:
+            self._values = {}
+            self._index = {}
+            self._loaded_at = None
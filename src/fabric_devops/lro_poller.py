@@ -0,0 +1,134 @@
+"""Polling engine for long-running operations"""
+
+import os
+import random
+import threading
+import time
+from json.decoder import JSONDecodeError
+
+from .http_metrics import HttpMetrics
+from .http_session_pool import HttpSessionPool
+from .rate_limiter import RateLimiter
+
+class LroResult:
+    """Outcome of a polled long-running operation"""
+
+    def __init__(self, response, operation_state, wait_time, poll_count):
+        self.response = response
+        self.operation_state = operation_state
+        self.wait_time = wait_time
+        self.poll_count = poll_count
+
+    @property
+    def status(self):
+        """Final status reported by the operation"""
+        return self.operation_state.get('status')
+
+class LroPoller:
+    """Reusable engine which polls long-running operations (LRO) until they complete"""
+
+    # first status check happens quickly, then the delay grows with jitter up to the maximum
+    INITIAL_DELAY_SECONDS = 1.0
+    BACKOFF_FACTOR = 1.5
+    MAX_DELAY_SECONDS = 15.0
+    JITTER_RATIO = 0.2
+
+    # Retry-After values above this ceiling are clamped
+    MAX_RETRY_AFTER_SECONDS = 60.0
+
+    # overall deadline for a single operation
+    DEFAULT_TIMEOUT_SECONDS = float(os.getenv('LRO_TIMEOUT_SECONDS', '1800'))
+
+    # running totals across all polled operations
+    total_wait_time = 0.0
+    total_operations = 0
+    _stats_lock = threading.Lock()
+
+    @classmethod
+    def get_retry_after(cls, response, default = None):
+        """Parse Retry-After header in seconds, supporting delta-seconds and HTTP-date formats"""
+        if response is None:
+            return default
+
+        seconds = RateLimiter.parse_retry_after(response.headers.get('Retry-After'))
+        if seconds is None:
+            return default
+
+        return min(seconds, cls.MAX_RETRY_AFTER_SECONDS)
+
+    @classmethod
+    def get_backoff_delay(cls, attempt):
+        """Get exponential backoff delay with jitter for a zero-based attempt number"""
+        delay = min(cls.INITIAL_DELAY_SECONDS * (cls.BACKOFF_FACTOR ** attempt), cls.MAX_DELAY_SECONDS)
+        jitter = delay * cls.JITTER_RATIO
+        return max(0.0, delay + random.uniform(-jitter, jitter))
+
+    @classmethod
+    def get_poll_delay(cls, attempt, retry_after = None):
+        """Get delay before next status check, preferring server-provided Retry-After"""
+        if retry_after is not None:
+            return retry_after
+        return cls.get_backoff_delay(attempt)
+
+    @classmethod
+    def is_operation_complete(cls, operation_state):
+        """Check whether Fabric or GitHub operation state has reached a terminal status"""
+        return operation_state.get('status') in { 'Succeeded', 'Failed' }
+
+    @classmethod
+    def _record_wait(cls, wait_time, wait_category = 'long_running_operation'):
+        """Add operation wait time to running totals"""
+        with cls._stats_lock:
+            cls.total_wait_time += wait_time
+            cls.total_operations += 1
+        HttpMetrics.record_wait(wait_category, wait_time)
+
+    @classmethod
+    def poll(cls, operation_url, request_headers, is_complete = None,
+             initial_response = None, timeout = None,
+             wait_category = 'long_running_operation') -> LroResult:
+        """Poll operation URL until is_complete returns True for operation state or deadline passes"""
+        if is_complete is None:
+            is_complete = cls.is_operation_complete
+
+        if timeout is None:
+            timeout = cls.DEFAULT_TIMEOUT_SECONDS
+
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        retry_after = cls.get_retry_after(initial_response)
+        attempt = 0
+
+        while True:
+            delay = cls.get_poll_delay(attempt, retry_after)
+            remaining = deadline - time.monotonic()
+            time.sleep(max(0.0, min(delay, remaining)))
+
+            response = HttpSessionPool.get(url=operation_url, headers=request_headers, timeout=60)
+
+            if response.status_code == 429 or response.status_code >= 500:
+                # transient failure while checking status so keep polling
+                operation_state = None
+            elif response.status_code not in { 200, 201, 202 }:
+                raise RuntimeError(
+                    f'Error polling operation status: {response.status_code} - {response.text}')
+            else:
+                try:
+                    operation_state = response.json()
+                except JSONDecodeError:
+                    operation_state = None
+
+            if operation_state is not None and is_complete(operation_state):
+                wait_time = time.monotonic() - start_time
+                cls._record_wait(wait_time, wait_category)
+                return LroResult(response, operation_state, wait_time, attempt + 1)
+
+            if time.monotonic() >= deadline:
+                wait_time = time.monotonic() - start_time
+                cls._record_wait(wait_time, wait_category)
+                raise TimeoutError(
+                    f'Long-running operation [{operation_url}] did not complete ' + \
+                    f'within {timeout} seconds')
+
+            retry_after = cls.get_retry_after(response)
+            attempt += 1
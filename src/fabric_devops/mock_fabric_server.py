@@ -0,0 +1,1923 @@
+"""Local stand-in for the Fabric, Power BI, Azure DevOps and GitHub REST APIs used for offline benchmarks and concurrency tests"""
+
+import base64
+import hashlib
+import ipaddress
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+class MockFabricSettings:
+    """Simulated latency, throttling and operation durations for MockFabricServer"""
+
+    def __init__(self, latency = 0.0, latency_jitter = 0.0, throttle_rate = 0.0, throttle_retry_after = 1,
+                 lro_duration = 0.0, job_duration = 0.0, job_failure_rate = 0.0,
+                 sql_endpoint_provisioning_duration = 0.0, refresh_duration = 0.0,
+                 retry_after = 1, seed = None):
+        # seconds added to every response, plus up to latency_jitter seconds at random
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        # share of requests answered with 429 TOO MANY REQUESTS
+        self.throttle_rate = throttle_rate
+        self.throttle_retry_after = throttle_retry_after
+        # seconds before long-running operations, jobs, SQL endpoints and refreshes complete
+        self.lro_duration = lro_duration
+        self.job_duration = job_duration
+        self.job_failure_rate = job_failure_rate
+        self.sql_endpoint_provisioning_duration = sql_endpoint_provisioning_duration
+        self.refresh_duration = refresh_duration
+        # Retry-After header value sent with 202 ACCEPTED responses
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_environment(cls):
+        """Create settings from MOCK_FABRIC_* environment variables"""
+        return cls(
+            latency=float(os.getenv('MOCK_FABRIC_LATENCY_SECONDS', '0')),
+            latency_jitter=float(os.getenv('MOCK_FABRIC_LATENCY_JITTER_SECONDS', '0')),
+            throttle_rate=float(os.getenv('MOCK_FABRIC_THROTTLE_RATE', '0')),
+            throttle_retry_after=int(os.getenv('MOCK_FABRIC_THROTTLE_RETRY_AFTER_SECONDS', '1')),
+            lro_duration=float(os.getenv('MOCK_FABRIC_LRO_SECONDS', '0')),
+            job_duration=float(os.getenv('MOCK_FABRIC_JOB_SECONDS', '0')),
+            job_failure_rate=float(os.getenv('MOCK_FABRIC_JOB_FAILURE_RATE', '0')),
+            sql_endpoint_provisioning_duration=float(os.getenv('MOCK_FABRIC_SQL_ENDPOINT_SECONDS', '0')),
+            refresh_duration=float(os.getenv('MOCK_FABRIC_REFRESH_SECONDS', '0')),
+            retry_after=int(os.getenv('MOCK_FABRIC_RETRY_AFTER_SECONDS', '1')),
+            seed=os.getenv('MOCK_FABRIC_SEED')
+        )
+
+class MockFabricState:
+    """In-memory tenant holding workspaces, items, connections, deployment pipelines, operations and jobs,
+    along with the Azure DevOps projects and GitHub repositories workspaces are synced with"""
+
+    # plural segment used by item-type-specific endpoints, in lower case
+    ITEM_TYPE_ENDPOINTS = {
+        'lakehouses': 'Lakehouse',
+        'notebooks': 'Notebook',
+        'datapipelines': 'DataPipeline',
+        'semanticmodels': 'SemanticModel',
+        'reports': 'Report',
+        'warehouses': 'Warehouse',
+        'sqlendpoints': 'SQLEndpoint',
+        'variablelibraries': 'VariableLibrary',
+        'environments': 'Environment',
+        'eventhouses': 'Eventhouse',
+        'kqldatabases': 'KQLDatabase',
+        'dataflows': 'Dataflow',
+        'copyjobs': 'CopyJob'
+    }
+
+    def __init__(self, capacity_id = None):
+        self.lock = threading.RLock()
+        self.capacities = [{
+            'id': capacity_id or str(uuid.uuid4()),
+            'displayName': 'Mock Capacity',
+            'sku': 'F64',
+            'region': 'West US',
+            'state': 'Active'
+        }]
+        self.workspaces = {}
+        self.items = {}
+        self.folders = {}
+        self.connections = {}
+        self.deployment_pipelines = {}
+        self.operations = {}
+        self.jobs = {}
+        self.refreshes = {}
+        # Azure DevOps and GitHub resources, with variable groups, environments, secrets and the like
+        # kept in devops_resources since no flow reads them back in detail
+        self.ado_projects = {}
+        self.repositories = {}
+        self.pull_requests = {}
+        self.pipelines = {}
+        self.pipeline_runs = {}
+        self.devops_resources = {}
+        # GitHub secrets are sealed with this Curve25519 public key
+        self.github_public_key = base64.b64encode(os.urandom(32)).decode('utf-8')
+        self._sequence = itertools.count(1)
+
+    @classmethod
+    def public(cls, resource):
+        """Copy of resource without internal fields"""
+        return { key: value for key, value in resource.items() if not key.startswith('_') }
+
+    def find_by_name(self, resources, display_name, **filters):
+        """Get first resource with display name and matching field values"""
+        for resource in resources.values():
+            if resource['displayName'] == display_name and \
+               all(resource.get(key) == value for key, value in filters.items()):
+                return resource
+        return None
+
+    def create_item(self, workspace_id, item_type, display_name, description = None,
+                    folder_id = None, definition = None):
+        """Create item along with the SQL endpoint Fabric provisions for each lakehouse"""
+        item = {
+            'id': str(uuid.uuid4()),
+            'type': item_type,
+            'displayName': display_name,
+            'description': description or '',
+            'workspaceId': workspace_id,
+            '_definition': definition or { 'parts': [] },
+            '_created_at': time.monotonic()
+        }
+        if folder_id is not None:
+            item['folderId'] = folder_id
+        self.items[item['id']] = item
+        if item_type == 'Lakehouse':
+            sql_endpoint = self.create_item(workspace_id, 'SQLEndpoint', display_name, folder_id=folder_id)
+            item['_sql_endpoint_id'] = sql_endpoint['id']
+            item['_shortcuts'] = []
+        return item
+
+    def create_folder(self, workspace_id, display_name, parent_folder_id = None):
+        """Create workspace folder"""
+        folder = {
+            'id': str(uuid.uuid4()),
+            'displayName': display_name,
+            'workspaceId': workspace_id
+        }
+        if parent_folder_id is not None:
+            folder['parentFolderId'] = parent_folder_id
+        self.folders[folder['id']] = folder
+        return folder
+
+    def get_or_create_folder_path(self, workspace_id, folder_path):
+        """Get id of nested folder path like 'staging/bronze', creating missing folders"""
+        parent_folder_id = None
+        for folder_name in [ name for name in folder_path.split('/') if name != '' ]:
+            folder = self.find_by_name(self.folders, folder_name,
+                                       workspaceId=workspace_id, parentFolderId=parent_folder_id)
+            if folder is None:
+                folder = self.create_folder(workspace_id, folder_name, parent_folder_id)
+            parent_folder_id = folder['id']
+        return parent_folder_id
+
+    def get_folder_path(self, folder_id):
+        """Get path of folder like 'staging/bronze'"""
+        names = []
+        while folder_id is not None:
+            folder = self.folders[folder_id]
+            names.insert(0, folder['displayName'])
+            folder_id = folder.get('parentFolderId')
+        return '/'.join(names)
+
+    def next_number(self):
+        """Get next integer id, which Azure DevOps and GitHub use for pipelines, runs and pull requests"""
+        return next(self._sequence)
+
+    def create_repository(self, provider, owner, name):
+        """Create empty git repository of provider 'AzureDevOps' or 'GitHub'"""
+        repository = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'defaultBranch': None,
+            '_provider': provider,
+            '_owner': owner,
+            '_branches': {},
+            '_commits': {}
+        }
+        self.repositories[repository['id']] = repository
+        return repository
+
+    def find_repository(self, provider, owner, name):
+        """Get repository of provider by owner and name"""
+        for repository in self.repositories.values():
+            if (repository['_provider'], repository['_owner'], repository['name']) == (provider, owner, name):
+                return repository
+        return None
+
+    def get_files(self, repository, branch):
+        """Get files at head of branch as a dictionary of path and base64 content"""
+        commit_id = repository['_branches'].get(branch)
+        return dict(repository['_commits'][commit_id]['files']) if commit_id is not None else {}
+
+    def commit_files(self, repository, branch, changes, message):
+        """Commit changed files to branch, with None content for deleted files, and return commit id"""
+        files = self.get_files(repository, branch)
+        for path, content in changes.items():
+            if content is None:
+                files.pop(path, None)
+            else:
+                files[path] = content
+        parent_id = repository['_branches'].get(branch)
+        commit_id = hashlib.sha1(f'{parent_id}{message}{uuid.uuid4()}'.encode('utf-8')).hexdigest()
+        repository['_commits'][commit_id] = {
+            'files': files,
+            'message': message,
+            'parents': [ parent_id ] if parent_id is not None else []
+        }
+        repository['_branches'][branch] = commit_id
+        return commit_id
+
+    def get_branch_changes(self, repository, source_branch, target_branch):
+        """Get files of source branch which differ from target branch"""
+        target_files = self.get_files(repository, target_branch)
+        return { path: content for path, content in self.get_files(repository, source_branch).items()
+                 if target_files.get(path) != content }
+
+    def get_workspace_git_items(self, workspace_id):
+        """Get files Fabric git integration writes for each workspace item, keyed by item folder"""
+        git_items = {}
+        for item in self.items.values():
+            if item['workspaceId'] != workspace_id or item['type'] == 'SQLEndpoint':
+                continue
+            platform = {
+                'metadata': { 'type': item['type'], 'displayName': item['displayName'] },
+                'config': { 'version': '2.0', 'logicalId': item.setdefault('_logical_id', str(uuid.uuid4())) }
+            }
+            files = { '.platform': base64.b64encode(json.dumps(platform, indent=2).encode('utf-8')).decode('utf-8') }
+            for part in item['_definition'].get('parts', []):
+                files[part['path']] = part['payload']
+            root_folder = '/'.join(filter(None, [ self.get_folder_path(item.get('folderId')),
+                                                  f"{item['displayName']}.{item['type']}" ]))
+            git_items[root_folder] = files
+        return git_items
+
+    @classmethod
+    def get_git_prefix(cls, directory):
+        """Get path prefix of files below git directory like '/workspace'"""
+        directory = (directory or '').strip('/')
+        return f'{directory}/' if directory != '' else ''
+
+    def get_git_items(self, repository, branch, directory):
+        """Get files of item folders below directory of branch, keyed by item folder"""
+        prefix = self.get_git_prefix(directory)
+        files = self.get_files(repository, branch)
+        git_items = {}
+        for path in files:
+            if path.startswith(prefix) and path.endswith('/.platform'):
+                root_folder = path[len(prefix):-len('/.platform')]
+                git_items[root_folder] = { file_path[len(prefix) + len(root_folder) + 1:]: content
+                                           for file_path, content in files.items()
+                                           if file_path.startswith(f'{prefix}{root_folder}/') }
+        return git_items
+
+    def import_git_item(self, workspace_id, root_folder, files):
+        """Create or update workspace item from files of its item folder"""
+        platform = json.loads(base64.b64decode(files['.platform']))
+        item_type = platform['metadata']['type']
+        display_name = platform['metadata']['displayName']
+        item = self.find_by_name(self.items, display_name, workspaceId=workspace_id, type=item_type)
+        if item is None:
+            folder_id = self.get_or_create_folder_path(workspace_id, root_folder.rpartition('/')[0])
+            item = self.create_item(workspace_id, item_type, display_name, folder_id=folder_id)
+        item['_logical_id'] = platform['config']['logicalId']
+        item['_definition'] = { 'parts': [ { 'path': path, 'payload': payload, 'payloadType': 'InlineBase64' }
+                                           for path, payload in files.items() if path != '.platform' ] }
+        return item
+
+    def delete_workspace(self, workspace_id):
+        """Delete workspace and everything in it"""
+        self.workspaces.pop(workspace_id, None)
+        for collection in [ self.items, self.folders ]:
+            for resource_id in [ key for key, value in collection.items()
+                                 if value['workspaceId'] == workspace_id ]:
+                del collection[resource_id]
+        for pipeline in self.deployment_pipelines.values():
+            for stage in pipeline['_stages']:
+                if stage.get('workspaceId') == workspace_id:
+                    stage.pop('workspaceId')
+                    stage.pop('workspaceName', None)
+
+class MockFabricRequestHandler(BaseHTTPRequestHandler):
+    """Routes Fabric v1 and Power BI v1.0 requests to handlers working on MockFabricState"""
+
+    protocol_version = 'HTTP/1.1'
+
+    # path prefixes of Azure DevOps and GitHub routes
+    ADO_ORGANIZATION = r'/ado/(?P<organization>[^/]+)'
+    ADO_PROJECT_NAME = r'(?P<project_name>(?!_apis/)[^/]+)'
+    ADO_PROJECT = rf'{ADO_ORGANIZATION}/{ADO_PROJECT_NAME}'
+    # repositories are addressed both with and without project
+    ADO_REPOSITORY = rf'{ADO_ORGANIZATION}(/{ADO_PROJECT_NAME})?/_apis/git/repositories/(?P<repository_id>[^/]+)'
+    GITHUB_REPOSITORY = r'/github/repos/(?P<owner>[^/]+)/(?P<repository_name>[^/]+)'
+
+    ROUTES = [
+        # operations
+        ('GET', r'/v1/operations/(?P<operation_id>[^/]+)', 'get_operation'),
+        ('GET', r'/v1/operations/(?P<operation_id>[^/]+)/result', 'get_operation_result'),
+        # capacities and gateways
+        ('GET', r'/v1/capacities', 'list_capacities'),
+        ('GET', r'/v1/gateways', 'list_gateways'),
+        # workspaces
+        ('GET', r'/v1/workspaces', 'list_workspaces'),
+        ('POST', r'/v1/workspaces', 'create_workspace'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)', 'get_workspace'),
+        ('PATCH', r'/v1/workspaces/(?P<workspace_id>[^/]+)', 'update_workspace'),
+        ('DELETE', r'/v1/workspaces/(?P<workspace_id>[^/]+)', 'delete_workspace'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/roleAssignments', 'list_role_assignments'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/roleAssignments', 'add_role_assignment'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/assignToCapacity', 'assign_to_capacity'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/provisionIdentity', 'provision_identity'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/deprovisionIdentity', 'deprovision_identity'),
+        # folders
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/folders', 'list_folders'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/folders', 'create_folder'),
+        ('DELETE', r'/v1/workspaces/(?P<workspace_id>[^/]+)/folders/(?P<folder_id>[^/]+)', 'delete_folder'),
+        # bulk import and export
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/bulkExportDefinitions', 'bulk_export'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/bulkImportDefinitions', 'bulk_import'),
+        # items
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items', 'list_items'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items', 'create_item'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)', 'get_item'),
+        ('PATCH', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)', 'update_item'),
+        ('DELETE', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)', 'delete_item'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/getDefinition',
+         'get_item_definition'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/updateDefinition',
+         'update_item_definition'),
+        # shortcuts
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/shortcuts', 'list_shortcuts'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/shortcuts', 'create_shortcut'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/onelake/resetShortcutCache', 'accept_operation'),
+        # jobs
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/jobs/instances', 'start_job'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/jobs/(?P<job_type>[^/]+)/instances',
+         'start_job'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/items/(?P<item_id>[^/]+)/jobs/instances/(?P<job_id>[^/]+)',
+         'get_job'),
+        # SQL endpoints
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/sqlEndpoints/(?P<item_id>[^/]+)/refreshMetadata',
+         'refresh_sql_endpoint_metadata'),
+        # git
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/connection', 'get_git_connection'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/status', 'get_git_status'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/connect', 'connect_git'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/disconnect', 'disconnect_git'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/initializeConnection', 'initialize_git_connection'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/commitToGit', 'commit_to_git'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/updateFromGit', 'update_from_git'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/myGitCredentials', 'get_git_credentials'),
+        ('PATCH', r'/v1/workspaces/(?P<workspace_id>[^/]+)/git/myGitCredentials', 'update_git_credentials'),
+        # item-type-specific endpoints
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/(?P<type_endpoint>[^/]+)', 'list_items'),
+        ('POST', r'/v1/workspaces/(?P<workspace_id>[^/]+)/(?P<type_endpoint>[^/]+)', 'create_item'),
+        ('GET', r'/v1/workspaces/(?P<workspace_id>[^/]+)/(?P<type_endpoint>[^/]+)/(?P<item_id>[^/]+)', 'get_item'),
+        ('PATCH', r'/v1/workspaces/(?P<workspace_id>[^/]+)/(?P<type_endpoint>[^/]+)/(?P<item_id>[^/]+)',
+         'update_item'),
+        ('DELETE', r'/v1/workspaces/(?P<workspace_id>[^/]+)/(?P<type_endpoint>[^/]+)/(?P<item_id>[^/]+)',
+         'delete_item'),
+        # connections
+        ('GET', r'/v1/connections', 'list_connections'),
+        ('POST', r'/v1/connections', 'create_connection'),
+        ('GET', r'/v1/connections/supportedConnectionTypes', 'list_supported_connection_types'),
+        ('GET', r'/v1/connections/(?P<connection_id>[^/]+)', 'get_connection'),
+        ('DELETE', r'/v1/connections/(?P<connection_id>[^/]+)', 'delete_connection'),
+        ('POST', r'/v1/connections/(?P<connection_id>[^/]+)/roleAssignments', 'add_role_assignment'),
+        # deployment pipelines
+        ('GET', r'/v1/deploymentPipelines', 'list_deployment_pipelines'),
+        ('POST', r'/v1/deploymentPipelines', 'create_deployment_pipeline'),
+        ('GET', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)', 'get_deployment_pipeline'),
+        ('DELETE', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)', 'delete_deployment_pipeline'),
+        ('GET', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)/stages', 'list_deployment_pipeline_stages'),
+        ('POST', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)/roleAssignments', 'add_role_assignment'),
+        ('POST', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)/stages/(?P<stage_id>[^/]+)/assignWorkspace',
+         'assign_workspace_to_stage'),
+        ('POST', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)/stages/(?P<stage_id>[^/]+)/unassignWorkspace',
+         'unassign_workspace_from_stage'),
+        ('POST', r'/v1/deploymentPipelines/(?P<pipeline_id>[^/]+)/deploy', 'deploy_stage_content'),
+        # Power BI
+        ('GET', r'/v1.0/myorg/gateways', 'list_gateways'),
+        ('GET', r'/v1.0/myorg/groups/(?P<workspace_id>[^/]+)/datasets/(?P<item_id>[^/]+)/datasources',
+         'list_datasources'),
+        ('POST', r'/v1.0/myorg/groups/(?P<workspace_id>[^/]+)/datasets/(?P<item_id>[^/]+)/Default.BindToGateway',
+         'bind_to_gateway'),
+        ('POST', r'/v1.0/myorg/groups/(?P<workspace_id>[^/]+)/datasets/(?P<item_id>[^/]+)/Default.TakeOver',
+         'empty_ok'),
+        ('POST', r'/v1.0/myorg/groups/(?P<workspace_id>[^/]+)/datasets/(?P<item_id>[^/]+)/refreshes',
+         'start_refresh'),
+        ('GET', r'/v1.0/myorg/groups/(?P<workspace_id>[^/]+)/datasets/(?P<item_id>[^/]+)/refreshes/(?P<refresh_id>[^/]+)',
+         'get_refresh'),
+        ('GET', r'/v1.0/myorg/groups/(?P<workspace_id>[^/]+)/datasets/(?P<item_id>[^/]+)/refreshes', 'list_refreshes'),
+        # Azure DevOps, served below /ado and /ado-vssps
+        ('GET', rf'{ADO_ORGANIZATION}/_apis/projects', 'list_ado_projects'),
+        ('POST', rf'{ADO_ORGANIZATION}/_apis/projects', 'create_ado_project'),
+        ('DELETE', rf'{ADO_ORGANIZATION}/_apis/projects/(?P<project_id>[^/]+)', 'delete_ado_project'),
+        ('GET', rf'{ADO_ORGANIZATION}/_apis/operations/(?P<operation_id>[^/]+)', 'get_ado_operation'),
+        ('GET', rf'{ADO_PROJECT}/_apis/git/repositories', 'list_ado_repositories'),
+        ('PATCH', rf'{ADO_REPOSITORY}', 'update_ado_repository'),
+        ('GET', rf'{ADO_REPOSITORY}/refs', 'list_ado_refs'),
+        ('POST', rf'{ADO_REPOSITORY}/refs', 'update_ado_refs'),
+        ('POST', rf'{ADO_REPOSITORY}/pushes', 'create_ado_push'),
+        ('GET', rf'{ADO_REPOSITORY}/pullrequests', 'list_ado_pull_requests'),
+        ('POST', rf'{ADO_REPOSITORY}/pullrequests', 'create_ado_pull_request'),
+        ('GET', rf'{ADO_REPOSITORY}/pullrequests/(?P<pull_request_id>\d+)', 'get_ado_pull_request'),
+        ('PATCH', rf'{ADO_REPOSITORY}/pullrequests/(?P<pull_request_id>\d+)', 'update_ado_pull_request'),
+        ('PUT', rf'{ADO_REPOSITORY}/pullrequests/(?P<pull_request_id>\d+)/reviewers/(?P<reviewer_id>[^/]+)',
+         'add_ado_reviewer'),
+        ('POST', rf'{ADO_ORGANIZATION}(/{ADO_PROJECT_NAME})?/_apis/distributedtask/variablegroups',
+         'create_devops_resource'),
+        ('GET', rf'{ADO_PROJECT}/_apis/distributedtask/environments', 'list_ado_environments'),
+        ('POST', rf'{ADO_PROJECT}/_apis/distributedtask/environments', 'create_ado_environment'),
+        ('POST', rf'{ADO_PROJECT}/_apis/pipelines/checks/configurations', 'create_devops_resource'),
+        ('POST', rf'{ADO_PROJECT}/_apis/policy/configurations', 'create_devops_resource'),
+        ('PATCH', rf'{ADO_PROJECT}/_apis/pipelines/pipelinePermissions/(?P<resource_type>[^/]+)/(?P<resource_id>[^/]+)',
+         'update_ado_pipeline_permissions'),
+        ('GET', rf'{ADO_PROJECT}/_apis/pipelines', 'list_ado_pipelines'),
+        ('POST', rf'{ADO_PROJECT}/_apis/pipelines', 'create_ado_pipeline'),
+        ('GET', rf'{ADO_PROJECT}/_apis/pipelines/(?P<pipeline_id>\d+)/runs', 'list_ado_pipeline_runs'),
+        ('POST', rf'{ADO_PROJECT}/_apis/pipelines/(?P<pipeline_id>\d+)/runs', 'run_ado_pipeline'),
+        ('GET', rf'{ADO_PROJECT}/_apis/pipelines/(?P<pipeline_id>\d+)/runs/(?P<run_id>\d+)', 'get_ado_pipeline_run'),
+        ('GET', r'/ado-vssps/(?P<organization>[^/]+)/_apis/identities', 'list_ado_identities'),
+        # GitHub, served below /github
+        ('GET', r'/github/user', 'get_github_user'),
+        ('GET', r'/github/orgs/(?P<owner>[^/]+)/repos', 'list_github_repositories'),
+        ('POST', r'/github/orgs/(?P<owner>[^/]+)/repos', 'create_github_repository'),
+        ('GET', r'/github/orgs/(?P<owner>[^/]+)/actions/secrets/public-key', 'get_github_public_key'),
+        ('PUT', r'/github/orgs/(?P<owner>[^/]+)/actions/secrets/(?P<name>[^/]+)', 'put_github_resource'),
+        ('GET', rf'{GITHUB_REPOSITORY}', 'get_github_repository'),
+        ('PATCH', rf'{GITHUB_REPOSITORY}', 'update_github_repository'),
+        ('DELETE', rf'{GITHUB_REPOSITORY}', 'delete_github_repository'),
+        ('GET', rf'{GITHUB_REPOSITORY}/branches', 'list_github_branches'),
+        ('GET', rf'{GITHUB_REPOSITORY}/branches/(?P<branch>.+)', 'get_github_branch'),
+        ('POST', rf'{GITHUB_REPOSITORY}/git/refs', 'create_github_ref'),
+        ('GET', rf'{GITHUB_REPOSITORY}/contents/(?P<path>.+)', 'get_github_content'),
+        ('PUT', rf'{GITHUB_REPOSITORY}/contents/(?P<path>.+)', 'put_github_content'),
+        ('GET', rf'{GITHUB_REPOSITORY}/compare/(?P<base>.+?)\.\.\.(?P<head>.+)', 'compare_github_branches'),
+        ('POST', rf'{GITHUB_REPOSITORY}/pulls', 'create_github_pull_request'),
+        ('GET', rf'{GITHUB_REPOSITORY}/pulls/(?P<number>\d+)', 'get_github_pull_request'),
+        ('PUT', rf'{GITHUB_REPOSITORY}/pulls/(?P<number>\d+)/merge', 'merge_github_pull_request'),
+        ('GET', rf'{GITHUB_REPOSITORY}/actions/secrets/public-key', 'get_github_public_key'),
+        ('PUT', rf'{GITHUB_REPOSITORY}/actions/secrets/(?P<name>[^/]+)', 'put_github_resource'),
+        ('POST', rf'{GITHUB_REPOSITORY}/actions/variables', 'create_devops_resource'),
+        ('POST', rf'{GITHUB_REPOSITORY}/actions/workflows/(?P<workflow>[^/]+)/dispatches', 'run_github_workflow'),
+        ('GET', rf'{GITHUB_REPOSITORY}/actions/runs/(?P<run_id>\d+)', 'get_github_workflow_run'),
+        ('PUT', rf'{GITHUB_REPOSITORY}/environments/(?P<name>[^/]+)', 'put_github_resource'),
+        ('POST', rf'{GITHUB_REPOSITORY}/rulesets', 'create_devops_resource'),
+    ]
+
+    _compiled_routes = [ (method, re.compile(f'^{pattern}$'), handler_name)
+                         for method, pattern, handler_name in ROUTES ]
+
+    # stdlib handler logs every request to stderr unless silenced
+    def log_message(self, format, *args):
+        """Suppress per-request logging"""
+
+    @property
+    def state(self) -> MockFabricState:
+        """Tenant state shared by all request threads"""
+        return self.server.state
+
+    @property
+    def settings(self) -> MockFabricSettings:
+        """Simulation settings of server"""
+        return self.server.settings
+
+    def do_GET(self):
+        """Handle GET request"""
+        self._dispatch('GET')
+
+    def do_POST(self):
+        """Handle POST request"""
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        """Handle PATCH request"""
+        self._dispatch('PATCH')
+
+    def do_PUT(self):
+        """Handle PUT request"""
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        """Handle DELETE request"""
+        self._dispatch('DELETE')
+
+    #region request plumbing
+
+    @classmethod
+    def _to_camel_case(cls, value):
+        """Convert snake_case keys sent by SDK request dictionaries to camelCase used by the REST API"""
+        if isinstance(value, dict):
+            return { re.sub(r'_([a-z])', lambda match: match.group(1).upper(), key): cls._to_camel_case(item)
+                     for key, item in value.items() }
+        if isinstance(value, list):
+            return [ cls._to_camel_case(item) for item in value ]
+        return value
+
+    def _read_body(self):
+        """Read JSON request body"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length == 0:
+            return {}
+        raw_body = self.rfile.read(length)
+        try:
+            body = json.loads(raw_body)
+        except ValueError:
+            return {}
+        return self._to_camel_case(body) if isinstance(body, (dict, list)) else {}
+
+    def _dispatch(self, method):
+        """Simulate latency and throttling, then route request to handler"""
+        parsed_url = urlparse(self.path)
+        path = re.sub(r'/+', '/', unquote(parsed_url.path)).rstrip('/')
+        self.query = { key: values[0] for key, values in parse_qs(parsed_url.query).items() }
+        self.body = self._read_body()
+        self.server.record_request(method, path)
+
+        delay = self.settings.latency
+        if self.settings.latency_jitter > 0:
+            delay += self.settings.random.uniform(0, self.settings.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.settings.throttle_rate > 0 and self.settings.random.random() < self.settings.throttle_rate:
+            self.server.record_throttled()
+            self._send_error(429, 'RequestBlocked', 'Request is blocked by the upstream service until the throttle period ends',
+                             { 'Retry-After': self._format_seconds(self.settings.throttle_retry_after) })
+            return
+
+        for route_method, pattern, handler_name in self._compiled_routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match is None:
+                continue
+            try:
+                with self.state.lock:
+                    getattr(self, f'_handle_{handler_name}')(**match.groupdict())
+            except KeyError as ex:
+                self._send_error(404, 'EntityNotFound', f'Resource not found: {ex}')
+            return
+
+        self.server.record_unknown_route(method, path)
+        self._send_error(404, 'EndpointNotFound', f'Mock server does not implement {method} {path}')
+
+    @classmethod
+    def _format_seconds(cls, seconds):
+        """Format Retry-After header as whole seconds which SDK clients parse as int"""
+        # SDK pollers treat 0 as a missing header and fall back to a 30 second interval
+        return str(max(1, round(seconds)))
+
+    def _get_base_url(self):
+        """Get root URL clients used to reach this server"""
+        scheme = 'https' if self.server.certificate_file is not None else 'http'
+        return f"{scheme}://{self.headers.get('Host')}"
+
+    def _send_json(self, status_code, body = None, headers = None):
+        """Send JSON response"""
+        content = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in { 'x-ms-request-id': str(uuid.uuid4()), **(headers or {}) }.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_error(self, status_code, error_code, message, headers = None):
+        """Send Fabric-style error response"""
+        self._send_json(status_code, {
+            'errorCode': error_code,
+            'message': message,
+            'requestId': str(uuid.uuid4())
+        }, headers)
+
+    def _send_list(self, values):
+        """Send collection response with no further pages"""
+        self._send_json(200, { 'value': values, 'continuationToken': None, 'continuationUri': None })
+
+    def _send_operation(self, result = None, duration = None):
+        """Start long-running operation and send 202 ACCEPTED pointing at its status URL"""
+        if duration is None:
+            duration = self.settings.lro_duration
+        operation_id = str(uuid.uuid4())
+        self.state.operations[operation_id] = {
+            'id': operation_id,
+            'created': datetime.now(timezone.utc).isoformat(),
+            '_ready_at': time.monotonic() + duration,
+            '_result': result
+        }
+        self._send_json(202, None, {
+            'Location': f'{self._get_base_url()}/v1/operations/{operation_id}',
+            'x-ms-operation-id': operation_id,
+            'Retry-After': self._format_seconds(self.settings.retry_after)
+        })
+
+    def _get_workspace(self, workspace_id):
+        """Get workspace or raise KeyError"""
+        return self.state.workspaces[workspace_id]
+
+    def _get_item(self, workspace_id, item_id):
+        """Get item in workspace or raise KeyError"""
+        item = self.state.items[item_id]
+        if item['workspaceId'] != workspace_id:
+            raise KeyError(item_id)
+        return item
+
+    def _get_item_type(self, type_endpoint):
+        """Get item type for item-type-specific endpoint or raise KeyError"""
+        if type_endpoint is None:
+            return None
+        return MockFabricState.ITEM_TYPE_ENDPOINTS[type_endpoint.lower()]
+
+    def _format_item(self, item, include_properties = False):
+        """Get item as returned by the REST API, with lakehouse properties for item-type-specific endpoints"""
+        result = MockFabricState.public(item)
+        if include_properties and item['type'] == 'Lakehouse':
+            ready = time.monotonic() - item['_created_at'] >= self.settings.sql_endpoint_provisioning_duration
+            result['properties'] = {
+                'oneLakeTablesPath': f"https://onelake.dfs.fabric.microsoft.com/{item['workspaceId']}/{item['id']}/Tables",
+                'oneLakeFilesPath': f"https://onelake.dfs.fabric.microsoft.com/{item['workspaceId']}/{item['id']}/Files",
+                'sqlEndpointProperties': {
+                    'connectionString': f"mock-{item['workspaceId'][:8]}.datawarehouse.fabric.microsoft.com",
+                    'id': item['_sql_endpoint_id'],
+                    'provisioningStatus': 'Success' if ready else 'InProgress'
+                }
+            }
+        return result
+
+    #endregion
+
+    #region operations
+
+    def _handle_get_operation(self, operation_id):
+        operation = self.state.operations[operation_id]
+        headers = { 'Retry-After': self._format_seconds(self.settings.retry_after) }
+        if time.monotonic() < operation['_ready_at']:
+            # running operations point at themselves, which fabric-cicd follows as its next poll URL
+            headers['Location'] = f'{self._get_base_url()}/v1/operations/{operation_id}'
+            self._send_json(200, { 'status': 'Running', 'createdTimeUtc': operation['created'],
+                                   'percentComplete': None }, headers)
+            return
+        if operation['_result'] is not None:
+            headers['Location'] = f'{self._get_base_url()}/v1/operations/{operation_id}/result'
+        self._send_json(200, { 'status': 'Succeeded', 'createdTimeUtc': operation['created'],
+                               'percentComplete': 100 }, headers)
+
+    def _handle_get_operation_result(self, operation_id):
+        operation = self.state.operations[operation_id]
+        self._send_json(200, operation['_result'] if operation['_result'] is not None else {})
+
+    def _handle_accept_operation(self, **_):
+        self._send_operation()
+
+    def _handle_empty_ok(self, **_):
+        self._send_json(200)
+
+    #endregion
+
+    #region capacities, workspaces and folders
+
+    def _handle_list_capacities(self):
+        self._send_list(self.state.capacities)
+
+    def _handle_list_gateways(self):
+        self._send_list([])
+
+    def _handle_list_workspaces(self):
+        self._send_list([ MockFabricState.public(workspace) for workspace in self.state.workspaces.values() ])
+
+    def _handle_create_workspace(self):
+        display_name = self.body.get('displayName')
+        if self.state.find_by_name(self.state.workspaces, display_name) is not None:
+            self._send_error(409, 'WorkspaceNameAlreadyExists', f'Workspace [{display_name}] already exists')
+            return
+        workspace = {
+            'id': str(uuid.uuid4()),
+            'displayName': display_name,
+            'description': self.body.get('description', ''),
+            'type': 'Workspace',
+            '_role_assignments': []
+        }
+        if self.body.get('capacityId'):
+            workspace['capacityId'] = self.body['capacityId']
+        self.state.workspaces[workspace['id']] = workspace
+        self._send_json(201, MockFabricState.public(workspace))
+
+    def _handle_get_workspace(self, workspace_id):
+        self._send_json(200, MockFabricState.public(self._get_workspace(workspace_id)))
+
+    def _handle_update_workspace(self, workspace_id):
+        workspace = self._get_workspace(workspace_id)
+        for field in [ 'displayName', 'description' ]:
+            if field in self.body:
+                workspace[field] = self.body[field]
+        self._send_json(200, MockFabricState.public(workspace))
+
+    def _handle_delete_workspace(self, workspace_id):
+        self._get_workspace(workspace_id)
+        self.state.delete_workspace(workspace_id)
+        self._send_json(200)
+
+    def _handle_list_role_assignments(self, workspace_id):
+        self._send_list(self._get_workspace(workspace_id)['_role_assignments'])
+
+    def _handle_add_role_assignment(self, workspace_id = None, connection_id = None, pipeline_id = None):
+        role_assignment = { 'id': str(uuid.uuid4()), **self.body }
+        if workspace_id is not None:
+            self._get_workspace(workspace_id)['_role_assignments'].append(role_assignment)
+        # deployment pipelines answer 200 OK where workspaces and connections answer 201 CREATED
+        self._send_json(200 if pipeline_id is not None else 201, role_assignment)
+
+    def _handle_assign_to_capacity(self, workspace_id):
+        self._get_workspace(workspace_id)['capacityId'] = self.body.get('capacityId')
+        self._send_operation()
+
+    def _handle_provision_identity(self, workspace_id):
+        workspace = self._get_workspace(workspace_id)
+        workspace['workspaceIdentity'] = {
+            'applicationId': str(uuid.uuid4()),
+            'servicePrincipalId': str(uuid.uuid4())
+        }
+        self._send_operation(workspace['workspaceIdentity'])
+
+    def _handle_deprovision_identity(self, workspace_id):
+        self._get_workspace(workspace_id).pop('workspaceIdentity', None)
+        self._send_operation()
+
+    def _handle_list_folders(self, workspace_id):
+        self._get_workspace(workspace_id)
+        self._send_list([ folder for folder in self.state.folders.values()
+                          if folder['workspaceId'] == workspace_id ])
+
+    def _handle_create_folder(self, workspace_id):
+        self._get_workspace(workspace_id)
+        folder = self.state.create_folder(workspace_id, self.body.get('displayName'),
+                                          self.body.get('parentFolderId'))
+        self._send_json(201, folder)
+
+    def _handle_delete_folder(self, workspace_id, folder_id):
+        if self.state.folders[folder_id]['workspaceId'] != workspace_id:
+            raise KeyError(folder_id)
+        del self.state.folders[folder_id]
+        self._send_json(200)
+
+    #endregion
+
+    #region items
+
+    def _handle_list_items(self, workspace_id, type_endpoint = None):
+        self._get_workspace(workspace_id)
+        item_type = self._get_item_type(type_endpoint) or self.query.get('type')
+        self._send_list([ self._format_item(item, type_endpoint is not None) for item in self.state.items.values()
+                          if item['workspaceId'] == workspace_id and
+                             (item_type is None or item['type'] == item_type) ])
+
+    def _handle_create_item(self, workspace_id, type_endpoint = None):
+        self._get_workspace(workspace_id)
+        item_type = self._get_item_type(type_endpoint) or self.body.get('type')
+        display_name = self.body.get('displayName')
+        if self.state.find_by_name(self.state.items, display_name,
+                                   workspaceId=workspace_id, type=item_type) is not None:
+            self._send_error(400, 'ItemDisplayNameAlreadyInUse',
+                             f'Requested [{display_name}] is already in use')
+            return
+
+        item = self.state.create_item(workspace_id, item_type, display_name,
+                                      self.body.get('description'),
+                                      # fabric-cicd sends an empty folder id for items at the workspace root
+                                      self.body.get('folderId') or None,
+                                      self.body.get('definition'))
+        # items created with a definition are provisioned as long-running operations
+        if self.body.get('definition') is not None:
+            self._send_operation(self._format_item(item))
+        else:
+            self._send_json(201, self._format_item(item))
+
+    def _handle_get_item(self, workspace_id, item_id, type_endpoint = None):
+        self._get_item_type(type_endpoint)
+        self._send_json(200, self._format_item(self._get_item(workspace_id, item_id), type_endpoint is not None))
+
+    def _handle_update_item(self, workspace_id, item_id, type_endpoint = None):
+        self._get_item_type(type_endpoint)
+        item = self._get_item(workspace_id, item_id)
+        for field in [ 'displayName', 'description' ]:
+            if field in self.body:
+                item[field] = self.body[field]
+        self._send_json(200, self._format_item(item))
+
+    def _handle_delete_item(self, workspace_id, item_id, type_endpoint = None):
+        self._get_item_type(type_endpoint)
+        self._get_item(workspace_id, item_id)
+        del self.state.items[item_id]
+        self._send_json(200)
+
+    def _handle_get_item_definition(self, workspace_id, item_id):
+        item = self._get_item(workspace_id, item_id)
+        self._send_operation({ 'definition': item['_definition'] })
+
+    def _handle_update_item_definition(self, workspace_id, item_id):
+        item = self._get_item(workspace_id, item_id)
+        item['_definition'] = self.body.get('definition', item['_definition'])
+        self._send_operation()
+
+    def _handle_bulk_export(self, workspace_id):
+        self._get_workspace(workspace_id)
+        index = []
+        parts = []
+        for item in self.state.items.values():
+            if item['workspaceId'] != workspace_id or item['type'] == 'SQLEndpoint':
+                continue
+            folder_path = self.state.get_folder_path(item.get('folderId'))
+            root_folder = '/' + '/'.join(filter(None, [ folder_path, f"{item['displayName']}.{item['type']}" ]))
+            index.append({ 'id': item['id'], 'type': item['type'], 'displayName': item['displayName'],
+                           'rootFolder': root_folder })
+            for part in item['_definition'].get('parts', []):
+                parts.append({ **part, 'path': f"{root_folder}/{part['path']}" })
+        self._send_operation({ 'itemDefinitionsIndex': index, 'definitionParts': parts })
+
+    def _handle_bulk_import(self, workspace_id):
+        self._get_workspace(workspace_id)
+        parts_by_item = {}
+        for part in self.body.get('definitionParts', []):
+            segments = part['path'].strip('/').split('/')
+            # the item folder is the first path segment named like 'display name.ItemType'
+            index = next(i for i, segment in enumerate(segments) if re.match(r'^.+\.[A-Za-z]+$', segment) and
+                         i < len(segments) - 1)
+            item_key = '/'.join(segments[:index + 1])
+            parts_by_item.setdefault(item_key, []).append({ **part, 'path': '/'.join(segments[index + 1:]) })
+
+        results = []
+        for item_key, parts in parts_by_item.items():
+            segments = item_key.split('/')
+            display_name, item_type = segments[-1].rsplit('.', 1)
+            folder_id = self.state.get_or_create_folder_path(workspace_id, '/'.join(segments[:-1]))
+            item = self.state.find_by_name(self.state.items, display_name, workspaceId=workspace_id, type=item_type)
+            if item is None:
+                item = self.state.create_item(workspace_id, item_type, display_name, folder_id=folder_id)
+            item['_definition'] = { 'parts': parts }
+            results.append({ 'id': item['id'], 'type': item_type, 'displayName': display_name,
+                             'rootFolder': '/' + item_key })
+        self._send_operation({ 'itemDefinitionsIndex': results })
+
+    #endregion
+
+    #region lakehouses, shortcuts and SQL endpoints
+
+    def _handle_list_shortcuts(self, workspace_id, item_id):
+        self._send_list(self._get_item(workspace_id, item_id).get('_shortcuts', []))
+
+    def _handle_create_shortcut(self, workspace_id, item_id):
+        item = self._get_item(workspace_id, item_id)
+        shortcuts = item.setdefault('_shortcuts', [])
+        shortcut = { 'name': self.body.get('name'), 'path': self.body.get('path'), 'target': self.body.get('target') }
+        shortcuts[:] = [ existing for existing in shortcuts
+                         if (existing['name'], existing['path']) != (shortcut['name'], shortcut['path']) ]
+        shortcuts.append(shortcut)
+        self._send_json(201, shortcut)
+
+    def _handle_refresh_sql_endpoint_metadata(self, workspace_id, item_id):
+        self._get_item(workspace_id, item_id)
+        self._send_operation({ 'value': [] })
+
+    #endregion
+
+    #region jobs
+
+    def _handle_start_job(self, workspace_id, item_id, job_type = None):
+        self._get_item(workspace_id, item_id)
+        job_id = str(uuid.uuid4())
+        failed = self.settings.job_failure_rate > 0 and \
+                 self.settings.random.random() < self.settings.job_failure_rate
+        self.state.jobs[job_id] = {
+            'id': job_id,
+            'itemId': item_id,
+            'jobType': job_type or self.query.get('jobType'),
+            'invokeType': 'Manual',
+            'rootActivityId': str(uuid.uuid4()),
+            'startTimeUtc': datetime.now(timezone.utc).isoformat(),
+            '_ready_at': time.monotonic() + self.settings.job_duration,
+            '_failed': failed
+        }
+        self._send_json(202, None, {
+            'Location': f'{self._get_base_url()}/v1/workspaces/{workspace_id}/items/{item_id}/jobs/instances/{job_id}',
+            'Retry-After': self._format_seconds(self.settings.retry_after)
+        })
+
+    def _handle_get_job(self, workspace_id, item_id, job_id):
+        self._get_item(workspace_id, item_id)
+        job = self.state.jobs[job_id]
+        result = MockFabricState.public(job)
+        if time.monotonic() < job['_ready_at']:
+            result.update({ 'status': 'InProgress', 'endTimeUtc': None, 'failureReason': None })
+        elif job['_failed']:
+            result.update({ 'status': 'Failed', 'endTimeUtc': datetime.now(timezone.utc).isoformat(),
+                            'failureReason': { 'errorCode': 'JobFailed', 'message': 'Simulated job failure' } })
+        else:
+            result.update({ 'status': 'Completed', 'endTimeUtc': datetime.now(timezone.utc).isoformat(),
+                            'failureReason': None })
+        self._send_json(200, result, { 'Retry-After': self._format_seconds(self.settings.retry_after) })
+
+    #endregion
+
+    #region git
+
+    def _handle_get_git_connection(self, workspace_id):
+        git = self._get_workspace(workspace_id).get('_git')
+        if git is None:
+            self._send_json(200, { 'gitConnectionState': 'NotConnected' })
+            return
+        self._send_json(200, { 'gitConnectionState': git['state'],
+                               'gitProviderDetails': git['gitProviderDetails'],
+                               'gitSyncDetails': { 'head': git['head'], 'lastSyncTime': git['lastSyncTime'] } })
+
+    def _get_git_repository(self, git_provider_details):
+        """Get Azure DevOps or GitHub repository workspace is connected to"""
+        provider = git_provider_details.get('gitProviderType')
+        owner = git_provider_details.get('projectName') if provider == 'AzureDevOps' \
+                else git_provider_details.get('ownerName')
+        return self.state.find_repository(provider, owner, git_provider_details.get('repositoryName'))
+
+    def _get_git_items(self, git):
+        """Get item folders in the branch and directory workspace is connected to"""
+        details = git['gitProviderDetails']
+        return self.state.get_git_items(self._get_git_repository(details), details['branchName'],
+                                        details.get('directoryName'))
+
+    def _get_remote_commit_hash(self, git):
+        """Get head commit of branch workspace is connected to"""
+        details = git['gitProviderDetails']
+        return self._get_git_repository(details)['_branches'].get(details['branchName'])
+
+    @classmethod
+    def _get_git_change_type(cls, synced_files, files):
+        """Compare item folder with its content at last sync"""
+        if synced_files == files:
+            return None
+        if synced_files is None:
+            return 'Added'
+        return 'Deleted' if files is None else 'Modified'
+
+    def _get_git_changes(self, workspace_id, git):
+        """Get items changed in workspace or branch since last sync"""
+        workspace_items = self.state.get_workspace_git_items(workspace_id)
+        remote_items = self._get_git_items(git)
+        changes = []
+        for root_folder in sorted(set(workspace_items) | set(remote_items)):
+            workspace_change = self._get_git_change_type(git['_synced'].get(root_folder),
+                                                         workspace_items.get(root_folder))
+            remote_change = self._get_git_change_type(git['_synced'].get(root_folder),
+                                                      remote_items.get(root_folder))
+            if workspace_change is None and remote_change is None:
+                continue
+            display_name, item_type = root_folder.rpartition('/')[2].rsplit('.', 1)
+            item = self.state.find_by_name(self.state.items, display_name, workspaceId=workspace_id, type=item_type)
+            conflict = workspace_change is not None and remote_change is not None and \
+                       workspace_items.get(root_folder) != remote_items.get(root_folder)
+            changes.append({
+                'itemMetadata': {
+                    'itemIdentifier': { 'objectId': item['id'] if item is not None else None,
+                                        'logicalId': item.get('_logical_id') if item is not None else None },
+                    'itemType': item_type,
+                    'displayName': display_name
+                },
+                'workspaceChange': workspace_change,
+                'remoteChange': remote_change,
+                'conflictType': 'Conflict' if conflict else 'None'
+            })
+        return changes
+
+    def _handle_get_git_status(self, workspace_id):
+        git = self._get_workspace(workspace_id).get('_git')
+        if git is None:
+            self._send_error(400, 'WorkspaceNotConnectedToGit', 'Workspace is not connected to git')
+            return
+        self._send_operation({ 'workspaceHead': git['head'], 'remoteCommitHash': self._get_remote_commit_hash(git),
+                               'changes': self._get_git_changes(workspace_id, git) }, duration=0)
+
+    def _handle_connect_git(self, workspace_id):
+        workspace = self._get_workspace(workspace_id)
+        details = self.body.get('gitProviderDetails') or {}
+        repository = self._get_git_repository(details)
+        if repository is None or details.get('branchName') not in repository['_branches']:
+            self._send_error(400, 'GitProviderResourceNotFound',
+                             f"Repository [{details.get('repositoryName')}] or branch " + \
+                             f"[{details.get('branchName')}] does not exist")
+            return
+        workspace['_git'] = {
+            'state': 'Connected',
+            'gitProviderDetails': details,
+            'head': None,
+            'lastSyncTime': None,
+            '_synced': {}
+        }
+        self._send_json(200)
+
+    def _handle_disconnect_git(self, workspace_id):
+        self._get_workspace(workspace_id).pop('_git', None)
+        self._send_json(200)
+
+    def _handle_initialize_git_connection(self, workspace_id):
+        git = self._get_workspace(workspace_id)['_git']
+        git['state'] = 'ConnectedAndInitialized'
+        has_workspace_items = len(self.state.get_workspace_git_items(workspace_id)) > 0
+        has_remote_items = len(self._get_git_items(git)) > 0
+        prefer_remote = self.body.get('initializationStrategy') == 'PreferRemote'
+        if has_workspace_items and (not has_remote_items or not prefer_remote):
+            required_action = 'CommitToGit'
+        elif has_remote_items:
+            required_action = 'UpdateFromGit'
+        else:
+            required_action = 'None'
+        git['head'] = uuid.uuid4().hex
+        self._send_operation({ 'requiredAction': required_action, 'workspaceHead': git['head'],
+                               'remoteCommitHash': self._get_remote_commit_hash(git) })
+
+    def _complete_git_sync(self, git, git_items):
+        """Record item folders both sides hold after commit or update"""
+        git['_synced'] = git_items
+        git['head'] = uuid.uuid4().hex
+        git['lastSyncTime'] = datetime.now(timezone.utc).isoformat()
+
+    def _handle_commit_to_git(self, workspace_id):
+        git = self._get_workspace(workspace_id)['_git']
+        details = git['gitProviderDetails']
+        prefix = MockFabricState.get_git_prefix(details.get('directoryName'))
+        workspace_items = self.state.get_workspace_git_items(workspace_id)
+        changes = {}
+        for root_folder, files in self._get_git_items(git).items():
+            for path in files:
+                changes[f'{prefix}{root_folder}/{path}'] = None
+        for root_folder, files in workspace_items.items():
+            for path, content in files.items():
+                changes[f'{prefix}{root_folder}/{path}'] = content
+        self.state.commit_files(self._get_git_repository(details), details['branchName'], changes,
+                                self.body.get('comment') or 'Committed from Fabric workspace')
+        self._complete_git_sync(git, workspace_items)
+        self._send_operation()
+
+    def _handle_update_from_git(self, workspace_id):
+        git = self._get_workspace(workspace_id)['_git']
+        workspace_items = self.state.get_workspace_git_items(workspace_id)
+        remote_items = self._get_git_items(git)
+        for root_folder, files in remote_items.items():
+            if workspace_items.get(root_folder) != files:
+                self.state.import_git_item(workspace_id, root_folder, files)
+        self._complete_git_sync(git, remote_items)
+        self._send_operation()
+
+    def _handle_get_git_credentials(self, workspace_id):
+        workspace = self._get_workspace(workspace_id)
+        self._send_json(200, workspace.get('_git_credentials', { 'source': 'None' }))
+
+    def _handle_update_git_credentials(self, workspace_id):
+        workspace = self._get_workspace(workspace_id)
+        workspace['_git_credentials'] = self.body
+        self._send_json(200, self.body)
+
+    #endregion
+
+    #region connections
+
+    def _handle_list_connections(self):
+        self._send_list([ MockFabricState.public(connection) for connection in self.state.connections.values() ])
+
+    def _handle_create_connection(self):
+        display_name = self.body.get('displayName')
+        if display_name is not None and \
+           self.state.find_by_name(self.state.connections, display_name) is not None:
+            self._send_error(409, 'DuplicateConnectionName', f'Connection [{display_name}] already exists')
+            return
+        connection_details = self.body.get('connectionDetails', {})
+        parameters = connection_details.get('parameters', [])
+        connection = {
+            'id': str(uuid.uuid4()),
+            'displayName': display_name,
+            'connectivityType': self.body.get('connectivityType', 'ShareableCloud'),
+            'connectionDetails': {
+                'type': connection_details.get('type'),
+                'path': ';'.join(str(parameter.get('value')) for parameter in parameters)
+            },
+            'privacyLevel': self.body.get('privacyLevel', 'Organizational'),
+            'credentialDetails': {
+                'credentialType': self.body.get('credentialDetails', {}).get('credentials', {}).get('credentialType'),
+                'singleSignOnType': 'None',
+                'connectionEncryption': 'NotEncrypted',
+                'skipTestConnection': False
+            }
+        }
+        self.state.connections[connection['id']] = connection
+        self._send_json(201, connection)
+
+    def _handle_list_supported_connection_types(self):
+        self._send_list([
+            { 'type': connection_type, 'creationMethods': [], 'supportedCredentialTypes': [],
+              'supportedConnectionEncryptionTypes': [], 'supportsSkipTestConnection': True }
+            for connection_type in [ 'SQL', 'AzureDataLakeStorage', 'Web', 'AzureDevOpsSourceControl',
+                                     'GitHubSourceControl' ]
+        ])
+
+    def _handle_get_connection(self, connection_id):
+        self._send_json(200, self.state.connections[connection_id])
+
+    def _handle_delete_connection(self, connection_id):
+        del self.state.connections[connection_id]
+        self._send_json(200)
+
+    #endregion
+
+    #region deployment pipelines
+
+    def _handle_list_deployment_pipelines(self):
+        self._send_list([ MockFabricState.public(pipeline)
+                          for pipeline in self.state.deployment_pipelines.values() ])
+
+    def _handle_create_deployment_pipeline(self):
+        pipeline = {
+            'id': str(uuid.uuid4()),
+            'displayName': self.body.get('displayName'),
+            'description': self.body.get('description', ''),
+            '_stages': []
+        }
+        for order, stage in enumerate(self.body.get('stages', [])):
+            pipeline['_stages'].append({
+                'id': str(uuid.uuid4()),
+                'order': order,
+                'displayName': stage.get('displayName'),
+                'description': stage.get('description', ''),
+                'isPublic': stage.get('isPublic', False)
+            })
+        self.state.deployment_pipelines[pipeline['id']] = pipeline
+        self._send_json(201, { **MockFabricState.public(pipeline), 'stages': pipeline['_stages'] })
+
+    def _handle_get_deployment_pipeline(self, pipeline_id):
+        self._send_json(200, MockFabricState.public(self.state.deployment_pipelines[pipeline_id]))
+
+    def _handle_delete_deployment_pipeline(self, pipeline_id):
+        del self.state.deployment_pipelines[pipeline_id]
+        self._send_json(200)
+
+    def _handle_list_deployment_pipeline_stages(self, pipeline_id):
+        self._send_list(self.state.deployment_pipelines[pipeline_id]['_stages'])
+
+    def _get_stage(self, pipeline_id, stage_id):
+        """Get deployment pipeline stage or raise KeyError"""
+        for stage in self.state.deployment_pipelines[pipeline_id]['_stages']:
+            if stage['id'] == stage_id:
+                return stage
+        raise KeyError(stage_id)
+
+    def _handle_assign_workspace_to_stage(self, pipeline_id, stage_id):
+        stage = self._get_stage(pipeline_id, stage_id)
+        workspace = self._get_workspace(self.body.get('workspaceId'))
+        stage['workspaceId'] = workspace['id']
+        stage['workspaceName'] = workspace['displayName']
+        self._send_json(200)
+
+    def _handle_unassign_workspace_from_stage(self, pipeline_id, stage_id):
+        stage = self._get_stage(pipeline_id, stage_id)
+        stage.pop('workspaceId', None)
+        stage.pop('workspaceName', None)
+        self._send_json(200)
+
+    def _handle_deploy_stage_content(self, pipeline_id):
+        source_stage = self._get_stage(pipeline_id, self.body.get('sourceStageId'))
+        target_stage = self._get_stage(pipeline_id, self.body.get('targetStageId'))
+        source_workspace_id = source_stage.get('workspaceId')
+        target_workspace_id = target_stage.get('workspaceId')
+        if source_workspace_id is None or target_workspace_id is None:
+            self._send_error(400, 'StageNotAssigned', 'Both stages must be assigned to workspaces')
+            return
+
+        for item in list(self.state.items.values()):
+            if item['workspaceId'] != source_workspace_id or item['type'] == 'SQLEndpoint':
+                continue
+            target_item = self.state.find_by_name(self.state.items, item['displayName'],
+                                                  workspaceId=target_workspace_id, type=item['type'])
+            if target_item is None:
+                folder_id = None
+                if item.get('folderId') is not None:
+                    folder_id = self.state.get_or_create_folder_path(
+                        target_workspace_id, self.state.get_folder_path(item['folderId']))
+                target_item = self.state.create_item(target_workspace_id, item['type'], item['displayName'],
+                                                     item['description'], folder_id)
+            target_item['_definition'] = json.loads(json.dumps(item['_definition']))
+        self._send_operation()
+
+    #endregion
+
+    #region Power BI datasets
+
+    # data source functions found in semantic model expressions and partitions
+    DATASOURCE_PATTERNS = [
+        ('Sql', re.compile(r'Sql\.Database\(\s*"(?P<server>[^"]+)"\s*,\s*"(?P<database>[^"]+)"')),
+        ('AzureDataLakeStorage', re.compile(r'AzureStorage\.DataLake\(\s*"(?P<url>https://[^/"]+)(?P<path>[^"]*)"')),
+        ('Web', re.compile(r'Web\.Contents\(\s*"(?P<url>[^"]+)"'))
+    ]
+
+    # text parameters like 'expression AZURE_STORAGE_ROOT = "https://..." meta [IsParameterQuery = true]'
+    PARAMETER_PATTERN = re.compile(
+        r'expression\s+(?P<name>\w+)\s*=\s*"(?P<value>[^"]*)"\s*meta\s*\[[^\]]*IsParameterQuery\s*=\s*true')
+
+    @classmethod
+    def _resolve_parameters(cls, contents):
+        """Replace parameter names passed to data source functions with their quoted values"""
+        parameters = { match.group('name'): match.group('value')
+                       for content in contents for match in cls.PARAMETER_PATTERN.finditer(content) }
+        resolved_contents = []
+        for content in contents:
+            for name, value in parameters.items():
+                content = re.sub(rf'([(,]\s*){name}(?=\s*[,)])',
+                                 lambda match: f'{match.group(1)}"{value}"', content)
+            resolved_contents.append(content)
+        return resolved_contents
+
+    def _handle_list_datasources(self, workspace_id, item_id):
+        item = self._get_item(workspace_id, item_id)
+        contents = []
+        for part in item['_definition'].get('parts', []):
+            try:
+                contents.append(base64.b64decode(part.get('payload', '')).decode('utf-8'))
+            except (ValueError, UnicodeDecodeError):
+                continue
+        datasources = []
+        # the service evaluates parameters such as AzureStorage.DataLake(AZURE_STORAGE_ROOT)
+        for content in self._resolve_parameters(contents):
+            for datasource_type, pattern in self.DATASOURCE_PATTERNS:
+                for match in pattern.finditer(content):
+                    details = match.groupdict()
+                    if datasource_type == 'AzureDataLakeStorage':
+                        details = { 'server': details['url'], 'path': details['path'] }
+                    datasource = { 'datasourceType': datasource_type, 'connectionDetails': details,
+                                   'datasourceId': str(uuid.uuid5(uuid.NAMESPACE_URL, json.dumps(details))),
+                                   'gatewayId': str(uuid.UUID(int=0)) }
+                    if datasource not in datasources:
+                        datasources.append(datasource)
+        self._send_json(200, { 'value': datasources })
+
+    def _handle_bind_to_gateway(self, workspace_id, item_id):
+        self._get_item(workspace_id, item_id)['_bound_datasources'] = self.body.get('datasourceObjectIds', [])
+        self._send_json(200)
+
+    def _handle_start_refresh(self, workspace_id, item_id):
+        self._get_item(workspace_id, item_id)
+        refresh_id = str(uuid.uuid4())
+        self.state.refreshes[refresh_id] = {
+            'requestId': refresh_id,
+            'id': len(self.state.refreshes) + 1,
+            'refreshType': 'ViaEnhancedApi',
+            'startTime': datetime.now(timezone.utc).isoformat(),
+            '_item_id': item_id,
+            '_ready_at': time.monotonic() + self.settings.refresh_duration
+        }
+        self._send_json(202, None, { 'x-ms-request-id': refresh_id,
+                                     'Location': f'{self._get_base_url()}/v1.0/myorg/groups/{workspace_id}' + \
+                                                 f'/datasets/{item_id}/refreshes/{refresh_id}' })
+
+    def _handle_get_refresh(self, workspace_id, item_id, refresh_id):
+        self._get_item(workspace_id, item_id)
+        refresh = self.state.refreshes[refresh_id]
+        if time.monotonic() < refresh['_ready_at']:
+            self._send_json(202, { 'extendedStatus': 'InProgress' })
+            return
+        self._send_json(200, { **MockFabricState.public(refresh), 'status': 'Completed',
+                               'extendedStatus': 'Completed',
+                               'endTime': datetime.now(timezone.utc).isoformat() })
+
+    def _handle_list_refreshes(self, workspace_id, item_id):
+        self._get_item(workspace_id, item_id)
+        self._send_json(200, { 'value': [ MockFabricState.public(refresh)
+                                          for refresh in self.state.refreshes.values()
+                                          if refresh['_item_id'] == item_id ] })
+
+    #endregion
+
+    #region Azure DevOps
+
+    # object id Azure DevOps uses for missing refs
+    ADO_EMPTY_OBJECT_ID = '0' * 40
+
+    def _send_ado_list(self, values):
+        """Send Azure DevOps collection response"""
+        self._send_json(200, { 'count': len(values), 'value': values })
+
+    def _send_ado_operation(self, organization):
+        """Start Azure DevOps operation and send 202 ACCEPTED with operation reference"""
+        operation_id = str(uuid.uuid4())
+        self.state.operations[operation_id] = {
+            'id': operation_id,
+            'created': datetime.now(timezone.utc).isoformat(),
+            '_ready_at': time.monotonic() + self.settings.lro_duration,
+            '_result': None
+        }
+        self._send_json(202, { 'id': operation_id, 'status': 'queued',
+                               'url': f'{self._get_base_url()}/ado/{organization}/_apis/operations/{operation_id}' })
+
+    def _get_ado_project(self, project_name):
+        """Get Azure DevOps project by name or id or raise KeyError"""
+        for project in self.state.ado_projects.values():
+            if project_name in (project['name'], project['id']):
+                return project
+        raise KeyError(project_name)
+
+    def _get_ado_repository(self, repository_id):
+        """Get Azure DevOps repository or raise KeyError"""
+        repository = self.state.repositories[repository_id]
+        if repository['_provider'] != 'AzureDevOps':
+            raise KeyError(repository_id)
+        return repository
+
+    def _format_ado_repository(self, repository):
+        """Get repository as returned by the Azure DevOps REST API"""
+        project = self._get_ado_project(repository['_owner'])
+        result = {
+            'id': repository['id'],
+            'name': repository['name'],
+            'project': MockFabricState.public(project),
+            'remoteUrl': f"https://dev.azure.com/{project['_organization']}/{project['name']}/_git/{repository['name']}",
+            'size': 0
+        }
+        if repository['defaultBranch'] is not None:
+            result['defaultBranch'] = f"refs/heads/{repository['defaultBranch']}"
+        return result
+
+    @classmethod
+    def _get_branch_name(cls, ref_name):
+        """Get branch name of ref like 'refs/heads/main'"""
+        return ref_name.removeprefix('refs/heads/')
+
+    def _handle_list_ado_projects(self, organization):
+        self._send_ado_list([ MockFabricState.public(project) for project in self.state.ado_projects.values()
+                              if project['_organization'] == organization ])
+
+    def _handle_create_ado_project(self, organization):
+        name = self.body.get('name')
+        if any(project['name'] == name for project in self.state.ado_projects.values()):
+            self._send_error(409, 'ProjectAlreadyExistsException', f'Project [{name}] already exists')
+            return
+        project = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'description': self.body.get('description', ''),
+            'state': 'wellFormed',
+            'visibility': self.body.get('visibility', 'private'),
+            'revision': 1,
+            '_organization': organization
+        }
+        self.state.ado_projects[project['id']] = project
+        # Azure DevOps creates an empty repository named after each new project
+        self.state.create_repository('AzureDevOps', name, name)
+        self._send_ado_operation(organization)
+
+    def _handle_delete_ado_project(self, organization, project_id):
+        project = self._get_ado_project(project_id)
+        del self.state.ado_projects[project['id']]
+        for repository_id in [ repository['id'] for repository in self.state.repositories.values()
+                               if (repository['_provider'], repository['_owner']) == ('AzureDevOps', project['name']) ]:
+            del self.state.repositories[repository_id]
+        self._send_ado_operation(organization)
+
+    def _handle_get_ado_operation(self, organization, operation_id):
+        operation = self.state.operations[operation_id]
+        status = 'inProgress' if time.monotonic() < operation['_ready_at'] else 'succeeded'
+        self._send_json(200, { 'id': operation_id, 'status': status,
+                               'url': f'{self._get_base_url()}/ado/{organization}/_apis/operations/{operation_id}' })
+
+    def _handle_list_ado_repositories(self, organization, project_name):
+        project = self._get_ado_project(project_name)
+        self._send_ado_list([ self._format_ado_repository(repository)
+                              for repository in self.state.repositories.values()
+                              if (repository['_provider'], repository['_owner']) == ('AzureDevOps', project['name']) ])
+
+    def _handle_update_ado_repository(self, organization, repository_id, project_name = None):
+        repository = self._get_ado_repository(repository_id)
+        if self.body.get('defaultBranch'):
+            repository['defaultBranch'] = self._get_branch_name(self.body['defaultBranch'])
+        self._send_json(200, self._format_ado_repository(repository))
+
+    def _handle_list_ado_refs(self, organization, repository_id, project_name = None):
+        repository = self._get_ado_repository(repository_id)
+        ref_filter = self.query.get('filter', '')
+        self._send_ado_list([ { 'name': f'refs/heads/{branch}', 'objectId': commit_id }
+                              for branch, commit_id in sorted(repository['_branches'].items())
+                              if f'heads/{branch}'.startswith(ref_filter) ])
+
+    def _handle_update_ado_refs(self, organization, repository_id, project_name = None):
+        repository = self._get_ado_repository(repository_id)
+        results = []
+        for ref_update in self.body:
+            branch = self._get_branch_name(ref_update['name'])
+            if ref_update['newObjectId'] == self.ADO_EMPTY_OBJECT_ID:
+                repository['_branches'].pop(branch, None)
+            else:
+                repository['_commits'][ref_update['newObjectId']]
+                repository['_branches'][branch] = ref_update['newObjectId']
+            results.append({ **ref_update, 'success': True, 'updateStatus': 'succeeded' })
+        self._send_ado_list(results)
+
+    def _handle_create_ado_push(self, organization, repository_id, project_name = None):
+        repository = self._get_ado_repository(repository_id)
+        ref_update = self.body['refUpdates'][0]
+        branch = self._get_branch_name(ref_update['name'])
+        old_object_id = repository['_branches'].get(branch, self.ADO_EMPTY_OBJECT_ID)
+        if ref_update.get('oldObjectId') != old_object_id:
+            self._send_error(409, 'GitReferenceStaleException',
+                             f"Ref [{ref_update['name']}] has moved from [{ref_update.get('oldObjectId')}]")
+            return
+
+        commits = []
+        for commit in self.body.get('commits', []):
+            changes = {}
+            for change in commit.get('changes', []):
+                path = change['item']['path'].lstrip('/')
+                if change.get('changeType') == 'delete':
+                    changes[path] = None
+                    continue
+                content = change['newContent']['content']
+                if change['newContent'].get('contentType') != 'base64encoded':
+                    content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
+                changes[path] = content
+            commit_id = self.state.commit_files(repository, branch, changes, commit.get('comment', ''))
+            commits.append({ 'commitId': commit_id, 'comment': commit.get('comment', '') })
+        if repository['defaultBranch'] is None:
+            repository['defaultBranch'] = branch
+
+        self._send_json(201, {
+            'pushId': self.state.next_number(),
+            'commits': commits,
+            'refUpdates': [ { 'name': ref_update['name'], 'oldObjectId': old_object_id,
+                              'newObjectId': repository['_branches'][branch] } ],
+            'repository': self._format_ado_repository(repository)
+        })
+
+    def _handle_list_ado_pull_requests(self, organization, repository_id, project_name = None):
+        self._get_ado_repository(repository_id)
+        self._send_ado_list([ MockFabricState.public(pull_request) for pull_request in self.state.pull_requests.values()
+                              if pull_request['_repository_id'] == repository_id and
+                                 pull_request['status'] == 'active' ])
+
+    def _handle_create_ado_pull_request(self, organization, repository_id, project_name = None):
+        repository = self._get_ado_repository(repository_id)
+        source_branch = self._get_branch_name(self.body['sourceRefName'])
+        pull_request = {
+            'pullRequestId': self.state.next_number(),
+            'status': 'active',
+            'title': self.body.get('title'),
+            'description': self.body.get('description'),
+            'sourceRefName': self.body['sourceRefName'],
+            'targetRefName': self.body['targetRefName'],
+            'mergeStatus': 'succeeded',
+            'creationDate': datetime.now(timezone.utc).isoformat(),
+            'lastMergeSourceCommit': { 'commitId': repository['_branches'][source_branch] },
+            'repository': { 'id': repository['id'], 'name': repository['name'] },
+            'reviewers': [],
+            '_repository_id': repository['id']
+        }
+        self.state.pull_requests[pull_request['pullRequestId']] = pull_request
+        self._send_json(201, MockFabricState.public(pull_request))
+
+    def _get_ado_pull_request(self, repository_id, pull_request_id):
+        """Get pull request of repository or raise KeyError"""
+        pull_request = self.state.pull_requests[int(pull_request_id)]
+        if pull_request['_repository_id'] != repository_id:
+            raise KeyError(pull_request_id)
+        return pull_request
+
+    def _handle_get_ado_pull_request(self, organization, repository_id, pull_request_id, project_name = None):
+        self._send_json(200, MockFabricState.public(self._get_ado_pull_request(repository_id, pull_request_id)))
+
+    def _handle_update_ado_pull_request(self, organization, repository_id, pull_request_id, project_name = None):
+        repository = self._get_ado_repository(repository_id)
+        pull_request = self._get_ado_pull_request(repository_id, pull_request_id)
+        if 'completionOptions' in self.body:
+            pull_request['completionOptions'] = self.body['completionOptions']
+        if self.body.get('status') == 'completed' and pull_request['status'] == 'active':
+            source_branch = self._get_branch_name(pull_request['sourceRefName'])
+            target_branch = self._get_branch_name(pull_request['targetRefName'])
+            merge_comment = pull_request.get('completionOptions', {}).get('mergeCommitMessage') or \
+                            f"Merged PR {pull_request['pullRequestId']}: {pull_request['title']}"
+            commit_id = self.state.commit_files(
+                repository, target_branch,
+                self.state.get_branch_changes(repository, source_branch, target_branch),
+                merge_comment)
+            pull_request.update({ 'status': 'completed', 'closedDate': datetime.now(timezone.utc).isoformat(),
+                                  'lastMergeCommit': { 'commitId': commit_id } })
+        self._send_json(200, MockFabricState.public(pull_request))
+
+    def _handle_add_ado_reviewer(self, organization, repository_id, pull_request_id, reviewer_id, project_name = None):
+        pull_request = self._get_ado_pull_request(repository_id, pull_request_id)
+        reviewer = { 'id': reviewer_id, 'vote': self.body.get('vote', 0) }
+        pull_request['reviewers'].append(reviewer)
+        self._send_json(200, reviewer)
+
+    def _handle_list_ado_environments(self, organization, project_name):
+        self._send_ado_list([ MockFabricState.public(environment)
+                              for environment in self.state.devops_resources.values()
+                              if environment.get('_environment_of') == project_name ])
+
+    def _handle_create_ado_environment(self, organization, project_name):
+        self._get_ado_project(project_name)
+        environment = { 'id': self.state.next_number(), 'name': self.body.get('name'),
+                        'description': self.body.get('description', ''), '_environment_of': project_name }
+        self.state.devops_resources[environment['id']] = environment
+        self._send_json(200, MockFabricState.public(environment))
+
+    def _handle_update_ado_pipeline_permissions(self, organization, project_name, resource_type, resource_id):
+        self._send_json(200, { 'resource': { 'type': resource_type, 'id': resource_id },
+                               'pipelines': self.body.get('pipelines', []),
+                               'allPipelines': self.body.get('allPipelines') })
+
+    def _handle_list_ado_pipelines(self, organization, project_name):
+        self._send_ado_list([ MockFabricState.public(pipeline) for pipeline in self.state.pipelines.values()
+                              if pipeline['_project'] == project_name ])
+
+    def _handle_create_ado_pipeline(self, organization, project_name):
+        self._get_ado_project(project_name)
+        pipeline = { 'id': self.state.next_number(), 'name': self.body.get('name'), 'revision': 1,
+                     'folder': self.body.get('folder') or '\\', 'configuration': self.body.get('configuration'),
+                     '_project': project_name }
+        self.state.pipelines[pipeline['id']] = pipeline
+        self._send_json(200, MockFabricState.public(pipeline))
+
+    def _handle_list_ado_pipeline_runs(self, organization, project_name, pipeline_id):
+        self._send_ado_list([ MockFabricState.public(run) for run in self.state.pipeline_runs.values()
+                              if run.get('_pipeline_id') == int(pipeline_id) ])
+
+    def _handle_run_ado_pipeline(self, organization, project_name, pipeline_id):
+        pipeline = self.state.pipelines[int(pipeline_id)]
+        # the mock does not execute pipeline YAML, so runs complete as soon as they are queued
+        run = {
+            'id': self.state.next_number(),
+            'state': 'completed',
+            'result': 'succeeded',
+            'pipeline': { 'id': pipeline['id'], 'name': pipeline['name'] },
+            'resources': self.body.get('resources', {}),
+            'createdDate': datetime.now(timezone.utc).isoformat(),
+            'finishedDate': datetime.now(timezone.utc).isoformat(),
+            '_pipeline_id': pipeline['id']
+        }
+        self.state.pipeline_runs[run['id']] = run
+        self._send_json(200, MockFabricState.public(run))
+
+    def _handle_get_ado_pipeline_run(self, organization, project_name, pipeline_id, run_id):
+        run = self.state.pipeline_runs[int(run_id)]
+        if run.get('_pipeline_id') != int(pipeline_id):
+            raise KeyError(run_id)
+        self._send_json(200, MockFabricState.public(run))
+
+    def _handle_list_ado_identities(self, organization):
+        filter_value = self.query.get('filterValue', '')
+        self._send_ado_list([ { 'id': str(uuid.uuid5(uuid.NAMESPACE_URL, filter_value)),
+                                'providerDisplayName': filter_value } ])
+
+    def _handle_create_devops_resource(self, **_):
+        resource = { 'id': self.state.next_number(), **self.body }
+        self.state.devops_resources[resource['id']] = resource
+        self._send_json(201, resource)
+
+    #endregion
+
+    #region GitHub
+
+    def _get_github_repository(self, owner, repository_name):
+        """Get GitHub repository or raise KeyError"""
+        repository = self.state.find_repository('GitHub', owner, repository_name)
+        if repository is None:
+            raise KeyError(f'{owner}/{repository_name}')
+        return repository
+
+    @classmethod
+    def _format_github_repository(cls, repository):
+        """Get repository as returned by the GitHub REST API"""
+        return {
+            'id': repository['_number'],
+            'name': repository['name'],
+            'full_name': f"{repository['_owner']}/{repository['name']}",
+            'owner': { 'login': repository['_owner'] },
+            'private': repository.get('_private', False),
+            'default_branch': repository['defaultBranch'],
+            'html_url': f"https://github.com/{repository['_owner']}/{repository['name']}"
+        }
+
+    @classmethod
+    def _get_blob_sha(cls, content):
+        """Get git blob sha GitHub returns for file with base64 content"""
+        data = base64.b64decode(content)
+        return hashlib.sha1(f'blob {len(data)}\0'.encode('utf-8') + data).hexdigest()
+
+    def _send_github_error(self, status_code, message):
+        """Send GitHub-style error response"""
+        self._send_json(status_code, { 'message': message, 'status': str(status_code) })
+
+    def _handle_get_github_user(self):
+        self._send_json(200, { 'login': 'mock-user', 'id': 1, 'type': 'User' })
+
+    def _handle_list_github_repositories(self, owner):
+        self._send_json(200, [ self._format_github_repository(repository)
+                               for repository in self.state.repositories.values()
+                               if (repository['_provider'], repository['_owner']) == ('GitHub', owner) ])
+
+    def _handle_create_github_repository(self, owner):
+        name = self.body.get('name')
+        if self.state.find_repository('GitHub', owner, name) is not None:
+            self._send_github_error(422, 'Repository creation failed: name already exists on this account')
+            return
+        repository = self.state.create_repository('GitHub', owner, name)
+        repository['_number'] = self.state.next_number()
+        repository['_private'] = self.body.get('private', False)
+        if self.body.get('autoInit'):
+            readme = base64.b64encode(f'# {name}\n'.encode('utf-8')).decode('utf-8')
+            self.state.commit_files(repository, 'main', { 'README.md': readme }, 'Initial commit')
+            repository['defaultBranch'] = 'main'
+        self._send_json(201, self._format_github_repository(repository))
+
+    def _handle_get_github_repository(self, owner, repository_name):
+        self._send_json(200, self._format_github_repository(self._get_github_repository(owner, repository_name)))
+
+    def _handle_update_github_repository(self, owner, repository_name):
+        repository = self._get_github_repository(owner, repository_name)
+        if self.body.get('defaultBranch') is not None:
+            repository['_branches'][self.body['defaultBranch']]
+            repository['defaultBranch'] = self.body['defaultBranch']
+        self._send_json(200, self._format_github_repository(repository))
+
+    def _handle_delete_github_repository(self, owner, repository_name):
+        del self.state.repositories[self._get_github_repository(owner, repository_name)['id']]
+        self._send_json(204)
+
+    def _handle_list_github_branches(self, owner, repository_name):
+        repository = self._get_github_repository(owner, repository_name)
+        self._send_json(200, [ { 'name': branch, 'commit': { 'sha': commit_id }, 'protected': False }
+                               for branch, commit_id in sorted(repository['_branches'].items()) ])
+
+    def _handle_get_github_branch(self, owner, repository_name, branch):
+        repository = self._get_github_repository(owner, repository_name)
+        commit_id = repository['_branches'][branch]
+        self._send_json(200, { 'name': branch, 'protected': False,
+                               'commit': { 'sha': commit_id,
+                                           'commit': { 'message': repository['_commits'][commit_id]['message'] } } })
+
+    def _handle_create_github_ref(self, owner, repository_name):
+        repository = self._get_github_repository(owner, repository_name)
+        branch = self._get_branch_name(self.body.get('ref', ''))
+        if branch in repository['_branches']:
+            self._send_github_error(422, 'Reference already exists')
+            return
+        repository['_commits'][self.body.get('sha')]
+        repository['_branches'][branch] = self.body['sha']
+        self._send_json(201, { 'ref': self.body['ref'], 'object': { 'sha': self.body['sha'], 'type': 'commit' } })
+
+    def _handle_get_github_content(self, owner, repository_name, path):
+        repository = self._get_github_repository(owner, repository_name)
+        content = self.state.get_files(repository, self.query.get('ref') or repository['defaultBranch'])[path]
+        self._send_json(200, { 'type': 'file', 'encoding': 'base64', 'name': path.rpartition('/')[2],
+                               'path': path, 'content': content, 'sha': self._get_blob_sha(content) })
+
+    def _handle_put_github_content(self, owner, repository_name, path):
+        repository = self._get_github_repository(owner, repository_name)
+        branch = self.body.get('branch') or repository['defaultBranch']
+        existing_content = self.state.get_files(repository, branch).get(path)
+        if existing_content is not None and self.body.get('sha') is None:
+            self._send_github_error(422, 'Invalid request. "sha" wasn\'t supplied.')
+            return
+        if existing_content is not None and self.body['sha'] != self._get_blob_sha(existing_content):
+            self._send_github_error(409, f'{path} does not match {self.body["sha"]}')
+            return
+        commit_id = self.state.commit_files(repository, branch, { path: self.body['content'] },
+                                            self.body.get('message', f'Update {path}'))
+        self._send_json(200 if existing_content is not None else 201, {
+            'content': { 'name': path.rpartition('/')[2], 'path': path,
+                         'sha': self._get_blob_sha(self.body['content']) },
+            'commit': { 'sha': commit_id, 'message': self.body.get('message') }
+        })
+
+    def _handle_compare_github_branches(self, owner, repository_name, base, head):
+        repository = self._get_github_repository(owner, repository_name)
+        head_commit_id = repository['_branches'][head]
+        repository['_branches'][base]
+        changes = self.state.get_branch_changes(repository, head, base)
+        commits = [ { 'sha': head_commit_id,
+                      'commit': { 'message': repository['_commits'][head_commit_id]['message'] } } ] \
+                  if len(changes) > 0 else []
+        self._send_json(200, { 'status': 'ahead' if len(commits) > 0 else 'identical',
+                               'ahead_by': len(commits), 'behind_by': 0, 'total_commits': len(commits),
+                               'commits': commits,
+                               'files': [ { 'filename': path, 'status': 'modified' } for path in sorted(changes) ] })
+
+    def _handle_create_github_pull_request(self, owner, repository_name):
+        repository = self._get_github_repository(owner, repository_name)
+        head = self.body.get('head', '').rpartition(':')[2]
+        base = self.body.get('base')
+        if len(self.state.get_branch_changes(repository, head, base)) == 0:
+            self._send_github_error(422, f'No commits between {base} and {head}')
+            return
+        pull_request = {
+            'number': self.state.next_number(),
+            'state': 'open',
+            'title': self.body.get('title'),
+            'body': self.body.get('body'),
+            'head': { 'ref': head, 'sha': repository['_branches'][head] },
+            'base': { 'ref': base, 'sha': repository['_branches'][base] },
+            'merged': False,
+            'mergeable': True,
+            'html_url': f"https://github.com/{owner}/{repository_name}/pull/{self.state.next_number()}",
+            '_repository_id': repository['id']
+        }
+        self.state.pull_requests[pull_request['number']] = pull_request
+        self._send_json(201, MockFabricState.public(pull_request))
+
+    def _get_github_pull_request(self, owner, repository_name, number):
+        """Get pull request of repository or raise KeyError"""
+        repository = self._get_github_repository(owner, repository_name)
+        pull_request = self.state.pull_requests[int(number)]
+        if pull_request['_repository_id'] != repository['id']:
+            raise KeyError(number)
+        return repository, pull_request
+
+    def _handle_get_github_pull_request(self, owner, repository_name, number):
+        self._send_json(200, MockFabricState.public(self._get_github_pull_request(owner, repository_name, number)[1]))
+
+    def _handle_merge_github_pull_request(self, owner, repository_name, number):
+        repository, pull_request = self._get_github_pull_request(owner, repository_name, number)
+        if pull_request['merged']:
+            self._send_github_error(405, 'Pull Request is not mergeable')
+            return
+        head = pull_request['head']['ref']
+        base = pull_request['base']['ref']
+        commit_id = self.state.commit_files(repository, base, self.state.get_branch_changes(repository, head, base),
+                                            self.body.get('commitTitle') or f"Merge pull request #{number}")
+        pull_request.update({ 'merged': True, 'mergeable': None, 'state': 'closed' })
+        self._send_json(200, { 'sha': commit_id, 'merged': True, 'message': 'Pull Request successfully merged' })
+
+    def _handle_get_github_public_key(self, owner, repository_name = None):
+        if repository_name is not None:
+            self._get_github_repository(owner, repository_name)
+        self._send_json(200, { 'key_id': '1', 'key': self.state.github_public_key })
+
+    def _handle_put_github_resource(self, owner, name, repository_name = None):
+        if repository_name is not None:
+            self._get_github_repository(owner, repository_name)
+        resource = { 'id': self.state.next_number(), 'name': name, **self.body }
+        self.state.devops_resources[resource['id']] = resource
+        self._send_json(201, resource)
+
+    def _handle_run_github_workflow(self, owner, repository_name, workflow):
+        repository = self._get_github_repository(owner, repository_name)
+        branch = self.body.get('ref')
+        repository['_branches'][branch]
+        # the mock does not execute workflow YAML, so runs complete as soon as they are dispatched
+        run = {
+            'id': self.state.next_number(),
+            'name': workflow,
+            'head_branch': branch,
+            'status': 'completed',
+            'conclusion': 'success',
+            'html_url': f'https://github.com/{owner}/{repository_name}/actions/runs/{workflow}'
+        }
+        run['html_url'] = f"https://github.com/{owner}/{repository_name}/actions/runs/{run['id']}"
+        self.state.pipeline_runs[run['id']] = run
+        if not self.body.get('returnRunDetails'):
+            self._send_json(204)
+            return
+        self._send_json(200, { 'workflow_run_id': run['id'], 'html_url': run['html_url'],
+                               'run_url': f"{self._get_base_url()}/github/repos/{owner}/{repository_name}" + \
+                                          f"/actions/runs/{run['id']}" })
+
+    def _handle_get_github_workflow_run(self, owner, repository_name, run_id):
+        self._get_github_repository(owner, repository_name)
+        self._send_json(200, self.state.pipeline_runs[int(run_id)])
+
+    #endregion
+
+class MockFabricServer(ThreadingHTTPServer):
+    """Threaded HTTP server which serves the Fabric and Power BI REST APIs from in-memory state"""
+
+    daemon_threads = True
+
+    # one HTTP thread per pooled client connection
+    request_queue_size = 128
+
+    def __init__(self, host = '127.0.0.1', port = 0, settings = None, capacity_id = None, use_tls = False):
+        super().__init__((host, port), MockFabricRequestHandler)
+        self.settings = settings if settings is not None else MockFabricSettings()
+        self.state = MockFabricState(capacity_id or os.getenv('FABRIC_CAPACITY_ID'))
+        self.request_counts = {}
+        self.unknown_routes = {}
+        self.throttled_count = 0
+        self._counts_lock = threading.Lock()
+        self._thread = None
+        self._certificate_folder = None
+        # PEM file clients must trust when the server runs with TLS
+        self.certificate_file = None
+        if use_tls:
+            self._enable_tls(host)
+
+    def _enable_tls(self, host):
+        """Serve HTTPS with a self-signed certificate, which clients like fabric-cicd require"""
+        # cryptography is only needed for TLS so it is imported here
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([ x509.NameAttribute(NameOID.COMMON_NAME, 'Mock Fabric REST API') ])
+        alternative_names = [ x509.DNSName('localhost') ]
+        try:
+            alternative_names.append(x509.IPAddress(ipaddress.ip_address(host)))
+        except ValueError:
+            alternative_names.append(x509.DNSName(host))
+        now = datetime.now(timezone.utc)
+        certificate = x509.CertificateBuilder() \
+            .subject_name(name) \
+            .issuer_name(name) \
+            .public_key(key.public_key()) \
+            .serial_number(x509.random_serial_number()) \
+            .not_valid_before(now - timedelta(minutes=5)) \
+            .not_valid_after(now + timedelta(days=1)) \
+            .add_extension(x509.SubjectAlternativeName(alternative_names), critical=False) \
+            .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True) \
+            .sign(key, hashes.SHA256())
+
+        self._certificate_folder = tempfile.mkdtemp(prefix='mock-fabric-')
+        self.certificate_file = os.path.join(self._certificate_folder, 'certificate.pem')
+        key_file = os.path.join(self._certificate_folder, 'key.pem')
+        with open(self.certificate_file, 'wb') as file:
+            file.write(certificate.public_bytes(serialization.Encoding.PEM))
+        with open(key_file, 'wb') as file:
+            file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                         serialization.NoEncryption()))
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.certificate_file, key_file)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+
+    @property
+    def base_url(self):
+        """Root URL to use as FABRIC_API_BASE_URL and POWERBI_API_BASE_URL"""
+        host, port = self.server_address[:2]
+        scheme = 'https' if self.certificate_file is not None else 'http'
+        return f'{scheme}://{host}:{port}'
+
+    def record_request(self, method, path):
+        """Count request by method and templated path"""
+        template = re.sub(r'/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9]+)(?=/|$)',
+                          '/{id}', path)
+        with self._counts_lock:
+            key = f'{method} {template}'
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def record_throttled(self):
+        """Count injected 429 response"""
+        with self._counts_lock:
+            self.throttled_count += 1
+
+    def record_unknown_route(self, method, path):
+        """Count request to an endpoint the mock does not implement"""
+        with self._counts_lock:
+            key = f'{method} {path}'
+            self.unknown_routes[key] = self.unknown_routes.get(key, 0) + 1
+
+    def reset(self, settings = None):
+        """Discard all tenant state and request counts, optionally switching simulation settings"""
+        if settings is not None:
+            self.settings = settings
+        self.state = MockFabricState(self.state.capacities[0]['id'])
+        with self._counts_lock:
+            self.request_counts = {}
+            self.unknown_routes = {}
+            self.throttled_count = 0
+
+    def get_environment(self):
+        """Get environment variables which point this package at the mock server"""
+        environment = {
+            'FABRIC_API_BASE_URL': self.base_url,
+            'POWERBI_API_BASE_URL': self.base_url,
+            'ADO_API_BASE_URL': f'{self.base_url}/ado',
+            'ADO_VSSPS_API_BASE_URL': f'{self.base_url}/ado-vssps',
+            'GITHUB_API_BASE_URL': f'{self.base_url}/github',
+            'FABRIC_STATIC_ACCESS_TOKEN': 'mock-access-token',
+            'FABRIC_CAPACITY_ID': self.state.capacities[0]['id']
+        }
+        if self.certificate_file is not None:
+            # requests, and the Azure SDK and fabric-cicd clients built on it, trust the self-signed certificate
+            environment['REQUESTS_CA_BUNDLE'] = self.certificate_file
+        return environment
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name='MockFabricServer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and release the port"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._certificate_folder is not None:
+            shutil.rmtree(self._certificate_folder, ignore_errors=True)
+            self._certificate_folder = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
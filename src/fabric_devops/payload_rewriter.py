@@ -0,0 +1,142 @@
+"""Single-pass search and replace for item definition payloads"""
+
+import base64
+import re
+import threading
+from collections import OrderedDict
+
+class RewriteRule:
+    """Literal or regular expression search term with its replacement"""
+
+    def __init__(self, search, replacement, is_regex):
+        self.search = search
+        self.replacement = replacement
+        self.is_regex = is_regex
+        self.pattern = re.compile(search) if is_regex else None
+
+class PayloadRewriter:
+    """Compiles literal and regex rules into one matcher which rewrites text in a single pass"""
+
+    # backreferences and conditionals depend on the group numbering of the rule's own pattern
+    _BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+    # global inline flags are only valid at the start of the whole pattern
+    _GLOBAL_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+
+    # rewriters compiled for recently used rule sets
+    MAX_CACHED_REWRITERS = 256
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, literals = None, patterns = None):
+        self.rules = []
+        for search, replacement in (literals or {}).items():
+            if search != '':
+                self.rules.append(RewriteRule(search, replacement, False))
+        for search, replacement in (patterns or {}).items():
+            self.rules.append(RewriteRule(search, replacement, True))
+
+        literal_rules = [ rule for rule in self.rules if not rule.is_regex ]
+        self._literal_replacements = { rule.search: rule.replacement for rule in literal_rules }
+
+        alternatives = []
+        self._regex_rules_by_group = {}
+        self.fallback_rules = []
+        if len(literal_rules) > 0:
+            alternatives.append(f'(?P<_literal>{self._get_trie_pattern(self._literal_replacements)})')
+        for index, rule in enumerate(rule for rule in self.rules if rule.is_regex):
+            if self._can_combine(rule):
+                group_name = f'_rule{index}'
+                alternatives.append(f'(?P<{group_name}>{rule.search})')
+                self._regex_rules_by_group[group_name] = rule
+            else:
+                self.fallback_rules.append(rule)
+
+        self._matcher = re.compile('|'.join(alternatives)) if len(alternatives) > 0 else None
+
+    @classmethod
+    def _get_trie_pattern(cls, literals):
+        """Get pattern which matches the longest of literals, with shared prefixes factored out"""
+        trie = {}
+        for literal in literals:
+            node = trie
+            for character in literal:
+                node = node.setdefault(character, {})
+            # empty key marks the end of a literal
+            node[''] = {}
+
+        def build(node):
+            branches = []
+            for character, child in sorted(node.items()):
+                if character == '':
+                    continue
+                # runs without branches become plain text so long literals don't recurse per character
+                prefix = character
+                while len(child) == 1 and '' not in child:
+                    next_character, child = next(iter(child.items()))
+                    prefix += next_character
+                branches.append(re.escape(prefix) + build(child))
+            if len(branches) == 0:
+                return ''
+            pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            # greedy optional group tries the longer literal before stopping at this one
+            return f'(?:{pattern})?' if '' in node else pattern
+
+        return build(trie)
+
+    @classmethod
+    def _can_combine(cls, rule):
+        """Check whether regex rule behaves the same inside the combined matcher"""
+        # named groups could collide with names used by other rules
+        return len(rule.pattern.groupindex) == 0 and \
+               cls._BACKREFERENCE.search(rule.search) is None and \
+               cls._GLOBAL_FLAGS.match(rule.search) is None
+
+    @classmethod
+    def get(cls, literals = None, patterns = None):
+        """Get rewriter for rules, reusing one compiled earlier for the same rules"""
+        key = (tuple((literals or {}).items()), tuple((patterns or {}).items()))
+        with cls._cache_lock:
+            rewriter = cls._cache.get(key)
+            if rewriter is not None:
+                cls._cache.move_to_end(key)
+                return rewriter
+
+        rewriter = PayloadRewriter(literals, patterns)
+        with cls._cache_lock:
+            cls._cache[key] = rewriter
+            while len(cls._cache) > cls.MAX_CACHED_REWRITERS:
+                cls._cache.popitem(last=False)
+        return rewriter
+
+    def rewrite(self, text):
+        """Apply all rules to text and return rewritten text with hit counts by search term"""
+        hits = { rule.search: 0 for rule in self.rules }
+
+        def replace(match):
+            group_name = match.lastgroup
+            if group_name == '_literal':
+                search = match.group()
+                hits[search] += 1
+                return self._literal_replacements[search]
+            rule = self._regex_rules_by_group[group_name]
+            hits[rule.search] += 1
+            # matching the rule's own pattern at the same position restores its group numbering
+            rule_match = rule.pattern.match(text, match.start())
+            return rule_match.expand(rule.replacement)
+
+        if self._matcher is not None:
+            text = self._matcher.sub(replace, text)
+
+        for rule in self.fallback_rules:
+            text, count = rule.pattern.subn(rule.replacement, text)
+            hits[rule.search] += count
+
+        return text, hits
+
+    def rewrite_payload(self, payload):
+        """Apply all rules to base64-encoded UTF-8 payload and return new payload with hit counts"""
+        content = base64.b64decode(payload).decode('utf-8')
+        content, hits = self.rewrite(content)
+        return base64.b64encode(content.encode('utf-8')).decode('utf-8'), hits
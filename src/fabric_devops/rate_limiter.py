@@ -0,0 +1,169 @@
+"""Process-wide adaptive rate limiter for REST API hosts"""
+
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+class _HostBucket:
+    """Token bucket state for a single API host"""
+
+    def __init__(self, max_rate, burst):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.request_count = 0
+        self.throttled_count = 0
+        self.throttled_time = 0.0
+
+class RateLimiter:
+    """Token bucket per API host which backs off for every worker when any worker gets throttled"""
+
+    # requests per second allowed for hosts without an explicit setting
+    DEFAULT_RATE = float(os.getenv('RATE_LIMIT_DEFAULT_RPS', '20'))
+
+    # per-host request rates in requests per second
+    RATES = {
+        'api.fabric.microsoft.com': float(os.getenv('RATE_LIMIT_FABRIC_RPS', '20')),
+        'api.powerbi.com': float(os.getenv('RATE_LIMIT_POWERBI_RPS', '10')),
+        'api.github.com': float(os.getenv('RATE_LIMIT_GITHUB_RPS', '10')),
+        'dev.azure.com': float(os.getenv('RATE_LIMIT_ADO_RPS', '10'))
+    }
+
+    # number of requests which can be sent back-to-back before the rate applies
+    BURST_SECONDS = 1.0
+
+    # multiplicative decrease on 429 and additive increase of about this many requests per second
+    DECREASE_FACTOR = 0.5
+    RECOVERY_STEP = 0.5
+    MIN_RATE = 0.5
+
+    # wait used when 429 response has no usable Retry-After header
+    DEFAULT_RETRY_AFTER_SECONDS = 5.0
+    MAX_RETRY_AFTER_SECONDS = 120.0
+
+    # retries for a single request after 429 TOO MANY REQUESTS
+    MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '6'))
+
+    _buckets = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def parse_retry_after(cls, retry_after):
+        """Parse Retry-After header value in seconds, supporting delta-seconds and HTTP-date formats"""
+        if retry_after is None:
+            return None
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return max(seconds, 0.0)
+
+    @classmethod
+    def get_retry_after(cls, response):
+        """Get wait time for throttled response, falling back to default when header is missing or invalid"""
+        seconds = cls.parse_retry_after(response.headers.get('Retry-After'))
+        if seconds is None:
+            seconds = cls.DEFAULT_RETRY_AFTER_SECONDS
+        return min(seconds, cls.MAX_RETRY_AFTER_SECONDS)
+
+    @classmethod
+    def _get_bucket(cls, host):
+        """Get bucket for host, creating it on first use (caller holds lock)"""
+        bucket = cls._buckets.get(host)
+        if bucket is None:
+            rate = cls.RATES.get(host, cls.DEFAULT_RATE)
+            bucket = _HostBucket(rate, max(1.0, rate * cls.BURST_SECONDS))
+            cls._buckets[host] = bucket
+        return bucket
+
+    @classmethod
+    def _refill(cls, bucket, now):
+        """Add tokens accumulated since last update (caller holds lock)"""
+        bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+
+    @classmethod
+    def reserve(cls, host):
+        """Reserve the next request slot for host and return how long the caller must wait before sending"""
+        with cls._lock:
+            bucket = cls._get_bucket(host)
+            now = time.monotonic()
+            cls._refill(bucket, now)
+            # negative tokens are reservations held by workers which are already waiting
+            bucket.tokens -= 1
+            delay = max(bucket.paused_until - now, 0.0)
+            if bucket.tokens < 0:
+                delay = max(delay, -bucket.tokens / bucket.rate)
+            bucket.request_count += 1
+            if delay > 0:
+                bucket.throttled_time += delay
+            return delay
+
+    @classmethod
+    def acquire(cls, host):
+        """Block until a request may be sent to host and return the time spent waiting"""
+        delay = cls.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    @classmethod
+    def on_success(cls, host):
+        """Raise request rate for host after a request which was not throttled"""
+        with cls._lock:
+            bucket = cls._get_bucket(host)
+            if bucket.rate < bucket.max_rate:
+                cls._refill(bucket, time.monotonic())
+                bucket.rate = min(bucket.max_rate, bucket.rate + cls.RECOVERY_STEP / bucket.rate)
+
+    @classmethod
+    def on_throttled(cls, host, retry_after):
+        """Pause all requests to host for retry_after seconds and lower its request rate"""
+        with cls._lock:
+            bucket = cls._get_bucket(host)
+            now = time.monotonic()
+            cls._refill(bucket, now)
+            bucket.rate = max(cls.MIN_RATE, bucket.rate * cls.DECREASE_FACTOR)
+            bucket.paused_until = max(bucket.paused_until, now + retry_after)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.throttled_count += 1
+
+    @classmethod
+    def set_rate(cls, host, rate):
+        """Set maximum request rate for host"""
+        host = host.lower()
+        with cls._lock:
+            cls.RATES[host] = rate
+            bucket = cls._buckets.get(host)
+            if bucket is not None:
+                bucket.max_rate = rate
+                bucket.rate = min(bucket.rate, rate)
+                bucket.burst = max(1.0, rate * cls.BURST_SECONDS)
+
+    @classmethod
+    def get_metrics(cls):
+        """Get request counts, 429 counts, time spent throttled (summed over workers) and current rate for each host"""
+        with cls._lock:
+            return {
+                host: {
+                    'requests': bucket.request_count,
+                    'throttled_responses': bucket.throttled_count,
+                    'throttled_seconds': round(bucket.throttled_time, 3),
+                    'current_rate': round(bucket.rate, 3),
+                    'max_rate': bucket.max_rate
+                }
+                for host, bucket in cls._buckets.items()
+            }
+
+    @classmethod
+    def reset(cls):
+        """Discard all bucket state and metrics"""
+        with cls._lock:
+            cls._buckets.clear()
@@ -0,0 +1,251 @@
+"""Persisted index of the items in FabricSolutions template folders"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from .definition_part_cache import DefinitionPartCache
+from .item_definition import ItemDefinition, DefinitionPart, DefinitionPartSet
+
+class TemplateCatalog:
+    """Index of solution items with their parts, hashes and placeholder GUIDs, rebuilt only when templates change"""
+
+    SOLUTIONS_FOLDER = './/templates//FabricSolutions'
+
+    # catalog outlives the process so flows can skip scanning template folders
+    CATALOG_FILE = os.getenv('TEMPLATE_CATALOG_FILE', './/templates//FabricSolutions//.template_catalog.json')
+
+    # redirect tokens like 11111111-1111-1111-1111-111111111111 repeat one hex digit
+    PLACEHOLDER_PATTERN = re.compile(r'\b([0-9a-fA-F])\1{7}-\1{4}-\1{4}-\1{4}-\1{12}\b')
+
+    CATALOG_VERSION = 1
+
+    _catalog = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_folder_path(cls, relative_path = ''):
+        """Get path below solutions folder"""
+        return os.path.join(cls.SOLUTIONS_FOLDER, relative_path) if relative_path else cls.SOLUTIONS_FOLDER
+
+    @classmethod
+    def _get_relative_path(cls, path):
+        """Get path relative to solutions folder with forward slashes"""
+        return os.path.relpath(path, cls.SOLUTIONS_FOLDER).replace('\\', '/')
+
+    @classmethod
+    def _index_item(cls, item_folder_path, file_paths):
+        """Get catalog entry for item folder with .platform file"""
+        with open(os.path.join(item_folder_path, '.platform'), 'r', encoding='utf-8') as file:
+            platform = json.loads(file.read())
+
+        parts = []
+        for file_path in file_paths:
+            with open(file_path, 'rb') as file:
+                content = file.read()
+            parts.append({
+                'path': os.path.relpath(file_path, item_folder_path).replace('\\', '/'),
+                'size': len(content),
+                'sha256': hashlib.sha256(content).hexdigest(),
+                'placeholders': sorted({ match.group(0).lower() for match in
+                                         cls.PLACEHOLDER_PATTERN.finditer(content.decode('utf-8', 'ignore')) })
+            })
+
+        return {
+            'type': platform['metadata']['type'],
+            'displayName': platform['metadata']['displayName'],
+            'logicalId': platform.get('config', {}).get('logicalId'),
+            'parts': parts
+        }
+
+    @classmethod
+    def _index_solution(cls, solution_name):
+        """Get catalog entry for solution folder"""
+        solution_folder_path = cls._get_folder_path(solution_name)
+        walk = list(os.walk(solution_folder_path))
+
+        item_folder_paths = [ root for root, _, files in walk if '.platform' in files ]
+        files_by_item = { item_folder_path: [] for item_folder_path in item_folder_paths }
+        for root, _, files in walk:
+            # files belong to the nearest enclosing item folder
+            item_folder_path = next((path for path in sorted(item_folder_paths, key=len, reverse=True)
+                                     if root == path or root.startswith(path + os.sep)), None)
+            if item_folder_path is not None:
+                files_by_item[item_folder_path].extend(os.path.join(root, file_name) for file_name in files)
+
+        items = {}
+        for item_folder_path in item_folder_paths:
+            item_folder = os.path.relpath(item_folder_path, solution_folder_path).replace('\\', '/')
+            items[item_folder] = cls._index_item(item_folder_path, files_by_item[item_folder_path])
+
+        # directory modification times change whenever files are added, removed or renamed
+        folders = { cls._get_relative_path(root): os.stat(root).st_mtime_ns for root, _, _ in walk }
+        files = {}
+        for root, _, file_names in walk:
+            for file_name in file_names:
+                stat_result = os.stat(os.path.join(root, file_name))
+                files[cls._get_relative_path(os.path.join(root, file_name))] = \
+                    [ stat_result.st_mtime_ns, stat_result.st_size ]
+
+        return { 'items': items, 'folders': folders, 'files': files }
+
+    @classmethod
+    def _is_current(cls, solution):
+        """Check recorded folders and files against file system without reading any file"""
+        try:
+            for folder, mtime_ns in solution['folders'].items():
+                if os.stat(cls._get_folder_path(folder)).st_mtime_ns != mtime_ns:
+                    return False
+            for file, (mtime_ns, size) in solution['files'].items():
+                stat_result = os.stat(cls._get_folder_path(file))
+                if stat_result.st_mtime_ns != mtime_ns or stat_result.st_size != size:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    @classmethod
+    def build(cls):
+        """Index every solution folder and save catalog"""
+        solution_names = sorted(name for name in os.listdir(cls.SOLUTIONS_FOLDER)
+                                if os.path.isdir(cls._get_folder_path(name)))
+        catalog = {
+            'version': cls.CATALOG_VERSION,
+            'solutions': { solution_name: cls._index_solution(solution_name) for solution_name in solution_names }
+        }
+        cls._save(catalog)
+        return catalog
+
+    @classmethod
+    def _save(cls, catalog):
+        """Write catalog atomically, keeping only the in-memory catalog when the file cannot be written"""
+        temp_path = f'{cls.CATALOG_FILE}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(json.dumps(catalog, indent=2))
+            os.replace(temp_path, cls.CATALOG_FILE)
+        except OSError:
+            # the catalog file is best effort so read-only checkouts reindex on every load
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @classmethod
+    def _load(cls):
+        """Get saved catalog with solutions whose templates changed reindexed"""
+        try:
+            with open(cls.CATALOG_FILE, 'r', encoding='utf-8') as file:
+                catalog = json.loads(file.read())
+        except (OSError, ValueError):
+            return cls.build()
+
+        if catalog.get('version') != cls.CATALOG_VERSION or \
+           set(catalog['solutions']) != { name for name in os.listdir(cls.SOLUTIONS_FOLDER)
+                                          if os.path.isdir(cls._get_folder_path(name)) }:
+            return cls.build()
+
+        stale_solutions = [ name for name, solution in catalog['solutions'].items() if not cls._is_current(solution) ]
+        for solution_name in stale_solutions:
+            catalog['solutions'][solution_name] = cls._index_solution(solution_name)
+        if len(stale_solutions) > 0:
+            cls._save(catalog)
+        return catalog
+
+    @classmethod
+    def get_catalog(cls, refresh = False):
+        """Get catalog, loading it once per process"""
+        with cls._lock:
+            if cls._catalog is None or refresh:
+                cls._catalog = cls.build() if refresh else cls._load()
+            return cls._catalog
+
+    @classmethod
+    def clear(cls):
+        """Forget catalog loaded by this process"""
+        with cls._lock:
+            cls._catalog = None
+
+    @classmethod
+    def get_items(cls, solution_name):
+        """Get catalog entries of solution items by item folder"""
+        solutions = cls.get_catalog()['solutions']
+        if solution_name not in solutions:
+            raise LookupError(f'Unknown solution folder [{solution_name}]')
+        return solutions[solution_name]['items']
+
+    @classmethod
+    def get_item(cls, solution_name, item_folder):
+        """Get catalog entry of item by folder like 'staging/Build 01 Silver Tables.Notebook'"""
+        items = cls.get_items(solution_name)
+        if item_folder not in items:
+            raise LookupError(f'Unknown item folder [{item_folder}] in solution [{solution_name}]')
+        return items[item_folder]
+
+    @classmethod
+    def _split_solution_folder(cls, solution_folder):
+        """Get (solution name, subfolder prefix) for folder like 'Two Workspace Solution/staging'"""
+        solution_name, _, subfolder = solution_folder.replace('\\', '/').strip('/').partition('/')
+        return solution_name, f'{subfolder}/' if subfolder else ''
+
+    @classmethod
+    def get_item_definition(cls, solution_folder, item_folder) -> ItemDefinition:
+        """Create item definition from catalog entry, reading parts through DefinitionPartCache"""
+        solution_name, prefix = cls._split_solution_folder(solution_folder)
+        item_folder = prefix + item_folder
+        item = cls.get_item(solution_name, item_folder)
+        item_folder_path = cls._get_folder_path(f'{solution_name}/{item_folder}')
+        parts = DefinitionPartSet()
+        for part in item['parts']:
+            payload = DefinitionPartCache.get_payload(os.path.join(item_folder_path, part['path']))
+            parts.put(DefinitionPart(part['path'], payload))
+        return ItemDefinition(item['displayName'], item['type'], parts)
+
+    @classmethod
+    def get_import_parts(cls, solution_folder):
+        """Get bulk import definition parts of all items below solution folder with paths relative to it"""
+        solution_name, prefix = cls._split_solution_folder(solution_folder)
+        solution_folder_path = cls._get_folder_path(solution_name)
+        parts = []
+        for item_folder, item in cls.get_items(solution_name).items():
+            if not item_folder.startswith(prefix):
+                continue
+            for part in item['parts']:
+                payload = DefinitionPartCache.get_payload(os.path.join(solution_folder_path, item_folder, part['path']))
+                parts.append(DefinitionPart(f"/{item_folder[len(prefix):]}/{part['path']}", payload).to_dict())
+        return parts
+
+    @classmethod
+    def get_placeholders(cls, solution_name, item_folders = None):
+        """Get placeholder GUIDs referenced by parts of solution items by part path"""
+        placeholders = {}
+        for item_folder, item in cls.get_items(solution_name).items():
+            if item_folders is not None and item_folder not in item_folders:
+                continue
+            for part in item['parts']:
+                if len(part['placeholders']) > 0:
+                    placeholders[f"{item_folder}/{part['path']}"] = part['placeholders']
+        return placeholders
+
+    @classmethod
+    def validate_placeholders(cls, solution_name, redirects, item_folders = None, patterns = None):
+        """Raise ValueError listing placeholders of solution items which redirects or regex patterns do not replace"""
+        covered = { search.lower() for search in redirects }
+        # logical ids are resolved by the import itself
+        covered.update(item['logicalId'].lower() for item in cls.get_items(solution_name).values()
+                       if item['logicalId'] is not None)
+        unresolved = {}
+        for part_path, placeholders in cls.get_placeholders(solution_name, item_folders).items():
+            missing = [ placeholder for placeholder in placeholders if placeholder not in covered ]
+            if len(missing) > 0 and patterns:
+                # placeholders inside text which patterns replace as a whole are covered too
+                payload = DefinitionPartCache.get_payload(cls._get_folder_path(f'{solution_name}/{part_path}'))
+                content = DefinitionPart(part_path, payload).content
+                for pattern in patterns:
+                    content = re.sub(pattern, '', content)
+                missing = [ placeholder for placeholder in missing if placeholder in content.lower() ]
+            if len(missing) > 0:
+                unresolved[part_path] = missing
+        if len(unresolved) > 0:
+            details = '; '.join(f'{path}: {", ".join(missing)}' for path, missing in unresolved.items())
+            raise ValueError(f'Unresolved placeholders in solution [{solution_name}] - {details}')
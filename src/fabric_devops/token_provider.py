@@ -0,0 +1,158 @@
+"""Process-wide bearer token cache"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from azure.core.credentials import AccessToken
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+from .app_logger import AppLogger
+
+class TokenProvider:
+    """Expiry-aware bearer token cache keyed by scope and shared by all REST API wrapper classes"""
+
+    FABRIC_API_SCOPE = 'https://api.fabric.microsoft.com/.default'
+    ADO_API_SCOPE = '499b84ac-1321-427f-aa17-267ca6975798/.default'
+
+    # tokens are refreshed this many seconds before they expire
+    REFRESH_AHEAD_SECONDS = 300
+
+    # fixed bearer token which replaces Entra ID sign-in when running against a local mock server
+    STATIC_ACCESS_TOKEN = os.getenv('FABRIC_STATIC_ACCESS_TOKEN')
+
+    # service roots which receive Entra ID tokens and must all be local for the static token to be used
+    STATIC_ACCESS_TOKEN_URL_SETTINGS = [ 'FABRIC_API_BASE_URL', 'POWERBI_API_BASE_URL',
+                                         'ADO_API_BASE_URL', 'ADO_VSSPS_API_BASE_URL' ]
+
+    # hosts of a local mock server, the only hosts allowed a static token or bearer tokens over plain HTTP
+    LOOPBACK_HOSTS = [ 'localhost', '127.0.0.1', '::1' ]
+
+    _credential = None
+    _token_cache = {}
+    _lock = threading.Lock()
+    _scope_locks = {}
+
+    @classmethod
+    def get_credential(cls):
+        """Get the one credential used to acquire tokens for every scope"""
+        if cls._credential is None:
+            with cls._lock:
+                if cls._credential is None and cls.STATIC_ACCESS_TOKEN:
+                    remote_settings = [ setting for setting in cls.STATIC_ACCESS_TOKEN_URL_SETTINGS
+                                        if not cls.is_loopback_url(os.getenv(setting, '')) ]
+                    if len(remote_settings) == 0:
+                        AppLogger.log_warning('Using FABRIC_STATIC_ACCESS_TOKEN instead of Entra ID sign-in')
+                        cls._credential = StaticTokenCredential(cls.STATIC_ACCESS_TOKEN)
+                    else:
+                        AppLogger.log_warning('Ignoring FABRIC_STATIC_ACCESS_TOKEN because ' + \
+                                              f'{", ".join(remote_settings)} do not point at localhost')
+                if cls._credential is None:
+                    # azure.identity pulls in msal so it is only imported when a real sign-in is needed
+                    from azure.identity import ClientSecretCredential, DefaultAzureCredential
+                    tenant_id = os.getenv('AZURE_TENANT_ID')
+                    client_id = os.getenv('AZURE_CLIENT_ID')
+                    client_secret = os.getenv('AZURE_CLIENT_SECRET')
+                    # use SPN credentials directly to skip probing the whole credential chain
+                    if tenant_id and client_id and client_secret:
+                        cls._credential = ClientSecretCredential(
+                            tenant_id=tenant_id,
+                            client_id=client_id,
+                            client_secret=client_secret
+                        )
+                    else:
+                        cls._credential = DefaultAzureCredential()
+        return cls._credential
+
+    @classmethod
+    def _get_scope_lock(cls, cache_key):
+        """Get lock which serializes token acquisition for a single scope"""
+        with cls._lock:
+            scope_lock = cls._scope_locks.get(cache_key)
+            if scope_lock is None:
+                scope_lock = threading.Lock()
+                cls._scope_locks[cache_key] = scope_lock
+            return scope_lock
+
+    @classmethod
+    def _is_fresh(cls, token):
+        """Check whether cached token is still outside the refresh window"""
+        return token is not None and \
+               token.expires_on - cls.REFRESH_AHEAD_SECONDS > time.time()
+
+    @classmethod
+    def get_token(cls, *scopes) -> AccessToken:
+        """Get access token for scopes, acquiring a new one only when the cached token nears expiry"""
+        cache_key = ' '.join(sorted(scopes))
+
+        token = cls._token_cache.get(cache_key)
+        if cls._is_fresh(token):
+            return token
+
+        with cls._get_scope_lock(cache_key):
+            # another thread may have refreshed the token while this one was waiting
+            token = cls._token_cache.get(cache_key)
+            if cls._is_fresh(token):
+                return token
+            token = cls.get_credential().get_token(*scopes)
+            cls._token_cache[cache_key] = token
+            return token
+
+    @classmethod
+    def get_access_token(cls, scope):
+        """Get access token string for scope"""
+        return cls.get_token(scope).token
+
+    @classmethod
+    def is_loopback_url(cls, url):
+        """Check whether url points at a server on this machine"""
+        return urlsplit(url).hostname in cls.LOOPBACK_HOSTS
+
+    @classmethod
+    def get_pipeline_policies(cls, base_url):
+        """Get Azure Core pipeline policies which SDK clients need to authenticate against base_url"""
+        if base_url.lower().startswith('https://'):
+            return []
+        if not cls.is_loopback_url(base_url):
+            raise ValueError(f'Bearer tokens can only be sent over plain HTTP to localhost, not to [{base_url}]')
+        AppLogger.log_warning(f'Sending bearer tokens over plain HTTP to [{base_url}]')
+        return [ LocalHttpBearerTokenPolicy() ]
+
+    @classmethod
+    def clear_cache(cls):
+        """Remove all cached tokens"""
+        with cls._lock:
+            cls._token_cache.clear()
+
+class CachedTokenCredential:
+    """TokenCredential adapter which serves tokens from the TokenProvider cache"""
+
+    def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs) -> AccessToken:
+        """Get access token for scopes"""
+        # claims challenges and cross-tenant requests cannot be served from the cache
+        if claims is not None or tenant_id is not None:
+            return TokenProvider.get_credential().get_token(
+                *scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+        return TokenProvider.get_token(*scopes)
+
+class StaticTokenCredential:
+    """TokenCredential which always returns the same token, used for offline runs against a mock server"""
+
+    # tokens never need refreshing during an offline run
+    EXPIRES_IN_SECONDS = 24 * 60 * 60
+
+    def __init__(self, token):
+        self.token = token
+
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        """Get static access token for any scope"""
+        return AccessToken(self.token, int(time.time()) + self.EXPIRES_IN_SECONDS)
+
+class LocalHttpBearerTokenPolicy(SansIOHTTPPolicy):
+    """Pipeline policy which lets SDK clients send bearer tokens over plain HTTP to a local mock server"""
+
+    def on_request(self, request):
+        """Turn off HTTPS check made by bearer token policy for requests to localhost"""
+        if TokenProvider.is_loopback_url(request.http_request.url):
+            request.context['enforce_https'] = False
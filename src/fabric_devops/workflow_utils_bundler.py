@@ -0,0 +1,471 @@
+"""Generates slim fabric_devops_utils modules for project workflow templates from the fabric_devops package"""
+
+import ast
+import os
+
+class WorkflowUtilsBundler:
+    """Bundles the package code reached by the scripts of a workflow template into one self-contained module"""
+
+    PACKAGE_FOLDER = os.path.dirname(os.path.abspath(__file__))
+    WORKFLOWS_FOLDER = './/templates//ProjectWorkflowFiles'
+
+    # module imported by workflow scripts which is generated into each workflow src folder
+    UTILS_MODULE_NAME = 'fabric_devops_utils'
+
+    # modules for local tooling which never ship with workflow templates
+    EXCLUDED_MODULES = [ '__init__', 'mock_fabric_server', 'deployment_benchmark', 'workflow_utils_bundler' ]
+
+    GENERATED_HEADER = [
+        '"""Fabric DevOps Utility Classes"""',
+        '# generated from the fabric_devops package by src/build_workflow_utils.py - do not edit by hand',
+        '# contains only the classes and members reached by the scripts in this folder'
+    ]
+
+    _modules = None
+
+    #region package parsing
+
+    @classmethod
+    def _parse_module(cls, module_name):
+        """Get parsed module with its imports, top-level symbols and class members"""
+        with open(os.path.join(cls.PACKAGE_FOLDER, f'{module_name}.py'), 'r', encoding='utf-8') as file:
+            source = file.read()
+
+        module = {
+            'name': module_name,
+            'lines': source.splitlines(),
+            # local name -> (imported module, imported name or None for plain imports)
+            'imports': {},
+            # local name -> (package module, symbol name)
+            'relative_imports': {},
+            'symbols': {},
+            'classes': {},
+            # top-level statements other than imports and definitions run whenever the module is used
+            'statements': [],
+            'body': []
+        }
+
+        for node in ast.parse(source).body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    local_name = alias.asname or alias.name.split('.')[0]
+                    module['imports'][local_name] = (alias.name if alias.asname else local_name, None)
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if node.level > 0:
+                        module['relative_imports'][alias.asname or alias.name] = (node.module, alias.name)
+                    else:
+                        module['imports'][alias.asname or alias.name] = (node.module, alias.name)
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and len(module['body']) == 0:
+                # module docstring
+                continue
+            else:
+                module['body'].append(node)
+                names = cls._get_defined_names(node)
+                if len(names) == 0:
+                    module['statements'].append(node)
+                for name in names:
+                    module['symbols'][name] = node
+                if isinstance(node, ast.ClassDef):
+                    module['classes'][node.name] = cls._parse_class(node)
+        return module
+
+    @classmethod
+    def _get_defined_names(cls, node):
+        """Get names bound by top-level or class-level statement"""
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            return [ node.name ]
+        if isinstance(node, ast.Assign):
+            return [ target.id for target in node.targets if isinstance(target, ast.Name) ]
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            return [ node.target.id ]
+        return []
+
+    @classmethod
+    def _parse_class(cls, node):
+        """Get class members by name and whether members can be kept individually"""
+        members = {}
+        is_static = len(node.bases) == 0 and len(node.keywords) == 0
+        for child in node.body:
+            for name in cls._get_defined_names(child):
+                members[name] = child
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                decorators = { decorator.id for decorator in child.decorator_list if isinstance(decorator, ast.Name) }
+                # instances carry state which any method may reach through unresolvable receivers
+                if not decorators & { 'classmethod', 'staticmethod' }:
+                    is_static = False
+        return { 'node': node, 'members': members, 'static': is_static }
+
+    @classmethod
+    def get_modules(cls):
+        """Get parsed package modules by name, parsing them once per process"""
+        if cls._modules is None:
+            module_names = sorted(file_name[:-3] for file_name in os.listdir(cls.PACKAGE_FOLDER)
+                                  if file_name.endswith('.py') and file_name[:-3] not in cls.EXCLUDED_MODULES)
+            cls._modules = { module_name: cls._parse_module(module_name) for module_name in module_names }
+        return cls._modules
+
+    @classmethod
+    def _get_module_order(cls):
+        """Get module names ordered so that every module follows the modules it imports"""
+        modules = cls.get_modules()
+        ordered = []
+        visiting = set()
+        def visit(module_name):
+            if module_name in ordered or module_name in visiting or module_name not in modules:
+                return
+            visiting.add(module_name)
+            for imported_module, _ in modules[module_name]['relative_imports'].values():
+                visit(imported_module)
+            ordered.append(module_name)
+        for module_name in modules:
+            visit(module_name)
+        return ordered
+
+    #endregion
+
+    #region reachability
+
+    @classmethod
+    def _resolve_name(cls, module, name):
+        """Get reference key of name used at module level or None for builtins and locals"""
+        modules = cls.get_modules()
+        if name in module['symbols']:
+            return ('symbol', module['name'], name)
+        if name in module['relative_imports']:
+            imported_module, imported_name = module['relative_imports'][name]
+            if imported_module in modules:
+                return cls._resolve_name(modules[imported_module], imported_name)
+            return None
+        if name in module['imports']:
+            return ('import', module['name'], name)
+        return None
+
+    @classmethod
+    def _get_references(cls, module, node, class_name = None, class_scope = False):
+        """Get reference keys for symbols, class members and imports used by node"""
+        references = set()
+        class_members = module['classes'][class_name]['members'] if class_name is not None else {}
+        for child in ast.walk(node):
+            if isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name):
+                if child.value.id in ('cls', 'self') and class_name is not None:
+                    references.add(('member', module['name'], class_name, child.attr))
+                    continue
+                target = cls._resolve_name(module, child.value.id)
+                if target is not None and target[0] == 'symbol' and \
+                   target[2] in cls.get_modules()[target[1]]['classes']:
+                    references.add(('member', target[1], target[2], child.attr))
+            elif isinstance(child, ast.Name):
+                # names in class bodies can refer to earlier class attributes
+                if class_scope and child.id in class_members:
+                    references.add(('member', module['name'], class_name, child.id))
+                    continue
+                target = cls._resolve_name(module, child.id)
+                if target is not None:
+                    references.add(target)
+        return references
+
+    @classmethod
+    def _get_key_references(cls, key):
+        """Get references which keeping the code identified by key brings along"""
+        modules = cls.get_modules()
+        module = modules[key[1]]
+        references = set()
+        if key[0] == 'module':
+            for statement in module['statements']:
+                references |= cls._get_references(module, statement)
+        elif key[0] == 'symbol':
+            references.add(('module', module['name']))
+            node = module['symbols'][key[2]]
+            if isinstance(node, ast.ClassDef):
+                class_info = module['classes'][node.name]
+                for header_node in node.bases + node.keywords + node.decorator_list:
+                    references |= cls._get_references(module, header_node)
+                if not class_info['static']:
+                    for member in node.body:
+                        references |= cls._get_references(module, member, node.name,
+                                                          not isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)))
+            else:
+                references |= cls._get_references(module, node)
+        elif key[0] == 'member':
+            class_info = module['classes'][key[2]]
+            references.add(('symbol', module['name'], key[2]))
+            member = class_info['members'].get(key[3])
+            if class_info['static'] and member is not None:
+                references |= cls._get_references(module, member, key[2],
+                                                  not isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)))
+        return references
+
+    @classmethod
+    def get_reachable(cls, entry_keys):
+        """Get keys of all code reached from entry keys"""
+        reached = set()
+        pending = list(entry_keys)
+        while len(pending) > 0:
+            key = pending.pop()
+            if key in reached:
+                continue
+            reached.add(key)
+            pending.extend(cls._get_key_references(key) - reached)
+        return reached
+
+    #endregion
+
+    #region workflow scripts
+
+    @classmethod
+    def get_workflow_names(cls):
+        """Get names of workflow templates whose scripts import the utils module"""
+        workflow_names = []
+        for workflow_name in sorted(os.listdir(cls.WORKFLOWS_FOLDER)):
+            if len(cls._get_script_paths(workflow_name)) > 0:
+                workflow_names.append(workflow_name)
+        return workflow_names
+
+    @classmethod
+    def _get_src_folder(cls, workflow_name):
+        """Get path of src folder of workflow template"""
+        return os.path.join(cls.WORKFLOWS_FOLDER, workflow_name, 'src')
+
+    @classmethod
+    def _get_script_paths(cls, workflow_name):
+        """Get paths of workflow scripts other than the utils module"""
+        src_folder = cls._get_src_folder(workflow_name)
+        if not os.path.isdir(src_folder):
+            return []
+        return [ os.path.join(src_folder, file_name) for file_name in sorted(os.listdir(src_folder))
+                 if file_name.endswith('.py') and file_name != f'{cls.UTILS_MODULE_NAME}.py' ]
+
+    @classmethod
+    def _find_symbol(cls, name):
+        """Get (module name, class info or None) of top-level package symbol"""
+        modules = cls.get_modules()
+        for module_name in cls._get_module_order():
+            module = modules[module_name]
+            if name in module['symbols']:
+                return module_name, module['classes'].get(name)
+        raise LookupError(f'[{name}] is not defined in the fabric_devops package')
+
+    @classmethod
+    def _check_call(cls, function, call, qualified_name):
+        """Get error when call does not match signature of classmethod or staticmethod"""
+        arguments = function.args
+        parameters = [ argument.arg for argument in arguments.posonlyargs + arguments.args ]
+        decorators = { decorator.id for decorator in function.decorator_list if isinstance(decorator, ast.Name) }
+        if 'classmethod' in decorators:
+            parameters = parameters[1:]
+        keyword_names = [ keyword.arg for keyword in call.keywords if keyword.arg is not None ]
+        if any(isinstance(argument, ast.Starred) for argument in call.args) or \
+           any(keyword.arg is None for keyword in call.keywords):
+            return None
+        if arguments.vararg is None and len(call.args) > len(parameters):
+            return f'{qualified_name} takes {len(parameters)} positional arguments but {len(call.args)} were given'
+        accepted = set(parameters) | { argument.arg for argument in arguments.kwonlyargs }
+        unknown = [ name for name in keyword_names if name not in accepted ]
+        if arguments.kwarg is None and len(unknown) > 0:
+            return f'{qualified_name} got unexpected keyword arguments {", ".join(unknown)}'
+        required = parameters[:len(parameters) - len(arguments.defaults)]
+        missing = [ name for name in required[len(call.args):] if name not in keyword_names ]
+        if len(missing) > 0:
+            return f'{qualified_name} is missing arguments {", ".join(missing)}'
+        return None
+
+    @classmethod
+    def get_entry_keys(cls, workflow_name):
+        """Get reference keys used by workflow scripts, raising LookupError for names the package does not provide"""
+        entry_keys = set()
+        errors = []
+        for script_path in cls._get_script_paths(workflow_name):
+            with open(script_path, 'r', encoding='utf-8') as file:
+                tree = ast.parse(file.read())
+            script_name = os.path.basename(script_path)
+
+            imported = {}
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ImportFrom) and node.module == cls.UTILS_MODULE_NAME:
+                    for alias in node.names:
+                        imported[alias.asname or alias.name] = alias.name
+            for local_name, name in imported.items():
+                try:
+                    module_name, class_info = cls._find_symbol(name)
+                except LookupError as error:
+                    errors.append(f'{script_name}: {error}')
+                    continue
+                imported[local_name] = (name, module_name, class_info)
+                entry_keys.add(('symbol', module_name, name))
+
+            attribute_values = set()
+            for node in ast.walk(tree):
+                if not (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)) or \
+                   not isinstance(imported.get(node.value.id), tuple):
+                    continue
+                attribute_values.add(id(node.value))
+                name, module_name, class_info = imported[node.value.id]
+                if class_info is None:
+                    continue
+                if class_info['static'] and node.attr not in class_info['members']:
+                    errors.append(f'{script_name}: {name}.{node.attr} is not defined in the fabric_devops package')
+                    continue
+                entry_keys.add(('member', module_name, name, node.attr))
+
+            for node in ast.walk(tree):
+                # classes used without attribute access are kept whole
+                if isinstance(node, ast.Name) and id(node) not in attribute_values and \
+                   isinstance(imported.get(node.id), tuple) and imported[node.id][2] is not None:
+                    name, module_name, class_info = imported[node.id]
+                    entry_keys.update(('member', module_name, name, member) for member in class_info['members'])
+                if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and \
+                   isinstance(node.func.value, ast.Name) and isinstance(imported.get(node.func.value.id), tuple):
+                    name, _, class_info = imported[node.func.value.id]
+                    function = class_info['members'].get(node.func.attr) if class_info is not None else None
+                    if class_info is not None and class_info['static'] and \
+                       isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        error = cls._check_call(function, node, f'{name}.{node.func.attr}')
+                        if error is not None:
+                            errors.append(f'{script_name} line {node.lineno}: {error}')
+
+        if len(errors) > 0:
+            raise LookupError(f'Scripts of workflow [{workflow_name}] do not match the fabric_devops package - ' +
+                              '; '.join(dict.fromkeys(errors)))
+        return entry_keys
+
+    #endregion
+
+    #region code generation
+
+    @classmethod
+    def _get_start_line(cls, node):
+        """Get first line of node including decorators"""
+        return min([ node.lineno ] + [ decorator.lineno for decorator in getattr(node, 'decorator_list', []) ])
+
+    @classmethod
+    def _get_leading_lines(cls, lines, previous_end, start):
+        """Get blank line separator and comments directly above statement, skipping region markers"""
+        gap = lines[previous_end:start - 1]
+        comments = []
+        for line in reversed(gap):
+            if not line.strip().startswith('#'):
+                break
+            comments.insert(0, line)
+        comments = [ line for line in comments if not line.strip().startswith(('#region', '#endregion')) ]
+        separator = [ '' ] if any(line.strip() == '' for line in gap) else []
+        return separator + comments
+
+    @classmethod
+    def _get_class_lines(cls, module, class_name, reached):
+        """Get source lines of class with members which were not reached removed"""
+        lines = module['lines']
+        class_info = module['classes'][class_name]
+        node = class_info['node']
+
+        header_end = node.lineno
+        while not lines[header_end - 1].split('#')[0].rstrip().endswith(':'):
+            header_end += 1
+        class_lines = lines[cls._get_start_line(node) - 1:header_end]
+
+        previous_end = header_end
+        for member in node.body:
+            names = cls._get_defined_names(member)
+            is_kept = not class_info['static'] or len(names) == 0 or \
+                      any(('member', module['name'], class_name, name) in reached for name in names)
+            if is_kept:
+                start = cls._get_start_line(member)
+                leading_lines = cls._get_leading_lines(lines, previous_end, start)
+                if previous_end == header_end:
+                    leading_lines = [ line for line in leading_lines if line != '' ]
+                class_lines.extend(leading_lines + lines[start - 1:member.end_lineno])
+            previous_end = member.end_lineno
+        return class_lines
+
+    @classmethod
+    def _get_import_lines(cls, reached):
+        """Get import statements for third-party and standard library names used by reached code"""
+        modules = cls.get_modules()
+        plain_imports = []
+        from_imports = {}
+        bindings = {}
+        for module_name in cls._get_module_order():
+            module = modules[module_name]
+            for local_name, (imported_module, imported_name) in module['imports'].items():
+                if ('import', module_name, local_name) not in reached:
+                    continue
+                if bindings.setdefault(local_name, (imported_module, imported_name)) != (imported_module, imported_name):
+                    raise ValueError(f'[{local_name}] is imported from different modules')
+                if imported_name is None:
+                    statement = f'import {imported_module}' if imported_module == local_name else \
+                                f'import {imported_module} as {local_name}'
+                    if statement not in plain_imports:
+                        plain_imports.append(statement)
+                else:
+                    alias = imported_name if imported_name == local_name else f'{imported_name} as {local_name}'
+                    names = from_imports.setdefault(imported_module, [])
+                    if alias not in names:
+                        names.append(alias)
+        return plain_imports + [ f'from {imported_module} import {", ".join(names)}'
+                                 for imported_module, names in from_imports.items() ]
+
+    @classmethod
+    def bundle(cls, workflow_name):
+        """Get source of utils module for workflow"""
+        reached = cls.get_reachable(cls.get_entry_keys(workflow_name))
+        modules = cls.get_modules()
+
+        defined = {}
+        blocks = []
+        for module_name in cls._get_module_order():
+            module = modules[module_name]
+            if ('module', module_name) not in reached:
+                continue
+            previous_end = 0
+            for node in module['body']:
+                names = cls._get_defined_names(node)
+                if len(names) == 0 or any(('symbol', module_name, name) in reached for name in names):
+                    for name in names:
+                        if defined.setdefault(name, module_name) != module_name:
+                            raise ValueError(f'[{name}] is defined in modules [{defined[name]}] and [{module_name}]')
+                    start = cls._get_start_line(node)
+                    comments = [ line for line in cls._get_leading_lines(module['lines'], previous_end, start)
+                                 if line != '' ]
+                    if isinstance(node, ast.ClassDef):
+                        blocks.append(comments + cls._get_class_lines(module, node.name, reached))
+                    else:
+                        blocks.append(comments + module['lines'][start - 1:node.end_lineno])
+                previous_end = node.end_lineno
+
+        source_lines = cls.GENERATED_HEADER + [ '' ] + cls._get_import_lines(reached)
+        for block in blocks:
+            source_lines.extend([ '' ] + [ line.rstrip() for line in block ])
+        source = '\n'.join(source_lines) + '\n'
+        compile(source, f'{cls.UTILS_MODULE_NAME}.py', 'exec')
+        return source
+
+    @classmethod
+    def get_utils_path(cls, workflow_name):
+        """Get path of generated utils module of workflow"""
+        return os.path.join(cls._get_src_folder(workflow_name), f'{cls.UTILS_MODULE_NAME}.py')
+
+    @classmethod
+    def is_current(cls, workflow_name):
+        """Check whether generated utils module of workflow matches the package"""
+        try:
+            with open(cls.get_utils_path(workflow_name), 'r', encoding='utf-8') as file:
+                return file.read() == cls.bundle(workflow_name)
+        except OSError:
+            return False
+
+    @classmethod
+    def write(cls, workflow_name):
+        """Write utils module of workflow and return whether its content changed"""
+        source = cls.bundle(workflow_name)
+        utils_path = cls.get_utils_path(workflow_name)
+        try:
+            with open(utils_path, 'r', encoding='utf-8') as file:
+                if file.read() == source:
+                    return False
+        except OSError:
+            pass
+        with open(utils_path, 'w', encoding='utf-8', newline='\n') as file:
+            file.write(source)
+        return True
+
+    #endregion
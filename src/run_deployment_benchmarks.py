@@ -0,0 +1,47 @@
+"""Benchmark deployment flows against local mock Fabric REST API and check for regressions"""
+import os
+import sys
+import uuid
+
+MOCK_FABRIC_PORT = int(os.getenv("MOCK_FABRIC_PORT", '8765'))
+BENCHMARK_PROFILES = os.getenv("BENCHMARK_PROFILES")
+BENCHMARK_CASE_FILTER = os.getenv("BENCHMARK_CASE_FILTER")
+BENCHMARK_RESULTS_FILE = os.getenv("BENCHMARK_RESULTS_FILE", './benchmarks/deployment_benchmark_results.json')
+BENCHMARK_UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE") == 'true'
+
+from fabric_devops.mock_fabric_server import MockFabricServer
+
+# the mock serves HTTPS so that fabric-cicd, which only calls https hosts, can deploy to it
+os.environ.setdefault('FABRIC_CAPACITY_ID', str(uuid.uuid4()))
+server = MockFabricServer(port=MOCK_FABRIC_PORT, use_tls=True)
+
+# REST API classes read these settings when the rest of fabric_devops is imported
+os.environ.update(server.get_environment())
+os.environ.setdefault('ADO_ORGANIZATION', 'benchmark-organization')
+os.environ.setdefault('ORGANIZATION_GITHUB', 'benchmark-organization')
+os.environ.setdefault('PERSONAL_ACCESS_TOKEN_GITHUB', 'mock-access-token')
+os.environ.setdefault('RATE_LIMIT_DEFAULT_RPS', '1000')
+
+from fabric_devops import AppLogger
+from fabric_devops.deployment_benchmark import DeploymentBenchmark
+
+server.start()
+try:
+    profile_names = BENCHMARK_PROFILES.split(',') if BENCHMARK_PROFILES else None
+    results = DeploymentBenchmark.run(server, profile_names, BENCHMARK_CASE_FILTER)
+finally:
+    server.stop()
+
+baseline = DeploymentBenchmark.load_baseline()
+regressions = DeploymentBenchmark.compare(results, baseline) if baseline is not None else []
+DeploymentBenchmark.log_results(results, baseline)
+DeploymentBenchmark.write_results(results, regressions, BENCHMARK_RESULTS_FILE)
+
+if BENCHMARK_UPDATE_BASELINE:
+    DeploymentBenchmark.write_baseline(results)
+    AppLogger.log_step(f'Baseline written to [{DeploymentBenchmark.BASELINE_FILE}]')
+elif len(regressions) > 0:
+    AppLogger.log_table_header('Regressions against baseline')
+    for regression in regressions:
+        AppLogger.log_error(regression)
+    sys.exit(1)
@@ -0,0 +1,27 @@
+"""Run local mock of the Fabric and Power BI REST APIs for offline benchmarks"""
+import os
+import time
+
+from fabric_devops.mock_fabric_server import MockFabricServer, MockFabricSettings
+
+MOCK_FABRIC_HOST = os.getenv("MOCK_FABRIC_HOST", '127.0.0.1')
+MOCK_FABRIC_PORT = int(os.getenv("MOCK_FABRIC_PORT", '8765'))
+
+server = MockFabricServer(MOCK_FABRIC_HOST, MOCK_FABRIC_PORT, MockFabricSettings.from_environment())
+server.start()
+
+print(f"Mock Fabric REST API listening on {server.base_url}")
+print("Set these environment variables before running deployment scripts:")
+for name, value in server.get_environment().items():
+    print(f"  {name}={value}")
+print("  RATE_LIMIT_DEFAULT_RPS=1000")
+
+try:
+    while True:
+        time.sleep(1)
+except KeyboardInterrupt:
+    pass
+finally:
+    server.stop()
+    for route, count in sorted(server.unknown_routes.items()):
+        print(f"Unmocked endpoint called {count} times: {route}")
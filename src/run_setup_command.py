@@ -6,7 +6,8 @@ from fabric_devops import DeploymentManager,  AppLogger, StagingEnvironments,\
                           FabricRestApi, AdoProjectManager, GitHubRestApi 
 
 RUN_CLEANUP_ENVIRONMENT = os.getenv("RUN_CLEANUP_ENVIRONMENT") == 'true'
+RUN_CLEANUP_CONCURRENTLY = os.getenv("RUN_CLEANUP_CONCURRENTLY") == 'true'
 
 if RUN_CLEANUP_ENVIRONMENT:
     AppLogger.log_job("Running cleanup environment")
-    DeploymentManager.cleanup_dev_environment()
+    DeploymentManager.cleanup_dev_environment(run_concurrently=RUN_CLEANUP_CONCURRENTLY)
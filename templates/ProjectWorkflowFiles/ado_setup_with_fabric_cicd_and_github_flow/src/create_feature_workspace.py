@@ -1,6 +1,6 @@
 """Create feature workspace from new ADO branch"""
 import os
-from fabric_devops_utils import EnvironmentSettings, AppLogger, FabricRestApi, AdoProjectManager, DeploymentManager
+from fabric_devops_utils import EnvironmentSettings, AppLogger, FabricRestApi, AdoProjectManager, DeploymentManager, StagingEnvironments
 
 AppLogger.log_job("Creating feature branch")
 
@@ -15,12 +15,6 @@ ADD_ADMIN_USER = os.getenv("ADD_ADMIN_USER") == 'True'
 
 FEATURE_NAME = os.getenv("FEATURE_NAME")
 
-DeploymentManager.create_feature_workspace(
-    PROJECT_NAME,
-    FEATURE_NAME,
-    'dev'
-)
-
 FEATURE_WORKSPACE_NAME = F'{DEV_WORKSPACE_NAME}-{FEATURE_NAME}'
 FEATURE_WORKSPACE = FabricRestApi.create_workspace(FEATURE_WORKSPACE_NAME)
 FabricRestApi.update_workspace_description(FEATURE_WORKSPACE.id, workspace_desciption)
@@ -45,12 +39,12 @@ if ADD_ADMIN_USER:
 FabricRestApi.connect_workspace_to_ado_repo(FEATURE_WORKSPACE, PROJECT_NAME, FEATURE_BRANCH_NAME)
 
 if RUN_POST_DEPLOY_FIXES:
-    deployment_job = EnvironmentSettings.DEPLOYMENT_JOBS['dev']
+    deployment_job = StagingEnvironments.get_dev_environment()
     DeploymentManager.apply_post_sync_fixes(FEATURE_WORKSPACE.id, deployment_job)
     DeploymentManager.apply_post_deploy_fixes(FEATURE_WORKSPACE.id)
 
     FabricRestApi.commit_workspace_to_git(
         FEATURE_WORKSPACE.id,
-        commit_comment = 'Sync updates from feature workspace to repo after applying fixes')
+        commit_message = 'Sync updates from feature workspace to repo after applying fixes')
 
 AppLogger.log_job_complete(FEATURE_WORKSPACE.id)
@@ -1,127 +1,258 @@
 """Fabric DevOps Utility Classes"""
-# this version of fabric_devops specific for Azure Dev Ops projects
-# updated: 05/15/2026-3PM
+# generated from the fabric_devops package by src/build_workflow_utils.py - do not edit by hand
+# contains only the classes and members reached by the scripts in this folder
 
-import base64
-import re
+import contextvars
+import json
 import os
+import threading
 import time
-import datetime
-import json
-from json.decoder import JSONDecodeError
-from typing import List
+import atexit
+import bisect
+import re
 import requests
-import msal
-
-from azure.identity import DefaultAzureCredential
-from microsoft_fabric_api import FabricClient
-
-class EnvironmentSettings:
-    """Environment Settings"""
+import random
+import base64
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlparse, urlsplit
+from azure.core.pipeline.policies import HTTPPolicy, SansIOHTTPPolicy
+from requests.adapters import HTTPAdapter
+from azure.core.credentials import AccessToken
+from collections import OrderedDict
+from json.decoder import JSONDecodeError
+from enum import Enum
 
-    AZURE_CLIENT_ID = os.getenv("AZURE_CLIENT_ID")
-    AZURE_CLIENT_SECRET = os.getenv("AZURE_CLIENT_SECRET")
-    AZURE_TENANT_ID = os.getenv("AZURE_TENANT_ID")
-    AUTHORITY = f'https://login.microsoftonline.com/{AZURE_TENANT_ID}'
-    FABRIC_CAPACITY_ID = os.getenv("FABRIC_CAPACITY_ID")
+class TraceSpan:
+    """Timed section of work recorded by AppLogger"""
 
-    WORKSPACE_ID_DEV = os.getenv("WORKSPACE_ID_DEV")
-    WORKSPACE_ID_TEST = os.getenv("WORKSPACE_ID_TEST")
-    WORKSPACE_ID_PROD = os.getenv("WORKSPACE_ID_PROD")
+    # nesting level of spans opened automatically by log calls
+    LEVELS = { 'job': 0, 'step': 1, 'substep': 2 }
 
-    ADMIN_USER_ID = os.getenv("ADMIN_USER_ID")
-    DEVELOPERS_GROUP_ID = os.getenv("DEVELOPERS_GROUP_ID")
-    
-    ADO_PROJECT_NAME = os.getenv("BUILD_REPOSITORY_NAME")
-    
-    AZURE_STORAGE_SAS_TOKEN = os.getenv('AZURE_STORAGE_SAS_TOKEN')
+    def __init__(self, name, kind, parent = None, attributes = None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.thread_id = threading.get_native_id()
+        self.thread_name = threading.current_thread().name
+        self.started_at = time.monotonic()
+        self.ended_at = None
+
+    @property
+    def level(self):
+        """Nesting level for automatic spans or None for spans opened with AppLogger.span"""
+        return self.LEVELS.get(self.kind)
+
+    @property
+    def duration(self):
+        """Seconds between start and end, or until now for an open span"""
+        end_time = self.ended_at if self.ended_at is not None else time.monotonic()
+        return end_time - self.started_at
+
+    @property
+    def job(self):
+        """Outermost span this span is nested in"""
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+    def is_nested_in(self, span):
+        """Check whether this span is span or nested in it at any depth"""
+        current = self
+        while current is not None:
+            if current is span:
+                return True
+            current = current.parent
+        return False
+
+    def end(self):
+        """Close span if it is still open"""
+        if self.ended_at is None:
+            self.ended_at = time.monotonic()
 
-    FABRIC_REST_API_RESOURCE_ID = 'https://api.fabric.microsoft.com'
-    FABRIC_REST_API_BASE_URL = 'https://api.fabric.microsoft.com/v1/'
-    POWER_BI_REST_API_BASE_URL = 'https://api.powerbi.com/v1.0/myorg/'
-    
-    DEPLOYMENT_JOBS = {
-        'dev': {
-            'name': 'dev',
-            'parameters': {
-                'web_datasource_path': 'https://github.com/FabricDevCamp/SampleData/raw/refs/heads/main/productsales/dev/',
-                'adls_server': 'https://fabricdevcamp.dfs.core.windows.net/',
-                'adls_container_name': 'sampledata', 
-                'adls_container_path': '/productsales/dev'
-            }            
-        },
-        'test': {
-            'name': 'test',
-            'parameters': {
-                'web_datasource_path': 'https://github.com/FabricDevCamp/SampleData/raw/refs/heads/main/productsales/test/',
-                'adls_server': 'https://fabricdevcamp.dfs.core.windows.net/',
-                'adls_container_name': 'sampledata', 
-                'adls_container_path': '/productsales/test'
-            }
-        },
-        "prod": {
-            'name': 'prod',
-            'parameters': {
-                'web_datasource_path': 'https://github.com/FabricDevCamp/SampleData/raw/refs/heads/main/productsales/prod/',
-                'adls_server': 'https://fabricdevcamp.dfs.core.windows.net/',
-                'adls_container_name': 'sampledata',
-                'adls_container_path': '/productsales/prod'
-            }
-        }
-    }
-    
 class AppLogger:
     """Logic to write log output to console and/or logs"""
 
+    # Chrome trace / Perfetto JSON file written each time a job completes
+    TRACE_FILE = os.getenv('APP_TRACE_FILE')
+
+    # rows in slowest steps table logged when a job completes
+    SLOWEST_STEPS_COUNT = int(os.getenv('APP_TRACE_SLOWEST_STEPS', '10'))
+
+    # oldest spans are discarded once this many have been recorded
+    MAX_SPANS = int(os.getenv('APP_TRACE_MAX_SPANS', '100000'))
+
+    # open spans for the current thread or task, outermost first
+    _span_stack = contextvars.ContextVar('app_logger_span_stack', default=())
+    _spans = []
+    _spans_lock = threading.Lock()
+
+    # converts monotonic span times to wall-clock trace timestamps
+    _clock_offset = time.time() - time.monotonic()
+
+    @classmethod
+    def _record_span(cls, span):
+        """Add span to recorded spans"""
+        with cls._spans_lock:
+            cls._spans.append(span)
+            if len(cls._spans) > cls.MAX_SPANS:
+                del cls._spans[:len(cls._spans) - cls.MAX_SPANS]
+
+    @classmethod
+    def _open_span(cls, name, kind, attributes = None):
+        """Close automatic spans at the same or deeper level and open new span nested in what remains"""
+        stack = list(cls._span_stack.get())
+        level = TraceSpan.LEVELS.get(kind)
+        if level is not None:
+            while len(stack) > 0 and stack[-1].level is not None and stack[-1].level >= level:
+                stack.pop().end()
+
+        span = TraceSpan(name, kind, stack[-1] if len(stack) > 0 else None, attributes)
+        cls._record_span(span)
+        stack.append(span)
+        cls._span_stack.set(tuple(stack))
+        return span
+
+    @classmethod
+    def _close_spans(cls, span = None):
+        """Close span along with all spans nested in it, or every open span when span is None"""
+        stack = list(cls._span_stack.get())
+        if span is not None and span not in stack:
+            span.end()
+            return
+        while len(stack) > 0:
+            closed_span = stack.pop()
+            closed_span.end()
+            if closed_span is span:
+                break
+        cls._span_stack.set(tuple(stack))
+
+    @classmethod
+    def get_current_span(cls):
+        """Get innermost open span for the current thread or task"""
+        stack = cls._span_stack.get()
+        return stack[-1] if len(stack) > 0 else None
+
+    @classmethod
+    def add_completed_span(cls, name, started_at, ended_at, kind = 'span', **attributes):
+        """Record span for work timed elsewhere using time.monotonic timestamps"""
+        span = TraceSpan(name, kind, cls.get_current_span(), attributes)
+        span.started_at = started_at
+        span.ended_at = ended_at
+        cls._record_span(span)
+        return span
+
+    @classmethod
+    def get_spans(cls, job = None):
+        """Get recorded spans, optionally only those nested in job span"""
+        with cls._spans_lock:
+            spans = list(cls._spans)
+        if job is not None:
+            spans = [ span for span in spans if span.is_nested_in(job) ]
+        return spans
+
+    @classmethod
+    def get_chrome_trace(cls, spans = None):
+        """Get spans as Chrome trace event format which can be loaded in Perfetto or chrome://tracing"""
+        if spans is None:
+            spans = cls.get_spans()
+
+        process_id = os.getpid()
+        trace_events = []
+        thread_names = {}
+        for span in spans:
+            thread_names[span.thread_id] = span.thread_name
+            trace_events.append({
+                'name': span.name,
+                'cat': span.kind,
+                'ph': 'X',
+                'ts': round((span.started_at + cls._clock_offset) * 1_000_000),
+                'dur': round(span.duration * 1_000_000),
+                'pid': process_id,
+                'tid': span.thread_id,
+                'args': { name: str(value) for name, value in span.attributes.items() }
+            })
+        for thread_id, thread_name in thread_names.items():
+            trace_events.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': process_id,
+                'tid': thread_id,
+                'args': { 'name': thread_name }
+            })
+
+        return { 'traceEvents': trace_events, 'displayTimeUnit': 'ms' }
+
+    @classmethod
+    def write_chrome_trace(cls, file_path = None):
+        """Write all recorded spans to Chrome trace JSON file"""
+        if file_path is None:
+            file_path = cls.TRACE_FILE
+        folder_path = os.path.dirname(file_path)
+        if folder_path != '':
+            os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(cls.get_chrome_trace()))
+
     @classmethod
-    def clear_console(cls):
-        """Clear Console Window when running locally"""
-        if os.name == 'nt':
-            os.system('cls')
+    def log_slowest_steps(cls, job = None, count = None):
+        """Log table of the slowest spans nested in job"""
+        if count is None:
+            count = cls.SLOWEST_STEPS_COUNT
+        spans = [ span for span in cls.get_spans(job) if span.kind != 'job' ]
+        if len(spans) == 0:
+            return
+        spans.sort(key=lambda span: span.duration, reverse=True)
+        cls.log_table_header('Slowest steps')
+        for span in spans[:count]:
+            cls.log_table_row(f'{span.duration:.1f}s', f'[{span.kind}] {span.name}')
+
+    @classmethod
+    def _end_job(cls):
+        """Close innermost job with its nested spans, log its slowest steps and write trace file when configured"""
+        # a job run by a worker thread is nested in the job which started the worker and only it ends here
+        jobs = [ span for span in cls._span_stack.get() if span.kind == 'job' ]
+        job = jobs[-1] if len(jobs) > 0 else None
+        cls._close_spans(job)
+        if job is not None:
+            cls.log_slowest_steps(job)
+        if cls.TRACE_FILE:
+            cls.write_chrome_trace()
 
     @classmethod
     def log_job(cls, message):
         """start job"""
-        print(' ', flush=True)
+        cls._open_span(message, 'job')
         print(' ', flush=True)
         print(('-' * (len(message) + 5)) , flush=True)
         print(f'|> {message} |', flush=True)
         print(('-' * (len(message) + 5)) , flush=True)
 
     @classmethod
-    def log_job_ended(cls, message=''):
-        """log that job has ended"""
-        print(' ', flush=True)
-        print(f'> {message}', flush=True)
-        print(' ', flush=True)
-
-    @classmethod
-    def log_job_complete(cls, workspace_id=None):
+    def log_job_complete(cls, workspace_id = None):
         """log that job has ended"""
         cls.log_step("Deployment job completed")
         if workspace_id is not None:
-            workspace_launch_url = (
-                f'https://app.powerbi.com/groups/{workspace_id}/list?experience=fabric-developer'
-            )
-            cls.log_substep(f'Workspace launch URL: {workspace_launch_url}')
+             workspace_laucnh_url = f'https://app.powerbi.com/groups/{workspace_id}/list?experience=power-bi'
+             cls.log_substep(f'Workspace launch URL: {workspace_laucnh_url}')
         print(' ', flush=True)
+        cls._end_job()
 
     @classmethod
     def log_step(cls, message):
         """log a step"""
+        cls._open_span(message, 'step')
         print(' ', flush=True)
         print('> ' + message, flush=True)
 
     @classmethod
     def log_substep(cls, message):
         """log a sub step"""
+        cls._open_span(message, 'substep')
         print('  - ' + message, flush=True)
 
-    @classmethod
-    def log_step_complete(cls):
-        """add linebreak to log"""
-        print(' ', flush=True)
-
     TABLE_WIDTH = 120
 
     @classmethod
@@ -137,18 +268,11 @@ class AppLogger:
         column1_width = 20
         column1_value_length = len(column1_value)
         column1_offset = column1_width - column1_value_length
-        column2_width = cls.TABLE_WIDTH - column1_width
+        column2_width = cls.TABLE_WIDTH  - column1_width
         column2_value_length = len(column2_value)
         column2_offset = column2_width - column2_value_length - 5
-        row = f'  | {column1_value}{" " * column1_offset}| {column2_value}{" " * column2_offset}|'
+        row = f'  > {column1_value}{" " * column1_offset}= {column2_value}{" " * column2_offset}'
         print(row, flush=True)
-        print('  ' + ('-' * (cls.TABLE_WIDTH)), flush=True)
-
-    @classmethod
-    def log_raw_text(cls, text):
-        """log raw text"""
-        print(text, flush=True)
-        print('', flush=True)
 
     @classmethod
     def log_error(cls, message):
@@ -157,1121 +281,907 @@ class AppLogger:
         print('-' * len(error_message), flush=True)
         print(error_message, flush=True)
         print('-' * len(error_message), flush=True)
-        
-        """Module to manage calls to Fabric REST APIs"""
-
-
-class AdoProjectManager:
-    """Wrapper class for calling Azure REST APIs for Azure Dev Ops"""
-
-    ADO_ORGANIZATION = 'FabricDevCamp'
-    BASE_URL = f'https://dev.azure.com/{ADO_ORGANIZATION}/_apis/'
-
-    ADO_PROJECT_TEMPLATE_ID = "b8a3a935-7e91-48b8-a94c-606d37c3e9f2";
-    ADO_API_VERSION = "api-version=7.1-preview";
-
-    #region Low-level details about authentication and HTTP requests and responses
-
-    # in-memory token cache
-    _token_cache = dict()
 
     @classmethod
-    def _get_ado_access_token(cls):
-        ado_resource_id = '499b84ac-1321-427f-aa17-267ca6975798'
-        scope = ado_resource_id + "/.default"
-    
-        if (scope in cls._token_cache) and \
-            (datetime.datetime.now() < cls._token_cache[scope]['access_token_expiration']):
-            return cls._token_cache[scope]['access_token']
-                    
-        app = msal.ConfidentialClientApplication(
-                EnvironmentSettings.AZURE_CLIENT_ID,
-                authority=EnvironmentSettings.AUTHORITY,
-                client_credential=EnvironmentSettings.AZURE_CLIENT_SECRET)
-
-        authentication_result = app.acquire_token_for_client([scope])
-
-        cls._token_cache[scope] = {
-            'access_token': authentication_result['access_token'],
-            'access_token_expiration': datetime.datetime.now() + \
-                                    datetime.timedelta(0,  int(authentication_result['expires_in']))
-            }
+    def log_warning(cls, message):
+        """log warning"""
+        warning_message = "WARNING: " + message
+        print('-' * len(warning_message), flush=True)
+        print(warning_message, flush=True)
+        print('-' * len(warning_message), flush=True)
 
-        return authentication_result['access_token']
-
-    @classmethod
-    def _execute_get_request(cls, endpoint):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = cls.BASE_URL + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            AppLogger.log_error(
-                f'Error executing GET request: {response.status_code} - {response.text}')
-            return None
-
-    @classmethod
-    def _execute_get_request_on_vssps(cls, endpoint):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://vssps.dev.azure.com/{cls.ADO_ORGANIZATION}/_apis/' + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            AppLogger.log_error(
-                f'Error executing GET request: {response.status_code} - {response.text}')
-            return None
-
-    @classmethod
-    def _execute_get_request_on_project(cls, project_name, endpoint):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            AppLogger.log_error(
-                f'Error executing GET request: {response.status_code} - {response.text}')
-            return None
-
-    @classmethod
-    def _execute_post_request(cls, endpoint, post_body=''):
-        """Execute POST request with support for Long-running Operations (LRO)"""
-        rest_url = cls.BASE_URL + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json; charset=utf-8; {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
-
-        if response.status_code in { 200, 201 }:
-            try:
-                return response.json()
-            except JSONDecodeError:
-                return None
-
-        if response.status_code in { 202 }:
-
-            reponse_body = response.json()
-            operation_id = reponse_body['id']
-            operation_url = f'operations/{operation_id}'
-
-            time.sleep(2)
-            response = cls._execute_get_request(operation_url)
-            
-            while response['status'] not in [ 'succeeded', 'failed', 'cancelled' ]:
-                time.sleep(2)
-                response = cls._execute_get_request(operation_url)
-
-            if response['status'] == 'succeeded':
-                return None
-            else:
-                AppLogger.log_error(response)
-
-        else:
-            AppLogger.log_error(
-                f'Error executing POST request: {response.status_code} - {response.text}')
-            return None
+class EnvironmentSettings:
+    """Environment Settings"""
 
-    @classmethod
-    def _execute_post_request_on_project(cls, project_name, endpoint, post_body=''):
-        """Execute POST request with support for Long-running Operations (LRO)"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json; charset=utf-8; {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
+    AZURE_CLIENT_ID = os.getenv("AZURE_CLIENT_ID")
+    AZURE_CLIENT_SECRET = os.getenv("AZURE_CLIENT_SECRET")
+    AZURE_TENANT_ID = os.getenv("AZURE_TENANT_ID")
+    ADMIN_USER_ID = os.getenv("ADMIN_USER_ID")
+    DEVELOPERS_GROUP_ID = os.getenv("DEVELOPERS_GROUP_ID")
 
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
+    #  WEB_DATASOURCE_ROOT_URL = 'https://github.com/FabricDevCamp/SampleData/raw/refs/heads/main/productsales/'
+    WEB_DATASOURCE_ROOT_URL = 'https://github.com/FabricDevCamp/SampleData/raw/refs/heads/main/productsales/'
 
-        if response.status_code in { 200, 201 }:
-            try:
-                return response.json()
-            except JSONDecodeError:
-                return None
+    AZURE_STORAGE_ACCOUNT_NAME = 'fabricdevcampdemos'
+    AZURE_STORAGE_CONTAINER = 'sampledata'
+    AZURE_STORAGE_SERVER = f'https://{AZURE_STORAGE_ACCOUNT_NAME}.dfs.core.windows.net/'
 
-        if response.status_code in { 202 }:
+    ADO_ORGANIZATION = os.getenv('ADO_ORGANIZATION')
 
-            reponse_body = response.json()
-            operation_id = reponse_body['id']
-            operation_url = f'operations/{operation_id}'
+    # set by pipelines and workflows of projects created from ProjectWorkflowFiles templates
+    ADO_PROJECT_NAME = os.getenv('ADO_PROJECT_NAME')
 
-            time.sleep(2)
-            response = cls._execute_get_request(operation_url)
-            
-            while response['status'] not in [ 'succeeded', 'failed', 'cancelled' ]:
-                time.sleep(2)
-                response = cls._execute_get_request(operation_url)
+    WORKSPACE_ID_DEV = os.getenv("WORKSPACE_ID_DEV")
+    WORKSPACE_ID_TEST = os.getenv("WORKSPACE_ID_TEST")
+    WORKSPACE_ID_PROD = os.getenv("WORKSPACE_ID_PROD")
 
-            if response['status'] == 'succeeded':
-                return None
-            else:
-                AppLogger.log_error(response)
+class _HostBucket:
+    """Token bucket state for a single API host"""
+
+    def __init__(self, max_rate, burst):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.request_count = 0
+        self.throttled_count = 0
+        self.throttled_time = 0.0
+
+class RateLimiter:
+    """Token bucket per API host which backs off for every worker when any worker gets throttled"""
+
+    # requests per second allowed for hosts without an explicit setting
+    DEFAULT_RATE = float(os.getenv('RATE_LIMIT_DEFAULT_RPS', '20'))
+
+    # per-host request rates in requests per second
+    RATES = {
+        'api.fabric.microsoft.com': float(os.getenv('RATE_LIMIT_FABRIC_RPS', '20')),
+        'api.powerbi.com': float(os.getenv('RATE_LIMIT_POWERBI_RPS', '10')),
+        'api.github.com': float(os.getenv('RATE_LIMIT_GITHUB_RPS', '10')),
+        'dev.azure.com': float(os.getenv('RATE_LIMIT_ADO_RPS', '10'))
+    }
 
-        else:
-            AppLogger.log_error(
-                f'Error executing POST request: {response.status_code} - {response.text}')
-            return None
+    # number of requests which can be sent back-to-back before the rate applies
+    BURST_SECONDS = 1.0
 
-    @classmethod
-    def _execute_patch_request(cls, endpoint, post_body):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = EnvironmentSettings.FABRIC_REST_API_BASE_URL + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json; {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
-        if response.status_code == 200:
-            return response.json()
+    # multiplicative decrease on 429 and additive increase of about this many requests per second
+    DECREASE_FACTOR = 0.5
+    RECOVERY_STEP = 0.5
+    MIN_RATE = 0.5
 
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_patch_request(endpoint, post_body)
-        else:
-            AppLogger.log_error(
-                f'Error executing PATCH request: {response.status_code} - {response.text}')
-            return None
+    # wait used when 429 response has no usable Retry-After header
+    DEFAULT_RETRY_AFTER_SECONDS = 5.0
+    MAX_RETRY_AFTER_SECONDS = 120.0
 
-    @classmethod
-    def _execute_patch_request_on_project(cls, project_name, endpoint, post_body):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json; {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-        
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
-        if response.status_code == 200:
-            return response.json()
+    # retries for a single request after 429 TOO MANY REQUESTS
+    MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '6'))
 
-        else:
-            AppLogger.log_error(
-                f'Error executing PATCH request: {response.status_code} - {response.text}')
-            return None
+    _buckets = {}
+    _lock = threading.Lock()
 
     @classmethod
-    def _execute_put_request_on_project(cls, project_name, endpoint, post_body):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
-                           'Content-Type': f'application/json; {cls.ADO_API_VERSION}',
-                           'Authorization': f'Bearer {access_token}'}
-        
-        response = requests.put(url=rest_url, json=post_body, headers=request_headers, timeout=60)
-        if response.status_code == 200:
-            return response.json()
-
-        else:
-            AppLogger.log_error(
-                f'Error executing PUT request: {response.status_code} - {response.text}')
+    def parse_retry_after(cls, retry_after):
+        """Parse Retry-After header value in seconds, supporting delta-seconds and HTTP-date formats"""
+        if retry_after is None:
             return None
-
-    @classmethod
-    def _execute_delete_request(cls, endpoint):
-        """Execute DELETE Request on Fabric REST API Endpoint"""
-        rest_url = cls.BASE_URL + endpoint
-        access_token = cls._get_ado_access_token()
-        request_headers= {'Accept':  f'application/json; {cls.ADO_API_VERSION}',
-                          'Content-Type':  f'application/json; {cls.ADO_API_VERSION}',
-                          'Authorization': f'Bearer {access_token}'}
-        response = requests.delete(url=rest_url, headers=request_headers, timeout=60)
-        
-        if response.status_code in { 200, 204}:
-            return None
-
-        if response.status_code in { 202 }:
-
-            reponse_body = response.json()
-            operation_id = reponse_body['id']
-            operation_url = f'operations/{operation_id}'
-
-            time.sleep(2)
-            response = cls._execute_get_request(operation_url)
-            
-            while response['status'] not in [ 'succeeded', 'failed', 'cancelled' ]:
-                time.sleep(2)
-                response = cls._execute_get_request(operation_url)
-
-            if response['status'] == 'succeeded':
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
                 return None
-            else:
-                AppLogger.log_error(response)
-
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            cls._execute_delete_request(endpoint)
-            return None
-        else:
-            AppLogger.log_error(
-                f'Error executing DELETE request: {response.status_code} - {response.text}')
-            return None
-
-    #endregion
-
-    @classmethod
-    def get_projects(cls):
-        """Get Azure DevOps Projects"""
-        endpoint = "projects"
-        return cls._execute_get_request(endpoint)['value']
-    
-    @classmethod
-    def get_project(cls, project_name):
-        """Get Project"""
-        projects = cls.get_projects()
-        for project in projects:
-            if project['name'] == project_name:
-                return project
-        return None
+        return max(seconds, 0.0)
+
+    @classmethod
+    def get_retry_after(cls, response):
+        """Get wait time for throttled response, falling back to default when header is missing or invalid"""
+        seconds = cls.parse_retry_after(response.headers.get('Retry-After'))
+        if seconds is None:
+            seconds = cls.DEFAULT_RETRY_AFTER_SECONDS
+        return min(seconds, cls.MAX_RETRY_AFTER_SECONDS)
+
+    @classmethod
+    def _get_bucket(cls, host):
+        """Get bucket for host, creating it on first use (caller holds lock)"""
+        bucket = cls._buckets.get(host)
+        if bucket is None:
+            rate = cls.RATES.get(host, cls.DEFAULT_RATE)
+            bucket = _HostBucket(rate, max(1.0, rate * cls.BURST_SECONDS))
+            cls._buckets[host] = bucket
+        return bucket
+
+    @classmethod
+    def _refill(cls, bucket, now):
+        """Add tokens accumulated since last update (caller holds lock)"""
+        bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+
+    @classmethod
+    def reserve(cls, host):
+        """Reserve the next request slot for host and return how long the caller must wait before sending"""
+        with cls._lock:
+            bucket = cls._get_bucket(host)
+            now = time.monotonic()
+            cls._refill(bucket, now)
+            # negative tokens are reservations held by workers which are already waiting
+            bucket.tokens -= 1
+            delay = max(bucket.paused_until - now, 0.0)
+            if bucket.tokens < 0:
+                delay = max(delay, -bucket.tokens / bucket.rate)
+            bucket.request_count += 1
+            if delay > 0:
+                bucket.throttled_time += delay
+            return delay
+
+    @classmethod
+    def acquire(cls, host):
+        """Block until a request may be sent to host and return the time spent waiting"""
+        delay = cls.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    @classmethod
+    def on_success(cls, host):
+        """Raise request rate for host after a request which was not throttled"""
+        with cls._lock:
+            bucket = cls._get_bucket(host)
+            if bucket.rate < bucket.max_rate:
+                cls._refill(bucket, time.monotonic())
+                bucket.rate = min(bucket.max_rate, bucket.rate + cls.RECOVERY_STEP / bucket.rate)
+
+    @classmethod
+    def on_throttled(cls, host, retry_after):
+        """Pause all requests to host for retry_after seconds and lower its request rate"""
+        with cls._lock:
+            bucket = cls._get_bucket(host)
+            now = time.monotonic()
+            cls._refill(bucket, now)
+            bucket.rate = max(cls.MIN_RATE, bucket.rate * cls.DECREASE_FACTOR)
+            bucket.paused_until = max(bucket.paused_until, now + retry_after)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.throttled_count += 1
+
+    @classmethod
+    def get_metrics(cls):
+        """Get request counts, 429 counts, time spent throttled (summed over workers) and current rate for each host"""
+        with cls._lock:
+            return {
+                host: {
+                    'requests': bucket.request_count,
+                    'throttled_responses': bucket.throttled_count,
+                    'throttled_seconds': round(bucket.throttled_time, 3),
+                    'current_rate': round(bucket.rate, 3),
+                    'max_rate': bucket.max_rate
+                }
+                for host, bucket in cls._buckets.items()
+            }
 
-    @classmethod
-    def create_project(cls, project_name, workspace = None):
-        """Create Project"""
-        AppLogger.log_step(f'Creating new ADO project [{project_name}]')
-        existing_projects = cls.get_projects()
-        for existing_project in existing_projects:
-            if existing_project['name'] == project_name:
-                AppLogger.log_substep('Deleteting existing project with same name')
-                cls.delete_project(existing_project['id'])
-                break
+class _EndpointStats:
+    """Counters and latency histogram for one templated endpoint"""
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.status_codes = {}
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        # one counter per latency bucket plus overflow, made cumulative on export
+        self.bucket_counts = [0] * (bucket_count + 1)
+
+class HttpMetrics:
+    """Records request counts, latency histograms, status codes, throttling and wait time per templated endpoint"""
+
+    # upper bounds in seconds of latency histogram buckets
+    LATENCY_BUCKETS = [ 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0 ]
+
+    # folder which receives http_metrics.prom and http_metrics.json when the process exits
+    EXPORT_FOLDER = os.getenv('HTTP_METRICS_FOLDER')
+
+    METRIC_PREFIX = 'fabric_devops'
+
+    _ID_SEGMENT = re.compile(
+        r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$')
+
+    _endpoints = {}
+    _waits = {}
+    _started_at = time.time()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_endpoint_template(cls, url):
+        """Get host and path of url with ids replaced by {id} so calls to the same endpoint share metrics"""
+        parsed_url = urlparse(url)
+        # Power BI URLs are built with doubled slashes which the service ignores
+        path = re.sub(r'/+', '/', parsed_url.path)
+        segments = [ '{id}' if cls._ID_SEGMENT.match(segment) else segment
+                     for segment in path.split('/') ]
+        return parsed_url.netloc.lower(), '/'.join(segments)
+
+    @classmethod
+    def _get_endpoint_stats(cls, method, url):
+        """Get stats for method and templated url, creating them on first use (caller holds lock)"""
+        host, path = cls.get_endpoint_template(url)
+        key = (method.upper(), host, path)
+        stats = cls._endpoints.get(key)
+        if stats is None:
+            stats = _EndpointStats(len(cls.LATENCY_BUCKETS))
+            cls._endpoints[key] = stats
+        return stats
+
+    @classmethod
+    def record_request(cls, method, url, status_code, elapsed, attempt = 0):
+        """Record one HTTP attempt with its status code and latency in seconds"""
+        with cls._lock:
+            stats = cls._get_endpoint_stats(method, url)
+            stats.count += 1
+            status = str(status_code) if status_code is not None else 'error'
+            stats.status_codes[status] = stats.status_codes.get(status, 0) + 1
+            if status_code is None:
+                stats.errors += 1
+            elif status_code == 429:
+                stats.throttled += 1
+            if attempt > 0:
+                stats.retries += 1
+            stats.latency_sum += elapsed
+            stats.latency_max = max(stats.latency_max, elapsed)
+            stats.bucket_counts[bisect.bisect_left(cls.LATENCY_BUCKETS, elapsed)] += 1
+
+    @classmethod
+    def record_wait(cls, category, wait_time):
+        """Record time spent waiting on long-running operations, jobs or provisioning"""
+        with cls._lock:
+            wait = cls._waits.setdefault(category, { 'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0 })
+            wait['count'] += 1
+            wait['total_seconds'] += wait_time
+            wait['max_seconds'] = max(wait['max_seconds'], wait_time)
+
+    @classmethod
+    def get_metrics(cls):
+        """Get snapshot of all recorded metrics as a JSON-serializable dictionary"""
+        with cls._lock:
+            endpoints = []
+            for (method, host, path), stats in sorted(cls._endpoints.items()):
+                cumulative_count = 0
+                buckets = {}
+                for upper_bound, bucket_count in zip(cls.LATENCY_BUCKETS + [ '+Inf' ], stats.bucket_counts):
+                    cumulative_count += bucket_count
+                    buckets[str(upper_bound)] = cumulative_count
+                endpoints.append({
+                    'method': method,
+                    'host': host,
+                    'endpoint': path,
+                    'requests': stats.count,
+                    'status_codes': dict(stats.status_codes),
+                    'retries': stats.retries,
+                    'throttled': stats.throttled,
+                    'errors': stats.errors,
+                    'latency_seconds': {
+                        'sum': round(stats.latency_sum, 6),
+                        'max': round(stats.latency_max, 6),
+                        'mean': round(stats.latency_sum / stats.count, 6) if stats.count > 0 else 0.0,
+                        'buckets': buckets
+                    }
+                })
+            waits = { category: { 'count': wait['count'],
+                                  'total_seconds': round(wait['total_seconds'], 3),
+                                  'max_seconds': round(wait['max_seconds'], 3) }
+                      for category, wait in sorted(cls._waits.items()) }
 
-        AppLogger.log_substep("Calling Create Project API")
-        
-        workspace_description = 'This is a Azure DevOps project created to demonstrate GIT integration with Fabric workspace.' 
-        
-        if workspace is not None:
-            workspace_description += \
-                f' This repository is connected to a Fabrc workspace named [{workspace["displayName"]}] with an id of [{workspace["id"]}]'            
-        
-        endpoint = "projects"
-        body = {
-            "name": project_name,
-            "description": workspace_description,
-            "state": "unchanged",
-            "capabilities": {
-                "versioncontrol": { "sourceControlType": "Git" },
-                "processTemplate": { "templateTypeId": "b8a3a935-7e91-48b8-a94c-606d37c3e9f2" }
-            },
-            "visibility": "private"
+        return {
+            'started_at': datetime.fromtimestamp(cls._started_at, timezone.utc).isoformat(),
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'endpoints': endpoints,
+            'waits': waits,
+            'rate_limiter': RateLimiter.get_metrics()
         }
-        
-        cls._execute_post_request(endpoint, body)
-        time.sleep(5)
-        new_project = cls.get_project(project_name)
-        AppLogger.log_substep(f"New ADO project created with Id [{new_project['id']}]")
 
-        repository = cls.get_project_repository(project_name)
-        
-        if workspace is None:
-            root_folder_readme_content = ItemDefinitionFactory.get_template_file(
-                'AdoProjectTemplates/AdoReadMe.md')
-        else:
-            root_folder_readme_content = ItemDefinitionFactory.get_template_file(
-                'AdoProjectTemplates/AdoReadMeWithWorkspace.md')
-            
-            root_folder_readme_content = root_folder_readme_content.replace(
-                '{WORKSPACE_ID}', 
-                workspace.id)
-
-            root_folder_readme_content = root_folder_readme_content.replace(
-                '{WORKSPACE_NAME}', 
-                workspace.display_name)
-
-        push_endpoint = f"git/repositories/{repository['id']}/pushes"
-        push_body = {
-            "commits":[
-                {
-                    "comment":"Adding ReadMe.md",
-                    "changes":[
-                        {
-                            "item":{ "path":"/ReadMe.md"},
-                            "changeType":"add",
-                            "newContent":{
-                                "content": root_folder_readme_content
-                            }
-                         }
-                        ]
-                    }],
-                    "refUpdates":[
-                        {
-                            "name":"refs/heads/main",
-                            "oldObjectId":"0000000000000000000000000000000000000000"
-                        }
-                    ]
-                }
-        cls._execute_post_request(push_endpoint, push_body)
+    @classmethod
+    def _format_labels(cls, labels):
+        """Format Prometheus label set with escaped values"""
+        formatted = []
+        for name, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            formatted.append(f'{name}="{value}"')
+        return '{' + ','.join(formatted) + '}'
+
+    @classmethod
+    def to_prometheus(cls, metrics = None):
+        """Render metrics in Prometheus text exposition format"""
+        if metrics is None:
+            metrics = cls.get_metrics()
+        prefix = cls.METRIC_PREFIX
+        lines = []
+
+        def add_metric(name, metric_type, description, samples):
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for suffix, labels, value in samples:
+                lines.append(f'{prefix}_{name}{suffix}{cls._format_labels(labels)} {value}')
+
+        endpoints = metrics['endpoints']
+        add_metric('http_requests_total', 'counter', 'HTTP requests by endpoint and status code', [
+            ('', { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'], 'status': status }, count)
+            for e in endpoints for status, count in sorted(e['status_codes'].items()) ])
+
+        latency_samples = []
+        for e in endpoints:
+            labels = { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'] }
+            for upper_bound, count in e['latency_seconds']['buckets'].items():
+                latency_samples.append(('_bucket', { **labels, 'le': upper_bound }, count))
+            latency_samples.append(('_sum', labels, e['latency_seconds']['sum']))
+            latency_samples.append(('_count', labels, e['requests']))
+        add_metric('http_request_duration_seconds', 'histogram', 'HTTP request latency', latency_samples)
+
+        add_metric('http_retries_total', 'counter', 'HTTP requests sent again after a failed attempt', [
+            ('', { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'] }, e['retries'])
+            for e in endpoints ])
+        add_metric('http_throttled_total', 'counter', 'HTTP 429 responses', [
+            ('', { 'method': e['method'], 'host': e['host'], 'endpoint': e['endpoint'] }, e['throttled'])
+            for e in endpoints ])
+
+        waits = metrics['waits']
+        add_metric('wait_seconds_total', 'counter', 'Time spent waiting on operations and jobs', [
+            ('', { 'category': category }, wait['total_seconds']) for category, wait in waits.items() ])
+        add_metric('waits_total', 'counter', 'Number of waits on operations and jobs', [
+            ('', { 'category': category }, wait['count']) for category, wait in waits.items() ])
+
+        rate_limiter = metrics['rate_limiter']
+        add_metric('rate_limiter_throttled_seconds_total', 'counter',
+                   'Time requests spent queued by the client-side rate limiter', [
+            ('', { 'host': host }, host_metrics['throttled_seconds'])
+            for host, host_metrics in sorted(rate_limiter.items()) ])
+
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def write_files(cls, folder = None):
+        """Write metrics to http_metrics.prom and http_metrics.json in folder"""
+        if folder is None:
+            folder = cls.EXPORT_FOLDER or '.'
+        os.makedirs(folder, exist_ok=True)
+
+        metrics = cls.get_metrics()
+        with open(os.path.join(folder, 'http_metrics.prom'), 'w', encoding='utf-8') as file:
+            file.write(cls.to_prometheus(metrics))
+        with open(os.path.join(folder, 'http_metrics.json'), 'w', encoding='utf-8') as file:
+            file.write(json.dumps(metrics, indent=4))
+
+class HttpMetricsPolicy(HTTPPolicy):
+    """Azure Core pipeline policy which records every attempt made by Fabric SDK clients in HttpMetrics"""
+
+    def send(self, request):
+        """Send request and record its status code and latency"""
+        # pipeline context is shared by every retry of the same call
+        attempt = request.context.get('fabric_devops_attempt', 0)
+        request.context['fabric_devops_attempt'] = attempt + 1
+        start_time = time.monotonic()
+        status_code = None
+        try:
+            response = self.next.send(request)
+            status_code = response.http_response.status_code
+            return response
+        finally:
+            HttpMetrics.record_request(request.http_request.method, request.http_request.url,
+                                       status_code, time.monotonic() - start_time, attempt)
+
+if HttpMetrics.EXPORT_FOLDER:
+    atexit.register(HttpMetrics.write_files)
+
+class HttpSessionPool:
+    """Thread-safe, connection-pooled HTTP transport shared by REST API wrapper classes"""
+
+    # default number of pooled connections kept open for each host
+    DEFAULT_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+
+    # per-host overrides for the number of pooled connections
+    POOL_SIZES = {
+        'api.fabric.microsoft.com': int(os.getenv('HTTP_POOL_SIZE_FABRIC', '32')),
+        'api.powerbi.com': int(os.getenv('HTTP_POOL_SIZE_POWERBI', '16'))
+    }
 
-        workspace_folder_readme_content = ItemDefinitionFactory.get_template_file(
-            'AdoProjectTemplates/AdoReadMeForWorkspaceFolder.md')
+    _sessions = {}
+    _lock = threading.Lock()
 
-        cls.write_file_to_repo(project_name, 'main', 'workspace/ReadMe.md', workspace_folder_readme_content)
-        
-        return new_project
-      
-    @classmethod
-    def delete_project(cls, project_id):
-        """Delete Project"""
-        endpoint = f'projects/{project_id}'
-        return cls._execute_delete_request(endpoint)   
-    
     @classmethod
-    def delete_project_by_name(cls, project_name):
-        """Delete Project By Name"""
-        project = cls.get_project(project_name)
-        cls.delete_project(project['id'])
-    
-    @classmethod
-    def get_project_repositories(cls, project_name):
-        """Get Project Repositories"""
-        endpoint = 'git/repositories'
-        return cls._execute_get_request_on_project(project_name, endpoint)['value']
+    def _get_host(cls, url):
+        """Get host name used to key sessions"""
+        return urlparse(url).netloc.lower()
 
     @classmethod
-    def get_project_repository(cls, project_name):
-        """Get Project Repository"""
-        return cls.get_project_repositories(project_name)[0]
-    
-    @classmethod
-    def get_branches(cls, project_name):
-        """Get Branches"""
-        repository = cls.get_project_repository(project_name)
-        repository_id = repository['id']
-        endpoint = f'git/repositories/{repository_id}/refs'
-        return cls._execute_get_request_on_project(project_name, endpoint)['value']
+    def _create_session(cls, host):
+        """Create session with connection pool sized for host"""
+        pool_size = cls.POOL_SIZES.get(host, cls.DEFAULT_POOL_SIZE)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
 
     @classmethod
-    def get_branch(cls, project_name, branch):
-        """Get Branches"""
-        repository = cls.get_project_repository(project_name)
-        repository_id = repository['id']
-        endpoint = f'git/repositories/{repository_id}/refs/?filter=heads/{branch}'
-        return cls._execute_get_request_on_project(project_name, endpoint)['value'][0]
+    def get_session(cls, url):
+        """Get shared session for the host of url, creating it on first use"""
+        host = cls._get_host(url)
+        session = cls._sessions.get(host)
+        if session is not None:
+            return session
 
-    @classmethod
-    def create_branch(cls, project_name, branch, base_branch):
-        """Get Branches"""
-        AppLogger.log_substep(f'Creating branch [{branch}]')
-        repository = cls.get_project_repository(project_name)        
-        repository_id = repository['id']
-        base_branch = cls.get_branch(project_name, base_branch)
-        base_branch_object_id = base_branch['objectId']
-        refs_endpoint = f'git/repositories/{repository_id}/refs'
-        body = [{
-            "name": f'refs/heads/{branch}',
-            "oldObjectId":"0000000000000000000000000000000000000000",
-            "newObjectId":f'{base_branch_object_id}'
-        }]
-        return cls._execute_post_request(refs_endpoint, body)
+        with cls._lock:
+            session = cls._sessions.get(host)
+            if session is None:
+                session = cls._create_session(host)
+                cls._sessions[host] = session
+            return session
 
     @classmethod
-    def set_default_branch(cls, project_name, branch):
-        """Get Branches"""
-        AppLogger.log_substep(f'Setting [{branch}] as default branch')
-        repository = cls.get_project_repository(project_name)
-        repository_id = repository['id']
-        repo_endpoint = f'git/repositories/{repository_id}/'
-        body = { "defaultBranch": f"refs/heads/{branch}" }
-        return cls._execute_patch_request_on_project(project_name, repo_endpoint, body)
-
-    @classmethod
-    def add_standard_branches(cls, project_name):
-        """Add Standard Branches"""     
-        cls.create_branch(project_name, 'test', 'main')
-        cls.create_branch(project_name, 'dev', 'test')
-        cls.set_default_branch(project_name, "dev")
-
-    @classmethod
-    def write_file_to_repo(cls, project_name, branch, file_path, file_content, comment = None):
-        """Write Files to Repo"""   
-             
-        if comment is None:
-            comment = f'Adding file [{file_path}]'
-        
-        base64_content = base64.b64encode(file_content.encode('utf-8')).decode('utf-8')
-        
-        repository = cls.get_project_repository(project_name)
-        target_branch = cls.get_branch(project_name, branch)
-        old_object_id = target_branch['objectId']
-
-        push_endpoint = f"git/repositories/{repository['id']}/pushes"
-        push_body = {
-            "commits":[
-                {
-                    "comment": comment,
-                    "changes":[
-                        {
-                            "item":{ "path": file_path },
-                            "changeType":"add",
-                            "newContent":{
-                                "content": F"{base64_content}",
-                                "contentType": "base64encoded"
-                            }
-                         }
-                        ]
-                    }],
-                    "refUpdates": [
-                        {
-                            "name": f"refs/heads/{branch}",
-                            "oldObjectId": f"{old_object_id}"
-                        }
-                    ]
-                }
-        
-        cls._execute_post_request(push_endpoint, push_body)
+    def request(cls, method, url, **kwargs):
+        """Execute HTTP request using pooled session for host, retrying after 429 TOO MANY REQUESTS"""
+        host = cls._get_host(url)
+        session = cls.get_session(url)
+        for attempt in range(RateLimiter.MAX_RETRIES + 1):
+            RateLimiter.acquire(host)
+            start_time = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.RequestException:
+                HttpMetrics.record_request(method, url, None, time.monotonic() - start_time, attempt)
+                raise
+            HttpMetrics.record_request(method, url, response.status_code, time.monotonic() - start_time, attempt)
+            if response.status_code != 429:
+                RateLimiter.on_success(host)
+                return response
+            RateLimiter.on_throttled(host, RateLimiter.get_retry_after(response))
+            if attempt < RateLimiter.MAX_RETRIES:
+                response.close()
+        # retries exhausted so caller handles the 429 response
+        return response
 
     @classmethod
-    def write_files_to_repo_from_folder(cls, project_name, branch, folder_path, comment = 'Adding files from template folder'):
-        """Write Files to repo from local folder"""        
-        AppLogger.log_substep(f"Copy [{folder_path}] files to [{project_name}] repository") 
-        
-        repository = cls.get_project_repository(project_name)
-        target_branch = cls.get_branch(project_name, branch)
-        old_object_id = target_branch['objectId']
-
-        file_changes = []
-        folder_path = f".//templates//WorkflowActions//{folder_path}//"
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file = open(file_path,'r', encoding="utf-8")
-                file_content = file.read()
-                base64_content = base64.b64encode(file_content.encode('utf-8')).decode('utf-8')
-                relative_file_path = file_path.replace(folder_path, '').replace('\\', '/')
-                
-                file_changes.append({
-                    "item":{ "path": relative_file_path },
-                    "changeType":"add",
-                    "newContent": {
-                        "content": f"{base64_content}",
-                        "contentType": "base64encoded"
-                    }
-                })
-
-        push_endpoint = f"git/repositories/{repository['id']}/pushes"
-        push_body = {
-            "refUpdates": [{
-                "name": f"refs/heads/{branch}",
-                "oldObjectId": f"{old_object_id}"
-            }],
-            "commits": [{
-                "comment": comment,
-                "changes": file_changes 
-            }]
-        }
-
-        cls._execute_post_request(push_endpoint, push_body)
-
-    @classmethod
-    def copy_files_from_folder_to_repo(cls, project_name, branch, folder_path, variable_group_id):
-        """Copy files to repo and create pipeline when copying YAML files"""                    
-
-        folder_path = f".//templates//WorkflowActions//{folder_path}//"
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file = open(file_path,'r', encoding="utf-8")
-                file_content = file.read()
-
-                relative_file_path = file_path.replace(folder_path, '').replace('\\', '/')
-                                                              
-                cls.write_file_to_repo(project_name, branch, relative_file_path, file_content)
-                
-                is_yml_pipeline_file = relative_file_path.lower().endswith('.yml') and '.pipelines/' in relative_file_path
-                
-                if is_yml_pipeline_file:
-                    pipeline_name = relative_file_path.replace('.yml', '').replace('.pipelines/', '')
-                    cls.create_pipeline(project_name, pipeline_name, relative_file_path, variable_group_id)
-
-    @classmethod
-    def create_two_stage_variable_group(cls, name, project_name, dev_workspace_id, prod_workspace_id):
-        """Add Variable Group"""
-        AppLogger.log_step(f"Creating variable group [{name}]")
-        project = cls.get_project(project_name)
-        endpoint = 'distributedtask/variablegroups'
-        body = {
-            "name": name,
-            "description": "Variable group added through code",
-            "type": "Vsts",
-            "variables": {
-                "AZURE_CLIENT_ID": {
-                    "value": EnvironmentSettings.AZURE_CLIENT_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "AZURE_CLIENT_SECRET": {
-                    "value": EnvironmentSettings.AZURE_CLIENT_SECRET,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "AZURE_TENANT_ID": {
-                    "value": EnvironmentSettings.AZURE_TENANT_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "FABRIC_CAPACITY_ID": {
-                    "value": EnvironmentSettings.FABRIC_CAPACITY_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "ADMIN_USER_ID": {
-                    "value": EnvironmentSettings.ADMIN_USER_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "WORKSPACE_ID_DEV": {
-                    "value": dev_workspace_id,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "WORKSPACE_ID_PROD": {
-                    "value": prod_workspace_id,
-                    "isSecret": False,
-                    "isReadOnly": True
-                }                    
-            },
-            "variableGroupProjectReferences": [{
-                "name": name,
-                "description": "Variable group added through code",
-                "projectReference": {
-                    "id": project['id'],
-                    "name": project_name
-                }
-            }]
-        }
-
-        return cls._execute_post_request(endpoint, body)
-
-    @classmethod
-    def create_variable_group_for_ado_project(
-        cls, 
-        name, 
-        project_name, 
-        dev_workspace_id, 
-        test_workspace_id,
-        prod_workspace_id):
-        """Add Variable Group"""
-        AppLogger.log_step(f"Creating variable group [{name}]")
-        project = cls.get_project(project_name)
-        endpoint = 'distributedtask/variablegroups'
-        body = {
-            "name": name,
-            "description": "Variable group added through code",
-            "type": "Vsts",
-            "variables": {
-                "AZURE_CLIENT_ID": {
-                    "value": EnvironmentSettings.AZURE_CLIENT_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "AZURE_CLIENT_SECRET": {
-                    "value": EnvironmentSettings.AZURE_CLIENT_SECRET,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "AZURE_TENANT_ID": {
-                    "value": EnvironmentSettings.AZURE_TENANT_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "FABRIC_CAPACITY_ID": {
-                    "value": EnvironmentSettings.FABRIC_CAPACITY_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "ADMIN_USER_ID": {
-                    "value": EnvironmentSettings.ADMIN_USER_ID,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "WORKSPACE_ID_DEV": {
-                    "value": dev_workspace_id,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },
-                "WORKSPACE_ID_TEST": {
-                    "value": test_workspace_id,
-                    "isSecret": False,
-                    "isReadOnly": True
-                },                
-                "WORKSPACE_ID_PROD": {
-                    "value": prod_workspace_id,
-                    "isSecret": False,
-                    "isReadOnly": True
-                }                    
-            },
-            "variableGroupProjectReferences": [{
-                "name": name,
-                "description": "Variable group added through code",
-                "projectReference": {
-                    "id": project['id'],
-                    "name": project_name
-                }
-            }]
-        }
-
-        return cls._execute_post_request(endpoint, body)
-
-    @classmethod
-    def create_variable_group(cls, name, project_name):
-        """Add Variable Group"""
-        AppLogger.log_step(f"Creating variable group [{name}]")
-        project = cls.get_project(project_name)
-        endpoint = 'distributedtask/variablegroups'
-        body = {
-            "name": name,
-            "description": "Variable group added through code",
-            "type": "Vsts",
-            "variables": {
-                "AZURE_CLIENT_ID": {
-                    "value": EnvironmentSettings.AZURE_CLIENT_ID,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "AZURE_CLIENT_SECRET": {
-                    "value": EnvironmentSettings.AZURE_CLIENT_SECRET,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "AZURE_TENANT_ID": {
-                    "value": EnvironmentSettings.AZURE_TENANT_ID,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "FABRIC_CAPACITY_ID": {
-                    "value": EnvironmentSettings.FABRIC_CAPACITY_ID,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "ADMIN_USER_ID": {
-                    "value": EnvironmentSettings.ADMIN_USER_ID,
-                    "isSecret": True,
-                    "isReadOnly": True
-                },
-                "SERVICE_PRINCIPAL_OBJECT_ID": {
-                    "value": EnvironmentSettings.SERVICE_PRINCIPAL_OBJECT_ID,
-                    "isSecret": True,
-                    "isReadOnly": True
-                }
-            },
-            "variableGroupProjectReferences": [{
-                "name": name,
-                "description": "Variable group added through code",
-                "projectReference": {
-                    "id": project['id'],
-                    "name": project_name
-                }
-            }]
-        }
+    def get(cls, url, **kwargs):
+        """Execute GET request using pooled session"""
+        return cls.request('GET', url, **kwargs)
+
+    @classmethod
+    def post(cls, url, **kwargs):
+        """Execute POST request using pooled session"""
+        return cls.request('POST', url, **kwargs)
+
+class IndexedCache:
+    """Snapshot of a collection indexed by key which is reloaded once its TTL expires"""
+
+    # lifetime of a loaded snapshot before the next lookup reloads it
+    DEFAULT_TTL_SECONDS = float(os.getenv('LOOKUP_CACHE_TTL_SECONDS', '300'))
+
+    def __init__(self, loader, key_function, id_function = None, ttl = None):
+        self.loader = loader
+        self.key_function = key_function
+        self.id_function = id_function if id_function is not None else (lambda value: value.id)
+        self.ttl = ttl if ttl is not None else self.DEFAULT_TTL_SECONDS
+        self._values = {}
+        self._index = {}
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def _is_expired(self):
+        """Check whether snapshot is missing or older than TTL (caller holds lock)"""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _load(self):
+        """Reload snapshot from loader and rebuild index (caller holds lock)"""
+        self._values = {}
+        self._index = {}
+        for value in self.loader():
+            self._values[self.id_function(value)] = value
+            # first match wins, the same as a linear scan of the listing
+            self._index.setdefault(self.key_function(value), value)
+        self._loaded_at = time.monotonic()
+
+    def values(self, force_refresh = False):
+        """Get all cached values"""
+        with self._lock:
+            if force_refresh or self._is_expired():
+                self._load()
+            return list(self._values.values())
+
+    def get(self, key, force_refresh = False):
+        """Get value by key, reloading once on a miss in case the collection changed elsewhere"""
+        with self._lock:
+            reloaded = force_refresh or self._is_expired()
+            if reloaded:
+                self._load()
+            value = self._index.get(key)
+            if value is None and not reloaded:
+                self._load()
+                value = self._index.get(key)
+            return value
+
+    def find(self, predicate, force_refresh = False):
+        """Get first cached value matching predicate"""
+        for value in self.values(force_refresh):
+            if predicate(value):
+                return value
+        return None
 
-        return cls._execute_post_request(endpoint, body)
+    def put(self, value):
+        """Add or replace value after it has been created through this process"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            value_id = self.id_function(value)
+            previous = self._values.get(value_id)
+            if previous is not None and self._index.get(self.key_function(previous)) is previous:
+                del self._index[self.key_function(previous)]
+            self._values[value_id] = value
+            self._index.setdefault(self.key_function(value), value)
+
+    def remove(self, value_id):
+        """Remove value after it has been deleted through this process"""
+        with self._lock:
+            value = self._values.pop(value_id, None)
+            if value is None:
+                return
+            key = self.key_function(value)
+            if self._index.get(key) is value:
+                del self._index[key]
+                # another value may share the same key
+                for other in self._values.values():
+                    if self.key_function(other) == key:
+                        self._index[key] = other
+                        break
+
+    def invalidate(self):
+        """Discard snapshot so the next lookup reloads it"""
+        with self._lock:
+            self._values = {}
+            self._index = {}
+            self._loaded_at = None
+
+class LroPoller:
+    """Reusable engine which polls long-running operations (LRO) until they complete"""
+
+    # first status check happens quickly, then the delay grows with jitter up to the maximum
+    INITIAL_DELAY_SECONDS = 1.0
+    BACKOFF_FACTOR = 1.5
+    MAX_DELAY_SECONDS = 15.0
+    JITTER_RATIO = 0.2
+
+    # Retry-After values above this ceiling are clamped
+    MAX_RETRY_AFTER_SECONDS = 60.0
+
+    @classmethod
+    def get_retry_after(cls, response, default = None):
+        """Parse Retry-After header in seconds, supporting delta-seconds and HTTP-date formats"""
+        if response is None:
+            return default
+
+        seconds = RateLimiter.parse_retry_after(response.headers.get('Retry-After'))
+        if seconds is None:
+            return default
+
+        return min(seconds, cls.MAX_RETRY_AFTER_SECONDS)
+
+    @classmethod
+    def get_backoff_delay(cls, attempt):
+        """Get exponential backoff delay with jitter for a zero-based attempt number"""
+        delay = min(cls.INITIAL_DELAY_SECONDS * (cls.BACKOFF_FACTOR ** attempt), cls.MAX_DELAY_SECONDS)
+        jitter = delay * cls.JITTER_RATIO
+        return max(0.0, delay + random.uniform(-jitter, jitter))
+
+    @classmethod
+    def get_poll_delay(cls, attempt, retry_after = None):
+        """Get delay before next status check, preferring server-provided Retry-After"""
+        if retry_after is not None:
+            return retry_after
+        return cls.get_backoff_delay(attempt)
+
+class TokenProvider:
+    """Expiry-aware bearer token cache keyed by scope and shared by all REST API wrapper classes"""
+
+    FABRIC_API_SCOPE = 'https://api.fabric.microsoft.com/.default'
+    ADO_API_SCOPE = '499b84ac-1321-427f-aa17-267ca6975798/.default'
+
+    # tokens are refreshed this many seconds before they expire
+    REFRESH_AHEAD_SECONDS = 300
+
+    # fixed bearer token which replaces Entra ID sign-in when running against a local mock server
+    STATIC_ACCESS_TOKEN = os.getenv('FABRIC_STATIC_ACCESS_TOKEN')
+
+    # service roots which receive Entra ID tokens and must all be local for the static token to be used
+    STATIC_ACCESS_TOKEN_URL_SETTINGS = [ 'FABRIC_API_BASE_URL', 'POWERBI_API_BASE_URL',
+                                         'ADO_API_BASE_URL', 'ADO_VSSPS_API_BASE_URL' ]
+
+    # hosts of a local mock server, the only hosts allowed a static token or bearer tokens over plain HTTP
+    LOOPBACK_HOSTS = [ 'localhost', '127.0.0.1', '::1' ]
+
+    _credential = None
+    _token_cache = {}
+    _lock = threading.Lock()
+    _scope_locks = {}
+
+    @classmethod
+    def get_credential(cls):
+        """Get the one credential used to acquire tokens for every scope"""
+        if cls._credential is None:
+            with cls._lock:
+                if cls._credential is None and cls.STATIC_ACCESS_TOKEN:
+                    remote_settings = [ setting for setting in cls.STATIC_ACCESS_TOKEN_URL_SETTINGS
+                                        if not cls.is_loopback_url(os.getenv(setting, '')) ]
+                    if len(remote_settings) == 0:
+                        AppLogger.log_warning('Using FABRIC_STATIC_ACCESS_TOKEN instead of Entra ID sign-in')
+                        cls._credential = StaticTokenCredential(cls.STATIC_ACCESS_TOKEN)
+                    else:
+                        AppLogger.log_warning('Ignoring FABRIC_STATIC_ACCESS_TOKEN because ' + \
+                                              f'{", ".join(remote_settings)} do not point at localhost')
+                if cls._credential is None:
+                    # azure.identity pulls in msal so it is only imported when a real sign-in is needed
+                    from azure.identity import ClientSecretCredential, DefaultAzureCredential
+                    tenant_id = os.getenv('AZURE_TENANT_ID')
+                    client_id = os.getenv('AZURE_CLIENT_ID')
+                    client_secret = os.getenv('AZURE_CLIENT_SECRET')
+                    # use SPN credentials directly to skip probing the whole credential chain
+                    if tenant_id and client_id and client_secret:
+                        cls._credential = ClientSecretCredential(
+                            tenant_id=tenant_id,
+                            client_id=client_id,
+                            client_secret=client_secret
+                        )
+                    else:
+                        cls._credential = DefaultAzureCredential()
+        return cls._credential
 
     @classmethod
-    def list_pipelines(cls, project_name):
-        """List Pipelines"""
-        return cls._execute_get_request_on_project(project_name, 'pipelines')['value']
-   
-    @classmethod
-    def get_pipeline_by_name(cls, project_name, pipeline_name):
-        """Get Pipeline By Name"""
-        pipelines = cls.list_pipelines(project_name)
-        for pipeline in pipelines:
-            if pipeline['name'] == pipeline_name:
-                return pipeline
+    def _get_scope_lock(cls, cache_key):
+        """Get lock which serializes token acquisition for a single scope"""
+        with cls._lock:
+            scope_lock = cls._scope_locks.get(cache_key)
+            if scope_lock is None:
+                scope_lock = threading.Lock()
+                cls._scope_locks[cache_key] = scope_lock
+            return scope_lock
 
     @classmethod
-    def get_pipeline_id_by_name(cls, project_name, pipeline_name):
-        """Get Pipeline By Name"""
-        pipelines = cls.list_pipelines(project_name)
-        for pipeline in pipelines:
-            if pipeline['name'] == pipeline_name:
-                return pipeline['id']
+    def _is_fresh(cls, token):
+        """Check whether cached token is still outside the refresh window"""
+        return token is not None and \
+               token.expires_on - cls.REFRESH_AHEAD_SECONDS > time.time()
 
     @classmethod
-    def create_pipeline(cls, project_name, pipeline_name, pipeline_yml_file, variable_group_id = None):
-        """Create Pipeline"""
-        AppLogger.log_step(f"Creating pipeline [{pipeline_name}]")
-        repository = cls.get_project_repository(project_name)
-        endpoint = 'pipelines'
-        body = {
-            "name": pipeline_name,
-            "folder":"",
-            "configuration":{
-                "type":"yaml",
-                "path": pipeline_yml_file,
-                "repository":{
-                    "name": project_name,
-                    'id': repository['id'],
-                    "type":"azureReposGit"
-                }
-            }
-        }
-        
-        pipeline = cls._execute_post_request_on_project(project_name, endpoint, body)
-        pipeline_id = pipeline['id']
-        if variable_group_id is not None:
-            cls.set_pipeline_permission(project_name, variable_group_id, pipeline_id)
-
-    @classmethod
-    def list_pipeline_runs(cls, project_name, pipeline_id):
-        """Get pipeline runs"""
-        endpoint = f'pipelines/{pipeline_id}/runs/'
-        return cls._execute_get_request_on_project(project_name, endpoint)
-
-    @classmethod
-    def get_pipeline_run(cls, project_name, pipeline_id, run_id):
-        """Get pipeline run"""
-        endpoint = f'pipelines/{pipeline_id}/runs/{run_id}'
-        return cls._execute_get_request_on_project(project_name, endpoint)
-
-    @classmethod
-    def get_pipeline_run_state(cls, project_name, pipeline_id, run_id):
-        """Get pipeline run state"""
-        endpoint = f'pipelines/{pipeline_id}/runs/{run_id}'
-        return cls._execute_get_request_on_project(project_name, endpoint)['state']
-
-    @classmethod
-    def run_pipeline(cls, project_name, pipeline_name, branch_name):
-        """Run  Pipeline By Name"""
-        AppLogger.log_step(f"Running pipeline [{pipeline_name}] on branch [{branch_name}]")
-        pipeline_id = cls.get_pipeline_id_by_name(project_name, pipeline_name)
-        endpoint = f'pipelines/{pipeline_id}/runs'
-        post_body = {
-            "stagesToSkip": [],
-            "resources": {
-                "repositories": {
-                    "self" : { 
-                        "refName" : f"refs/heads/{branch_name}"
-                    }
-                }
-            },
-            "variables":{}
-        }
-          
-        pipeline_run = cls._execute_post_request_on_project(project_name, endpoint, post_body)
-        pipeline_run_id = pipeline_run['id']
-        
-        pipeline_run_state = cls.get_pipeline_run_state(
-            project_name,
-            pipeline_id, 
-            pipeline_run_id
-        )
-        
-        while pipeline_run_state == 'inProgress':
-            time.sleep(20)
-            pipeline_run_state = cls.get_pipeline_run_state(
-                project_name,
-                pipeline_id,
-                pipeline_run_id
-            )
-                
-        if pipeline_run_state == 'completed':
-            AppLogger.log_substep('Pipeline run completed successfully')
-        else:
-            AppLogger.log_error(f'Error running pipeline - state={pipeline_run_state}')
+    def get_token(cls, *scopes) -> AccessToken:
+        """Get access token for scopes, acquiring a new one only when the cached token nears expiry"""
+        cache_key = ' '.join(sorted(scopes))
 
+        token = cls._token_cache.get(cache_key)
+        if cls._is_fresh(token):
+            return token
 
-    @classmethod
-    def set_pipeline_permission(cls, project_name, variable_group_id, pipeline_id):
-        """Set pipeline permissions"""
-        AppLogger.log_substep("Setting pipeline permissions")
-        endpoint = f'pipelines/pipelinePermissions/variablegroup/{variable_group_id}'
-        body = {
-            "pipelines":[{
-                "id":pipeline_id,
-                "authorized":True
-            }]
-        }
-
-        cls._execute_patch_request_on_project(project_name, endpoint, body)
+        with cls._get_scope_lock(cache_key):
+            # another thread may have refreshed the token while this one was waiting
+            token = cls._token_cache.get(cache_key)
+            if cls._is_fresh(token):
+                return token
+            token = cls.get_credential().get_token(*scopes)
+            cls._token_cache[cache_key] = token
+            return token
 
     @classmethod
-    def get_pull_requests(cls, project_name):
-        """Create Pull Request"""
-        repository = cls.get_project_repository(project_name)
-        endpoint = f"git/repositories/{repository['id']}/pullrequests"
-        return cls._execute_get_request_on_project(project_name, endpoint)
+    def get_access_token(cls, scope):
+        """Get access token string for scope"""
+        return cls.get_token(scope).token
 
     @classmethod
-    def get_pull_request(cls, project_name, pull_request_id):
-        """Get Pull Request"""
-        repository = cls.get_project_repository(project_name)
-        endpoint = f"git/repositories/{repository['id']}/pullrequests/{pull_request_id}"
-        return cls._execute_get_request_on_project(project_name, endpoint)        
+    def is_loopback_url(cls, url):
+        """Check whether url points at a server on this machine"""
+        return urlsplit(url).hostname in cls.LOOPBACK_HOSTS
 
     @classmethod
-    def create_pull_request(cls, project_name, source_branch, target_branch, title, description = "plain description"):
-        """Create Pull Request"""
-        repository = cls.get_project_repository(project_name)
-        endpoint = f"git/repositories/{repository['id']}/pullrequests"
-        body = {
-            "sourceRefName": f"refs/heads/{source_branch}" ,            
-            "targetRefName": f"refs/heads/{target_branch}" ,
-            "title": title,
-            "description": description
-        }
+    def get_pipeline_policies(cls, base_url):
+        """Get Azure Core pipeline policies which SDK clients need to authenticate against base_url"""
+        if base_url.lower().startswith('https://'):
+            return []
+        if not cls.is_loopback_url(base_url):
+            raise ValueError(f'Bearer tokens can only be sent over plain HTTP to localhost, not to [{base_url}]')
+        AppLogger.log_warning(f'Sending bearer tokens over plain HTTP to [{base_url}]')
+        return [ LocalHttpBearerTokenPolicy() ]
 
-        pull_request = cls._execute_post_request_on_project(project_name, endpoint, body)
-        AppLogger.log_substep(f"Pull request [{title}] with PR Id [{pull_request['pullRequestId']}]")
-        return pull_request
-    
-    @classmethod
-    def merge_pull_request(cls, project_name, pull_request, merge_comment = None):
-        """Merge Pull Request"""
-        AppLogger.log_substep("Approving and completing pull request")
-        pull_request_id = pull_request['pullRequestId']
-        repository = cls.get_project_repository(project_name)
-        endpoint = f"git/repositories/{repository['id']}/pullrequests/{pull_request_id}"
-        body = {
-            "completionOptions": {
-                "bypassPolicy": True,
-                "deleteSourceBranch": False,
-                "bypassReason": "policy-watcher-automation"
-            },
-        }
-        cls._execute_patch_request_on_project(project_name, endpoint, body)        
+class CachedTokenCredential:
+    """TokenCredential adapter which serves tokens from the TokenProvider cache"""
 
-        reviewer_id = cls.get_service_principal_id()
+    def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs) -> AccessToken:
+        """Get access token for scopes"""
+        # claims challenges and cross-tenant requests cannot be served from the cache
+        if claims is not None or tenant_id is not None:
+            return TokenProvider.get_credential().get_token(
+                *scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+        return TokenProvider.get_token(*scopes)
 
-        endpoint = f"git/repositories/{repository['id']}/pullrequests/{pull_request_id}/reviewers/{reviewer_id}"
-        body = {
-            "id": reviewer_id,
-            "vote": 10
-        }
+class StaticTokenCredential:
+    """TokenCredential which always returns the same token, used for offline runs against a mock server"""
 
-        cls._execute_put_request_on_project(project_name, endpoint, body)
+    # tokens never need refreshing during an offline run
+    EXPIRES_IN_SECONDS = 24 * 60 * 60
 
-        pull_request = cls.get_pull_request(project_name, pull_request_id)
-        last_merge_source_commit = pull_request['lastMergeSourceCommit']
-        
-        endpoint = f"git/repositories/{repository['id']}/pullrequests/{pull_request_id}"
+    def __init__(self, token):
+        self.token = token
 
-        if merge_comment is None:
-            merge_comment = f'Merged changes from pull request {pull_request_id}'
-            
-        body = {
-            "status": "completed",
-            "autoCompleteSetBy": {
-                "id": reviewer_id
-            },
-            "completionOptions": {
-                "mergeStrategy": "NoFastForward",
-                "mergeCommitMessage": merge_comment,
-                "bypassPolicy": True,
-                "deleteSourceBranch": False,
-                "bypassReason": "policy-watcher-automation"
-            },
-            "lastMergeSourceCommit": last_merge_source_commit
-        }
-        cls._execute_patch_request_on_project(project_name, endpoint, body)        
-
-    @classmethod
-    def create_and_merge_pull_request(cls, project_name, source_branch, target_branch, merge_comment = None):
-        """Create Pull Request"""
-        AppLogger.log_step(f'Creating pull request to push changes from [{source_branch}] to [{target_branch}]')
-        title = f'Pushing changes from {source_branch} to {target_branch}'
-        pull_request = cls.create_pull_request(project_name, source_branch, target_branch, title, 'Auto commit')
-        
-        pull_request_id = pull_request['pullRequestId']
-        pull_request_status = pull_request['status']
-        
-        while pull_request_status != 'active':
-            AppLogger.log_step(f'Waiting while pull request status is {pull_request_status}')
-            time.sleep(3)
-            pull_request = cls.get_pull_request(project_name, pull_request_id)
-            pull_request_status = pull_request['status']        
-
-        cls.merge_pull_request(project_name, pull_request, merge_comment)
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        """Get static access token for any scope"""
+        return AccessToken(self.token, int(time.time()) + self.EXPIRES_IN_SECONDS)
 
-        time.sleep(3)
+class LocalHttpBearerTokenPolicy(SansIOHTTPPolicy):
+    """Pipeline policy which lets SDK clients send bearer tokens over plain HTTP to a local mock server"""
 
-        pull_request = cls.get_pull_request(project_name, pull_request_id)
-        pull_request_status = pull_request['status']
+    def on_request(self, request):
+        """Turn off HTTPS check made by bearer token policy for requests to localhost"""
+        if TokenProvider.is_loopback_url(request.http_request.url):
+            request.context['enforce_https'] = False
 
-        while pull_request_status != 'completed':
-            AppLogger.log_substep('Waiting for pull request to complete')
-            time.sleep(3)
-            pull_request = cls.get_pull_request(project_name, pull_request_id)
-            pull_request_status = pull_request['status']
+class FabricRestApi:
+    """Fabric REST API Wrapper Class"""
 
-        AppLogger.log_substep(f'Pull request merge status: {pull_request["mergeStatus"]}')
+    # used for creating connections with SPN creds
+    AZURE_TENANT_ID = os.getenv('AZURE_TENANT_ID')
+    AZURE_CLIENT_ID = os.getenv('AZURE_CLIENT_ID')
+    AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET')
 
-    @classmethod
-    def get_user_id(cls, user_email):
-        """Get Azure Dev Ops Identities"""
-        endpoint = rf'identities?searchFilter=General&filterValue={user_email}&queryMembership=None' 
-        return cls._execute_get_request_on_vssps(endpoint)['value'][0]['id']
+    # root URL of Fabric REST API which can point to a local mock server for offline benchmarks
+    FABRIC_API_BASE_URL = os.getenv('FABRIC_API_BASE_URL', 'https://api.fabric.microsoft.com').rstrip('/') + '/'
+    FABRIC_API_V1_URL = FABRIC_API_BASE_URL + 'v1/'
 
-    @classmethod
-    def get_service_principal_id(cls):
-        """Get Azure Dev Ops Identities"""
-        endpoint = rf'identities?searchFilter=AccountName&filterValue={EnvironmentSettings.AZURE_TENANT_ID}\{EnvironmentSettings.SERVICE_PRINCIPAL_OBJECT_ID}&queryMembership=None'
-        return cls._execute_get_request_on_vssps(endpoint)['value'][0]['id']
+    # tokens are served from the process-wide TokenProvider cache
+    credential = CachedTokenCredential()
 
+    ADMIN_USER_ID = os.getenv('ADMIN_USER_ID')
+    FABRIC_CAPACITY_ID = os.getenv('FABRIC_CAPACITY_ID')
 
-class FabricRestApi:
-    """Fabric REST API Wrapper Class"""
-    
-    #region class-level fields
-
-    # used for creating DefaultAzureCredential connections with SPN creds
-    AZURE_TENANT_ID = EnvironmentSettings.AZURE_TENANT_ID
-    AZURE_CLIENT_ID = EnvironmentSettings.AZURE_CLIENT_ID
-    AZURE_CLIENT_SECRET = EnvironmentSettings.AZURE_CLIENT_SECRET
-    
-    credential = DefaultAzureCredential()
-    fabric_client = FabricClient(credential)
-
-    ADMIN_USER_ID = EnvironmentSettings.ADMIN_USER_ID
-    DEVELOPERS_GROUP_ID = EnvironmentSettings.DEVELOPERS_GROUP_ID
-    FABRIC_CAPACITY_ID = EnvironmentSettings.FABRIC_CAPACITY_ID
-    
     # used for creating ADLS connections using SAS token
-    AZURE_STORAGE_SAS_TOKEN = EnvironmentSettings.AZURE_STORAGE_SAS_TOKEN
+    AZURE_STORAGE_SAS_TOKEN = os.getenv('AZURE_STORAGE_SAS_TOKEN')
 
-    #endregion
-    
-    #region capacity functions
-    
-    @classmethod
-    def list_capacities(cls):
-        """list capacities accessible to caller"""
-        return cls.fabric_client.core.capacities.list_capacities()
+    ADO_ORGANIZATION = os.getenv('ADO_ORGANIZATION')
+
+    # deadline for on-demand notebook and pipeline jobs
+    JOB_TIMEOUT_SECONDS = float(os.getenv('JOB_TIMEOUT_SECONDS', '7200'))
+
+    # capacity override for workspaces created in the current thread or task context
+    _default_capacity_id = contextvars.ContextVar('default_capacity_id', default=None)
+
+    # name-indexed caches used by get_*_by_name lookups
+    _workspace_cache = IndexedCache(lambda: FabricRestApi.list_workspaces(),
+                                    lambda workspace: workspace.display_name)
+    _connection_cache = IndexedCache(lambda: FabricRestApi.list_connections(),
+                                     lambda connection: connection.display_name)
+    _item_caches = {}
+    _item_caches_lock = threading.Lock()
+
+    # SDK client is created on first use so importing this module stays cheap
+    _fabric_client = None
+    _fabric_client_lock = threading.Lock()
+
+    @classmethod
+    def get_fabric_client(cls):
+        """Get Fabric SDK client shared by all calls, creating it on first use"""
+        if cls._fabric_client is None:
+            with cls._fabric_client_lock:
+                if cls._fabric_client is None:
+                    from microsoft_fabric_api import FabricClient
+                    # every attempt made by the SDK is recorded in HttpMetrics
+                    cls._fabric_client = FabricClient(cls.credential,
+                                                      base_url=cls.FABRIC_API_BASE_URL,
+                                                      per_retry_policies=[HttpMetricsPolicy()] + \
+                                                          TokenProvider.get_pipeline_policies(cls.FABRIC_API_BASE_URL))
+        return cls._fabric_client
+
+    @classmethod
+    def _get_item_cache(cls, workspace_id):
+        """Get name-indexed cache of all items in workspace"""
+        with cls._item_caches_lock:
+            item_cache = cls._item_caches.get(workspace_id)
+            if item_cache is None:
+                item_cache = IndexedCache(lambda: cls.list_workspace_items(workspace_id),
+                                          lambda item: (item.display_name, item.type))
+                cls._item_caches[workspace_id] = item_cache
+            return item_cache
+
+    @classmethod
+    def _invalidate_item_cache(cls, workspace_id = None):
+        """Discard cached items for workspace or for all workspaces when workspace_id is None"""
+        with cls._item_caches_lock:
+            if workspace_id is None:
+                cls._item_caches.clear()
+            else:
+                cls._item_caches.pop(workspace_id, None)
 
     @classmethod
-    def display_capacities(cls):
-        """Display capacities in console"""
-        capacities = cls.list_capacities()
-        AppLogger.log_step("Capacities:")
-        for capacity in capacities:
-            AppLogger.log_substep(f"Capacity: {capacity.display_name}, ID: {capacity.id}")
-
-    #endregion
-
-    #region workspace functions
+    def get_default_capacity_id(cls):
+        """Get capacity used for new workspaces when no capacity id is passed"""
+        capacity_id = cls._default_capacity_id.get()
+        return capacity_id if capacity_id is not None else cls.FABRIC_CAPACITY_ID
 
     @classmethod
     def list_workspaces(cls):
         """list workspaces accessible to caller"""
-        return cls.fabric_client.core.workspaces.list_workspaces()
+        return cls.get_fabric_client().core.workspaces.list_workspaces()
 
-    @classmethod
-    def display_workspaces(cls):
-        """Display workspaces in console"""
-        workspaces = cls.list_workspaces()
-        AppLogger.log_step("Workspaces:")
-        for workspace in workspaces:
-            AppLogger.log_substep(f"Workspace: {workspace.display_name}, ID: {workspace.id}")        
-        
     @classmethod
     def get_workspace_info(cls, workspace_id):
         """Get Workspace information by ID"""
-        return cls.fabric_client.core.workspaces.get_workspace(workspace_id)
+        return cls.get_fabric_client().core.workspaces.get_workspace(workspace_id)
 
     @classmethod
-    def get_workspace_by_name(cls, display_name):
+    def get_workspace_by_name(cls, display_name, force_refresh = False):
         """Get Workspace item by display name"""
-        workspaces = cls.list_workspaces()
-        for workspace in workspaces:
-            if workspace.display_name == display_name:
-                return workspace
-        return None
-    
-    @classmethod
-    def get_workspace_info_by_name(cls, display_name):
-        """Get Workspace information by ID"""
-        workspace = cls.get_workspace_by_name(display_name)        
-        return cls.fabric_client.core.workspaces.get_workspace(workspace.id)
+        return cls._workspace_cache.get(display_name, force_refresh)
 
     @classmethod
-    def create_workspace(cls, display_name, capacity_id = None):
+    def create_workspace(cls, display_name, capacity_id = None, reuse_existing_workspace = False):
         """Create a new Fabric workspace"""
         AppLogger.log_step(f'Creating workspace [{display_name}]')
 
         if capacity_id is None:
-            capacity_id = 'ccf863ed-7145-4789-811d-d9bcd4a8563f'
+            capacity_id = cls.get_default_capacity_id()
 
         existing_workspace = cls.get_workspace_by_name(display_name)
         if existing_workspace is not None:
-            AppLogger.log_substep("Deleting existing workspace with the same name")
-            cls.delete_workspace(existing_workspace.id)
-        
+            if reuse_existing_workspace:
+                AppLogger.log_substep("Found existing workspace with the same name")
+                return existing_workspace
+            else:
+                AppLogger.log_substep("Deleting existing workspace with the same name")
+                cls.delete_workspace(existing_workspace.id)
+
         create_request = {
             "display_name": display_name,
             "capacity_id": capacity_id
         }
 
-        workspace = cls.fabric_client.core.workspaces.create_workspace(
+        workspace = cls.get_fabric_client().core.workspaces.create_workspace(
             create_workspace_request=create_request
         )
-        
+
         workspace_id = workspace.id
         AppLogger.log_substep(f'Workspace created with Id of [{workspace_id}]')
-        
+        cls._workspace_cache.put(workspace)
+
         # add workspace role assignment for admin user
         AppLogger.log_substep('Adding workspace role assignment for admin user')
         cls.add_workspace_role_assignment_for_user(
             workspace_id=workspace_id,
             user_id=cls.ADMIN_USER_ID,
             role_name='Admin'
-        )        
+        )
 
         return workspace
 
-    @classmethod
-    def get_or_create_workspace(cls, display_name, capacity_id = None):
-        """Get or create workspace"""
-
-        existing_workspace = cls.get_workspace_by_name(display_name)
-        if existing_workspace is not None:
-            AppLogger.log_step(f"Getting existing workspace {display_name}")
-            return existing_workspace
-                
-        return cls.create_workspace(display_name, capacity_id)
-
     @classmethod
     def update_workspace_description(cls, workspace_id, description = None):
         """Update Workspace properties"""
-        
+
         update_request = {
             'description': description
         }
-                    
-        cls.fabric_client.core.workspaces.update_workspace(
-            workspace_id=workspace_id, 
+
+        cls.get_fabric_client().core.workspaces.update_workspace(
+            workspace_id=workspace_id,
             update_workspace_request=update_request
         )
 
     @classmethod
     def add_workspace_role_assignment_for_user(cls, workspace_id, user_id, role_name):
         """Add workspace user"""
-   
+
         add_role_request = {
             "role": role_name,
             "principal": {
                 'id': user_id,
-                'type': 'User'                
-            }            
+                'type': 'User'
+            }
         }
 
-        cls.fabric_client.core.workspaces.add_workspace_role_assignment(        
+        cls.get_fabric_client().core.workspaces.add_workspace_role_assignment(
             workspace_id=workspace_id,
             workspace_role_assignment_request=add_role_request
         )
@@ -1284,126 +1194,71 @@ class FabricRestApi:
             "role": role_name,
             "principal": {
                 'id': group_id,
-                'type': 'Group'                
-            }            
-        }
-
-        cls.fabric_client.core.workspaces.add_workspace_role_assignment(        
-            workspace_id=workspace_id,
-            workspace_role_assignment_request=add_role_request
-        )
-
-    @classmethod
-    def add_workspace_role_assignment_for_spn(cls, workspace_id, spn_id, role_name):
-        """Add workspace service principal"""
-
-        add_role_request = {
-            "role": role_name,
-            "principal": {
-                'id': spn_id,
-                'type': 'ServicePrincipal'                
-            }            
-        }
-
-        cls.fabric_client.core.workspaces.add_workspace_role_assignment(        
-            workspace_id=workspace_id,
-            workspace_role_assignment_request=add_role_request
-        )
-
-    @classmethod
-    def provision_workspace_identity(cls, workspace_id, workspace_role = 'Admin'):
-        """Provision Workspace Identity"""        
-        workspace_identity = cls.fabric_client.core.workspaces.provision_identity(workspace_id=workspace_id)        
-        service_principal_id = workspace_identity.service_principal_id
-        cls.add_workspace_role_assignment_for_spn(workspace_id, service_principal_id, workspace_role)
-
-    @classmethod
-    def workspace_has_provisioned_identity(cls, workspace_id):
-        """Check if Workspace has a provisioned identity"""
-        workspace_info = cls.get_workspace_info(workspace_id)
-        return (workspace_info.workspace_identity is not None)
-
-    @classmethod
-    def deprovision_workspace_identity(cls, workspace_id):
-        """Deprovision Workspace Identity"""        
-        cls.fabric_client.core.workspaces.deprovision_identity(workspace_id=workspace_id)        
-
-    @classmethod
-    def delete_workspace(cls, workspace_id):
-        """Delete Workspace"""        
-        cls.fabric_client.core.workspaces.delete_workspace(workspace_id=workspace_id)        
-
-    #endregion
-    
-    #region connection functions
-
-    @classmethod
-    def list_connections(cls):
-        """List all connections accessible to caller"""
-        return cls.fabric_client.core.connections.list_connections()
+                'type': 'Group'
+            }
+        }
+
+        cls.get_fabric_client().core.workspaces.add_workspace_role_assignment(
+            workspace_id=workspace_id,
+            workspace_role_assignment_request=add_role_request
+        )
 
     @classmethod
-    def get_connection_by_name(cls, display_name):
-        """Get Connection By Name"""
-        connections = cls.list_connections()
+    def _get_workspace_connection_map(cls, workspace_ids, connections):
+        """Map each workspace id to the connections with that id in their display name"""
+        workspace_ids = { workspace_id.lower(): workspace_id for workspace_id in workspace_ids }
+        connection_map = { workspace_id: [] for workspace_id in workspace_ids.values() }
+        guid_pattern = re.compile(r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}')
         for connection in connections:
-            if connection.display_name == display_name:
-                return connection
-        return None
+            if connection.display_name is None:
+                continue
+            for guid in set(guid_pattern.findall(connection.display_name)):
+                workspace_id = workspace_ids.get(guid.lower())
+                if workspace_id is not None:
+                    connection_map[workspace_id].append(connection)
+        return connection_map
 
     @classmethod
-    def display_connections(cls):
-        """Display all connections accessible to caller"""
-        connections = cls.list_connections()
-        AppLogger.log_step("Connections:")
-        for conn in connections:
-            AppLogger.log_substep(f" - {conn.display_name}, ID: {conn.id}")
+    def delete_workspace(cls, workspace_id):
+        """Delete Workspace"""
 
-    @classmethod
-    def list_supported_connection_types(cls):
-        """list all connection types supported by Fabric"""
-        return cls.fabric_client.core.connections.list_supported_connection_types()
+        # cascade delete workspace-specific connections, including ones created since the cache was filled
+        connections = cls._connection_cache.values(force_refresh=True)
+        connection_map = cls._get_workspace_connection_map([workspace_id], connections)
+        for connection in connection_map[workspace_id]:
+            cls.delete_connection(connection.id)
 
-    @classmethod
-    def get_connection_type_metadata(cls, type_name):
-        """list all connection types supported by Fabric"""
-        supported_types = cls.fabric_client.core.connections.list_supported_connection_types()
-        for conn_type in supported_types:
-            if conn_type.type == type_name:
-                return conn_type
-            
-        return None
+        # delete workspace
+        cls.get_fabric_client().core.workspaces.delete_workspace(workspace_id)
+        cls._workspace_cache.remove(workspace_id)
+        cls._invalidate_item_cache(workspace_id)
 
     @classmethod
-    def display_supported_connection_types(cls):
-        """Display all connection types supported by Fabric"""
-        connection_types = cls.list_supported_connection_types()
-        AppLogger.log_step("Supported Connection Types:")        
-        for conn_type in connection_types:
-            AppLogger.log_substep(f"{conn_type.type}")
+    def list_connections(cls):
+        """List all connections accessible to caller"""
+        return cls.get_fabric_client().core.connections.list_connections()
 
     @classmethod
-    def display_connection_type_metadata(cls, type_name):
-        """list all connection types supported by Fabric"""
-        target_type = cls.get_connection_type_metadata(type_name)
-        AppLogger.log_step(json.dumps(target_type.as_dict(), indent=4))
+    def get_connection_by_name(cls, display_name, force_refresh = False):
+        """Get Connection By Name"""
+        return cls._connection_cache.get(display_name, force_refresh)
 
     @classmethod
     def create_connection(cls, create_connection_request):
         """ Create new connection"""
         AppLogger.log_substep(f"Creating connection {create_connection_request['displayName']} ...")
 
-        existing_connections = cls.list_connections()
-        for connection in existing_connections:
-            if connection.display_name is not None and connection.display_name  == create_connection_request['displayName']:
-                AppLogger.log_substep(f"Using existing Connection with id [{connection.id}]")
-                return connection
+        connection = cls.get_connection_by_name(create_connection_request['displayName'])
+        if connection is not None:
+            AppLogger.log_substep(f"Using existing Connection with id [{connection.id}]")
+            return connection
 
-        connection = cls.fabric_client.core.connections.create_connection(
+        connection = cls.get_fabric_client().core.connections.create_connection(
             create_connection_request=create_connection_request
         )
 
         AppLogger.log_substep(f"Connection created with id [{connection.id}]")
+        cls._connection_cache.put(connection)
 
         # add admin user as co-owner of connection
         cls.add_connection_role_assignment_for_user(
@@ -1411,13 +1266,19 @@ class FabricRestApi:
             cls.ADMIN_USER_ID,
             'Owner'
         )
-     
+
         return connection
 
+    @classmethod
+    def delete_connection(cls, connection_id):
+        """delete connections"""
+        cls.get_fabric_client().core.connections.delete_connection(connection_id)
+        cls._connection_cache.remove(connection_id)
+
     @classmethod
     def add_connection_role_assignment_for_user(cls, connection_id, admin_user_id, connection_role):
         """Add connection role assignment for user"""
-        
+
         assignment_request = {
             'principal': {
                 'id': admin_user_id,
@@ -1425,8 +1286,8 @@ class FabricRestApi:
             },
             'role': connection_role
         }
-        
-        return cls.fabric_client.core.connections.add_connection_role_assignment(
+
+        return cls.get_fabric_client().core.connections.add_connection_role_assignment(
             connection_id=connection_id,
             add_connection_role_assignment_request=assignment_request
         )
@@ -1443,7 +1304,7 @@ class FabricRestApi:
             'connectionDetails': {
                 'type': 'Web',
                 'creationMethod': 'Web',
-                'parameters': [ 
+                'parameters': [
                     {
                         'value': web_url,
                         'dataType': 'Text',
@@ -1453,7 +1314,7 @@ class FabricRestApi:
             },
             'credentialDetails': {
                 'credentials': {
-                    'credentialType': 'Anonymous' 
+                    'credentialType': 'Anonymous'
                 },
                 'singleSignOnType': 'None',
                 'connectionEncryption': 'NotEncrypted',
@@ -1467,9 +1328,9 @@ class FabricRestApi:
     def create_azure_storage_connection_with_sas_token(cls, server, path):
         """Create Azure Storage connections"""
         display_name = ""
-        
+
         display_name = f"ADLS-SAS-[{server}{path}]"
-        
+
         create_connection_request = {
             'displayName': display_name,
             'connectivityType': 'ShareableCloud',
@@ -1477,7 +1338,7 @@ class FabricRestApi:
             'connectionDetails': {
                 'type': 'AzureDataLakeStorage',
                 'creationMethod': 'AzureDataLakeStorage',
-                'parameters': [ 
+                'parameters': [
                     { 'value': server, 'dataType': 'Text', 'name': 'server' },
                     { 'value': path, 'dataType': 'Text', 'name': 'path' }
                 ]
@@ -1516,7 +1377,7 @@ class FabricRestApi:
             'connectionDetails': {
                 'type': 'SQL',
                 'creationMethod': 'Sql',
-                'parameters': [ 
+                'parameters': [
                     { 'value': server, 'dataType': 'Text', 'name': 'server' },
                     { 'value': database, 'dataType': 'Text', 'name': 'database' }
                 ]
@@ -1536,137 +1397,38 @@ class FabricRestApi:
 
         return cls.create_connection(create_connection_request)
 
-    @classmethod
-    def create_azure_storage_connection_with_service_principal(cls, server, path,
-                                                                workspace = None, lakehouse = None):
-        """Create Azure Storage connections"""
-
-        display_name = ''
-        if workspace is not None:
-            display_name = f"Workspace[{workspace.id}]-" + display_name
-            if lakehouse is not None:
-                display_name = display_name + f"Lakehouse[{lakehouse.display_name}]-Onelake"
-        else:
-            display_name = f'ADLS-SPN-{server}:{path}'
-
-        create_connection_request = {
-            'displayName': display_name,
-            'connectivityType': 'ShareableCloud',
-            'privacyLevel': 'Organizational',
-            'connectionDetails': {
-                'type': 'AzureDataLakeStorage',
-                'creationMethod': 'AzureDataLakeStorage',
-                'parameters': [ 
-                    { 'value': server, 'dataType': 'Text', 'name': 'server' },
-                    { 'value': path, 'dataType': 'Text', 'name': 'path' }
-                ]
-            },
-            'credentialDetails': {
-                'credentials': {
-                    'tenantId': cls.AZURE_TENANT_ID,
-                    'servicePrincipalClientId': cls.AZURE_CLIENT_ID,
-                    'servicePrincipalSecret': cls.AZURE_CLIENT_SECRET,
-                    'credentialType': 'ServicePrincipal'
-                },
-                'singleSignOnType': 'None',
-                'connectionEncryption': 'NotEncrypted',
-                'skipTestConnection': 'false'
-            }
-        }
-
-        return cls.create_connection(create_connection_request)
-
-    @classmethod
-    def list_workspace_connections(cls, workspace_id):
-        """Get connections associated with a specifc workspace"""
-        workspace_connections = []
-        connections = cls.list_connections()
-        for connection in connections:
-            if connection.displayName is not None and workspace_id in connection.displayName:
-                workspace_connections.append(connection)
-        return workspace_connections
-
-    #endregion
-    
-    #region folder functions
-    
-    @classmethod
-    def list_folders(cls, workspace_id):
-        """List Folder"""
-        return cls.fabric_client.core.folders.list_folders(workspace_id=workspace_id)
-
-    @classmethod
-    def create_folder(cls, workspace_id, folder_name, paremt_folder_id = None):
-        """Create Folder"""
-
-        AppLogger.log_step(f'Creating folder {folder_name}')
-        
-        create_request = {
-            'displayName': folder_name,
-            'parentFolderId': paremt_folder_id
-         }
-
-        folder = cls.fabric_client.core.folders.create_folder(workspace_id, create_request)
-        AppLogger.log_substep(f"folder created with Id [{folder.id}]")
-        
-        return folder
-
-    #endregion
-    
-    #region item functions
-
     @classmethod
     def list_workspace_items(cls, workspace_id, item_type = None):
         """Get items in workspace"""
-        return cls.fabric_client.core.items.list_items(workspace_id, type=item_type)
+        return cls.get_fabric_client().core.items.list_items(workspace_id, type=item_type)
 
     @classmethod
-    def get_item_by_name(cls, workspace_id, display_name, item_type):
+    def get_item_by_name(cls, workspace_id, display_name, item_type, force_refresh = False):
         """Get Item by Name"""
-        items = cls.list_workspace_items(workspace_id, item_type)
-        for item in items:
-            if item.display_name == display_name:
-                return item
-        return None
-
-    @classmethod
-    def create_item(cls, workspace_id, create_item_request, folder_id = None):
-        """Create Item"""
-
-        AppLogger.log_step(
-            f"Creating [{create_item_request['displayName']}.{create_item_request['type']}]...")
-        
-        if folder_id is not None:
-            create_item_request['folderId'] = folder_id
-        
-        item = cls.fabric_client.core.items.create_item(workspace_id, create_item_request)
-        AppLogger.log_substep(f"{item.type} created with id [{item.id}]")
-
-        return item
+        item_cache = cls._get_item_cache(workspace_id)
+        if item_type is None:
+            return item_cache.find(lambda item: item.display_name == display_name, force_refresh)
+        return item_cache.get((display_name, item_type), force_refresh)
 
     @classmethod
     def get_item_definition(cls, workspace_id, item, export_format = None):
         """Get Item Definition"""
         # no ability to pass format parameter
-        return cls.fabric_client.core.items.get_item_definition(workspace_id, item.id)
+        return cls.get_fabric_client().core.items.get_item_definition(workspace_id, item.id)
 
     @classmethod
     def update_item_definition(cls, workspace_id, item, update_item_definition_request):
         """Update Item Definition using update-item--definition-request"""
-        return cls.fabric_client.core.items.update_item_definition(
+        return cls.get_fabric_client().core.items.update_item_definition(
             workspace_id,
             item.id,
             update_item_definition_request
         )
 
-    #endregion
-
-    #region variable library functions
-
     @classmethod
     def set_active_valueset_for_variable_library(cls, workspace_id, library, valueset):
         """Set active valueset for variable library"""
-        
+
         # leave default settings for dev environment
         if valueset == 'dev':
             return
@@ -1677,58 +1439,22 @@ class FabricRestApi:
 
         update_request = {
             'displayName': library.display_name,
-            'properties': {                
+            'properties': {
                 'activeValueSetName': valueset
             }
         }
-        
-        cls.fabric_client.variablelibrary.items.update_variable_library(
+
+        cls.get_fabric_client().variablelibrary.items.update_variable_library(
             workspace_id=workspace_id,
             variable_library_id=library.id,
             update_variable_library_request=update_request
         )
- 
-    @classmethod
-    def set_active_valueset_for_variable_library_no_sdk(cls, workspace_id, library, valueset):
-        """Set active valueset for variable library"""
-        if valueset == 'dev':
-            valueset = None
-            
-        AppLogger.log_substep(
-            "Setting active valueset for variable library " + \
-            f"[{library.display_name}] to [{valueset}]...")
-
-        rest_url = f"workspaces/{workspace_id}/VariableLibraries/{library.id}"
-        post_body = {
-            'properties': {                
-                'activeValueSetName': valueset
-            }
-        }
-        cls._execute_patch_request(rest_url, post_body)
-        
- 
-    #endregion
-
-    #region lakehouse and shortcut functions
- 
-    @classmethod
-    def create_lakehouse(cls, workspace_id, display_name, folder_id = None, enable_schemas = False):
-        """Create Lakehouse"""
-        create_item_request = {
-            'displayName': display_name, 
-            'type': 'Lakehouse' 
-        }
-
-        if enable_schemas:
-            create_item_request['creationPayload'] = { 'enableSchemas': True }
-            
-        return cls.create_item(workspace_id, create_item_request, folder_id)
 
     @classmethod
     def get_lakehouse(cls, workspace_id, lakehouse_id):
         """Get lakehouse properties"""
         rest_url = f'workspaces/{workspace_id}/lakehouses/{lakehouse_id}'
-        return cls.fabric_client.lakehouse.items.get_lakehouse(
+        return cls.get_fabric_client().lakehouse.items.get_lakehouse(
             workspace_id=workspace_id,
             lakehouse_id=lakehouse_id
         )
@@ -1737,11 +1463,13 @@ class FabricRestApi:
     def get_sql_endpoint_for_lakehouse(cls, workspace_id, lakehouse):
         """Get SQL endpoint properties for lakehouse"""
 
+        start_time = time.monotonic()
         lakehouse = cls.get_lakehouse(workspace_id, lakehouse.id)
         while lakehouse.properties.sql_endpoint_properties.provisioning_status != 'Success':
             wait_time = 10
             time.sleep(wait_time)
             lakehouse = cls.get_lakehouse(workspace_id, lakehouse.id)
+        HttpMetrics.record_wait('sql_endpoint_provisioning', time.monotonic() - start_time)
 
         server = lakehouse.properties.sql_endpoint_properties.connection_string
         database = lakehouse.properties.sql_endpoint_properties.id
@@ -1755,54 +1483,24 @@ class FabricRestApi:
     def refresh_sql_endpoint_metadata(cls, workspace_id, sql_endpoint_id):
         """Refresh SL Endpoint"""
         AppLogger.log_substep("Updating SQL Endpoint metadata...")
-        cls.fabric_client.sqlendpoint.items.refresh_sql_endpoint_metadata(
+        cls.get_fabric_client().sqlendpoint.items.refresh_sql_endpoint_metadata(
                         workspace_id=workspace_id,
                         sql_endpoint_id=sql_endpoint_id,
                         sql_endpoint_refresh_metadata_request={}
                     ).value
-            
+
         AppLogger.log_substep(f"SQL Endpoint metadata refresh job completed successfully")
 
     @classmethod
     def list_shortcuts(cls, workspace_id, lakehouse_id):
         """List Shortcuts"""
-        return cls.fabric_client.core.one_lake_shortcuts.list_shortcuts(workspace_id, lakehouse_id)
+        return cls.get_fabric_client().core.one_lake_shortcuts.list_shortcuts(workspace_id, lakehouse_id)
 
-    @classmethod
-    def create_onelake_shortcut(cls, 
-                                workspace_id, 
-                                target_lakehouse_id,
-                                source_lakehouse_id,
-                                name, 
-                                path,
-                                ):
-        """Create ADLS Gen2 Shortcut"""
-        AppLogger.log_step('Creating OneLake shortcut using ADLS connection...')
-        create_request = {
-            'name': name,
-            'path': f'/{path}',
-            'target': {
-                'onelake': {
-                    'itemId': source_lakehouse_id,
-                    'path': f'{path}/{name}',
-                    'workspaceId': workspace_id
-                }
-            }
-        }
-        
-        cls.fabric_client.core.one_lake_shortcuts.create_shortcut(
-            workspace_id, 
-            target_lakehouse_id,
-            create_request
-        )
-                
-        AppLogger.log_substep(f'Shortcut [{path}/{name}] successfullly created')
-       
     @classmethod
     def create_adls_gen2_shortcut(cls, workspace_id, lakehouse_id, name, path,
                                     location, subpath, connection_id):
         """Create ADLS Gen2 Shortcut"""
-        AppLogger.log_substep(f'Creating OneLake shortcut [{path}/{name}] using ADLS connection...')
+        AppLogger.log_substep(f'Creating ADLS Gen2 shortcut [{path}/{name}] using ADLS connection...')
         create_request = {
             'name': name,
             'path': path,
@@ -1814,8 +1512,8 @@ class FabricRestApi:
                 }
             }
         }
-        cls.fabric_client.core.one_lake_shortcuts.create_shortcut(
-            workspace_id, 
+        cls.get_fabric_client().core.one_lake_shortcuts.create_shortcut(
+            workspace_id,
             lakehouse_id,
             create_request,
             shortcut_conflict_policy='CreateOrOverwrite'
@@ -1833,44 +1531,7 @@ class FabricRestApi:
             "$(/**/environment_settings/adls_shortcut_subpath)",
             "$(/**/environment_settings/adls_connection_id)"
         )
- 
-    #endregion
-
-    #region job functions
-
-    @classmethod
-    def run_notebook_with_sdk(cls, workspace_id, notebook):
-        """Run notebook and wait for job completion"""
-        AppLogger.log_substep(f"Running notebook [{notebook.display_name}]...")
-
-        response = cls.fabric_client.core.job_scheduler.run_on_demand_item_job(
-            workspace_id=workspace_id,
-            item_id=notebook.id,
-            job_type='RunNotebook'            
-        )
-
-        AppLogger.log_substep("Notebook run job completed successfully")
-        return response
-
-
-    @classmethod
-    def run_data_pipeline_with_sdk(cls, workspace_id, pipeline):
-        """Run pipeline and wait for job completion"""
-        AppLogger.log_substep(f"Running data pipeline [{pipeline.display_name}]...")
-        
-        response = cls.fabric_client.core.job_scheduler.run_on_demand_item_job(
-            workspace_id=workspace_id,
-            item_id=pipeline.id,
-            job_type='Pipeline'
-        )
-        
-        AppLogger.log_substep("Data pipeline run job completed successfully")
-        return response
 
-    #endregion
- 
-    #region semantic model functions
- 
     @classmethod
     def bind_semantic_model_to_connection(cls, workspace_id, semantic_model_id, connection_id):
         """Bind semantic model to connection"""
@@ -1932,179 +1593,30 @@ class FabricRestApi:
                 AppLogger.log_substep('Creating AzureDataLakeStorage connection for semantic model')
                 server    = datasource['connectionDetails']['server']
                 path      = datasource['connectionDetails']['path']
-                if 'onelake.dfs.fabric.microsoft.com' in server:
-                    connection = cls.create_azure_storage_connection_with_service_principal(server, path, workspace, lakehouse)
-                else:
-                    connection = cls.create_azure_storage_connection_with_sas_token(server, path)
-                    
-                AppLogger.log_substep('Binding semantic model to OneLake connection')
+                connection = cls.create_azure_storage_connection_with_sas_token(server, path)
+                AppLogger.log_substep('Binding semantic model to Azure Gen2 storage')
                 cls.bind_semantic_model_to_connection(workspace.id, semantic_model_id, connection.id)
                 cls.refresh_semantic_model(workspace.id, semantic_model_id)
 
-    #endregion
-    
-    #region deployment pipelines
-          
-    @classmethod
-    def list_deployment_pipelines(cls):
-        """Get all deployment pipelines accessible to caller"""
-        return cls.fabric_client.core.deployment_pipelines.list_deployment_pipelines()
-
-    @classmethod
-    def get_deployment_pipeline_by_name(cls, display_name):
-        """Get Deployment Pipeline item by display name"""
-        pipelines = cls.list_deployment_pipelines()
-        for pipeline in pipelines:
-            if pipeline.display_name == display_name:
-                return pipeline
-        return None
-
-    @classmethod
-    def list_deployment_pipeline_stages(cls, pipeline_id):
-        """List all deployment pipeline stages"""
-        return cls.fabric_client.core.deployment_pipelines.list_deployment_pipeline_stages(pipeline_id)
-
-    @classmethod
-    def delete_deployment_pipeline(cls, pipeline_id):
-        """Delete Deployment Pipeline"""
-        cls.fabric_client.core.deployment_pipelines.delete_deployment_pipeline(pipeline_id)
-
-    @classmethod
-    def display_deployment_pipelines(cls):
-        """Display Deployment Pipeline"""
-        AppLogger.log_step('Deployment Pipelines:')
-        pipelines = cls.list_deployment_pipelines()
-        for pipeline in pipelines:
-            AppLogger.log_substep(f"{pipeline.id} - {pipeline.display_name}")
-
-    @classmethod
-    def create_deployment_pipeline(cls, display_name, stages):
-        """Create Deployment Pipeline"""
-        AppLogger.log_step(f'Creating Deployment Pipeline [{display_name}]')
-        pipeline_stages = []
-        for stage in stages:
-            pipeline_stages.append({
-                'displayName': stage,
-                'description': f'stage for {stage}',
-                'isPublic': False
-            })
-        create_request = {
-            'displayName': display_name,
-            'description': 'great example',
-            'stages': pipeline_stages
-        }
-        
-        pipeline = cls.fabric_client.core.deployment_pipelines.create_deployment_pipeline(create_request)
-        
-        AppLogger.log_substep(f"Pipeline create with id [{pipeline.id}]")
-
-        AppLogger.log_substep('Adding deployment pipeline role of [Admin] for admin user')
-        cls.add_deployment_pipeline_role_assignment(pipeline.id,
-                                                    cls.ADMIN_USER_ID,
-                                                    'User',
-                                                    'Admin')
-
-        return pipeline
-
-    @classmethod
-    def add_deployment_pipeline_role_assignment(cls, pipeline_id, principal_id, principal_type, role):
-        """Add Deployment Pipeline Role Assignment"""
-        add_request = {
-            'principal': {
-                'id': principal_id,
-                'type': principal_type
-            },
-            'role': role
-        }
-        return cls.fabric_client.core.deployment_pipelines.add_deployment_pipeline_role_assignment(
-            pipeline_id, 
-            add_request
-        )
-
-    @classmethod
-    def assign_workpace_to_pipeline_stage(cls, workspace_id, pipeline_id, stage_id):
-        """Assign workspace to pipeline stage """
-        assign_request = { 'workspaceId': workspace_id }
-        cls.fabric_client.core.deployment_pipelines.assign_workspace_to_stage(
-            pipeline_id,
-            stage_id,
-            assign_request
-        )
-
-    @classmethod
-    def unassign_workpace_from_pipeline_stage(cls, pipeline_id, stage_id):
-        """Assign workspace to pipeline stage"""
-        cls.fabric_client.core.deployment_pipelines.unassign_workspace_from_stage(
-            pipeline_id,
-            stage_id
-        )
-
-    @classmethod
-    def deploy_to_pipeline_stage_with_sdk(cls, pipeline_id, source_stage_id, target_stage_id,    note = None):
-        """Deploy to pipeline stage"""
-        deploy_request = {
-            'sourceStageId': source_stage_id,
-            'targetStageId': target_stage_id
-        }
-        if note is not None:
-            deploy_request['note'] = note
-        else:
-            deploy_request['note'] = 'A bunch of saves'
-
-        cls.fabric_client.core.deploymentpipelines.deploy_stage_content(
-            pipeline_id,
-            deploy_request
-        )
-
-    @classmethod
-    def deploy_to_pipeline_stage(cls, pipeline_id, source_stage_id, target_stage_id,    note = None):
-        """Deploy to pipeline stage"""
-        endpoint = f'deploymentPipelines/{pipeline_id}/deploy'
-        deploy_request = {
-            'sourceStageId': source_stage_id,
-            'targetStageId': target_stage_id
-        }
-        if note is not None:
-            deploy_request['note'] = note
-        else:
-            deploy_request['note'] = 'Demo of automating deployment using APIs'
-
-
-        cls._execute_post_request(endpoint, deploy_request)
-    
-    #endregion
-    
-    #region generic Git integration functions
-
     @classmethod
     def initialize_git_connection(cls, workspace_id, initialize_connection_request):
         """Initialize GIT Connection"""
-        return cls.fabric_client.core.git.initialize_connection(
+        return cls.get_fabric_client().core.git.initialize_connection(
             workspace_id=workspace_id,
-            git_initialize_connection_request=initialize_connection_request            
+            git_initialize_connection_request=initialize_connection_request
         )
 
     @classmethod
     def get_git_status(cls, workspace_id):
         """Get GIT Connection Status"""
-        return cls.fabric_client.core.git.get_status(workspace_id=workspace_id)
-
-    @classmethod
-    def get_git_connection(cls, workspace_id):
-        """Get GIT Connection"""
-        return cls.fabric_client.core.git.get_connection(workspace_id=workspace_id)
-
-    @classmethod
-    def disconnect_workspace_from_git(cls, workspace_id):
-        """Disconnect Workspace from GIT Repository"""
-        return cls.fabric_client.core.git.disconnect(workspace_id)
+        return cls.get_fabric_client().core.git.get_status(workspace_id=workspace_id)
 
     @classmethod
-    def commit_workspace_to_git(cls, workspace_id, commit_to_git_request = None, commit_comment = "commit workspace changes back to repo"):
+    def commit_workspace_to_git(cls, workspace_id, commit_to_git_request = None, commit_message = "commit workspace changes back to repo"):
         """Commit Workspace to GIT Repository"""
-          
+
         AppLogger.log_substep("Committing Workspace content to GIT repository")
-                
+
         if commit_to_git_request is None:
             currest_status = cls.get_git_status(workspace_id)
             changes = currest_status.changes
@@ -2115,23 +1627,23 @@ class FabricRestApi:
                     'mode': 'All',
                     'workspaceHead': currest_status.workspace_head,
                     'remoteCommitHash': currest_status.remote_commit_hash,
-                    'comment': commit_comment
+                    'comment': commit_message
             }
-            
-        cls.fabric_client.core.git.commit_to_git(
-            workspace_id, 
+
+        cls.get_fabric_client().core.git.commit_to_git(
+            workspace_id,
             commit_to_git_request)
-        
+
         AppLogger.log_substep('GIT sync process completed successfully')
 
     @classmethod
     def update_workspace_from_git(cls, workspace_id, update_from_git_request = None):
         """Update Workspace from GIT Repository"""
-        
-        AppLogger.log_substep("Updating workspace items from item definition in GIT")
-        
-        if update_from_git_request is None:            
-            git_status = FabricRestApi.get_git_status(workspace_id)
+        AppLogger.log_substep("Committing GIT repsitory content to workspace items")
+
+        # by default remote changes win over changes made in the workspace
+        if update_from_git_request is None:
+            git_status = cls.get_git_status(workspace_id)
             update_from_git_request = {
                 "workspaceHead": git_status.workspace_head,
                 "remoteCommitHash": git_status.remote_commit_hash,
@@ -2139,29 +1651,11 @@ class FabricRestApi:
                     "conflictResolutionType": "Workspace",
                     "conflictResolutionPolicy": "PreferRemote"
                 },
-                "options": { "allowOverrideItems": True }                
+                "options": { "allowOverrideItems": True }
             }
-                    
-        cls.fabric_client.core.git.update_from_git(workspace_id, update_from_git_request)
-        AppLogger.log_substep("GIT synchronization process complete")
-
-    @classmethod
-    def get_my_git_credentials(cls, workspace_id):
-        """Get My GIT Credential"""
-        return cls.fabric_client.core.git.get_my_git_credentials(workspace_id)
 
-    @classmethod
-    def update_my_git_credentials(cls, workspace_id, update_git_credentials_request):
-        """Update My GIT Credentials"""
-        endpoint = f"workspaces/{workspace_id}/git/myGitCredentials"
-        return cls.fabric_client.core.git.update_my_git_credentials(
-            workspace_id,
-            update_git_credentials_request
-        )    
-    
-    #endregion
-    
-    #region Azure Dev Ops specific function
+        cls._invalidate_item_cache(workspace_id)
+        return cls.get_fabric_client().core.git.update_from_git(workspace_id, update_from_git_request)
 
     @classmethod
     def _create_ado_source_control_connection(cls, url):
@@ -2176,7 +1670,7 @@ class FabricRestApi:
             'connectionDetails': {
                 'type': 'AzureDevOpsSourceControl',
                 'creationMethod': 'AzureDevOpsSourceControl.Contents',
-                'parameters': [ 
+                'parameters': [
                     { 'name': 'url', 'dataType': 'Text', 'value': url }
                 ]
             },
@@ -2194,12 +1688,12 @@ class FabricRestApi:
         }
 
         return cls.create_connection(create_connection_request)
-    
+
     @classmethod
-    def _get_ado_repo_connection(cls, project_name, workspace):
+    def _get_ado_repo_connection(cls, project_name):
         """Get Azure DevOps Repo Connection"""
 
-        ado_repo_url = f'https://dev.azure.com/fabricdevcamp/{project_name}/_git/{project_name}/'
+        ado_repo_url = f'https://dev.azure.com/{cls.ADO_ORGANIZATION}/{project_name}/_git/{project_name}/'
 
         connections = FabricRestApi.list_connections()
 
@@ -2211,72 +1705,39 @@ class FabricRestApi:
         return FabricRestApi._create_ado_source_control_connection(ado_repo_url)
 
     @classmethod
-    def _create_workspace_connection_to_ado_repo_as_user(cls, workspace_id, project_name, branch = 'main'):
-        
-        """Connect Workspace Connection to Azure DevOps Repository"""
-
-        endpoint = f"workspaces/{workspace_id}/git/connect"
-
-        workspace_folder = "workspace"
-
-        connect_request = {
-            "gitProviderDetails": {
-                "organizationName": "FabricDevCamp",
-                "projectName": project_name,
-                "gitProviderType": "AzureDevOps",
-                "repositoryName": project_name,
-                "branchName": branch,
-                "directoryName": f"/{workspace_folder}"
-            }
-        }
-
-        return cls.fabric_client.core.git.connect(
-            workspace_id=workspace_id, 
-            connect_git_request=connect_request
-        )
-
-    @classmethod
-    def _create_workspace_connection_to_ado_as_service_principal(cls, workspace, project_name, branch = 'main'):
+    def _create_workspace_connection_to_ado_repo(cls, workspace_id, project_name, connection_id,
+                                                 branch = 'main', git_folder = '/workspace'):
         """Connect Workspace Connection to Azure DevOps Repository"""
 
-        workspace_id = workspace.id
-
-        workspace_folder = "workspace"
-
-        connection = cls._get_ado_repo_connection(project_name, workspace)
-        connection_id = connection.id
-
         connect_request = {
             "gitProviderDetails": {
-                "organizationName": "FabricDevCamp",
+                "organizationName": EnvironmentSettings.ADO_ORGANIZATION,
                 "projectName": project_name,
                 "gitProviderType": "AzureDevOps",
                 "repositoryName": project_name,
                 "branchName": branch,
-                "directoryName": f"/{workspace_folder}"
+                "directoryName": git_folder
             },
             "myGitCredentials": {
                 "source": "ConfiguredConnection",
-                "connectionId": connection_id            
+                "connectionId": connection_id
             }
         }
 
-        return cls.fabric_client.core.git.connect(
-            workspace_id=workspace_id, 
-            git_connect_request=connect_request
-        )
+        return cls.get_fabric_client().core.git.connect(workspace_id, connect_request)
 
     @classmethod
-    def connect_workspace_to_ado_repo(cls, workspace, project_name, branch = 'main'):
+    def connect_workspace_to_ado_repo(cls, workspace, project_name, branch = 'main', git_folder = '/workspace'):
         """Connect Workspace to Azure Dev Ops Repository"""
-
-        AppLogger.log_substep(f"Connecting workspace[{workspace.display_name}] " + \
+        AppLogger.log_substep(f"Connecting workspace [{workspace.display_name}] " + \
                                 f"to branch[{branch}] in Azure DevOps repo[{project_name}]")
 
-        cls._create_workspace_connection_to_ado_as_service_principal(workspace, project_name, branch)
-        
-        AppLogger.log_substep("Workspace connection created successfully")
+        connection = cls._get_ado_repo_connection(project_name)
+        connection_id = connection.id
+
+        cls._create_workspace_connection_to_ado_repo(workspace.id, project_name, connection_id, branch, git_folder)
 
+        AppLogger.log_substep("Workspace connection created successfully")
 
         init_request = {
             'initializationStrategy': 'PreferWorkspace'
@@ -2285,7 +1746,7 @@ class FabricRestApi:
         init_response = cls.initialize_git_connection(workspace.id, init_request)
 
         required_action = init_response.required_action
-    
+
         if required_action == 'CommitToGit':
             commit_to_git_request = {
                 'mode': 'All',
@@ -2293,7 +1754,7 @@ class FabricRestApi:
                 'comment': 'Initial commit from workspace'
             }
             cls.commit_workspace_to_git(
-                workspace.id, 
+                workspace.id,
                 commit_to_git_request,
                 'Initial commit of workspace items to GIT')
 
@@ -2305,219 +1766,75 @@ class FabricRestApi:
                     "conflictResolutionType": "Workspace",
                     "conflictResolutionPolicy": "PreferWorkspace"
                 },
-                "options": {
-                    "allowOverrideItems": True
-                }
-                            
-            }
-            cls.update_workspace_from_git(workspace.id, update_from_git_request)
-
-        AppLogger.log_substep("Workspace connection successfully created and synchronized")
-
-    #endregion
-
-    #region  direct calls to Fabric REST API for gaps and bugs where the SDK does not work
-    
-    @classmethod
-    def run_notebook(cls, workspace_id, notebook):
-        """Run notebook and wait for job completion"""
-        AppLogger.log_substep(f"Running notebook [{notebook.display_name}]...")
-        rest_url = f"workspaces/{workspace_id}/items/{notebook.id}" + \
-                    "/jobs/instances?jobType=RunNotebook"
-        response = cls._execute_post_request_for_job_scheduler(rest_url)
-        AppLogger.log_substep("Notebook run job completed successfully")
-        return response
-
-    @classmethod
-    def run_data_pipeline(cls, workspace_id, pipeline):
-        """Run notebook and wait for job completion"""
-        AppLogger.log_substep(f"Running data pipeline [{pipeline.display_name}]...")
-
-        rest_url = f"workspaces/{workspace_id}/items/{pipeline.id}" + \
-                    "/jobs/instances?jobType=Pipeline"
-        response = cls._execute_post_request_for_job_scheduler(rest_url)
-        AppLogger.log_substep("Data pipeline run job completed successfully")
-        return response
-
-    @classmethod
-    def refresh_sql_endpoint_metadata_no_sdk(cls, workspace_id, sql_endpoint_id):
-        """Refresh SL Endpoint"""
-        AppLogger.log_substep("Updating SQL Endpoint metadata (NO SDK)...")
-        endpoint = \
-            f"workspaces/{workspace_id}/sqlEndpoints/{sql_endpoint_id}/refreshMetadata?preview=True"
-        cls._execute_post_request(endpoint, {})        
-
-    @classmethod
-    def _execute_post_request(cls, endpoint, post_body=''):
-        """Execute POST request with support for Long-running Operations (LRO)"""
-        rest_url = 'https://api.fabric.microsoft.com/v1/' + endpoint        
-        fabric_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-        access_token = cls.credential.get_token(fabric_rest_api_scope).token
-        request_headers = {'Content-Type':'application/json',
-                             'Authorization': f'Bearer {access_token}'}
-
-        response = requests.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
-
-        if response.status_code in { 200, 201, 204 }:
-            try:
-                return response.json()
-            except JSONDecodeError:
-                return None
-
-        if response.status_code == 202:
-            operation_state_url = response.headers.get('Location')
-            wait_time = 10 # int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            response = requests.get(url=operation_state_url, headers=request_headers, timeout=60)
-            operation_state = response.json()
-            while operation_state['status'] != 'Succeeded' and \
-                    operation_state['status'] != 'Failed':
-                time.sleep(wait_time)
-                response = requests.get(url=operation_state_url,
-                                        headers=request_headers,
-                                        timeout=60)
-                operation_state = response.json()
-
-            if operation_state['status'] == 'Succeeded':
-                if 'Location' in response.headers:
-                    operation_result_url = response.headers.get('Location')
-                    response = requests.get(url=operation_result_url,
-                                            headers=request_headers,
-                                            timeout=60)
-                    if response.status_code == 200:
-                        return response.json()
-                    else:
-                        AppLogger.log_error(f"Error - {response.status_code}")
-                        return None
-                else:
-                    return None
-            else:
-                AppLogger.log_error(f"Error - {operation_state}")
-
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_post_request(endpoint, post_body)
-     
-        elif response.status_code == 404: # handle NOT FOUND error
-            AppLogger.log_substep('Received 404 NOT FOUND error - waiting 10 seconds and retrying')
-            wait_time = 10
-            time.sleep(wait_time)
-            return cls._execute_post_request(endpoint, post_body)
-        
-        else:
-            AppLogger.log_error(
-                f'Error executing POST request: {response.status_code} - {response.text}')
-            raise RuntimeError(f'Error executing POST request: {response.status_code} - {response.text}')
-
-    @classmethod
-    def _execute_patch_request(cls, endpoint, post_body):
-        """Execute GET Request on Fabric REST API Endpoint"""
-        rest_url = 'https://api.fabric.microsoft.com/v1/' + endpoint        
-        fabric_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-        access_token = cls.credential.get_token(fabric_rest_api_scope).token
-        request_headers = {'Content-Type':'application/json',
-                           'Authorization': f'Bearer {access_token}'}
-        response = requests.patch(url=rest_url, json=post_body, headers=request_headers, timeout=60)
-        if response.status_code in {200, 204}:
-            return response.json()
-
-        if response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            return cls._execute_patch_request(endpoint, post_body)
-        else:
-            AppLogger.log_error(
-                f'Error executing PATCH request: {response.status_code} - {response.text}')
-            return None
-
+                "options": {
+                    "allowOverrideItems": True
+                }
 
+            }
+            cls.update_workspace_from_git(workspace.id, update_from_git_request)
 
+        AppLogger.log_substep("Workspace connection successfully created and synchronized")
 
     @classmethod
-    def _execute_post_request_for_job_scheduler(cls, endpoint, post_body=''):
-        """Execute POST request with support for Om-demand Job with Job Scheduler"""
-        rest_url = 'https://api.fabric.microsoft.com/v1/' + endpoint        
-        fabric_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-        access_token = cls.credential.get_token(fabric_rest_api_scope).token
+    def start_item_job(cls, workspace_id, item_id, job_type, post_body = ''):
+        """Submit on-demand item job without waiting and return job instance URL and Retry-After hint"""
+        rest_url = cls.FABRIC_API_V1_URL + \
+                   f'workspaces/{workspace_id}/items/{item_id}/jobs/instances?jobType={job_type}'
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
         request_headers = {'Content-Type':'application/json',
-                             'Authorization': f'Bearer {access_token}'}
-        response = requests.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
-
-        if response.status_code == 202:
-            operation_state_url = response.headers.get('Location')
-            wait_time = 10 # int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            response = requests.get(url=operation_state_url, headers=request_headers, timeout=60)
-            operation_state = response.json()
-            while operation_state['status'] == 'NotStarted' or \
-                    operation_state['status'] == 'InProgress' or \
-                    (operation_state['status'] == 'Failed' and \
-                     operation_state['failureReason']['errorCode'] == 'RequestExecutionFailed'    ):
-                time.sleep(wait_time)
-                response = requests.get(url=operation_state_url,
-                                        headers=request_headers,
-                                        timeout=60)
-                operation_state = response.json()
-
-            if operation_state['status'] == 'Completed':
-                return
-
-            if operation_state['status'] == 'Failed':
-                AppLogger.log_error('On-demand job Failed')
-                print('----------------------------')
-                print(operation_state)
-                print('----------------------------')
-                print(response)
-                print('----------------------------')
-                raise RuntimeError('On-demand job started but Failed')
-
-            if operation_state['status'] == 'Cancelled':
-                AppLogger.log_error('On-demand job was cancelled')
-
-            if operation_state['status'] == 'Deduped':
-                AppLogger.log_error('On-demand job was depuped')
-
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            time.sleep(wait_time)
-            cls._execute_post_request_for_job_scheduler(endpoint, post_body)
-        else:
+                           'Authorization': f'Bearer {access_token}'}
+        response = HttpSessionPool.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
+        if response.status_code != 202:
             AppLogger.log_error(
                 f'Error executing POST request: {response.status_code} - {response.text}')
+            raise RuntimeError(f'On-demand job could not be started: {response.status_code}')
+        return response.headers.get('Location'), LroPoller.get_retry_after(response)
 
-    #endregion
+    @classmethod
+    def get_item_job_instance(cls, job_instance_url):
+        """Get job instance state and Retry-After hint, returning None state on transient errors"""
+        access_token = TokenProvider.get_access_token(TokenProvider.FABRIC_API_SCOPE)
+        request_headers = {'Content-Type':'application/json',
+                           'Authorization': f'Bearer {access_token}'}
+        response = HttpSessionPool.get(url=job_instance_url, headers=request_headers, timeout=60)
+        if response.status_code == 429 or response.status_code >= 500:
+            return None, LroPoller.get_retry_after(response)
+        if response.status_code not in { 200, 201, 202 }:
+            raise RuntimeError(
+                f'Error polling job instance: {response.status_code} - {response.text}')
+        return response.json(), LroPoller.get_retry_after(response)
+
+    @classmethod
+    def _is_job_instance_complete(cls, job_instance):
+        """Check whether on-demand job instance has stopped running"""
+        status = job_instance['status']
+        if status in { 'NotStarted', 'InProgress' }:
+            return False
+        # job scheduler reports this transient failure while it retries the job
+        failure_reason = job_instance.get('failureReason') or {}
+        if status == 'Failed' and failure_reason.get('errorCode') == 'RequestExecutionFailed':
+            return False
+        return True
 
 class PowerBiRestApi:
     """Power BI REST API Wrapper Class used for operations not yet supported by Fabric REST API"""
 
-    # used for creating DefaultAzureCredential connections with SPN creds
-    AZURE_TENANT_ID = os.getenv('AZURE_TENANT_ID')
-    AZURE_CLIENT_ID = os.getenv('AZURE_CLIENT_ID')
-    AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET')
-    
-    credential = DefaultAzureCredential()
-    fabric_client = FabricClient(credential)
-    
+    # root URL of Power BI REST API which can point to a local mock server for offline benchmarks
+    POWERBI_API_BASE_URL = os.getenv('POWERBI_API_BASE_URL', 'https://api.powerbi.com').rstrip('/') + '/'
+
     powerbi_rest_api_scope = 'https://api.fabric.microsoft.com/.default'
-    powerbi_rest_api_base_url = 'https://api.powerbi.com/v1.0/myorg/'
-    
+    powerbi_rest_api_base_url = POWERBI_API_BASE_URL + 'v1.0/myorg/'
+
     @classmethod
     def _execute_get_request_to_powerbi(cls, endpoint):
         """Execute GET Request on Power BI REST API Endpoint"""
         rest_url = cls.powerbi_rest_api_base_url + endpoint
-        scope = cls.powerbi_rest_api_scope
-        access_token = cls.credential.get_token(scope).token
+        access_token = TokenProvider.get_access_token(cls.powerbi_rest_api_scope)
         request_headers = {'Content-Type':'application/json',
                              'Authorization': f'Bearer {access_token}'}
-        response = requests.get(url=rest_url, headers=request_headers, timeout=60)
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
         if response.status_code in { 200, 202 }:
             return response.json()
-        elif response.status_code == 429: # handle TOO MANY REQUESTS error
-            wait_time = int(response.headers.get('Retry-After'))
-            AppLogger.log_substep(f'Waiting {wait_time} seconds due to 429 TOO MANY REQUESTS error')
-            time.sleep(wait_time)
-            return cls._execute_get_request_to_powerbi(endpoint)
         else:
             AppLogger.log_error(
                 f'Error executing GET request: {response.status_code} - {response.text}')
@@ -2526,11 +1843,10 @@ class PowerBiRestApi:
     @classmethod
     def _execute_post_request_to_powerbi(cls, endpoint, post_body=''):
         rest_url = cls.powerbi_rest_api_base_url + endpoint
-        scope = cls.powerbi_rest_api_scope
-        access_token = cls.credential.get_token(scope).token
+        access_token = TokenProvider.get_access_token(cls.powerbi_rest_api_scope)
         request_headers = {'Content-Type':'application/json',
                              'Authorization': f'Bearer {access_token}'}
-        response = requests.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
+        response = HttpSessionPool.post(url=rest_url, headers=request_headers, json=post_body, timeout=60)
         return response
 
     @classmethod
@@ -2543,20 +1859,12 @@ class PowerBiRestApi:
     def get_adls_dataource_from_semantic_model(cls, workspace_id, semantic_model_id):
         """Get ADLS datasource from semantic model"""
         data_sources = cls.list_datasources_for_semantic_model(workspace_id, semantic_model_id)
-        for datasource in data_sources:                        
+        for datasource in data_sources:
             if datasource['datasourceType'] == 'AzureDataLakeStorage':
                 server    = datasource['connectionDetails']['server']
                 path      = datasource['connectionDetails']['path']
                 return f'{server}{path}'
 
-    @classmethod
-    def get_web_url_from_semantic_model(cls, workspace_id, semantic_model_id):
-        """Get Web datasource URL from semantic model"""
-        data_sources = cls.list_datasources_for_semantic_model(workspace_id, semantic_model_id)
-        for data_source in data_sources:
-            if data_source['datasourceType'] == 'Web':
-                return data_source['connectionDetails']['url']
-
     @classmethod
     def bind_semantic_model_to_connection(cls, workspace_id, semantic_model_id, connection_id):
         """Bind semantic model to connection"""
@@ -2584,422 +1892,755 @@ class PowerBiRestApi:
             refresh_details = cls._execute_get_request_to_powerbi(rest_url_refresh_details)
 
         AppLogger.log_substep("Refresh operation complete")
-        
-class Variable:
-    """Variable in Variable Library"""
-    name: str
-    value: str
-    type: str
-    note: str
-
-    def __init__(self, name: str, value: str, variable_type: str = 'String', note: str = '') -> None:
-        self.name = name
-        self.value = value
-        self.type = variable_type
-        self.note = note
 
-    def encode(self):
-        """encode support"""
-        return self.__dict__
-
-class VariableOverride:
-    """Variable in Variable Library"""
-    name: str
-    value: str
-
-    def __init__(self, name: str, value: str) -> None:
-        self.name = name
-        self.value = value
-
-    def encode(self):
-        """encode support"""
-        return self.__dict__
-
-class Valueset:
-    """Variable Library"""
-    variableOverrides: List[VariableOverride]
-
-    def __init__(self, name):
-        self.name = name
-        self.variableOverrides = []
-
-    def encode(self):
-        """encode support"""
-        return self.__dict__
-    
-    def add_variable_override(self, name: str, value: str):
-        """"add variable"""
-        self.variableOverrides.append( VariableOverride(name, value) )
-
-class VariableLibrary:
-    """Variable Library"""
-    variables: List[Variable]
-    valuesets: List[Valueset]
-
-    def __init__(self, variables = None, valuesets = None):
-        self.variables = variables if variables is not None else []
-        self.valuesets = valuesets if valuesets is not None else []
-
-    def encode(self):
-        """encode support"""
-        return self.__dict__
-
-    def add_variable(self, name: str, value: str, variable_type: str = 'String', note: str = 'some note'):
-        """"add variable"""
-        self.variables.append( Variable(name, value, variable_type, note) )
-
-    def add_valueset(self, valueset: Valueset):
-        """"add valueset"""
-        self.valuesets.append( valueset )
-
-
-    def get_variable_json(self):
-        "Get JSON for variables.json"
-        variable_lib = {
-            '$schema': 'https://developer.microsoft.com/json-schemas/fabric/item/variableLibrary/definition/variables/1.0.0/schema.json',
-            'variables': self.variables
-        }
-        return json.dumps(variable_lib, default=lambda o: o.encode(), indent=4)
-
-    def get_valueset_json(self, valueset_name):
-        """Get JSON for valueset.json"""
-        valueset_list = list(filter(lambda valueset: valueset.name == valueset_name, self.valuesets))
-        valueset: Valueset = valueset_list[0]
-               
-        valueset_export = {
-            '$schema': 'https://developer.microsoft.com/json-schemas/fabric/item/variableLibrary/definition/valueSet/1.0.0/schema.json',
-            'name': valueset.name,
-            'variableOverrides': valueset.variableOverrides
+class RewriteRule:
+    """Literal or regular expression search term with its replacement"""
+
+    def __init__(self, search, replacement, is_regex):
+        self.search = search
+        self.replacement = replacement
+        self.is_regex = is_regex
+        self.pattern = re.compile(search) if is_regex else None
+
+class PayloadRewriter:
+    """Compiles literal and regex rules into one matcher which rewrites text in a single pass"""
+
+    # backreferences and conditionals depend on the group numbering of the rule's own pattern
+    _BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+    # global inline flags are only valid at the start of the whole pattern
+    _GLOBAL_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+
+    # rewriters compiled for recently used rule sets
+    MAX_CACHED_REWRITERS = 256
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, literals = None, patterns = None):
+        self.rules = []
+        for search, replacement in (literals or {}).items():
+            if search != '':
+                self.rules.append(RewriteRule(search, replacement, False))
+        for search, replacement in (patterns or {}).items():
+            self.rules.append(RewriteRule(search, replacement, True))
+
+        literal_rules = [ rule for rule in self.rules if not rule.is_regex ]
+        self._literal_replacements = { rule.search: rule.replacement for rule in literal_rules }
+
+        alternatives = []
+        self._regex_rules_by_group = {}
+        self.fallback_rules = []
+        if len(literal_rules) > 0:
+            alternatives.append(f'(?P<_literal>{self._get_trie_pattern(self._literal_replacements)})')
+        for index, rule in enumerate(rule for rule in self.rules if rule.is_regex):
+            if self._can_combine(rule):
+                group_name = f'_rule{index}'
+                alternatives.append(f'(?P<{group_name}>{rule.search})')
+                self._regex_rules_by_group[group_name] = rule
+            else:
+                self.fallback_rules.append(rule)
+
+        self._matcher = re.compile('|'.join(alternatives)) if len(alternatives) > 0 else None
+
+    @classmethod
+    def _get_trie_pattern(cls, literals):
+        """Get pattern which matches the longest of literals, with shared prefixes factored out"""
+        trie = {}
+        for literal in literals:
+            node = trie
+            for character in literal:
+                node = node.setdefault(character, {})
+            # empty key marks the end of a literal
+            node[''] = {}
+
+        def build(node):
+            branches = []
+            for character, child in sorted(node.items()):
+                if character == '':
+                    continue
+                # runs without branches become plain text so long literals don't recurse per character
+                prefix = character
+                while len(child) == 1 and '' not in child:
+                    next_character, child = next(iter(child.items()))
+                    prefix += next_character
+                branches.append(re.escape(prefix) + build(child))
+            if len(branches) == 0:
+                return ''
+            pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            # greedy optional group tries the longer literal before stopping at this one
+            return f'(?:{pattern})?' if '' in node else pattern
+
+        return build(trie)
+
+    @classmethod
+    def _can_combine(cls, rule):
+        """Check whether regex rule behaves the same inside the combined matcher"""
+        # named groups could collide with names used by other rules
+        return len(rule.pattern.groupindex) == 0 and \
+               cls._BACKREFERENCE.search(rule.search) is None and \
+               cls._GLOBAL_FLAGS.match(rule.search) is None
+
+    @classmethod
+    def get(cls, literals = None, patterns = None):
+        """Get rewriter for rules, reusing one compiled earlier for the same rules"""
+        key = (tuple((literals or {}).items()), tuple((patterns or {}).items()))
+        with cls._cache_lock:
+            rewriter = cls._cache.get(key)
+            if rewriter is not None:
+                cls._cache.move_to_end(key)
+                return rewriter
+
+        rewriter = PayloadRewriter(literals, patterns)
+        with cls._cache_lock:
+            cls._cache[key] = rewriter
+            while len(cls._cache) > cls.MAX_CACHED_REWRITERS:
+                cls._cache.popitem(last=False)
+        return rewriter
+
+    def rewrite(self, text):
+        """Apply all rules to text and return rewritten text with hit counts by search term"""
+        hits = { rule.search: 0 for rule in self.rules }
+
+        def replace(match):
+            group_name = match.lastgroup
+            if group_name == '_literal':
+                search = match.group()
+                hits[search] += 1
+                return self._literal_replacements[search]
+            rule = self._regex_rules_by_group[group_name]
+            hits[rule.search] += 1
+            # matching the rule's own pattern at the same position restores its group numbering
+            rule_match = rule.pattern.match(text, match.start())
+            return rule_match.expand(rule.replacement)
+
+        if self._matcher is not None:
+            text = self._matcher.sub(replace, text)
+
+        for rule in self.fallback_rules:
+            text, count = rule.pattern.subn(rule.replacement, text)
+            hits[rule.search] += count
+
+        return text, hits
+
+    def rewrite_payload(self, payload):
+        """Apply all rules to base64-encoded UTF-8 payload and return new payload with hit counts"""
+        content = base64.b64decode(payload).decode('utf-8')
+        content, hits = self.rewrite(content)
+        return base64.b64encode(content.encode('utf-8')).decode('utf-8'), hits
+
+class DefinitionPart:
+    """Item definition part which decodes its payload on first read and encodes it again only when changed"""
+
+    def __init__(self, path, payload = None, payload_type = 'InlineBase64', content = None):
+        self.path = path
+        self.payload_type = payload_type
+        self._payload = payload
+        self._content = content
+        # content has changed since payload was last encoded
+        self._dirty = content is not None
+
+    @classmethod
+    def from_dict(cls, part):
+        """Create part from REST API part dictionary"""
+        return cls(part['path'], part.get('payload'), part.get('payloadType', 'InlineBase64'))
+
+    @property
+    def content(self):
+        """Decoded UTF-8 text of payload"""
+        if self._content is None and self._payload is not None:
+            self._content = base64.b64decode(self._payload).decode('utf-8')
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._dirty = True
+
+    @property
+    def payload(self):
+        """Base64-encoded payload"""
+        if self._dirty:
+            self._payload = base64.b64encode(self._content.encode('utf-8')).decode('utf-8')
+            self._dirty = False
+        return self._payload
+
+    def rewrite(self, literals = None, patterns = None):
+        """Apply search and replace rules to content and return hit counts"""
+        content, hits = PayloadRewriter.get(literals, patterns).rewrite(self.content)
+        if any(count > 0 for count in hits.values()):
+            self.content = content
+        return hits
+
+    def to_dict(self):
+        """Get part as REST API part dictionary"""
+        return {
+            'path': self.path,
+            'payload': self.payload,
+            'payloadType': self.payload_type
         }
-        return json.dumps(valueset_export, default=lambda o: o.encode(), indent=4)
 
-class ItemDefinitionFactory:
-    """Logic to to create and update item definitions"""
+class DefinitionPartSet:
+    """Definition parts indexed by path which keep their original order when updated"""
 
-    @classmethod
-    def _create_inline_base64_part(cls, path, payload):
-        """create item definition part with base64 encoding"""
-        return {
-            'path': path,
-            'payload': base64.b64encode(payload.encode('utf-8')).decode('utf-8'),
-            'payloadType': 'InlineBase64'
-        }
+    # parts which must come after all others, such as notebook-settings.json which Fabric expects last
+    LAST_PART_NAMES = [ 'notebook-settings.json' ]
 
-    @classmethod
-    def _get_part_path(cls, item_folder_path, file_path):
-        """get path for item definition part"""
-        offset = file_path.find(item_folder_path) + len(item_folder_path) + 1
-        return file_path[offset:].replace('\\', '/')
+    def __init__(self, parts = None):
+        self._parts = {}
+        for part in parts or []:
+            self.put(part)
 
     @classmethod
-    def _search_and_replace_in_payload(cls, payload, search_replace_text):
-        payload_bytes = base64.b64decode(payload)
-        payload_content = payload_bytes.decode('utf-8')
-        for entry in search_replace_text.keys():
-            payload_content = payload_content.replace(entry, search_replace_text[entry])
-        return base64.b64encode(payload_content.encode('utf-8')).decode('utf-8')
+    def from_parts(cls, parts):
+        """Create part set from list of REST API part dictionaries"""
+        return cls(DefinitionPart.from_dict(part) for part in parts)
 
-    @classmethod
-    def _search_and_replace_in_payload_with_regex(cls, payload, search_replace_terms):
-        payload_bytes = base64.b64decode(payload)
-        payload_content = payload_bytes.decode('utf-8')
+    def __len__(self):
+        return len(self._parts)
 
-        for search, replace in search_replace_terms.items():
-            payload_content, count = re.subn(search, replace, payload_content)
+    def __contains__(self, path):
+        return path in self._parts
 
-        return base64.b64encode(payload_content.encode('utf-8')).decode('utf-8')
+    def __iter__(self):
+        return iter(self.ordered())
 
-    @classmethod
-    def get_template_file(cls, path):
-        """get contents of a file from templates folder"""
-        file_path = f".//templates//ItemDefinitionTemplateFiles//{path}"
-        file = open(file_path,'r', encoding="utf-8")
-        file_content = file.read()
-        file.close()
-        return file_content
+    def get(self, path):
+        """Get part by path or None"""
+        return self._parts.get(path)
 
-    @classmethod
-    def get_create_item_request_from_folder(cls, item_folder):
-        """generate create item request from folder"""
-        folder_path = f".//templates//ItemDefinitionTemplateFolders//{item_folder}"
-        platform_file_path = f'{folder_path}//.platform'
-        file = open(platform_file_path,'r', encoding="utf-8")
-        file_content = json.loads(file.read())
-        file.close()
-        item_type = file_content['metadata']['type']
-        item_display_name = file_content['metadata']['displayName']
+    def put(self, part: DefinitionPart):
+        """Add part, replacing any part with the same path in place"""
+        self._parts[part.path] = part
+        return part
 
-        item_definition_parts = []
+    def set_content(self, path, content, payload_type = 'InlineBase64'):
+        """Replace content of part, adding part if it does not exist"""
+        part = self._parts.get(path)
+        if part is None:
+            return self.put(DefinitionPart(path, payload_type=payload_type, content=content))
+        part.content = content
+        return part
 
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                part_path = cls._get_part_path(item_folder, file_path)
-                file = open(file_path,'r', encoding="utf-8")
-                part_content = file.read()
-                item_definition_parts.append(cls._create_inline_base64_part(part_path, part_content))
+    def remove(self, path):
+        """Remove part by path and return it or None"""
+        return self._parts.pop(path, None)
 
+    def rewrite(self, path, literals = None, patterns = None):
+        """Apply search and replace rules to part and return hit counts, or None if part does not exist"""
+        part = self._parts.get(path)
+        if part is None:
+            return None
+        return part.rewrite(literals, patterns)
+
+    def ordered(self):
+        """Get parts in original order with parts named in LAST_PART_NAMES moved to the end"""
+        parts = []
+        last_parts = []
+        for part in self._parts.values():
+            name = part.path.rsplit('/', 1)[-1]
+            (last_parts if name in self.LAST_PART_NAMES else parts).append(part)
+        return parts + last_parts
+
+    def to_parts(self):
+        """Get parts as list of REST API part dictionaries"""
+        return [ part.to_dict() for part in self.ordered() ]
+
+class ItemDefinition:
+    """Item display name, type and definition parts which serialize to create and update requests"""
+
+    def __init__(self, display_name = None, item_type = None, parts = None, definition_format = None):
+        self.display_name = display_name
+        self.item_type = item_type
+        self.parts = parts if parts is not None else DefinitionPartSet()
+        self.definition_format = definition_format
+
+    @classmethod
+    def from_definition(cls, definition, display_name = None, item_type = None):
+        """Create item definition from REST API definition dictionary with parts"""
+        return cls(display_name, item_type,
+                   DefinitionPartSet.from_parts(definition.get('parts', [])),
+                   definition.get('format'))
+
+    @classmethod
+    def from_create_request(cls, create_request):
+        """Create item definition from create item request"""
+        return cls.from_definition(create_request.get('definition', {}),
+                                   create_request.get('displayName'),
+                                   create_request.get('type'))
+
+    def to_definition(self):
+        """Get REST API definition dictionary"""
+        definition = { 'parts': self.parts.to_parts() }
+        if self.definition_format is not None:
+            definition['format'] = self.definition_format
+        return definition
+
+    def to_create_request(self):
+        """Get create item request"""
         return {
-            'displayName': item_display_name,
-            'type': item_type,
-            'definition': {
-                'parts': item_definition_parts
-            }
-
+            'displayName': self.display_name,
+            'type': self.item_type,
+            'definition': self.to_definition()
         }
 
+    def to_update_request(self):
+        """Get update item definition request"""
+        return { 'definition': self.to_definition() }
+
+class ItemDefinitionFactory:
+    """Logic to to create and update item definitions"""
+
     @classmethod
     def update_item_definition_part(cls, item_definition, part_path, search_replace_text):
         """Update Item Definition Part"""
-        item_part = next((part for part in item_definition['parts'] if part['path'] == part_path), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            item_part['payload'] = cls._search_and_replace_in_payload(item_part['payload'], search_replace_text)
-            item_definition['parts'].append(item_part)
-        return item_definition
+        definition = ItemDefinition.from_definition(item_definition)
+        definition.parts.rewrite(part_path, literals=search_replace_text)
+        return definition.to_definition()
 
     @classmethod
     def update_item_definition_part_with_regex(cls, item_definition, part_path, search_replace_terms):
         """Update Item Definition Part"""
-        item_part = next((part for part in item_definition['parts'] if part['path'] == part_path), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            item_part['payload'] = cls._search_and_replace_in_payload_with_regex(item_part['payload'], search_replace_terms)
-            item_definition['parts'].append(item_part)
-        return item_definition
-
-    @classmethod
-    def update_part_in_create_request(cls, create_item_request, part_path, search_replace_text):
-        """Update Item Definition Part"""
-        item_definition = create_item_request['definition']
-        item_part = next((part for part in item_definition['parts'] if part['path'] == part_path), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            item_part['payload'] = cls._search_and_replace_in_payload(item_part['payload'], search_replace_text)
-            item_definition['parts'].append(item_part)
-        
-        return {
-            'displayName': create_item_request['displayName'],
-            'type': create_item_request['type'],
-            'definition': item_definition
-        }
+        definition = ItemDefinition.from_definition(item_definition)
+        definition.parts.rewrite(part_path, patterns=search_replace_terms)
+        return definition.to_definition()
 
-    @classmethod
-    def get_notebook_create_request(cls, workspace_id, lakehouse, display_name, py_file):
-        """Create Item Definition for a Notebook"""
-        py_content = cls.get_template_file(f"Notebooks//{py_file}")
-        py_content = py_content.replace('{WORKSPACE_ID}', workspace_id) \
-                             .replace('{LAKEHOUSE_ID}', lakehouse.id) \
-                             .replace('{LAKEHOUSE_NAME}', lakehouse.display_name)
+class AdoProjectManager:
+    """Wrapper class for calling Azure REST APIs for Azure Dev Ops"""
 
-        item_part = cls._create_inline_base64_part('notebook-content.py', py_content)
-        item_definition = {
-            'parts': [ item_part ]
-        }
+    ADO_ORGANIZATION = os.getenv('ADO_ORGANIZATION')
 
-        return {
-            'displayName': display_name,
-            'type': 'Notebook',
-            'definition': item_definition
-        }
+    # Azure DevOps service roots, which can be pointed at a local mock server
+    ADO_API_BASE_URL = os.getenv('ADO_API_BASE_URL', 'https://dev.azure.com').rstrip('/') + '/'
+    BASE_URL = f'{ADO_API_BASE_URL}{ADO_ORGANIZATION}/_apis/'
+    ADO_API_VERSION = "api-version=7.1-preview"
 
     @classmethod
-    def get_semantic_model_create_request(cls, display_name, bim_file):
-        """Create semantic model create request from BIM file"""
-        pbism_content = cls.get_template_file("SemanticModels//definition.pbism")
-        bim_content  = cls.get_template_file(f'SemanticModels//{bim_file}')
-
-        return {
-            'displayName': display_name,
-            'type': "SemanticModel",
-            'definition': {
-                'parts': [
-                    cls._create_inline_base64_part('definition.pbism', pbism_content),
-                    cls._create_inline_base64_part('model.bim', bim_content)
-                ]
-            }
-        }
+    def _get_ado_access_token(cls):
+        """"Get Access Token for Azure Dev Ops from shared token cache"""
+        return TokenProvider.get_access_token(TokenProvider.ADO_API_SCOPE)
 
     @classmethod
-    def get_semantic_model_create_request_from_definition(cls, display_name, bim_definition):
-        """Create semantic model create request from BIM file"""
-        pbism_content = cls.get_template_file("SemanticModels//definition.pbism")
+    def _execute_get_request(cls, endpoint):
+        """Execute GET Request on Fabric REST API Endpoint"""
+        rest_url = cls.BASE_URL + endpoint
+        access_token = cls._get_ado_access_token()
+        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
+                           'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
+                           'Authorization': f'Bearer {access_token}'}
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            AppLogger.log_error(
+                f'Error executing GET request: {response.status_code} - {response.text}')
+            return None
 
-        return {
-            'displayName': display_name,
-            'type': "SemanticModel",
-            'definition': {
-                'parts': [
-                    cls._create_inline_base64_part('definition.pbism', pbism_content),
-                    cls._create_inline_base64_part('model.bim', bim_definition)
-                ]
-            }
-        }
+    @classmethod
+    def _execute_get_request_on_project(cls, project_name, endpoint):
+        """Execute GET Request on Fabric REST API Endpoint"""
+        rest_url = f'{cls.ADO_API_BASE_URL}{cls.ADO_ORGANIZATION}/{project_name}/_apis/' + endpoint
+        access_token = cls._get_ado_access_token()
+        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
+                           'Content-Type': f'application/json: {cls.ADO_API_VERSION}',
+                           'Authorization': f'Bearer {access_token}'}
+        response = HttpSessionPool.get(url=rest_url, headers=request_headers, timeout=60)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            AppLogger.log_error(
+                f'Error executing GET request: {response.status_code} - {response.text}')
+            return None
 
     @classmethod
-    def get_directlake_model_create_request(cls, display_name, bim_file, server, database):
-        """Get Create Request for DirectLake Semantic Model"""
+    def _execute_post_request(cls, endpoint, post_body=''):
+        """Execute POST request with support for Long-running Operations (LRO)"""
+        rest_url = cls.BASE_URL + endpoint
+        access_token = cls._get_ado_access_token()
+        request_headers = {'Accept': f'application/json; {cls.ADO_API_VERSION}',
+                           'Content-Type': f'application/json; charset=utf-8; {cls.ADO_API_VERSION}',
+                           'Authorization': f'Bearer {access_token}'}
 
-        pbism_content = cls.get_template_file("SemanticModels//definition.pbism")
-        bim_template  = cls.get_template_file(f'SemanticModels//{bim_file}')
+        response = HttpSessionPool.post(url=rest_url, json=post_body, headers=request_headers, timeout=60)
 
-        bim_content = bim_template.replace('abc-xyz.datawarehouse.fabric.microsoft.com', server) \
-                                  .replace('{SQL_ENDPOINT_DATABASE}', database)
+        if response.status_code in { 200, 201 }:
+            try:
+                return response.json()
+            except JSONDecodeError:
+                return None
 
-        return {
-            'displayName': display_name,
-            'type': "SemanticModel",
-            'definition': {
-                'parts': [
-                    cls._create_inline_base64_part('definition.pbism', pbism_content),
-                    cls._create_inline_base64_part('model.bim', bim_content)
-                ]
-            }
-        }
+        if response.status_code in { 202 }:
 
-    @classmethod
-    def get_report_create_request(cls, semantic_model_id, display_name, report_json_file):
-        """Get Create Request for Report using Report.json file"""
+            reponse_body = response.json()
+            operation_id = reponse_body['id']
+            operation_url = f'operations/{operation_id}'
 
-        pbir_content = \
-            cls.get_template_file("Reports//definition.pbir").replace('{SEMANTIC_MODEL_ID}',
-                                                                      semantic_model_id)
+            time.sleep(2)
+            response = cls._execute_get_request(operation_url)
 
-        report_json_content  = cls.get_template_file(f'Reports//{report_json_file}')
-        theme_file_content = \
-            cls.get_template_file(
-                "Reports//StaticResources//SharedResources//BaseThemes//CY24SU02.json")
-        return {
-            'displayName': display_name,
-            'type': "Report",
-            'definition': {
-                'parts': [
-                    cls._create_inline_base64_part('definition.pbir', pbir_content),
-                    cls._create_inline_base64_part('report.json', report_json_content),
-                    cls._create_inline_base64_part(
-                        'StaticResources/SharedResources/BaseThemes/CY24SU02.json', 
-                        theme_file_content )
-                ]
-            }
-        }
+            while response['status'] not in [ 'succeeded', 'failed', 'cancelled' ]:
+                time.sleep(2)
+                response = cls._execute_get_request(operation_url)
 
-    @classmethod
-    def update_report_definition_with_semantic_model_id(cls, item_definition, target_model_id):
-        """Update Item Definition Part"""
-        item_part = next((part for part in item_definition['parts'] if part['path'] == 'definition.pbir'), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            file_template = cls.get_template_file(r"Reports//definition.pbir")
-            file_content = file_template.replace('{SEMANTIC_MODEL_ID}', target_model_id)
-            item_part = cls._create_inline_base64_part('definition.pbir', file_content)
-            item_definition['parts'].append(item_part)
+            if response['status'] == 'succeeded':
+                return None
+            else:
+                AppLogger.log_error(response)
 
-        return item_definition
+        else:
+            AppLogger.log_error(
+                f'Error executing POST request: {response.status_code} - {response.text}')
+            return None
 
     @classmethod
-    def update_create_report_request_with_semantic_model(cls, create_report_request, target_model_id):
-        """Update Item Definition Part"""
-        item_definition = create_report_request['definition']
-        item_part = next((part for part in item_definition['parts'] if part['path'] == 'definition.pbir'), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            file_template = cls.get_template_file(r"Reports//definition.pbir")
-            file_content = file_template.replace('{SEMANTIC_MODEL_ID}', target_model_id)
-            item_part = cls._create_inline_base64_part('definition.pbir', file_content)
-            item_definition['parts'].append(item_part)
-
-        return {
-            'displayName': create_report_request['displayName'],
-            'type': "Report",
-            'definition': item_definition
-        }
+    def get_project_repositories(cls, project_name):
+        """Get Project Repositories"""
+        endpoint = 'git/repositories'
+        return cls._execute_get_request_on_project(project_name, endpoint)['value']
 
     @classmethod
-    def update_create_pbir_report_request_with_semantic_model(cls, create_report_request, target_model_id):
-        """Update Item Definition Part"""
-        item_definition = create_report_request['definition']
-        item_part = next((part for part in item_definition['parts'] if part['path'] == 'definition.pbir'), None)
-        if item_part is not None:
-            item_definition['parts'].remove(item_part)
-            file_template = cls.get_template_file(r"Reports//definition_pbir.pbir")
-            file_content = file_template.replace('{SEMANTIC_MODEL_ID}', target_model_id)
-            item_part = cls._create_inline_base64_part('definition.pbir', file_content)
-            item_definition['parts'].append(item_part)
+    def get_project_repository(cls, project_name):
+        """Get Project Repository"""
+        repo_list = cls.get_project_repositories(project_name)
+        return repo_list[0]
 
-        return {
-            'displayName': create_report_request['displayName'],
-            'type': "Report",
-            'definition': item_definition
-        }
+    @classmethod
+    def get_branches(cls, project_name):
+        """Get Branches"""
+        repository = cls.get_project_repository(project_name)
+        repository_id = repository['id']
+        endpoint = f'git/repositories/{repository_id}/refs'
+        return cls._execute_get_request_on_project(project_name, endpoint)['value']
 
     @classmethod
-    def get_data_pipeline_create_request(cls, display_name, pipeline_definition):
-        """Get Create Request for Data Pipeline using pipeline-content.json file"""
-        return {
-            'displayName': display_name,
-            'type': "DataPipeline",
-            'definition': {
-                'parts': [
-                    cls._create_inline_base64_part('pipeline-content.json', pipeline_definition),
-                ]
-            }
-        }
- 
+    def get_branch(cls, project_name, branch):
+        """Get Branches"""
+        repository = cls.get_project_repository(project_name)
+        repository_id = repository['id']
+        endpoint = f'git/repositories/{repository_id}/refs/?filter=heads/{branch}'
+        return cls._execute_get_request_on_project(project_name, endpoint)['value'][0]
+
     @classmethod
-    def get_variable_library_create_request(cls, display_name, variable_library: VariableLibrary):
-        """Get Create Request for Variable Library file"""
+    def create_branch(cls, project_name, branch, base_branch):
+        """Get Branches"""
+        AppLogger.log_substep(f'Creating branch [{branch}]')
+        repository = cls.get_project_repository(project_name)
+        repository_id = repository['id']
+        base_branch = cls.get_branch(project_name, base_branch)
+        base_branch_object_id = base_branch['objectId']
+        refs_endpoint = f'git/repositories/{repository_id}/refs'
+        body = [{
+            "name": f'refs/heads/{branch}',
+            "oldObjectId":"0000000000000000000000000000000000000000",
+            "newObjectId":f'{base_branch_object_id}'
+        }]
+        return cls._execute_post_request(refs_endpoint, body)
 
-        variables_json = variable_library.get_variable_json()
+class DeploymentJobType(Enum):
+    """Deployment Plan Type"""
+    STAGED_DEPLOYMENT = 1
+    CUSTOMER_TENANT = 2
+
+class DeploymentJob:
+    """Deployment Plan Class"""
+
+    deployment_type: DeploymentJobType
+
+    web_datasource_path_parameter = "web_datasource_path"
+    adls_server_parameter = "adls_server"
+    adls_container_name_parameter = "adls_container_name"
+    adls_container_path_parameter = "adls_container_path"
+    adls_account_key_parameter = "adls_account_key"
+
+    def __init__(self, deployment_id, deployment_name,
+                 deployment_type: DeploymentJobType = DeploymentJobType.CUSTOMER_TENANT):
+        self.deployment_type = deployment_type
+        self.id = deployment_id
+        self.name = deployment_name
+        self.description = None
+        # capacity for workspaces created by this job, None uses FABRIC_CAPACITY_ID
+        self.capacity_id = None
+        self._parameters = dict()
+
+        # setup Web datasource path
+        self.set_deployment_parameter(DeploymentJob.web_datasource_path_parameter,
+                                      EnvironmentSettings.WEB_DATASOURCE_ROOT_URL + 'dev/')
+
+        # setup ADLS datasource path
+        self.set_deployment_parameter(DeploymentJob.adls_server_parameter,
+                                      EnvironmentSettings.AZURE_STORAGE_SERVER)
+        self.set_deployment_parameter(DeploymentJob.adls_container_name_parameter,
+                                      EnvironmentSettings.AZURE_STORAGE_CONTAINER)
+        self.set_deployment_parameter(DeploymentJob.adls_container_path_parameter,
+                                      EnvironmentSettings.AZURE_STORAGE_CONTAINER)
+
+    @property
+    def target_workspace_name(self):
+        """Target Workspace Name"""
+        return f"Tenant - {self.id}"
+
+    @property
+    def parameters(self):
+        """parameters collection"""
+        return self._parameters
+
+    def set_deployment_parameter(self, parameter_name, deployment_value):
+        """add deployment parameter"""
+        self._parameters.update({ parameter_name: deployment_value })
+
+    def display_deployment_parameters(self, parameter_filter = None):
+        """Display Deployment Parameters"""
+        AppLogger.log_table_header(f'Deployment parameters for [{self.id}]')
+        for key, value in self.parameters.items():
+            if (parameter_filter is None) or \
+               (parameter_filter in key):
+                AppLogger.log_table_row(key, value)
+
+class JobRun:
+    """State and timing of one on-demand job tracked by JobOrchestrator"""
+
+    def __init__(self, name, item_id, job_type, depends_on = None):
+        self.name = name
+        self.item_id = item_id
+        self.job_type = job_type
+        self.depends_on = list(depends_on or [])
+        self.status = 'Pending'
+        self.job_instance_url = None
+        self.job_instance = None
+        self.error = None
+        self.started_at = None
+        self.ended_at = None
+        self.poll_count = 0
+        self.next_poll_at = None
+
+    @property
+    def duration(self):
+        """Seconds between submission and completion"""
+        if self.started_at is None:
+            return None
+        end_time = self.ended_at if self.ended_at is not None else time.monotonic()
+        return end_time - self.started_at
 
-        parts = [
-            cls._create_inline_base64_part('variables.json', variables_json)
-        ]
+    @property
+    def is_finished(self):
+        """Check whether job has reached a terminal status"""
+        return self.status not in { 'Pending', 'Running' }
 
-        for valueset in variable_library.valuesets:
-            path = f"valueSets/{valueset.name}.json"
-            content = variable_library.get_valueset_json(valueset.name)
-            parts.append( cls._create_inline_base64_part(path, content ) )
+class JobOrchestrator:
+    """Submits on-demand jobs through the job scheduler and tracks them all from a single polling loop"""
 
+    # job type used by the job scheduler for each item type
+    JOB_TYPES = {
+        'Notebook': 'RunNotebook',
+        'DataPipeline': 'Pipeline'
+    }
 
-        settings_json = cls.get_template_file("VariableLibraries//settings.json")
-        parts.append( cls._create_inline_base64_part('settings.json', settings_json ) )
+    # upper bound for jobs running at the same time in one workspace
+    MAX_CONCURRENT_JOBS = int(os.getenv('JOB_MAX_CONCURRENCY', '4'))
 
-        return {
-            'displayName': display_name,
-            'type': "VariableLibrary",
-            'definition': {
-                'parts': parts
-            }
-        }
+    @classmethod
+    def create_job(cls, item, depends_on = None):
+        """Create job run for notebook or data pipeline item"""
+        job_type = cls.JOB_TYPES.get(item.type)
+        if job_type is None:
+            raise ValueError(f'Item type [{item.type}] does not support on-demand jobs')
+        return JobRun(item.display_name, item.id, job_type, depends_on)
 
     @classmethod
-    def get_variable_library_update_request(cls, variable_library: VariableLibrary):
-        """Get Create Request for Variable Library file"""
+    def infer_dependencies(cls, items):
+        """Chain numbered items like 'Create 01 Silver' -> 'Create 02 Gold' and run pipelines after notebooks"""
+        dependencies = { item.display_name: [] for item in items }
+
+        numbered_chains = {}
+        for item in items:
+            match = re.match(r'^(.*?)\s*(\d+)\s', item.display_name)
+            if match is not None:
+                chain_key = (item.type, match.group(1))
+                numbered_chains.setdefault(chain_key, []).append((int(match.group(2)), item.display_name))
+
+        for chain in numbered_chains.values():
+            chain.sort()
+            for (_, previous_name), (_, name) in zip(chain, chain[1:]):
+                dependencies[name].append(previous_name)
+
+        # pipelines have always been run once every notebook has completed
+        notebook_names = [ item.display_name for item in items if item.type == 'Notebook' ]
+        for item in items:
+            if item.type == 'DataPipeline':
+                dependencies[item.display_name].extend(notebook_names)
+
+        return dependencies
+
+    @classmethod
+    def run_jobs(cls, workspace_id, items, dependencies = None, max_concurrency = None,
+                 timeout = None, raise_on_failure = True):
+        """Run jobs for items concurrently in dependency order and return job runs by name"""
+        if dependencies is None:
+            dependencies = cls.infer_dependencies(items)
+        if max_concurrency is None:
+            max_concurrency = cls.MAX_CONCURRENT_JOBS
+        if timeout is None:
+            timeout = FabricRestApi.JOB_TIMEOUT_SECONDS
+
+        jobs = { item.display_name: cls.create_job(item, dependencies.get(item.display_name))
+                 for item in items }
+        for job in jobs.values():
+            unknown = [ name for name in job.depends_on if name not in jobs ]
+            if len(unknown) > 0:
+                raise ValueError(f'Job [{job.name}] depends on unknown jobs {unknown}')
+
+        if len(jobs) > 0:
+            AppLogger.log_substep(f"Running {len(jobs)} on-demand jobs " + \
+                                  f"with up to {max_concurrency} at a time...")
+
+        start_time = time.monotonic()
+        while not all(job.is_finished for job in jobs.values()):
+            cls._start_ready_jobs(workspace_id, jobs, max_concurrency)
+
+            running_jobs = [ job for job in jobs.values() if job.status == 'Running' ]
+            if len(running_jobs) == 0:
+                # jobs still pending with nothing running can only be waiting on a dependency cycle
+                for job in jobs.values():
+                    if job.status == 'Pending':
+                        job.status = 'Skipped'
+                        job.error = 'Circular dependency'
+                continue
+
+            if time.monotonic() - start_time > timeout:
+                for job in running_jobs:
+                    job.status = 'TimedOut'
+                    job.ended_at = time.monotonic()
+                    job.error = f'Job did not complete within {timeout} seconds'
+                continue
+
+            # wait until the next job is due for a status check
+            next_poll_at = min(job.next_poll_at for job in running_jobs)
+            time.sleep(max(0.0, next_poll_at - time.monotonic()))
+
+            for job in running_jobs:
+                if job.next_poll_at <= time.monotonic():
+                    cls._poll_job(job)
+
+        cls.log_job_summary(jobs)
+
+        failed_jobs = [ job.name for job in jobs.values() if job.status != 'Completed' ]
+        if raise_on_failure and len(failed_jobs) > 0:
+            raise RuntimeError(f'On-demand jobs did not complete: {failed_jobs}')
+
+        return jobs
+
+    @classmethod
+    def _start_ready_jobs(cls, workspace_id, jobs, max_concurrency):
+        """Submit pending jobs whose dependencies have completed and skip those with failed dependencies"""
+        running_count = sum(1 for job in jobs.values() if job.status == 'Running')
+        for job in jobs.values():
+            if job.status != 'Pending':
+                continue
+
+            dependency_states = [ jobs[name].status for name in job.depends_on ]
+            if any(state not in { 'Pending', 'Running', 'Completed' } for state in dependency_states):
+                job.status = 'Skipped'
+                job.error = 'Dependency did not complete'
+                continue
+            if any(state != 'Completed' for state in dependency_states):
+                continue
+            if running_count >= max_concurrency:
+                continue
+
+            AppLogger.log_substep(f"Starting {job.job_type} job for [{job.name}]")
+            job.started_at = time.monotonic()
+            try:
+                job.job_instance_url, retry_after = \
+                    FabricRestApi.start_item_job(workspace_id, job.item_id, job.job_type)
+            except RuntimeError as ex:
+                job.status = 'Failed'
+                job.error = str(ex)
+                job.ended_at = time.monotonic()
+                continue
+
+            job.status = 'Running'
+            job.next_poll_at = time.monotonic() + LroPoller.get_poll_delay(0, retry_after)
+            running_count += 1
+
+    @classmethod
+    def _poll_job(cls, job):
+        """Check status of running job once and schedule its next check"""
+        job.poll_count += 1
+        try:
+            job_instance, retry_after = FabricRestApi.get_item_job_instance(job.job_instance_url)
+        except RuntimeError as ex:
+            job.status = 'Failed'
+            job.error = str(ex)
+            job.ended_at = time.monotonic()
+            return
 
-        variables_json = variable_library.get_variable_json()
+        if job_instance is not None and FabricRestApi._is_job_instance_complete(job_instance):
+            job.job_instance = job_instance
+            job.status = job_instance['status']
+            job.ended_at = time.monotonic()
+            if job.status != 'Completed':
+                job.error = job_instance.get('failureReason')
+            HttpMetrics.record_wait('job', job.duration)
+            AppLogger.log_substep(f"Job for [{job.name}] {job.status.lower()} in {job.duration:.0f} seconds")
+            return
 
-        parts = [
-            cls._create_inline_base64_part('variables.json', variables_json)
-        ]
+        job.next_poll_at = time.monotonic() + LroPoller.get_poll_delay(job.poll_count, retry_after)
 
-        for valueset in variable_library.valuesets:
-            path = f"valueSets/{valueset.name}.json"
-            content = variable_library.get_valueset_json(valueset.name)
-            parts.append( cls._create_inline_base64_part(path, content ) )
+    @classmethod
+    def log_job_summary(cls, jobs):
+        """Log status and duration of each job"""
+        if len(jobs) == 0:
+            return
+        AppLogger.log_table_header('On-demand job results')
+        for job in jobs.values():
+            if job.started_at is not None and job.ended_at is not None:
+                AppLogger.add_completed_span(job.name, job.started_at, job.ended_at, 'job_run',
+                                             job_type=job.job_type, status=job.status)
+            duration = f'{job.duration:.1f}s' if job.duration is not None else '-'
+            AppLogger.log_table_row(job.status, f'{job.name} ({duration})')
 
+class StagingEnvironments:
+    """Sample staging environments"""
 
-        settings_json = cls.get_template_file("VariableLibraries//settings.json")
-        parts.append( cls._create_inline_base64_part('settings.json', settings_json ) )
+    @classmethod
+    def get_dev_environment(cls) -> DeploymentJob:
+        """Getter for dev environment"""
+        deployment = DeploymentJob("dev", "dev",
+                                    DeploymentJobType.STAGED_DEPLOYMENT)
+        deployment.description = "dev environment"
 
-        return {
-            'definition': {
-                'parts': parts
-            }
-        }
+        # setup Web datasource path
+        deployment.set_deployment_parameter(DeploymentJob.web_datasource_path_parameter,
+                                            EnvironmentSettings.WEB_DATASOURCE_ROOT_URL +
+                                            'dev/')
+
+        # setup ADLS datasource path
+        deployment.set_deployment_parameter(DeploymentJob.adls_container_path_parameter,
+                                            "/productsales/dev/")
+
+        return deployment
 
 class DeploymentManager:
     """Deployment Manager"""
 
+    # notebook metadata which binds a notebook to its default lakehouse
+    NOTEBOOK_LAKEHOUSE_PATTERNS = [
+        r'("default_lakehouse"\s*:\s*)".*"',
+        r'("default_lakehouse_name"\s*:\s*)".*"',
+        r'("default_lakehouse_workspace_id"\s*:\s*)".*"',
+        r'("known_lakehouses"\s*:\s*)\[[\s\S]*?\]'
+    ]
+
+    @classmethod
+    def _get_notebook_lakehouse_redirects(cls, workspace_id, lakehouse_id, lakehouse_name):
+        """Get regex search and replace terms which bind notebook to default lakehouse"""
+        return dict(zip(cls.NOTEBOOK_LAKEHOUSE_PATTERNS, [
+            rf'\1"{lakehouse_id}"',
+            rf'\1"{lakehouse_name}"',
+            rf'\1"{workspace_id}"',
+            rf'\1[{{"id": "{lakehouse_id}"}}]'
+        ]))
+
     @classmethod
     def update_source_lakehouse_in_notebook(cls,
                 workspace_name,
@@ -3010,15 +2651,7 @@ class DeploymentManager:
         notebook = FabricRestApi.get_item_by_name(workspace.id, notebook_name, 'Notebook')
         lakehouse = FabricRestApi.get_item_by_name(workspace.id, lakehouse_name, "Lakehouse")
 
-        workspace_id = workspace.id
-        lakehouse_id = lakehouse.id
-
-        search_replace_terms = {
-            r'("default_lakehouse"\s*:\s*)".*"': rf'\1"{lakehouse_id}"',
-            r'("default_lakehouse_name"\s*:\s*)".*"': rf'\1"{lakehouse_name}"',
-            r'("default_lakehouse_workspace_id"\s*:\s*)".*"': rf'\1"{workspace_id}"',
-            r'("known_lakehouses"\s*:\s*)\[[\s\S]*?\]': rf'\1[{{"id": "{lakehouse_id}"}}]',
-        }
+        search_replace_terms = cls._get_notebook_lakehouse_redirects(workspace.id, lakehouse.id, lakehouse_name)
 
         notebook_definition = FabricRestApi.get_item_definition(workspace.id, notebook).as_dict()
 
@@ -3030,10 +2663,10 @@ class DeploymentManager:
         }
 
         FabricRestApi.update_item_definition(workspace.id, notebook, notebook_definition)
-       
+
     @classmethod
     def update_imported_semantic_model_source(cls, workspace,
-                                                semantic_model_name, 
+                                                semantic_model_name,
                                                 datasource_path):
         """Update Imported Sementic Model Source"""
         model = FabricRestApi.get_item_by_name(workspace.id, semantic_model_name, 'SemanticModel')
@@ -3042,8 +2675,9 @@ class DeploymentManager:
         if datasource_path == old_datasource_path:
             AppLogger.log_substep(f"Verified web datasource path: [{datasource_path}]")
         else:
+            AppLogger.log_substep(f"Updating web datasource path from [{old_datasource_path}] to [{datasource_path}]")
             old_model_definition = FabricRestApi.get_item_definition(workspace.id, model).as_dict()
-    
+
             search_replace_terms = {
                 old_datasource_path: datasource_path
             }
@@ -3057,7 +2691,6 @@ class DeploymentManager:
 
             FabricRestApi.update_item_definition(workspace.id, model, model_definition)
 
-
     @classmethod
     def update_directlake_semantic_model_source(cls,
                                                 workspace_name,
@@ -3067,8 +2700,8 @@ class DeploymentManager:
         workspace = FabricRestApi.get_workspace_by_name(workspace_name)
         lakehouse = FabricRestApi.get_item_by_name(workspace.id, lakehouse_name, 'Lakehouse')
         model = FabricRestApi.get_item_by_name(workspace.id, semantic_model_name, 'SemanticModel')
-        
-        old_sql_endpoint =    FabricRestApi.get_sql_endpoint_from_semantic_model(
+
+        old_sql_endpoint = FabricRestApi.get_sql_endpoint_from_semantic_model(
             workspace.id,
             model.id
         )
@@ -3083,8 +2716,6 @@ class DeploymentManager:
             old_sql_endpoint['server']: new_sql_endpoint['server']
         }
 
-        AppLogger.log_substep(f"Connect string: [{new_sql_endpoint['server']}]")
-        
         model_definition = {
             'definition': ItemDefinitionFactory.update_item_definition_part(
                 old_model_definition['definition'],
@@ -3095,34 +2726,46 @@ class DeploymentManager:
         FabricRestApi.update_item_definition(workspace.id, model, model_definition)
 
     @classmethod
-    def create_and_bind_model_connection(cls, workspace_name):
-        """Create and Bind Model Connections"""
-        workspace = FabricRestApi.get_workspace_by_name(workspace_name)
-        model_name = 'Product Sales DirectLake Model'
-        model = FabricRestApi.get_item_by_name(workspace.id, model_name, 'SemanticModel')
-        FabricRestApi.create_and_bind_semantic_model_connecton(workspace, model.id)
+    def run_etl_jobs(cls, workspace_id, workspace_items, dependencies = None):
+        """Run 'Create' notebooks and data pipelines concurrently in dependency order"""
+        etl_items = [ item for item in workspace_items
+                      if item.type in JobOrchestrator.JOB_TYPES and 'Create' in item.display_name ]
+        return JobOrchestrator.run_jobs(workspace_id, etl_items, dependencies)
 
     @classmethod
-    def apply_post_sync_fixes(cls, workspace_id, deploy_job):
+    def apply_post_sync_fixes(cls, workspace_id, deploy_job: DeploymentJob):
 
         """Apply Post Sync Fixes"""
         workspace = FabricRestApi.get_workspace_info(workspace_id)
         workspace_name = workspace.display_name
-        AppLogger.log_step(f"Applying post sync fixes to [{workspace.display_name}]")
-        
+        AppLogger.log_step(f"Applying post sync fixes to workspace [{workspace.display_name}]")
+
         workspace_items = list(FabricRestApi.list_workspace_items(workspace.id))
 
+        environment = deploy_job.name
+        variable_libraries = list(filter(lambda item: item.type=='VariableLibrary', workspace_items))
+        for variable_library in variable_libraries:
+            AppLogger.log_substep(f"Set valueSet for variable library [{variable_library.display_name}] to [{environment}]")
+            FabricRestApi.set_active_valueset_for_variable_library(workspace.id, variable_library, environment)
+
+        lakehouses = list(filter(lambda item: item.type=='Lakehouse', workspace_items))
+        for lakehouse in lakehouses:
+            shortcuts = FabricRestApi.list_shortcuts(workspace.id, lakehouse.id)
+            for shortcut in shortcuts:
+                if (shortcut.target.type == 'AdlsGen2') and (shortcut.name == 'sales-data'):
+                    FabricRestApi.reset_adls_gen2_shortcut(workspace.id, lakehouse.id, shortcut)
+
         notebooks = list(filter(lambda item: item.type=='Notebook', workspace_items))
         for notebook in notebooks:
-            
+
             # bind notebooks to sales lakehouse
             if notebook.display_name in [
-                'Create Lakehouse Tables', 
-                'Build 01 Silver Layer',
-                'Build 02 Gold Layer',
-                'Create 01 Silver Layer',
-                'Create 02 Gold Layer',
-                'Build 02 Gold Tables']:
+                'Create Lakehouse Tables',
+                'Build 1 Silver Layer',
+                'Build 2 Gold Layer',
+                'Create 1 Silver Layer',
+                'Create 2 Gold Layer',
+                'Build 2 Gold Tables']:
                 AppLogger.log_substep(f"Updating notebook [{notebook.display_name}]")
                 cls.update_source_lakehouse_in_notebook(
                     workspace_name,
@@ -3130,7 +2773,7 @@ class DeploymentManager:
                     "sales")
 
             # bind notebooks to sales_silver lakehouse
-            if notebook.display_name in ['Build 01 Silver Tables']:
+            if notebook.display_name in ['Build 11 Silver Tables']:
                 AppLogger.log_substep(f"Updating notebook [{notebook.display_name}]")
                 cls.update_source_lakehouse_in_notebook(
                     workspace_name,
@@ -3139,11 +2782,11 @@ class DeploymentManager:
 
         models = list(filter(lambda item: item.type=='SemanticModel', workspace_items))
         for model in models:
-             
-            if model.display_name == 'Product Sales Imported Model':                
-                adls_server =  deploy_job['parameters']['adls_server']
-                adls_container_name =  deploy_job['parameters']['adls_container_name']
-                adls_container_path =  deploy_job['parameters']['adls_container_path']
+
+            if model.display_name == 'Product Sales Imported Model':
+                adls_server =  deploy_job.parameters[deploy_job.adls_server_parameter]
+                adls_container_name =  deploy_job.parameters[deploy_job.adls_container_name_parameter]
+                adls_container_path =  deploy_job.parameters[deploy_job.adls_container_path_parameter]
                 datasource_path = f'{adls_server}{adls_container_name}{adls_container_path}'
                 DeploymentManager.update_imported_semantic_model_source(
                     workspace,
@@ -3155,30 +2798,21 @@ class DeploymentManager:
                 # fix connection to lakehouse SQL endpoint
                 target_lakehouse_name = 'sales'
                 DeploymentManager.update_directlake_semantic_model_source(
-                    workspace_name, 
+                    workspace_name,
                     model.display_name,
                     target_lakehouse_name)
 
-
     @classmethod
     def apply_post_deploy_fixes(cls, workspace_id):
-        """Apply Post Deploy Fixes"""
 
+        """Apply Post Deploy Fixes"""
         workspace = FabricRestApi.get_workspace_info(workspace_id)
-        workspace_name = workspace.display_name                         
+        workspace_name = workspace.display_name
         workspace_items = list(FabricRestApi.list_workspace_items(workspace.id))
-       
+
         AppLogger.log_step(f"Applying post deploy fixes to [{workspace_name}]")
-        
-        notebooks = list(filter(lambda item: item.type == 'Notebook', workspace_items))        
-        for notebook in notebooks:
-            if 'Create' in notebook.display_name:
-                FabricRestApi.run_notebook(workspace.id, notebook)
-    
-        pipelines  = list(filter(lambda item: item.type == 'DataPipeline', workspace_items))
-        for pipeline in pipelines:
-            if 'Create' in pipeline.display_name:
-                FabricRestApi.run_data_pipeline(workspace.id, pipeline)
+
+        cls.run_etl_jobs(workspace.id, workspace_items)
 
         sql_endpoints = list(filter(lambda item: item.type == 'SQLEndpoint', workspace_items))
         for sql_endpoint in sql_endpoints:
@@ -3192,50 +2826,3 @@ class DeploymentManager:
                 workspace,
                 model.id,
                 FabricRestApi.get_item_by_name(workspace.id, 'sales', 'Lakehouse'))
-
-    @classmethod
-    def run_data_pipeline(cls, workspace_name, data_pipeline_name):
-        """Run data pipeline"""
-        workspace = FabricRestApi.get_workspace_by_name(workspace_name)
-        data_pipeline_name = 'Create Lakehouse Tables'
-        data_pipeline = FabricRestApi.get_item_by_name(
-            workspace.id,
-            data_pipeline_name,
-            'DataPipeline')
-
-        FabricRestApi.run_data_pipeline(workspace.id, data_pipeline)
-
-    @classmethod
-    def get_sql_endpoint_info_by_name(cls, workspace_name, lakehouse_name):
-        """Get SQL Endpoint"""
-        workspace = FabricRestApi.get_workspace_by_name(workspace_name)
-        lakehouse = FabricRestApi.get_item_by_name(workspace.id, 
-                                                     lakehouse_name, 'Lakehouse')
-        
-        return FabricRestApi.get_sql_endpoint_for_lakehouse(workspace.id, lakehouse)
- 
-    @classmethod
-    def create_feature_workspace(cls, project_name, feature_name, base_branch):
-        """Create feature workspace from new ADO branch"""
-        
-        # create first feature workspace
-        feature_workspace_name = F'{project_name}-dev-{feature_name}'
-        feature_branch_name = f'dev-{feature_name}'
-        feature_workspace = FabricRestApi.create_workspace(feature_workspace_name)
-        AdoProjectManager.create_branch(project_name, feature_branch_name, base_branch)
-        FabricRestApi.connect_workspace_to_ado_repo(
-            feature_workspace,
-            project_name,
-            feature_branch_name
-        )
-        
-        DeploymentManager.apply_post_sync_fixes(
-            feature_workspace.id,
-            EnvironmentSettings.DEPLOYMENT_JOBS['dev']
-        )
-
-        DeploymentManager.apply_post_deploy_fixes(feature_workspace.id)
-        
-        FabricRestApi.commit_workspace_to_git(feature_workspace.id)
-        
-        return feature_workspace
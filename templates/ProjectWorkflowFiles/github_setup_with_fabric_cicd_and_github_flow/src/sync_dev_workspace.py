@@ -2,7 +2,7 @@
 
 import os
 
-from fabric_devops_utils import EnvironmentSettings, DeploymentManager, FabricRestApi, AppLogger
+from fabric_devops_utils import EnvironmentSettings, DeploymentManager, FabricRestApi, AppLogger, StagingEnvironments
 
 AppLogger.log_job(
     "Synching workspace by updating from GIT and applying any post-sync fixes..."
@@ -17,7 +17,7 @@ match branch_name:
     case 'main':
         workspace_id = EnvironmentSettings.WORKSPACE_ID_DEV
         FabricRestApi.update_workspace_from_git(workspace_id)
-        deployment_job = EnvironmentSettings.DEPLOYMENT_JOBS['dev']
+        deployment_job = StagingEnvironments.get_dev_environment()
         DeploymentManager.apply_post_sync_fixes(workspace_id, deployment_job)
         AppLogger.log_job_complete(workspace_id)
 
@@ -5,17 +5,11 @@ from fabric_devops_utils import EnvironmentSettings, AppLogger, FabricRestApi, D
 REPO_NAME = EnvironmentSettings.GITHUB_REPOSITORY_NAME
 FEATURE_NAME = os.getenv("FEATURE_NAME")
 
-feature_workspace = DeploymentManager.create_feature_workspace_in_github(
+feature_workspace = DeploymentManager.create_feature_workspace_for_github_repo(
+    f'{REPO_NAME}-dev',
     REPO_NAME,
     FEATURE_NAME,
     'dev'
 )
 
-AppLogger.log_substep('Adding workspace role of [Member] for developers group')
-FabricRestApi.add_workspace_role_assignment_for_group(
-    feature_workspace.id,
-    EnvironmentSettings.DEVELOPERS_GROUP_ID,
-    'Member'
-)
-
 AppLogger.log_job_complete(feature_workspace.id)